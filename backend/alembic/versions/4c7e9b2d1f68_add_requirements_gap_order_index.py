@@ -0,0 +1,32 @@
+"""add_requirements_gap_order_index
+
+Revision ID: 4c7e9b2d1f68
+Revises: d81c4f3a7e25
+Create Date: 2026-10-19 18:05:12.318740
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c7e9b2d1f68'
+down_revision: Union[str, None] = 'd81c4f3a7e25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Must match app.models.requirement.priority_rank exactly to be used;
+    # PostgreSQL needs the expression in its own parentheses
+    op.create_index('ix_requirements_gap_order', 'requirements', [
+        sa.text("(CASE priority WHEN 'CRITICAL' THEN 0 WHEN 'HIGH' THEN 1 "
+                "WHEN 'MEDIUM' THEN 2 WHEN 'LOW' THEN 3 ELSE 4 END)"),
+        'id'
+    ], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_requirements_gap_order', table_name='requirements')
@@ -0,0 +1,38 @@
+"""add_jobs_scheduled_active_index
+
+Revision ID: 5d2f8c1a9e07
+Revises: c4e91b7d2a56
+Create Date: 2026-10-20 09:41:27.310562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8c1a9e07'
+down_revision: Union[str, None] = 'c4e91b7d2a56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEDULED_ACTIVE = sa.text("created_by_id IS NULL AND status IN ('QUEUED', 'RUNNING')")
+
+
+def upgrade() -> None:
+    # Duplicates queued by concurrent schedulers before this index: fail all but the oldest
+    op.execute(
+        "UPDATE jobs SET status = 'FAILED', error = 'Duplicate scheduled job' "
+        "WHERE created_by_id IS NULL AND status IN ('QUEUED', 'RUNNING') AND id NOT IN ("
+        "SELECT MIN(id) FROM jobs WHERE created_by_id IS NULL AND status IN ('QUEUED', 'RUNNING') "
+        "GROUP BY job_type)"
+    )
+    op.create_index(
+        'ix_jobs_scheduled_active', 'jobs', ['job_type'], unique=True,
+        postgresql_where=SCHEDULED_ACTIVE, sqlite_where=SCHEDULED_ACTIVE
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_scheduled_active', table_name='jobs')
@@ -0,0 +1,63 @@
+"""add_failure_analyses_table
+
+Revision ID: 7c1d2e9a4b50
+Revises: eb6aa8f9d3ec
+Create Date: 2026-10-19 09:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d2e9a4b50'
+down_revision: Union[str, None] = 'eb6aa8f9d3ec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('failure_analyses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('test_case_id', sa.Integer(), nullable=False),
+    sa.Column('log_fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('knowledge_version', sa.String(length=16), nullable=False),
+    sa.Column('failure_type', sa.String(length=50), nullable=True),
+    sa.Column('confidence_score', sa.Float(), nullable=True),
+    sa.Column('report', sa.JSON(), nullable=False),
+    sa.Column('created_by_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['test_case_id'], ['test_cases.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('test_case_id', 'log_fingerprint', 'knowledge_version', name='unique_failure_analysis')
+    )
+    op.create_index(op.f('ix_failure_analyses_id'), 'failure_analyses', ['id'], unique=False)
+    op.create_index(op.f('ix_failure_analyses_test_case_id'), 'failure_analyses', ['test_case_id'], unique=False)
+    op.create_index(op.f('ix_failure_analyses_failure_type'), 'failure_analyses', ['failure_type'], unique=False)
+    op.create_index(op.f('ix_failure_analyses_created_at'), 'failure_analyses', ['created_at'], unique=False)
+
+    op.add_column('test_case_suggestions', sa.Column('analysis_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_test_case_suggestions_analysis_id', 'test_case_suggestions', 'failure_analyses',
+        ['analysis_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index(op.f('ix_test_case_suggestions_analysis_id'), 'test_case_suggestions', ['analysis_id'], unique=False)
+    op.create_index(op.f('ix_test_case_suggestions_test_case_id'), 'test_case_suggestions', ['test_case_id'], unique=False)
+    op.create_index(op.f('ix_suggestion_feedback_suggestion_id'), 'suggestion_feedback', ['suggestion_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_suggestion_feedback_suggestion_id'), table_name='suggestion_feedback')
+    op.drop_index(op.f('ix_test_case_suggestions_test_case_id'), table_name='test_case_suggestions')
+    op.drop_index(op.f('ix_test_case_suggestions_analysis_id'), table_name='test_case_suggestions')
+    op.drop_constraint('fk_test_case_suggestions_analysis_id', 'test_case_suggestions', type_='foreignkey')
+    op.drop_column('test_case_suggestions', 'analysis_id')
+
+    op.drop_index(op.f('ix_failure_analyses_created_at'), table_name='failure_analyses')
+    op.drop_index(op.f('ix_failure_analyses_failure_type'), table_name='failure_analyses')
+    op.drop_index(op.f('ix_failure_analyses_test_case_id'), table_name='failure_analyses')
+    op.drop_index(op.f('ix_failure_analyses_id'), table_name='failure_analyses')
+    op.drop_table('failure_analyses')
@@ -0,0 +1,64 @@
+"""add_requirement_counters
+
+Revision ID: 7f3a2d8e6b41
+Revises: e2b8c5a90d17
+Create Date: 2026-10-19 19:47:21.306518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3a2d8e6b41'
+down_revision: Union[str, None] = 'e2b8c5a90d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = (
+    'test_case_count',
+    'passed_test_count',
+    'failed_test_count',
+    'pending_test_count',
+    'parent_link_count',
+    'child_link_count',
+)
+
+# Parenthesized: PostgreSQL only accepts an expression index column in its own parentheses
+GAP_ORDER = ("(CASE priority WHEN 'CRITICAL' THEN 0 WHEN 'HIGH' THEN 1 "
+             "WHEN 'MEDIUM' THEN 2 WHEN 'LOW' THEN 3 ELSE 4 END)")
+
+
+def upgrade() -> None:
+    for column in COUNTERS:
+        op.add_column('requirements', sa.Column(column, sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill; afterwards kept up to date on flush (app.models.counters)
+    test_count = "SELECT COUNT(*) FROM test_cases WHERE test_cases.requirement_id = requirements.id"
+    op.execute(f"""
+        UPDATE requirements SET
+            test_case_count = ({test_count}),
+            passed_test_count = ({test_count} AND test_cases.status = 'PASSED'),
+            failed_test_count = ({test_count} AND test_cases.status = 'FAILED'),
+            pending_test_count = ({test_count} AND test_cases.status = 'PENDING'),
+            parent_link_count = (SELECT COUNT(*) FROM traceability_links WHERE traceability_links.target_id = requirements.id),
+            child_link_count = (SELECT COUNT(*) FROM traceability_links WHERE traceability_links.source_id = requirements.id)
+    """)
+
+    # The gap order index only needs the uncovered requirements
+    op.drop_index('ix_requirements_gap_order', table_name='requirements')
+    op.create_index(
+        'ix_requirements_gap_order', 'requirements', [sa.text(GAP_ORDER), 'id'], unique=False,
+        postgresql_where=sa.text('test_case_count = 0'),
+        sqlite_where=sa.text('test_case_count = 0')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_requirements_gap_order', table_name='requirements')
+    op.create_index('ix_requirements_gap_order', 'requirements', [sa.text(GAP_ORDER), 'id'], unique=False)
+
+    for column in reversed(COUNTERS):
+        op.drop_column('requirements', column)
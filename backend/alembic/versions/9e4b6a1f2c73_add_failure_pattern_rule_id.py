@@ -0,0 +1,28 @@
+"""add_failure_pattern_rule_id
+
+Revision ID: 9e4b6a1f2c73
+Revises: 7c1d2e9a4b50
+Create Date: 2026-10-19 11:40:02.551873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b6a1f2c73'
+down_revision: Union[str, None] = '7c1d2e9a4b50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('failure_patterns', sa.Column('rule_id', sa.String(length=50), nullable=True))
+    op.create_index(op.f('ix_failure_patterns_rule_id'), 'failure_patterns', ['rule_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_failure_patterns_rule_id'), table_name='failure_patterns')
+    op.drop_column('failure_patterns', 'rule_id')
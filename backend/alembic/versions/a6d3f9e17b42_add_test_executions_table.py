@@ -0,0 +1,64 @@
+"""add_test_executions_table
+
+Revision ID: a6d3f9e17b42
+Revises: 4c7e9b2d1f68
+Create Date: 2026-10-19 18:41:37.902215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3f9e17b42'
+down_revision: Union[str, None] = '4c7e9b2d1f68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # Range-partitioned by month; the partition key has to be part of the
+        # primary key. Monthly partitions are created ahead by the
+        # test_execution_maintenance job (app.services.test_executions).
+        op.execute("""
+            CREATE TABLE test_executions (
+                id SERIAL NOT NULL,
+                test_case_id INTEGER NOT NULL REFERENCES test_cases (id) ON DELETE CASCADE,
+                requirement_id INTEGER NOT NULL REFERENCES requirements (id) ON DELETE CASCADE,
+                status testcasestatus NOT NULL,
+                actual_results TEXT,
+                execution_duration INTEGER,
+                executed_by VARCHAR(100),
+                executed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                PRIMARY KEY (id, executed_at)
+            ) PARTITION BY RANGE (executed_at)
+        """)
+        op.execute("CREATE TABLE test_executions_default PARTITION OF test_executions DEFAULT")
+    else:
+        op.create_table('test_executions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('test_case_id', sa.Integer(), nullable=False),
+        sa.Column('requirement_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'PASSED', 'FAILED', 'BLOCKED', 'IN_PROGRESS', name='testcasestatus'), nullable=False),
+        sa.Column('actual_results', sa.Text(), nullable=True),
+        sa.Column('execution_duration', sa.Integer(), nullable=True),
+        sa.Column('executed_by', sa.String(length=100), nullable=True),
+        sa.Column('executed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['requirement_id'], ['requirements.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['test_case_id'], ['test_cases.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index('ix_test_executions_test_case_executed', 'test_executions', ['test_case_id', 'executed_at'], unique=False)
+    op.create_index('ix_test_executions_requirement_executed', 'test_executions', ['requirement_id', 'executed_at'], unique=False)
+    op.create_index(op.f('ix_test_executions_executed_at'), 'test_executions', ['executed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_test_executions_executed_at'), table_name='test_executions')
+    op.drop_index('ix_test_executions_requirement_executed', table_name='test_executions')
+    op.drop_index('ix_test_executions_test_case_executed', table_name='test_executions')
+    # Drops the partitions with it on PostgreSQL
+    op.drop_table('test_executions')
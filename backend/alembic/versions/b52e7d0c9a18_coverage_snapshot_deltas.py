@@ -0,0 +1,51 @@
+"""coverage_snapshot_deltas
+
+Revision ID: b52e7d0c9a18
+Revises: 3f8a1c6d2e94
+Create Date: 2026-10-19 15:41:08.203915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e7d0c9a18'
+down_revision: Union[str, None] = '3f8a1c6d2e94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('coverage_snapshots', sa.Column('base_snapshot_id', sa.Integer(), nullable=True))
+    op.add_column('coverage_snapshots', sa.Column('parent_snapshot_id', sa.Integer(), nullable=True))
+    op.add_column('coverage_snapshots', sa.Column('heatmap_delta', sa.JSON(), nullable=True))
+    op.create_foreign_key(
+        'fk_coverage_snapshots_base_snapshot_id', 'coverage_snapshots', 'coverage_snapshots',
+        ['base_snapshot_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_foreign_key(
+        'fk_coverage_snapshots_parent_snapshot_id', 'coverage_snapshots', 'coverage_snapshots',
+        ['parent_snapshot_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index(op.f('ix_coverage_snapshots_base_snapshot_id'), 'coverage_snapshots', ['base_snapshot_id'], unique=False)
+
+    # Scheduled snapshots and jobs have no submitting user
+    op.alter_column('coverage_snapshots', 'created_by_id', existing_type=sa.Integer(), nullable=True)
+    op.alter_column('jobs', 'created_by_id', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM jobs WHERE created_by_id IS NULL")
+    op.alter_column('jobs', 'created_by_id', existing_type=sa.Integer(), nullable=False)
+    op.execute("DELETE FROM coverage_snapshots WHERE created_by_id IS NULL")
+    op.alter_column('coverage_snapshots', 'created_by_id', existing_type=sa.Integer(), nullable=False)
+
+    op.drop_index(op.f('ix_coverage_snapshots_base_snapshot_id'), table_name='coverage_snapshots')
+    op.drop_constraint('fk_coverage_snapshots_parent_snapshot_id', 'coverage_snapshots', type_='foreignkey')
+    op.drop_constraint('fk_coverage_snapshots_base_snapshot_id', 'coverage_snapshots', type_='foreignkey')
+    op.drop_column('coverage_snapshots', 'heatmap_delta')
+    op.drop_column('coverage_snapshots', 'parent_snapshot_id')
+    op.drop_column('coverage_snapshots', 'base_snapshot_id')
@@ -0,0 +1,28 @@
+"""add_requirement_content_hash
+
+Revision ID: c4e91b7d2a56
+Revises: 7f3a2d8e6b41
+Create Date: 2026-10-19 21:12:08.417093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e91b7d2a56'
+down_revision: Union[str, None] = '7f3a2d8e6b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Left unset: the next ORM write or sync of each row fills it in, and the
+    # sync treats a row without a hash as changed
+    op.add_column('requirements', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('requirements', 'content_hash')
@@ -0,0 +1,46 @@
+"""add_coverage_rollups_table
+
+Revision ID: d81c4f3a7e25
+Revises: b52e7d0c9a18
+Create Date: 2026-10-19 17:22:54.690412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81c4f3a7e25'
+down_revision: Union[str, None] = 'b52e7d0c9a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backfill from existing snapshots with app/scripts/rebuild_coverage_rollups.py
+    op.create_table('coverage_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('resolution', sa.String(length=10), nullable=False),
+    sa.Column('period_start', sa.DateTime(), nullable=False),
+    sa.Column('snapshot_count', sa.Integer(), nullable=False),
+    sa.Column('coverage_min', sa.Float(), nullable=False),
+    sa.Column('coverage_max', sa.Float(), nullable=False),
+    sa.Column('coverage_sum', sa.Float(), nullable=False),
+    sa.Column('last_snapshot_date', sa.DateTime(), nullable=False),
+    sa.Column('total_requirements', sa.Integer(), nullable=False),
+    sa.Column('covered_requirements', sa.Integer(), nullable=False),
+    sa.Column('total_gaps', sa.Integer(), nullable=False),
+    sa.Column('critical_gaps', sa.Integer(), nullable=False),
+    sa.Column('breakdown', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('resolution', 'period_start', name='unique_coverage_rollup')
+    )
+    op.create_index(op.f('ix_coverage_rollups_id'), 'coverage_rollups', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_coverage_rollups_id'), table_name='coverage_rollups')
+    op.drop_table('coverage_rollups')
@@ -0,0 +1,27 @@
+"""add_requirement_stats_indexes
+
+Revision ID: e2b8c5a90d17
+Revises: a6d3f9e17b42
+Create Date: 2026-10-19 19:12:08.554129
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8c5a90d17'
+down_revision: Union[str, None] = 'a6d3f9e17b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_requirements_priority'), 'requirements', ['priority'], unique=False)
+    op.create_index('ix_requirements_type_status_priority', 'requirements', ['type', 'status', 'priority', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_requirements_type_status_priority', table_name='requirements')
+    op.drop_index(op.f('ix_requirements_priority'), table_name='requirements')
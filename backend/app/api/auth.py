@@ -3,14 +3,14 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, LoginRequest, Token
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import verify_password, get_password_hash, create_access_token, user_token_claims
 from app.core.dependencies import get_current_active_user
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+def register(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     # Check if user exists
     existing_user = db.query(User).filter(
@@ -37,7 +37,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     """Login and receive access token"""
     user = db.query(User).filter(User.username == login_data.username).first()
 
@@ -54,19 +54,19 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
             detail="Inactive user"
         )
 
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data=user_token_claims(user))
 
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_active_user)):
+def read_users_me(current_user: User = Depends(get_current_active_user)):
     """Get current user information"""
     return current_user
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(current_user: User = Depends(get_current_active_user)):
+def refresh_token(current_user: User = Depends(get_current_active_user)):
     """Refresh access token for authenticated user"""
-    access_token = create_access_token(data={"sub": current_user.username})
+    access_token = create_access_token(data=user_token_claims(current_user))
     return {"access_token": access_token, "token_type": "bearer"}
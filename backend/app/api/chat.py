@@ -2,22 +2,29 @@
 Ask Ahmed - AI Chat Assistant for CALIDUS Requirements Management System
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+from sqlalchemy import func, or_, select
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Union
 import anthropic
+import asyncio
 import json
+import logging
+import time
 
 from app.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.cache import TTLCache, table_versions
 from app.models.user import User
 from app.models.requirement import Requirement
 from app.models.test_case import TestCase
 from app.models.traceability import TraceabilityLink
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 settings = get_settings()
 
@@ -32,52 +39,152 @@ class ChatRequest(BaseModel):
     context_type: Optional[str] = "auto"  # auto, requirements, tests, traceability
 
 
-async def get_system_context(db: Session, context_type: str = "auto") -> str:
-    """Generate system context based on database content with REAL-TIME test execution data"""
+# Tables the rendered context is derived from; any committed change bumps a version
+CONTEXT_TABLES = ("requirements", "test_cases", "traceability_links")
+
+# Rendered data sections keyed by table versions. The TTL bounds staleness
+# across worker processes, which do not share version counters.
+_context_cache = TTLCache(ttl=settings.chat_context_ttl_seconds, maxsize=16)
+
+# Stable part of the system prompt. Sent first with cache_control so the
+# Anthropic prompt cache can reuse it (together with TOOLS) across turns.
+SYSTEM_PROMPT_PREFIX = """
+# CALIDUS Requirements Management System Context
+
+You are Ahmed, an AI assistant for the CALIDUS Aerospace Requirements Management System. You have comprehensive knowledge of all aerospace requirements, regulations, test cases, and traceability relationships in the system.
+
+## Your Capabilities:
+1. **Direct Database Access**: You have tools to query ANY test case or requirement in the system by ID
+   - Use get_test_case_by_id() to retrieve complete details about any test case (e.g., TC-000942)
+   - Use get_requirement_by_id() to retrieve complete details about any requirement (e.g., SYS-00018)
+   - Use get_requirements_by_ids() to retrieve several requirements in one call (up to 20 IDs)
+   - Use search_test_cases() to find test cases by keyword
+   - Use search_requirements() to find requirements by keyword
+
+2. **Test Execution Analysis**: Analyze test results, pass rates, failed tests, and execution trends (REAL-TIME DATA)
+
+3. **Analysis**: Analyze compliance, coverage, risks, and gaps in the requirements
+
+4. **Reporting**: Generate summaries, statistics, and reports with current test execution data
+
+5. **Guidance**: Provide aerospace regulatory guidance (FAA, EASA, UAE GCAA)
+
+6. **Recommendations**: Suggest improvements, missing links, or potential issues based on test results
+
+IMPORTANT: When a user asks about a specific test case ID or requirement ID, ALWAYS use the appropriate tool to look it up in the database. Never say you don't have information about a specific ID - use the tools to retrieve it!
 
-    # Get counts and stats
-    total_requirements = db.query(Requirement).count()
-    total_tests = db.query(TestCase).count()
-    total_links = db.query(TraceabilityLink).count()
-
-    # Get requirement type breakdown
-    req_by_type = {}
-    for req_type in ["Aircraft_High_Level_Requirement", "System_Requirement", "Technical_Specification", "Certification_Requirement"]:
-        count = db.query(Requirement).filter(Requirement.type == req_type).count()
-        req_by_type[req_type] = count
-
-    # Get status breakdown
-    req_by_status = {}
-    for status_val in ["draft", "approved", "under_review", "deprecated"]:
-        count = db.query(Requirement).filter(Requirement.status == status_val).count()
-        req_by_status[status_val] = count
-
-    # Get priority breakdown
-    req_by_priority = {}
-    for priority in ["Critical", "High", "Medium", "Low"]:
-        count = db.query(Requirement).filter(Requirement.priority == priority).count()
-        req_by_priority[priority] = count
-
-    # ============================================================================
-    # REAL-TIME TEST EXECUTION DATA
-    # ============================================================================
-
-    # Get test execution status breakdown
-    test_by_status = db.query(
-        TestCase.status,
-        func.count(TestCase.id)
-    ).group_by(TestCase.status).all()
-    test_status_dict = {status: count for status, count in test_by_status}
-
-    # Get test type breakdown
-    test_by_type = db.query(
-        TestCase.test_type,
-        func.count(TestCase.id)
-    ).filter(TestCase.test_type.isnot(None)).group_by(TestCase.test_type).all()
-
-    # Get automation breakdown
-    automated_count = db.query(TestCase).filter(TestCase.automated == True).count()
-    manual_count = db.query(TestCase).filter(TestCase.automated == False).count()
+## Regulatory Context:
+The system manages compliance across multiple aerospace regulations including:
+- **USA (FAA)**: 14 CFR Parts 21, 23, 25, 33, DO-178C
+- **EU (EASA)**: CS-23, CS-25, Part-21
+- **UAE (GCAA)**: UAEMAR-21, UAEMAR-M
+- **International**: ICAO Annexes, NATO STANAGs
+
+## Response Guidelines:
+- Be precise and professional
+- Cite specific requirement IDs and test case IDs when relevant
+- Use aerospace terminology appropriately
+- Provide actionable insights, especially for failed or blocked tests
+- When discussing tests, use the REAL-TIME execution data provided below
+- Alert users to failed tests and blocked tests that require immediate attention
+- Calculate and present metrics like pass rates and execution coverage
+
+## CRITICAL FORMATTING RULES:
+- DO NOT use Markdown formatting symbols (##, ###, **, *, _, etc.)
+- DO NOT use hashtags for headings
+- DO NOT use asterisks for bold or emphasis
+- Write in PLAIN TEXT with natural conversational formatting
+- Use simple line breaks and indentation for structure
+- Use emojis sparingly and naturally (✅, 🚨, ⚠️, 📊)
+- Format like you're writing an email or chat message, not a Markdown document
+- Use uppercase for emphasis instead of bold (e.g., "CRITICAL" not "**CRITICAL**")
+- Use dashes or numbers for lists without any special symbols
+
+When users ask questions, you can:
+- Search for requirements by ID, type, status, or content
+- Analyze real-time test execution data, identify failed tests, and suggest corrective actions
+- Analyze traceability and coverage
+- Generate reports and statistics with current test execution metrics
+- Provide regulatory guidance
+- Identify gaps, risks, and tests requiring attention
+"""
+
+
+def _enum_value(value):
+    return getattr(value, "value", value)
+
+
+def _collect_context_stats(db: Session) -> dict:
+    """Gather chat context numbers with grouped aggregates instead of per-value COUNTs"""
+    req_by_type, req_by_status, req_by_priority = {}, {}, {}
+    total_requirements = 0
+    req_groups = db.query(
+        Requirement.type, Requirement.status, Requirement.priority, func.count(Requirement.id)
+    ).group_by(Requirement.type, Requirement.status, Requirement.priority).all()
+    for req_type, req_status, priority, count in req_groups:
+        total_requirements += count
+        for bucket, key in ((req_by_type, req_type), (req_by_status, req_status), (req_by_priority, priority)):
+            key = _enum_value(key)
+            bucket[key] = bucket.get(key, 0) + count
+
+    test_status_dict, test_by_type = {}, {}
+    total_tests = automated_count = manual_count = 0
+    test_groups = db.query(
+        TestCase.status, TestCase.test_type, TestCase.automated, func.count(TestCase.id)
+    ).group_by(TestCase.status, TestCase.test_type, TestCase.automated).all()
+    for test_status, test_type, automated, count in test_groups:
+        total_tests += count
+        test_status = _enum_value(test_status)
+        test_status_dict[test_status] = test_status_dict.get(test_status, 0) + count
+        if test_type is not None:
+            test_by_type[test_type] = test_by_type.get(test_type, 0) + count
+        if automated is True:
+            automated_count += count
+        elif automated is False:
+            manual_count += count
+
+    total_links = db.query(func.count(TraceabilityLink.id)).scalar()
+
+    # Get recent test executions (last 10)
+    recent_tests = db.query(TestCase).filter(
+        TestCase.execution_date.isnot(None)
+    ).order_by(TestCase.execution_date.desc()).limit(10).all()
+
+    # Get failed and blocked tests with their requirement in the same query
+    failed_tests = db.query(TestCase).options(joinedload(TestCase.requirement)).filter(
+        TestCase.status == "failed"
+    ).order_by(TestCase.execution_date.desc()).limit(10).all()
+
+    blocked_tests = db.query(TestCase).options(joinedload(TestCase.requirement)).filter(
+        TestCase.status == "blocked"
+    ).order_by(TestCase.updated_at.desc()).limit(10).all()
+
+    return {
+        "total_requirements": total_requirements,
+        "total_tests": total_tests,
+        "total_links": total_links,
+        "req_by_type": req_by_type,
+        "req_by_status": req_by_status,
+        "req_by_priority": req_by_priority,
+        "test_status": test_status_dict,
+        "test_by_type": sorted(test_by_type.items()),
+        "automated_count": automated_count,
+        "manual_count": manual_count,
+        "recent_tests": recent_tests,
+        "failed_tests": failed_tests,
+        "blocked_tests": blocked_tests,
+    }
+
+
+def _render_data_context(stats: dict) -> str:
+    """Render the live statistics section of the system prompt"""
+    total_requirements = stats["total_requirements"]
+    total_tests = stats["total_tests"]
+    total_links = stats["total_links"]
+    req_by_type = stats["req_by_type"]
+    req_by_status = stats["req_by_status"]
+    req_by_priority = stats["req_by_priority"]
+    test_status_dict = stats["test_status"]
 
     # Calculate test execution metrics
     passed_count = test_status_dict.get("passed", 0)
@@ -94,26 +201,7 @@ async def get_system_context(db: Session, context_type: str = "auto") -> str:
         pass_rate = 0
         execution_coverage = 0
 
-    # Get recent test executions (last 10)
-    recent_tests = db.query(TestCase).filter(
-        TestCase.execution_date.isnot(None)
-    ).order_by(TestCase.execution_date.desc()).limit(10).all()
-
-    # Get failed tests requiring attention
-    failed_tests = db.query(TestCase).filter(
-        TestCase.status == "failed"
-    ).order_by(TestCase.execution_date.desc()).limit(10).all()
-
-    # Get blocked tests
-    blocked_tests = db.query(TestCase).filter(
-        TestCase.status == "blocked"
-    ).order_by(TestCase.updated_at.desc()).limit(10).all()
-
     context = f"""
-# CALIDUS Requirements Management System Context
-
-You are Ahmed, an AI assistant for the CALIDUS Aerospace Requirements Management System. You have comprehensive knowledge of all aerospace requirements, regulations, test cases, and traceability relationships in the system.
-
 ## System Overview
 - **Total Requirements**: {total_requirements:,}
 - **Total Test Cases**: {total_tests:,}
@@ -154,104 +242,77 @@ You are Ahmed, an AI assistant for the CALIDUS Aerospace Requirements Management
 - **Tests Requiring Action**: {failed_count + blocked_count:,} tests (failed + blocked)
 
 ### Test Automation:
-- **Automated Tests**: {automated_count:,}
-- **Manual Tests**: {manual_count:,}
+- **Automated Tests**: {stats['automated_count']:,}
+- **Manual Tests**: {stats['manual_count']:,}
 
 ### Test Types Distribution:
 """
 
-    for test_type, count in test_by_type:
+    for test_type, count in stats["test_by_type"]:
         context += f"- {test_type}: {count:,}\n"
 
     context += "\n### Recent Test Executions (Last 10):\n"
-    if recent_tests:
-        for test in recent_tests:
+    if stats["recent_tests"]:
+        for test in stats["recent_tests"]:
             exec_date = test.execution_date.strftime("%Y-%m-%d %H:%M") if test.execution_date else "N/A"
             duration = f"{test.execution_duration}s" if test.execution_duration else "N/A"
             executor = test.executed_by or "N/A"
-            context += f"- **{test.test_case_id}**: {test.title[:60]}... | Status: {test.status} | Date: {exec_date} | Duration: {duration} | By: {executor}\n"
+            context += f"- **{test.test_case_id}**: {test.title[:60]}... | Status: {_enum_value(test.status)} | Date: {exec_date} | Duration: {duration} | By: {executor}\n"
     else:
         context += "- No recent test executions found\n"
 
     context += "\n### Failed Tests Requiring Attention:\n"
-    if failed_tests:
-        for test in failed_tests:
+    if stats["failed_tests"]:
+        for test in stats["failed_tests"]:
             req_id = test.requirement.requirement_id if test.requirement else "N/A"
             context += f"- **{test.test_case_id}**: {test.title[:60]}... | Requirement: {req_id} | Type: {test.test_type or 'N/A'}\n"
     else:
         context += "- ✅ No failed tests currently\n"
 
     context += "\n### Blocked Tests:\n"
-    if blocked_tests:
-        for test in blocked_tests:
+    if stats["blocked_tests"]:
+        for test in stats["blocked_tests"]:
             req_id = test.requirement.requirement_id if test.requirement else "N/A"
             context += f"- **{test.test_case_id}**: {test.title[:60]}... | Requirement: {req_id} | Type: {test.test_type or 'N/A'}\n"
     else:
         context += "- ✅ No blocked tests currently\n"
 
-    context += """
-
-## Your Capabilities:
-1. **Direct Database Access**: You have tools to query ANY test case or requirement in the system by ID
-   - Use get_test_case_by_id() to retrieve complete details about any test case (e.g., TC-000942)
-   - Use get_requirement_by_id() to retrieve complete details about any requirement (e.g., SYS-00018)
-   - Use search_test_cases() to find test cases by keyword
-   - Use search_requirements() to find requirements by keyword
-
-2. **Test Execution Analysis**: Analyze test results, pass rates, failed tests, and execution trends (REAL-TIME DATA)
-
-3. **Analysis**: Analyze compliance, coverage, risks, and gaps in the requirements
-
-4. **Reporting**: Generate summaries, statistics, and reports with current test execution data
-
-5. **Guidance**: Provide aerospace regulatory guidance (FAA, EASA, UAE GCAA)
+    return context
 
-6. **Recommendations**: Suggest improvements, missing links, or potential issues based on test results
 
-IMPORTANT: When a user asks about a specific test case ID or requirement ID, ALWAYS use the appropriate tool to look it up in the database. Never say you don't have information about a specific ID - use the tools to retrieve it!
+def get_data_context(db: Session, context_type: str = "auto") -> str:
+    """
+    Live statistics section of the system prompt.
 
-## Regulatory Context:
-The system manages compliance across multiple aerospace regulations including:
-- **USA (FAA)**: 14 CFR Parts 21, 23, 25, 33, DO-178C
-- **EU (EASA)**: CS-23, CS-25, Part-21
-- **UAE (GCAA)**: UAEMAR-21, UAEMAR-M
-- **International**: ICAO Annexes, NATO STANAGs
+    Served from cache until a commit touches one of CONTEXT_TABLES, so a chat
+    turn costs no queries while the data is unchanged.
+    """
+    key = (context_type, table_versions(*CONTEXT_TABLES))
+    context = _context_cache.get(key)
+    if context is None:
+        context = _render_data_context(_collect_context_stats(db))
+        _context_cache.set(key, context)
+    return context
 
-## Response Guidelines:
-- Be precise and professional
-- Cite specific requirement IDs and test case IDs when relevant
-- Use aerospace terminology appropriately
-- Provide actionable insights, especially for failed or blocked tests
-- When discussing tests, use the REAL-TIME execution data provided above
-- Alert users to failed tests and blocked tests that require immediate attention
-- Calculate and present metrics like pass rates and execution coverage
 
-## CRITICAL FORMATTING RULES:
-- DO NOT use Markdown formatting symbols (##, ###, **, *, _, etc.)
-- DO NOT use hashtags for headings
-- DO NOT use asterisks for bold or emphasis
-- Write in PLAIN TEXT with natural conversational formatting
-- Use simple line breaks and indentation for structure
-- Use emojis sparingly and naturally (✅, 🚨, ⚠️, 📊)
-- Format like you're writing an email or chat message, not a Markdown document
-- Use uppercase for emphasis instead of bold (e.g., "CRITICAL" not "**CRITICAL**")
-- Use dashes or numbers for lists without any special symbols
+def get_system_blocks(db: Session, context_type: str = "auto") -> List[dict]:
+    """System prompt as content blocks, with the stable prefix marked cacheable"""
+    return [
+        {"type": "text", "text": SYSTEM_PROMPT_PREFIX, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": get_data_context(db, context_type)},
+    ]
 
-When users ask questions, you can:
-- Search for requirements by ID, type, status, or content
-- Analyze real-time test execution data, identify failed tests, and suggest corrective actions
-- Analyze traceability and coverage
-- Generate reports and statistics with current test execution metrics
-- Provide regulatory guidance
-- Identify gaps, risks, and tests requiring attention
-"""
 
-    return context
+def get_system_context(db: Session, context_type: str = "auto") -> str:
+    """Generate system context based on database content with REAL-TIME test execution data"""
+    return SYSTEM_PROMPT_PREFIX + get_data_context(db, context_type)
 
 
 def get_test_case_by_id(db: Session, test_case_id: str) -> dict:
     """Query database for a specific test case by its ID"""
-    test_case = db.query(TestCase).filter(TestCase.test_case_id == test_case_id).first()
+    test_case = db.query(TestCase).options(joinedload(TestCase.requirement)).filter(
+        TestCase.test_case_id == test_case_id
+    ).first()
 
     if not test_case:
         return {"error": f"Test case {test_case_id} not found"}
@@ -283,20 +344,12 @@ def get_test_case_by_id(db: Session, test_case_id: str) -> dict:
     }
 
 
-def get_requirement_by_id(db: Session, requirement_id: str) -> dict:
-    """Query database for a specific requirement by its ID"""
-    requirement = db.query(Requirement).filter(Requirement.requirement_id == requirement_id).first()
+# Upper bound on requirement IDs resolved by one get_requirements_by_ids call
+MAX_REQUIREMENTS_PER_LOOKUP = 20
 
-    if not requirement:
-        return {"error": f"Requirement {requirement_id} not found"}
 
-    # Get linked test cases
+def _requirement_details(requirement: Requirement, parents: List[str], children: List[str]) -> dict:
     test_cases = requirement.test_cases
-
-    # Get traceability links
-    parent_links = db.query(TraceabilityLink).filter(TraceabilityLink.target_id == requirement.id).all()
-    child_links = db.query(TraceabilityLink).filter(TraceabilityLink.source_id == requirement.id).all()
-
     return {
         "requirement_id": requirement.requirement_id,
         "title": requirement.title,
@@ -311,16 +364,74 @@ def get_requirement_by_id(db: Session, requirement_id: str) -> dict:
         "version": requirement.version,
         "test_cases": [{"id": tc.test_case_id, "title": tc.title, "status": tc.status} for tc in test_cases],
         "test_case_count": len(test_cases),
-        "parent_requirements": [db.query(Requirement).get(link.source_id).requirement_id for link in parent_links if db.query(Requirement).get(link.source_id)],
-        "child_requirements": [db.query(Requirement).get(link.target_id).requirement_id for link in child_links if db.query(Requirement).get(link.target_id)],
+        "parent_requirements": parents,
+        "child_requirements": children,
         "created_at": requirement.created_at.isoformat() if requirement.created_at else None,
         "updated_at": requirement.updated_at.isoformat() if requirement.updated_at else None
     }
 
 
+def load_requirement_details(db: Session, requirement_ids: List[str]) -> dict:
+    """
+    Resolve requirements with their tests and linked requirement IDs.
+
+    Issues a fixed number of queries however many IDs or links are involved:
+    requirements, their test cases (selectin), and both link directions with
+    the requirement ID at the other end. Returns a dict keyed by requirement ID.
+    """
+    requirements = db.query(Requirement).options(
+        selectinload(Requirement.test_cases)
+    ).filter(Requirement.requirement_id.in_(requirement_ids)).all()
+    if not requirements:
+        return {}
+
+    pk_ids = [req.id for req in requirements]
+    parents = {pk: [] for pk in pk_ids}
+    children = {pk: [] for pk in pk_ids}
+
+    source = aliased(Requirement)
+    target = aliased(Requirement)
+    links = db.query(
+        TraceabilityLink.source_id, TraceabilityLink.target_id,
+        source.requirement_id, target.requirement_id
+    ).join(source, source.id == TraceabilityLink.source_id).join(
+        target, target.id == TraceabilityLink.target_id
+    ).filter(
+        or_(TraceabilityLink.target_id.in_(pk_ids), TraceabilityLink.source_id.in_(pk_ids))
+    ).order_by(TraceabilityLink.id).all()
+
+    for source_id, target_id, source_req_id, target_req_id in links:
+        # Links pointing at a requirement name its parents; links from it name its children
+        if target_id in parents:
+            parents[target_id].append(source_req_id)
+        if source_id in children:
+            children[source_id].append(target_req_id)
+
+    return {
+        req.requirement_id: _requirement_details(req, parents[req.id], children[req.id])
+        for req in requirements
+    }
+
+
+def get_requirement_by_id(db: Session, requirement_id: str) -> dict:
+    """Query database for a specific requirement by its ID"""
+    details = load_requirement_details(db, [requirement_id])
+    return details.get(requirement_id) or {"error": f"Requirement {requirement_id} not found"}
+
+
+def get_requirements_by_ids(db: Session, requirement_ids: List[str]) -> list:
+    """Query database for several requirements at once, in the order requested"""
+    requested = list(dict.fromkeys(requirement_ids))[:MAX_REQUIREMENTS_PER_LOOKUP]
+    details = load_requirement_details(db, requested)
+    return [
+        details.get(req_id) or {"error": f"Requirement {req_id} not found"}
+        for req_id in requested
+    ]
+
+
 def search_test_cases(db: Session, query: str, limit: int = 10) -> list:
     """Search for test cases by title or description"""
-    test_cases = db.query(TestCase).filter(
+    test_cases = db.query(TestCase).options(joinedload(TestCase.requirement)).filter(
         (TestCase.title.ilike(f"%{query}%")) |
         (TestCase.description.ilike(f"%{query}%")) |
         (TestCase.test_case_id.ilike(f"%{query}%"))
@@ -390,6 +501,22 @@ TOOLS = [
             "required": ["requirement_id"]
         }
     },
+    {
+        "name": "get_requirements_by_ids",
+        "description": f"Get detailed information about several requirements in one call (up to {MAX_REQUIREMENTS_PER_LOOKUP} IDs). Returns the same details as get_requirement_by_id for each ID, in the order given; unknown IDs return an error entry.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "requirement_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "maxItems": MAX_REQUIREMENTS_PER_LOOKUP,
+                    "description": "The requirement IDs (e.g., [\"SYS-00018\", \"AHLR-001\"])"
+                }
+            },
+            "required": ["requirement_ids"]
+        }
+    },
     {
         "name": "search_test_cases",
         "description": "Search for test cases by keyword in title, description, or ID. Returns a list of matching test cases with basic information.",
@@ -431,7 +558,53 @@ TOOLS = [
 ]
 
 
-async def stream_chat_response(messages: List[ChatMessage], system_context: str, db: Session):
+# Model used for chat completions
+CHAT_MODEL = "claude-sonnet-4-5-20250929"
+
+
+def get_anthropic_client() -> anthropic.AsyncAnthropic:
+    """Async Anthropic client; ANTHROPIC_BASE_URL can point it at a local stub server"""
+    return anthropic.AsyncAnthropic(
+        api_key=settings.anthropic_api_key,
+        base_url=settings.anthropic_base_url or None,
+    )
+
+
+def execute_tool(db: Session, tool_name: str, tool_input: dict):
+    """Dispatch a single tool call from the model"""
+    if tool_name == "get_test_case_by_id":
+        return get_test_case_by_id(db, tool_input["test_case_id"])
+    elif tool_name == "get_requirement_by_id":
+        return get_requirement_by_id(db, tool_input["requirement_id"])
+    elif tool_name == "get_requirements_by_ids":
+        return get_requirements_by_ids(db, tool_input["requirement_ids"])
+    elif tool_name == "search_test_cases":
+        return search_test_cases(db, tool_input["query"], tool_input.get("limit", 10))
+    elif tool_name == "search_requirements":
+        return search_requirements(db, tool_input["query"], tool_input.get("limit", 10))
+    return {"error": f"Unknown tool: {tool_name}"}
+
+
+def _execute_tool_in_session(bind, tool_name: str, tool_input: dict):
+    """Run a tool with its own session; sessions must not be shared across threads"""
+    with Session(bind=bind) as tool_db:
+        return execute_tool(tool_db, tool_name, tool_input)
+
+
+async def run_tool_calls(db: Session, tool_blocks: list) -> List[dict]:
+    """Execute all tool calls of one model turn concurrently in the threadpool"""
+    bind = db.get_bind()
+    results = await asyncio.gather(*[
+        run_in_threadpool(_execute_tool_in_session, bind, block.name, block.input)
+        for block in tool_blocks
+    ])
+    return [
+        {"type": "tool_result", "tool_use_id": block.id, "content": json.dumps(result, default=str)}
+        for block, result in zip(tool_blocks, results)
+    ]
+
+
+async def stream_chat_response(messages: List[ChatMessage], system_context: Union[str, List[dict]], db: Session):
     """Stream chat responses from Claude with tool support"""
 
     if not settings.anthropic_api_key:
@@ -440,7 +613,7 @@ async def stream_chat_response(messages: List[ChatMessage], system_context: str,
             detail="Anthropic API key not configured"
         )
 
-    client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+    client = get_anthropic_client()
 
     # Convert messages to Anthropic format
     anthropic_messages = [
@@ -448,67 +621,40 @@ async def stream_chat_response(messages: List[ChatMessage], system_context: str,
         for msg in messages
     ]
 
-    try:
-        # First request to Claude with tools
-        response = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=4096,
-            system=system_context,
-            messages=anthropic_messages,
-            tools=TOOLS
-        )
-
-        # Process tool calls if any
-        while response.stop_reason == "tool_use":
-            # Execute tools
-            tool_results = []
-            for content_block in response.content:
-                if content_block.type == "tool_use":
-                    tool_name = content_block.name
-                    tool_input = content_block.input
-
-                    # Execute the tool
-                    if tool_name == "get_test_case_by_id":
-                        result = get_test_case_by_id(db, tool_input["test_case_id"])
-                    elif tool_name == "get_requirement_by_id":
-                        result = get_requirement_by_id(db, tool_input["requirement_id"])
-                    elif tool_name == "search_test_cases":
-                        result = search_test_cases(db, tool_input["query"], tool_input.get("limit", 10))
-                    elif tool_name == "search_requirements":
-                        result = search_requirements(db, tool_input["query"], tool_input.get("limit", 10))
-                    else:
-                        result = {"error": f"Unknown tool: {tool_name}"}
-
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": content_block.id,
-                        "content": json.dumps(result)
-                    })
-
-            # Continue conversation with tool results
-            anthropic_messages.append({"role": "assistant", "content": response.content})
-            anthropic_messages.append({"role": "user", "content": tool_results})
+    started = time.perf_counter()
+    first_token_ms = None
 
-            response = client.messages.create(
-                model="claude-sonnet-4-5-20250929",
+    try:
+        while True:
+            async with client.messages.stream(
+                model=CHAT_MODEL,
                 max_tokens=4096,
                 system=system_context,
                 messages=anthropic_messages,
                 tools=TOOLS
-            )
-
-        # Stream the final response
-        for content_block in response.content:
-            if hasattr(content_block, "text"):
-                # Split text into chunks for streaming effect
-                text = content_block.text
-                chunk_size = 10
-                for i in range(0, len(text), chunk_size):
-                    chunk = text[i:i+chunk_size]
-                    yield f"data: {json.dumps({'type': 'content', 'text': chunk})}\n\n"
+            ) as stream:
+                async for text in stream.text_stream:
+                    if first_token_ms is None:
+                        first_token_ms = (time.perf_counter() - started) * 1000
+                    yield f"data: {json.dumps({'type': 'content', 'text': text})}\n\n"
+                response = await stream.get_final_message()
+
+            if response.stop_reason != "tool_use":
+                break
+
+            # Execute the requested tools (in parallel) and continue the conversation
+            tool_blocks = [block for block in response.content if block.type == "tool_use"]
+            tool_results = await run_tool_calls(db, tool_blocks)
+            anthropic_messages.append({"role": "assistant", "content": response.content})
+            anthropic_messages.append({"role": "user", "content": tool_results})
+
+        total_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"Chat response streamed: first token {first_token_ms or 0:.0f}ms, total {total_ms:.0f}ms"
+        )
 
         # Send completion signal
-        yield f"data: {json.dumps({'type': 'done'})}\n\n"
+        yield f"data: {json.dumps({'type': 'done', 'first_token_ms': first_token_ms, 'total_ms': total_ms})}\n\n"
 
     except anthropic.APIError as e:
         error_message = f"Anthropic API error: {str(e)}"
@@ -516,6 +662,8 @@ async def stream_chat_response(messages: List[ChatMessage], system_context: str,
     except Exception as e:
         error_message = f"Unexpected error: {str(e)}"
         yield f"data: {json.dumps({'type': 'error', 'message': error_message})}\n\n"
+    finally:
+        await client.close()
 
 
 @router.post("/chat")
@@ -535,8 +683,8 @@ async def chat(
     Returns a streaming response with Server-Sent Events
     """
 
-    # Generate system context
-    system_context = await get_system_context(db, request.context_type)
+    # Generate system context (sync DB work, kept off the event loop)
+    system_context = await run_in_threadpool(get_system_blocks, db, request.context_type)
 
     # Return streaming response with database access
     return StreamingResponse(
@@ -551,7 +699,7 @@ async def chat(
 
 
 @router.get("/chat/stats")
-async def chat_stats(
+def chat_stats(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -559,9 +707,15 @@ async def chat_stats(
     Get system statistics for Ask Ahmed context
     """
 
+    totals = db.execute(select(
+        select(func.count(Requirement.id)).scalar_subquery(),
+        select(func.count(TestCase.id)).scalar_subquery(),
+        select(func.count(TraceabilityLink.id)).scalar_subquery(),
+    )).one()
+
     return {
-        "total_requirements": db.query(Requirement).count(),
-        "total_test_cases": db.query(TestCase).count(),
-        "total_traceability_links": db.query(TraceabilityLink).count(),
+        "total_requirements": totals[0],
+        "total_test_cases": totals[1],
+        "total_traceability_links": totals[2],
         "api_status": "configured" if settings.anthropic_api_key else "not_configured"
     }
@@ -28,7 +28,7 @@ router = APIRouter(prefix="/api/compliance", tags=["compliance"])
 
 
 @router.get("/overview", response_model=ComplianceOverview)
-async def get_compliance_overview(
+def get_compliance_overview(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -138,7 +138,7 @@ async def get_compliance_overview(
 
 
 @router.get("/regulations", response_model=RegulationListResponse)
-async def list_regulations(
+def list_regulations(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -189,7 +189,7 @@ async def list_regulations(
 
 
 @router.get("/regulations/{regulation_name}", response_model=RegulationDetail)
-async def get_regulation_detail(
+def get_regulation_detail(
     regulation_name: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -272,7 +272,7 @@ async def get_regulation_detail(
 
 
 @router.get("/gaps", response_model=GapAnalysisResponse)
-async def get_compliance_gaps(
+def get_compliance_gaps(
     priority: Optional[str] = None,
     requirement_type: Optional[str] = None,
     limit: int = 100,
@@ -362,7 +362,7 @@ async def get_compliance_gaps(
 
 
 @router.get("/stats", response_model=ComplianceStats)
-async def get_compliance_stats(
+def get_compliance_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -2,13 +2,17 @@
 Test Coverage Analyzer API
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
 from app.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User
+from app.models.coverage_rollup import RollupResolution
+from app.models.requirement import RequirementPriority, RequirementStatus, RequirementType
 from app.services.coverage_analyzer import CoverageAnalyzer
+from app.services.coverage_gaps import decode_cursor, encode_cursor, query_gaps
 from app.schemas.coverage import (
     CoverageAnalysisResponse,
     CoverageSnapshotResponse,
@@ -19,7 +23,7 @@ router = APIRouter(prefix="/api/coverage", tags=["Coverage Analysis"])
 
 
 @router.get("/analyze", response_model=CoverageAnalysisResponse)
-async def analyze_coverage(
+def analyze_coverage(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -76,7 +80,7 @@ async def analyze_coverage(
 
 
 @router.post("/snapshot", response_model=CoverageSnapshotResponse)
-async def create_snapshot(
+def create_snapshot(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -84,8 +88,8 @@ async def create_snapshot(
     Create a coverage snapshot for trend tracking.
 
     Snapshots are stored in the database and used to generate
-    historical coverage trends. This endpoint should be called
-    periodically (e.g., daily, weekly) to track coverage over time.
+    historical coverage trends. The job worker also takes one every
+    COVERAGE_SNAPSHOT_INTERVAL_MINUTES; this endpoint records one on demand.
 
     **Permissions**: Requires authenticated user
     """
@@ -95,8 +99,14 @@ async def create_snapshot(
 
 
 @router.get("/trends")
-async def get_coverage_trends(
+def get_coverage_trends(
     limit: int = Query(10, ge=1, le=100, description="Number of historical snapshots to return"),
+    start: Optional[datetime] = Query(None, description="Range start (downsampled mode)"),
+    end: Optional[datetime] = Query(None, description="Range end (downsampled mode)"),
+    points: Optional[int] = Query(None, ge=2, le=2000, description="Maximum points (downsampled mode)"),
+    resolution: Optional[str] = Query(
+        None, pattern="^(raw|daily|weekly|monthly)$", description="raw snapshots or daily / weekly / monthly rollups"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -108,17 +118,31 @@ async def get_coverage_trends(
 
     **Query Parameters**:
     - `limit`: Number of snapshots to return (default: 10, max: 100)
+    - `start`, `end`, `points`: Return the snapshots in a date range,
+      aggregated into time buckets (mean / min / max coverage) so that
+      at most about `points` points (default: 200) come back
+    - `resolution`: `daily`, `weekly` or `monthly` returns one point per
+      period in the range from the coverage rollups, with mean / min / max
+      coverage overall and per requirement type and priority; `raw` is the
+      bucketed snapshot mode above
     """
     analyzer = CoverageAnalyzer(db)
+    if resolution is not None and resolution != "raw":
+        return analyzer.get_coverage_trends(start=start, end=end, resolution=RollupResolution(resolution))
+    if start is not None or end is not None or points is not None or resolution == "raw":
+        return analyzer.get_coverage_trends(start=start, end=end, points=points or 200)
     trends = analyzer._get_coverage_trends(limit=limit)
     return trends
 
 
 @router.get("/gaps")
-async def get_coverage_gaps(
-    type: Optional[str] = Query(None, description="Filter by requirement type"),
-    priority: Optional[str] = Query(None, description="Filter by priority level"),
+def get_coverage_gaps(
+    response: Response,
+    type: Optional[RequirementType] = Query(None, description="Filter by requirement type"),
+    priority: Optional[RequirementPriority] = Query(None, description="Filter by priority level"),
+    status: Optional[RequirementStatus] = Query(None, description="Filter by status"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of gaps to return"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -126,12 +150,17 @@ async def get_coverage_gaps(
     Get requirements with no test coverage.
 
     Returns a list of requirements that have zero test cases,
-    sorted by priority (Critical first).
+    sorted by priority (Critical first), then by id.
 
     **Query Parameters**:
-    - `type`: Filter by requirement type (e.g., "Aircraft_High_Level")
+    - `type`: Filter by requirement type (e.g., "Aircraft_High_Level_Requirement")
     - `priority`: Filter by priority level (e.g., "Critical", "High")
+    - `status`: Filter by status (e.g., "Approved")
     - `limit`: Maximum number of gaps to return (default: 100, max: 500)
+    - `cursor`: Continue after the previous page
+
+    When more gaps follow, the response carries an `X-Next-Cursor` header;
+    pass its value as `cursor` to fetch the next page.
 
     **Example Response**:
     ```json
@@ -140,7 +169,7 @@ async def get_coverage_gaps(
             "requirement_id": 123,
             "requirement_identifier": "AHLR-001",
             "title": "Flight Control System Requirements",
-            "type": "Aircraft_High_Level",
+            "type": "Aircraft_High_Level_Requirement",
             "priority": "Critical",
             "status": "Approved",
             "regulatory": true,
@@ -150,21 +179,23 @@ async def get_coverage_gaps(
     ]
     ```
     """
-    analyzer = CoverageAnalyzer(db)
-    analysis = analyzer.analyze_coverage()
-    gaps = analysis["gaps"]
-
-    # Apply filters
-    if type:
-        gaps = [g for g in gaps if g["type"] == type]
-    if priority:
-        gaps = [g for g in gaps if g["priority"] == priority]
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
 
-    return gaps[:limit]
+    gaps, next_cursor = query_gaps(
+        db, type=type, priority=priority, status=status, limit=limit, after=after
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_cursor)
+    return gaps
 
 
 @router.get("/suggestions/{requirement_id}", response_model=List[TestSuggestionResponse])
-async def get_test_suggestions(
+def get_test_suggestions(
     requirement_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -214,7 +245,7 @@ async def get_test_suggestions(
 
 
 @router.get("/heatmap")
-async def get_coverage_heatmap(
+def get_coverage_heatmap(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
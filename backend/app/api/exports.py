@@ -0,0 +1,104 @@
+"""
+Data Export API
+Streamed CSV / XLSX / Parquet downloads of requirements, test cases and traceability links.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.core.dependencies import get_current_user
+from app.models import (
+    User, RequirementPriority, RequirementStatus, RequirementType, TestCasePriority, TestCaseStatus, TraceLinkType
+)
+from app.services.exports import (
+    REQUIREMENTS, TEST_CASES, TRACEABILITY_LINKS, ExportEntity, count_export_rows, iter_export_rows,
+    requirement_filters, test_case_filters, traceability_link_filters
+)
+from app.services.tabular_export import EXPORT_FORMATS, XLSX_MAX_ROWS, iter_export, parquet_available
+
+router = APIRouter(prefix="/api/export", tags=["Export"])
+
+FORMAT_QUERY = Query("csv", pattern="^(csv|xlsx|parquet)$", description="csv, xlsx or parquet")
+COLUMNS_QUERY = Query(None, description="Comma-separated columns to include (default: the common ones)")
+
+
+def _export_response(
+    db: Session, entity: ExportEntity, export_format: str, columns: Optional[str], clauses: List
+) -> StreamingResponse:
+    """Validate the request, then stream the rows; errors after the first byte can no longer become a 4xx"""
+    try:
+        names = entity.resolve_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if export_format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export requires the pyarrow package on the server; use csv or xlsx"
+        )
+    if export_format == "xlsx" and count_export_rows(db, entity, clauses) >= XLSX_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many rows for XLSX (limit {XLSX_MAX_ROWS - 1}); use csv or parquet, or narrow the filters"
+        )
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    rows = iter_export_rows(db, entity, names, clauses)
+    return StreamingResponse(
+        iter_export(export_format, names, rows, sheet_name=entity.name, types=entity.kinds(names)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{entity.name}.{extension}"'}
+    )
+
+
+@router.get("/requirements")
+def export_requirements(
+    format: str = FORMAT_QUERY,
+    columns: Optional[str] = COLUMNS_QUERY,
+    type: Optional[RequirementType] = Query(None, description="Filter by requirement type"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    status: Optional[RequirementStatus] = Query(None, description="Filter by status"),
+    priority: Optional[RequirementPriority] = Query(None, description="Filter by priority"),
+    search: Optional[str] = Query(None, description="Search in title and description"),
+    regulatory_document: Optional[str] = Query(None, description="Filter by regulatory document"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Export requirements matching the GET /requirements filters, in id order"""
+    clauses = requirement_filters(type, category, status, priority, search, regulatory_document)
+    return _export_response(db, REQUIREMENTS, format, columns, clauses)
+
+
+@router.get("/test-cases")
+def export_test_cases(
+    format: str = FORMAT_QUERY,
+    columns: Optional[str] = COLUMNS_QUERY,
+    status: Optional[TestCaseStatus] = Query(None, description="Filter by test status"),
+    priority: Optional[TestCasePriority] = Query(None, description="Filter by priority"),
+    requirement_id: Optional[int] = Query(None, description="Filter by requirement ID"),
+    test_type: Optional[str] = Query(None, description="Filter by test type"),
+    automated: Optional[bool] = Query(None, description="Filter automated/manual tests"),
+    search: Optional[str] = Query(None, description="Search in title and description"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Export test cases matching the GET /test-cases filters, in id order"""
+    clauses = test_case_filters(status, priority, requirement_id, test_type, automated, search)
+    return _export_response(db, TEST_CASES, format, columns, clauses)
+
+
+@router.get("/traceability-links")
+def export_traceability_links(
+    format: str = FORMAT_QUERY,
+    columns: Optional[str] = COLUMNS_QUERY,
+    link_type: Optional[TraceLinkType] = Query(None, description="Filter by link type"),
+    source_id: Optional[int] = Query(None, description="Filter by source requirement ID"),
+    target_id: Optional[int] = Query(None, description="Filter by target requirement ID"),
+    requirement_id: Optional[int] = Query(None, description="Filter by either source or target"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Export traceability links matching the GET /traceability filters, in id order"""
+    clauses = traceability_link_filters(link_type, source_id, target_id, requirement_id)
+    return _export_response(db, TRACEABILITY_LINKS, format, columns, clauses)
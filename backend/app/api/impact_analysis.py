@@ -36,7 +36,7 @@ router = APIRouter(prefix="/api/impact-analysis", tags=["Impact Analysis"])
 
 
 @router.post("/analyze", response_model=ImpactAnalysisResultSchema)
-async def analyze_impact(
+def analyze_impact(
     request: AnalyzeImpactRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -78,31 +78,7 @@ async def analyze_impact(
         )
 
     # Save report to database
-    report = ImpactAnalysisReport(
-        requirement_id=request.requirement_id,
-        analyzed_by_id=current_user.id,
-        risk_score=result.risk_score.score,
-        risk_level=RiskLevel[result.risk_score.level],
-        upstream_count=len(result.upstream),
-        downstream_count=len(result.downstream),
-        test_case_count=len(result.affected_test_cases),
-        regulatory_impact=len(result.regulatory_implications) > 0,
-        upstream_tree=[node.to_dict() for node in result.upstream],
-        downstream_tree=[node.to_dict() for node in result.downstream],
-        affected_requirements=[node.id for node in result.upstream + result.downstream],
-        affected_test_cases=result.affected_test_cases,
-        recommendations=result.recommendations,
-        regulatory_implications=result.regulatory_implications,
-        risk_factors=result.risk_score.factors,
-        estimated_effort_hours=result.estimated_effort_hours,
-        stats=result.stats
-    )
-
-    db.add(report)
-    db.commit()
-    db.refresh(report)
-
-    logger.info(f"Impact analysis report {report.id} created")
+    service.save_report(result, current_user.id)
 
     # Convert requirement to dict for response
     req_dict = {
@@ -129,7 +105,7 @@ async def analyze_impact(
 
 
 @router.get("/reports/{report_id}", response_model=ImpactAnalysisReportResponse)
-async def get_report(
+def get_report(
     report_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -151,7 +127,7 @@ async def get_report(
 
 
 @router.get("/reports", response_model=ImpactAnalysisReportListResponse)
-async def list_reports(
+def list_reports(
     requirement_id: Optional[int] = Query(None),
     risk_level: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
@@ -194,7 +170,7 @@ async def list_reports(
 
 
 @router.post("/change-requests", response_model=ChangeRequestResponse)
-async def create_change_request(
+def create_change_request(
     request: CreateChangeRequestRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -300,7 +276,7 @@ async def create_change_request(
 
 
 @router.get("/change-requests", response_model=ChangeRequestListResponse)
-async def list_change_requests(
+def list_change_requests(
     requirement_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
@@ -378,7 +354,7 @@ async def list_change_requests(
 
 
 @router.get("/change-requests/{change_request_id}", response_model=ChangeRequestResponse)
-async def get_change_request(
+def get_change_request(
     change_request_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -431,7 +407,7 @@ async def get_change_request(
 
 
 @router.patch("/change-requests/{change_request_id}/review", response_model=ChangeRequestResponse)
-async def review_change_request(
+def review_change_request(
     change_request_id: int,
     review: ReviewChangeRequestRequest,
     db: Session = Depends(get_db),
@@ -0,0 +1,179 @@
+"""
+Background Jobs API Endpoints
+Submit long-running work to the job queue, follow its progress and fetch results.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.core.dependencies import get_current_user
+from app.models.job import Job, JobStatus
+from app.models.user import User
+from app.schemas.job import JobSubmitRequest, JobResponse, JobListResponse, JobResultResponse
+from app.services.jobs import TERMINAL_STATUSES, get_job_types, submit_job
+import asyncio
+import json
+import time
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+# SSE: how often the job row is polled, and the idle interval between keep-alive comments
+EVENT_POLL_SECONDS = 0.5
+EVENT_KEEPALIVE_SECONDS = 15.0
+
+
+def _get_job(db: Session, job_id: int, current_user: User) -> Job:
+    """Load a job visible to the current user (its submitter or an admin)"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job or (job.created_by_id != current_user.id and current_user.role != "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+    return job
+
+
+def _job_event(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status.value,
+        "progress": job.progress or 0.0,
+        "progress_message": job.progress_message,
+        "error": job.error
+    }
+
+
+@router.get("/types")
+def list_job_types(current_user: User = Depends(get_current_user)):
+    """List the job types that can be submitted"""
+    return {"job_types": sorted(get_job_types())}
+
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_job(
+    request: JobSubmitRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queue a background job.
+
+    Returns immediately with the job ID; follow it with `GET /api/jobs/{id}`
+    or `GET /api/jobs/{id}/events` and fetch the outcome from `/result`.
+    """
+    try:
+        return submit_job(db, request.job_type, request.params, current_user.id)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=json.loads(e.json(include_url=False))
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/", response_model=JobListResponse)
+def list_jobs(
+    job_type: Optional[str] = Query(None),
+    job_status: Optional[JobStatus] = Query(None, alias="status"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List the current user's jobs (all jobs for admins), newest first"""
+    query = db.query(Job)
+    if current_user.role != "admin":
+        query = query.filter(Job.created_by_id == current_user.id)
+    if job_type:
+        query = query.filter(Job.job_type == job_type)
+    if job_status:
+        query = query.filter(Job.status == job_status)
+
+    total = query.count()
+    offset = (page - 1) * page_size
+    jobs = query.order_by(Job.id.desc()).offset(offset).limit(page_size).all()
+
+    return JobListResponse(jobs=jobs, total=total, page=page, page_size=page_size)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get job status and progress"""
+    return _get_job(db, job_id, current_user)
+
+
+@router.get("/{job_id}/result", response_model=JobResultResponse)
+def get_job_result(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the result of a finished job (409 while it is queued, running or failed)"""
+    job = _get_job(db, job_id, current_user)
+    if job.status != JobStatus.SUCCEEDED:
+        detail = f"Job {job_id} is {job.status.value}"
+        if job.error:
+            detail += f": {job.error}"
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=detail
+        )
+    return job
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream job progress as Server-Sent Events
+
+    An `event: progress` message is sent whenever status or progress
+    changes; the stream ends with `event: done` once the job has
+    succeeded or failed.
+    """
+    await run_in_threadpool(_get_job, db, job_id, current_user)
+
+    def poll() -> dict:
+        # Re-read the row the worker is updating
+        db.expire_all()
+        job = db.query(Job).filter(Job.id == job_id).first()
+        event = _job_event(job)
+        db.rollback()  # Do not hold a snapshot between polls
+        return event
+
+    async def events():
+        last = None
+        sent_at = time.monotonic()
+        while True:
+            event = await run_in_threadpool(poll)
+            finished = event["status"] in {s.value for s in TERMINAL_STATUSES}
+            if event != last or finished:
+                name = "done" if finished else "progress"
+                yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
+                last, sent_at = event, time.monotonic()
+                if finished:
+                    return
+            elif time.monotonic() - sent_at >= EVENT_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                sent_at = time.monotonic()
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,72 @@
+"""
+ReqIF API
+Exchange of requirements, test cases and traceability links with other tools in ReqIF.
+"""
+import xml.etree.ElementTree as ET
+import zipfile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.core.dependencies import get_current_user
+from app.models import User, RequirementPriority, RequirementStatus, RequirementType
+from app.schemas.requirement import ReqIFImportResponse
+from app.services.exports import requirement_filters
+from app.services.reqif import import_reqif, iter_reqif
+
+router = APIRouter(prefix="/api/reqif", tags=["ReqIF"])
+
+
+@router.post("/import", response_model=ReqIFImportResponse)
+def import_reqif_file(
+    file: UploadFile = File(..., description="ReqIF document (.reqif) or archive (.reqifz)"),
+    default_type: RequirementType = Query(
+        RequirementType.SYSTEM, description="Type of requirements without a Type attribute"
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Import a ReqIF exchange document
+
+    Requirements and test cases are upserted by their ids, so re-importing
+    a revised document only writes what changed; relations between
+    requirements become traceability links. The document is parsed
+    incrementally and applied in one transaction; objects that cannot be
+    imported are counted as failed.
+    """
+    try:
+        return import_reqif(db, file.file, current_user.id, default_type)
+    except (ET.ParseError, ValueError, zipfile.BadZipFile) as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid ReqIF document: {e}"
+        )
+
+
+@router.get("/export")
+def export_reqif(
+    type: Optional[RequirementType] = Query(None, description="Filter by requirement type"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    status: Optional[RequirementStatus] = Query(None, description="Filter by status"),
+    priority: Optional[RequirementPriority] = Query(None, description="Filter by priority"),
+    search: Optional[str] = Query(None, description="Search in title and description"),
+    regulatory_document: Optional[str] = Query(None, description="Filter by regulatory document"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export requirements matching the GET /requirements filters as ReqIF
+
+    The document also carries the requirements' test cases and the
+    traceability links among the exported requirements, and is streamed
+    as it is generated.
+    """
+    clauses = requirement_filters(type, category, status, priority, search, regulatory_document)
+    return StreamingResponse(
+        iter_reqif(db, clauses),
+        media_type="application/xml",
+        headers={"Content-Disposition": 'attachment; filename="requirements.reqif"'}
+    )
@@ -2,20 +2,35 @@
 Requirements API Routes
 CRUD operations for requirements with filtering, pagination, and statistics.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_
+from sqlalchemy import String, case, cast, func, literal, or_, select, tuple_, union_all
 from typing import List, Optional
+from app.config import get_settings
 from app.database import get_db
-from app.models import User, Requirement, RequirementStatus, RequirementType, RequirementPriority
+from app.models import (
+    User, Requirement, RequirementStatus, RequirementType, RequirementPriority
+)
 from app.schemas.requirement import (
     RequirementCreate, RequirementUpdate, RequirementResponse,
     RequirementListResponse, RequirementWithRelations, RequirementFilter,
-    RequirementStats
+    RequirementStats, RequirementSyncRequest, UpsertCounts
 )
+from app.schemas.test_case import TestExecutionResponse
+from app.core.cache import TTLCache, table_versions
 from app.core.dependencies import get_current_user
+from app.services.exports import requirement_filters
+from app.services.requirement_sync import upsert_requirements
+from app.services.test_executions import decode_cursor, encode_cursor, get_requirement_history
 
 router = APIRouter(prefix="/requirements", tags=["requirements"])
+settings = get_settings()
+
+# Tables /stats is derived from (test and link counts are requirement
+# columns); statistics are cached per their versions
+# (the TTL bounds staleness from writes in other processes)
+_STATS_TABLES = ("requirements",)
+_stats_cache = TTLCache(ttl=settings.stats_cache_ttl_seconds, maxsize=4)
 
 
 # ============================================================================
@@ -42,9 +57,9 @@ def _build_requirement_response(req: Requirement) -> RequirementResponse:
         created_by_id=req.created_by_id,
         created_at=req.created_at,
         updated_at=req.updated_at,
-        test_case_count=len(req.test_cases) if req.test_cases else 0,
-        parent_trace_count=len(req.parent_traces) if req.parent_traces else 0,
-        child_trace_count=len(req.child_traces) if req.child_traces else 0,
+        test_case_count=req.test_case_count or 0,
+        parent_trace_count=req.parent_link_count or 0,
+        child_trace_count=req.child_link_count or 0,
     )
 
 
@@ -53,7 +68,7 @@ def _build_requirement_response(req: Requirement) -> RequirementResponse:
 # ============================================================================
 
 @router.post("/", response_model=RequirementResponse, status_code=status.HTTP_201_CREATED)
-async def create_requirement(
+def create_requirement(
     requirement_data: RequirementCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -81,8 +96,30 @@ async def create_requirement(
     return _build_requirement_response(new_requirement)
 
 
+@router.post("/sync", response_model=UpsertCounts)
+def sync_requirements(
+    sync_data: RequirementSyncRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create or update requirements in bulk, keyed on requirement_id
+
+    Idempotent: new ids are inserted, existing ones have their content
+    replaced, and requirements whose content hash is unchanged are not
+    written at all. Runs as a few INSERT ... ON CONFLICT DO UPDATE
+    statements in one transaction. Requirements missing from the request
+    are left alone.
+    """
+    counts = upsert_requirements(
+        db, (item.model_dump() for item in sync_data.requirements), current_user.id
+    )
+    db.commit()
+    return counts
+
+
 @router.get("/", response_model=RequirementListResponse)
-async def list_requirements(
+def list_requirements(
     type: Optional[RequirementType] = Query(None, description="Filter by requirement type"),
     category: Optional[str] = Query(None, description="Filter by category"),
     status: Optional[RequirementStatus] = Query(None, description="Filter by status"),
@@ -97,31 +134,11 @@ async def list_requirements(
     current_user: User = Depends(get_current_user)
 ):
     """List requirements with filtering and pagination"""
-    # Build query
-    query = db.query(Requirement).options(
-        joinedload(Requirement.test_cases),
-        joinedload(Requirement.parent_traces),
-        joinedload(Requirement.child_traces)
-    )
+    # Build query (counts come from the counter columns, so no relationships are loaded)
+    query = db.query(Requirement)
 
-    # Apply filters
-    if type:
-        query = query.filter(Requirement.type == type)
-    if category:
-        query = query.filter(Requirement.category == category)
-    if status:
-        query = query.filter(Requirement.status == status)
-    if priority:
-        query = query.filter(Requirement.priority == priority)
-    if regulatory_document:
-        query = query.filter(Requirement.regulatory_document.ilike(f"%{regulatory_document}%"))
-    if search:
-        search_filter = or_(
-            Requirement.title.ilike(f"%{search}%"),
-            Requirement.description.ilike(f"%{search}%"),
-            Requirement.requirement_id.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+    # Apply filters (shared with /export/requirements)
+    query = query.filter(*requirement_filters(type, category, status, priority, search, regulatory_document))
 
     # Get total count
     total = query.count()
@@ -147,68 +164,100 @@ async def list_requirements(
     )
 
 
-@router.get("/stats", response_model=RequirementStats)
-async def get_requirement_statistics(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get statistics about requirements"""
-    # Total count
-    total_requirements = db.query(func.count(Requirement.id)).scalar()
-
-    # Count by type
-    by_type = {}
-    type_counts = db.query(
-        Requirement.type, func.count(Requirement.id)
-    ).group_by(Requirement.type).all()
-    for req_type, count in type_counts:
-        by_type[req_type.value] = count
-
-    # Count by status
-    by_status = {}
-    status_counts = db.query(
-        Requirement.status, func.count(Requirement.id)
-    ).group_by(Requirement.status).all()
-    for req_status, count in status_counts:
-        by_status[req_status.value] = count
-
-    # Count by priority
-    by_priority = {}
-    priority_counts = db.query(
-        Requirement.priority, func.count(Requirement.id)
-    ).group_by(Requirement.priority).all()
-    for req_priority, count in priority_counts:
-        by_priority[req_priority.value] = count
-
-    # Requirements with test cases
-    total_with_tests = db.query(Requirement).filter(
-        Requirement.test_cases.any()
-    ).count()
-
-    # Requirements with traceability links
-    total_with_traces = db.query(Requirement).filter(
-        or_(
-            Requirement.parent_traces.any(),
-            Requirement.child_traces.any()
+# Dimensions reported by /stats, with the enum each column's stored names belong to
+_STATS_DIMENSIONS = (
+    ("type", Requirement.type, RequirementType),
+    ("status", Requirement.status, RequirementStatus),
+    ("priority", Requirement.priority, RequirementPriority),
+)
+
+
+def _requirement_flags():
+    """Per-requirement rows with has_tests / has_traces, from the counter columns"""
+    return select(
+        *(cast(column, String).label(name) for name, column, _ in _STATS_DIMENSIONS),
+        case((Requirement.test_case_count > 0, 1), else_=0).label("has_tests"),
+        case((or_(Requirement.parent_link_count > 0, Requirement.child_link_count > 0), 1), else_=0).label("has_traces"),
+    ).cte("requirement_flags")
+
+
+def _compute_requirement_stats(db: Session) -> RequirementStats:
+    """
+    All requirement statistics in one statement.
+
+    PostgreSQL aggregates once with GROUPING SETS ((type), (status),
+    (priority), ()); other backends get the same rows from a UNION ALL of
+    the four groupings over the shared CTE.
+    """
+    flags = _requirement_flags()
+    totals = (
+        func.count().label("total"),
+        func.coalesce(func.sum(flags.c.has_tests), 0).label("with_tests"),
+        func.coalesce(func.sum(flags.c.has_traces), 0).label("with_traces"),
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        dimension = case(
+            *((func.grouping(flags.c[name]) == 0, name) for name, _, _ in _STATS_DIMENSIONS),
+            else_="all"
+        )
+        key = func.coalesce(*(flags.c[name] for name, _, _ in _STATS_DIMENSIONS))
+        statement = select(dimension.label("dimension"), key.label("key"), *totals).group_by(
+            func.grouping_sets(*(tuple_(flags.c[name]) for name, _, _ in _STATS_DIMENSIONS), tuple_())
+        )
+    else:
+        statement = union_all(
+            *(
+                select(literal(name).label("dimension"), flags.c[name].label("key"), *totals).group_by(flags.c[name])
+                for name, _, _ in _STATS_DIMENSIONS
+            ),
+            select(literal("all").label("dimension"), literal(None, String).label("key"), *totals)
         )
-    ).count()
 
-    # Coverage percentage
+    stats = {name: {} for name, _, _ in _STATS_DIMENSIONS}
+    overall = None
+    enums = {name: enum for name, _, enum in _STATS_DIMENSIONS}
+    for row in db.execute(statement):
+        if row.dimension == "all":
+            overall = row
+        elif row.key is not None:
+            stats[row.dimension][enums[row.dimension][row.key].value] = row.total
+
+    total_requirements = overall.total if overall else 0
+    total_with_tests = overall.with_tests if overall else 0
     coverage_percentage = (total_with_tests / total_requirements * 100) if total_requirements > 0 else 0.0
 
     return RequirementStats(
         total_requirements=total_requirements,
-        by_type=by_type,
-        by_status=by_status,
-        by_priority=by_priority,
+        by_type=stats["type"],
+        by_status=stats["status"],
+        by_priority=stats["priority"],
         total_with_tests=total_with_tests,
-        total_with_traces=total_with_traces,
+        total_with_traces=overall.with_traces if overall else 0,
         coverage_percentage=round(coverage_percentage, 2)
     )
 
 
+@router.get("/stats", response_model=RequirementStats)
+def get_requirement_statistics(
+    cached: bool = Query(False, description="Allow a result up to STATS_CACHE_TTL_SECONDS old (for dashboard polling)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get statistics about requirements"""
+    if not cached:
+        return _compute_requirement_stats(db)
+
+    key = table_versions(*_STATS_TABLES)
+    stats = _stats_cache.get(key)
+    if stats is None:
+        stats = _compute_requirement_stats(db)
+        _stats_cache.set(key, stats)
+    return stats
+
+
 @router.get("/by-req-id/{req_id}", response_model=RequirementWithRelations)
-async def get_requirement_by_req_id(
+def get_requirement_by_req_id(
     req_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -298,7 +347,7 @@ async def get_requirement_by_req_id(
 
 
 @router.get("/{requirement_id}", response_model=RequirementWithRelations)
-async def get_requirement(
+def get_requirement(
     requirement_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -387,8 +436,45 @@ async def get_requirement(
     )
 
 
+@router.get("/{requirement_id}/test-executions", response_model=List[TestExecutionResponse])
+def get_requirement_test_executions(
+    requirement_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Execution history of all the requirement's test cases, newest first
+
+    When older executions remain, the response carries an `X-Next-Cursor`
+    header; pass its value as `cursor` to fetch them.
+    """
+    if not db.query(Requirement.id).filter(Requirement.id == requirement_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Requirement with ID {requirement_id} not found"
+        )
+
+    before = None
+    if cursor:
+        try:
+            before = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid cursor: {cursor}"
+            )
+
+    executions, next_cursor = get_requirement_history(db, requirement_id, limit, before)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_cursor)
+    return executions
+
+
 @router.put("/{requirement_id}", response_model=RequirementResponse)
-async def update_requirement(
+def update_requirement(
     requirement_id: int,
     requirement_data: RequirementUpdate,
     db: Session = Depends(get_db),
@@ -415,7 +501,7 @@ async def update_requirement(
 
 
 @router.delete("/{requirement_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_requirement(
+def delete_requirement(
     requirement_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
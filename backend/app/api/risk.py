@@ -3,7 +3,7 @@ Risk Assessment API Endpoints
 Provides risk scoring and analytics for requirements.
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
 from app.core.dependencies import get_current_user
@@ -22,7 +22,7 @@ router = APIRouter(prefix="/api/risk", tags=["Risk Assessment"])
 
 
 @router.get("/overview", response_model=RiskOverview)
-async def get_risk_overview(
+def get_risk_overview(
     requirement_type: Optional[RequirementType] = Query(None, description="Filter by requirement type"),
     status: Optional[RequirementStatus] = Query(None, description="Filter by status"),
     priority: Optional[RequirementPriority] = Query(None, description="Filter by priority"),
@@ -34,11 +34,7 @@ async def get_risk_overview(
     Returns risk distribution, key metrics, and top risk requirements.
     """
     # Build query with filters
-    query = db.query(Requirement).options(
-        joinedload(Requirement.test_cases),
-        joinedload(Requirement.parent_traces),
-        joinedload(Requirement.child_traces)
-    )
+    query = db.query(Requirement)
 
     if requirement_type:
         query = query.filter(Requirement.type == requirement_type)
@@ -92,13 +88,12 @@ async def get_risk_overview(
 
     untested_requirements = sum(
         1 for req in requirements
-        if not req.test_cases or len(req.test_cases) == 0
+        if not req.test_case_count
     )
 
     orphaned_requirements = sum(
         1 for req in requirements
-        if (not req.parent_traces or len(req.parent_traces) == 0) and
-           (not req.child_traces or len(req.child_traces) == 0)
+        if not req.parent_link_count and not req.child_link_count
     )
 
     non_compliant_requirements = sum(
@@ -138,7 +133,7 @@ async def get_risk_overview(
 
 
 @router.get("/requirements", response_model=List[RequirementRiskResponse])
-async def get_requirements_with_risk(
+def get_requirements_with_risk(
     requirement_type: Optional[RequirementType] = Query(None, description="Filter by requirement type"),
     status: Optional[RequirementStatus] = Query(None, description="Filter by status"),
     priority: Optional[RequirementPriority] = Query(None, description="Filter by priority"),
@@ -155,11 +150,7 @@ async def get_requirements_with_risk(
     Supports filtering by requirement properties and risk scores.
     """
     # Build query with filters
-    query = db.query(Requirement).options(
-        joinedload(Requirement.test_cases),
-        joinedload(Requirement.parent_traces),
-        joinedload(Requirement.child_traces)
-    )
+    query = db.query(Requirement)
 
     if requirement_type:
         query = query.filter(Requirement.type == requirement_type)
@@ -213,7 +204,7 @@ async def get_requirements_with_risk(
 
 
 @router.get("/requirements/{requirement_id}", response_model=RequirementRiskResponse)
-async def get_requirement_risk(
+def get_requirement_risk(
     requirement_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -224,12 +215,8 @@ async def get_requirement_risk(
     Args:
         requirement_id: Requirement identifier (e.g., "AHLR-001")
     """
-    # Query requirement with all relationships
-    requirement = db.query(Requirement).options(
-        joinedload(Requirement.test_cases),
-        joinedload(Requirement.parent_traces),
-        joinedload(Requirement.child_traces)
-    ).filter(Requirement.requirement_id == requirement_id).first()
+    # Query requirement (scoring reads the counter columns)
+    requirement = db.query(Requirement).filter(Requirement.requirement_id == requirement_id).first()
 
     if not requirement:
         raise HTTPException(status_code=404, detail=f"Requirement {requirement_id} not found")
@@ -254,7 +241,7 @@ async def get_requirement_risk(
 
 
 @router.get("/requirements/by-id/{req_id}", response_model=RiskScore)
-async def get_requirement_risk_score_only(
+def get_requirement_risk_score_only(
     req_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -266,11 +253,7 @@ async def get_requirement_risk_score_only(
     Args:
         req_id: Database ID of the requirement
     """
-    requirement = db.query(Requirement).options(
-        joinedload(Requirement.test_cases),
-        joinedload(Requirement.parent_traces),
-        joinedload(Requirement.child_traces)
-    ).filter(Requirement.id == req_id).first()
+    requirement = db.query(Requirement).filter(Requirement.id == req_id).first()
 
     if not requirement:
         raise HTTPException(status_code=404, detail=f"Requirement with ID {req_id} not found")
@@ -283,7 +266,7 @@ async def get_requirement_risk_score_only(
 
 
 @router.get("/critical", response_model=List[RequirementRiskResponse])
-async def get_critical_risks(
+def get_critical_risks(
     limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -293,11 +276,7 @@ async def get_critical_risks(
     Sorted by risk score (highest first).
     """
     # Get all requirements
-    requirements = db.query(Requirement).options(
-        joinedload(Requirement.test_cases),
-        joinedload(Requirement.parent_traces),
-        joinedload(Requirement.child_traces)
-    ).all()
+    requirements = db.query(Requirement).all()
 
     # Calculate risk scores and filter for critical
     analyzer = RiskAnalyzer(db)
@@ -2,21 +2,37 @@
 Test Cases API Routes
 CRUD operations for test cases with execution tracking and statistics.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_
+from sqlalchemy import case, func
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+from app.config import get_settings
 from app.database import get_db
 from app.models import User, TestCase, Requirement, TestCaseStatus, TestCasePriority
 from app.schemas.test_case import (
     TestCaseCreate, TestCaseUpdate, TestCaseResponse,
     TestCaseListResponse, TestCaseWithRequirement,
-    TestCaseExecutionUpdate, TestCaseFilter, TestCaseStats
+    TestCaseExecutionUpdate, TestCaseFilter, TestCaseStats,
+    TestResultImportResponse, TestExecutionResponse, FlakyTestResponse
 )
+from app.core.cache import TTLCache, table_versions
 from app.core.dependencies import get_current_user
+from app.services.exports import test_case_filters
+from app.services.similarity_index import get_similarity_index
+from app.services.test_executions import (
+    decode_cursor, encode_cursor, execution_row, find_flaky_tests, get_test_case_history, record_executions
+)
+from app.services.test_results_import import detect_format, import_test_results, iter_results
+import gzip
+import xml.etree.ElementTree as ET
 
 router = APIRouter(prefix="/test-cases", tags=["test-cases"])
+settings = get_settings()
+
+# Statistics keyed by the test_cases table version. A write in this process
+# invalidates them at once; the TTL bounds staleness from other processes.
+_stats_cache = TTLCache(ttl=settings.stats_cache_ttl_seconds, maxsize=4)
 
 
 # ============================================================================
@@ -52,12 +68,25 @@ def _build_test_case_response(tc: TestCase, include_requirement: bool = True) ->
     return response
 
 
+def _parse_cursor(cursor: Optional[str]):
+    """Decode an execution history cursor, rejecting malformed ones with 400"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {cursor}"
+        )
+
+
 # ============================================================================
 # CRUD Operations
 # ============================================================================
 
 @router.post("/", response_model=TestCaseResponse, status_code=status.HTTP_201_CREATED)
-async def create_test_case(
+def create_test_case(
     test_case_data: TestCaseCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -96,7 +125,7 @@ async def create_test_case(
 
 
 @router.get("/", response_model=TestCaseListResponse)
-async def list_test_cases(
+def list_test_cases(
     status: Optional[TestCaseStatus] = Query(None, description="Filter by test status"),
     priority: Optional[TestCasePriority] = Query(None, description="Filter by priority"),
     requirement_id: Optional[int] = Query(None, description="Filter by requirement ID"),
@@ -114,24 +143,8 @@ async def list_test_cases(
     # Build query
     query = db.query(TestCase).options(joinedload(TestCase.requirement))
 
-    # Apply filters
-    if status:
-        query = query.filter(TestCase.status == status)
-    if priority:
-        query = query.filter(TestCase.priority == priority)
-    if requirement_id:
-        query = query.filter(TestCase.requirement_id == requirement_id)
-    if test_type:
-        query = query.filter(TestCase.test_type.ilike(f"%{test_type}%"))
-    if automated is not None:
-        query = query.filter(TestCase.automated == automated)
-    if search:
-        search_filter = or_(
-            TestCase.title.ilike(f"%{search}%"),
-            TestCase.description.ilike(f"%{search}%"),
-            TestCase.test_case_id.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+    # Apply filters (shared with /export/test-cases)
+    query = query.filter(*test_case_filters(status, priority, requirement_id, test_type, automated, search))
 
     # Get total count
     total = query.count()
@@ -157,60 +170,84 @@ async def list_test_cases(
     )
 
 
-@router.get("/stats", response_model=TestCaseStats)
-async def get_test_case_statistics(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get statistics about test cases"""
-    # Total count
-    total_test_cases = db.query(func.count(TestCase.id)).scalar()
-
-    # Count by status
-    by_status = {}
-    status_counts = db.query(
-        TestCase.status, func.count(TestCase.id)
-    ).group_by(TestCase.status).all()
-    for tc_status, count in status_counts:
-        by_status[tc_status.value] = count
-
-    # Count by priority
-    by_priority = {}
-    priority_counts = db.query(
-        TestCase.priority, func.count(TestCase.id)
-    ).group_by(TestCase.priority).all()
-    for tc_priority, count in priority_counts:
-        by_priority[tc_priority.value] = count
-
-    # Automated vs manual
-    total_automated = db.query(TestCase).filter(TestCase.automated == True).count()
-    total_manual = total_test_cases - total_automated
-
-    # Pass rate
-    total_passed = db.query(TestCase).filter(TestCase.status == TestCaseStatus.PASSED).count()
-    total_executed = db.query(TestCase).filter(
-        TestCase.status.in_([TestCaseStatus.PASSED, TestCaseStatus.FAILED])
-    ).count()
+def _count_where(condition):
+    return func.count(case((condition, 1)))
+
+
+def _compute_test_case_stats(db: Session) -> TestCaseStats:
+    """All test case statistics from one aggregate query (conditional counts per status / priority)"""
+    columns = [
+        func.count(TestCase.id).label("total"),
+        _count_where(TestCase.automated == True).label("automated"),
+        func.avg(TestCase.execution_duration).label("avg_duration"),
+    ]
+    columns += [_count_where(TestCase.status == value).label(f"status_{value.name}") for value in TestCaseStatus]
+    columns += [_count_where(TestCase.priority == value).label(f"priority_{value.name}") for value in TestCasePriority]
+    row = db.query(*columns).one()
+
+    by_status = {
+        value.value: row._mapping[f"status_{value.name}"]
+        for value in TestCaseStatus if row._mapping[f"status_{value.name}"]
+    }
+    by_priority = {
+        value.value: row._mapping[f"priority_{value.name}"]
+        for value in TestCasePriority if row._mapping[f"priority_{value.name}"]
+    }
+
+    total_passed = by_status.get(TestCaseStatus.PASSED.value, 0)
+    total_executed = total_passed + by_status.get(TestCaseStatus.FAILED.value, 0)
     pass_rate = (total_passed / total_executed * 100) if total_executed > 0 else 0.0
 
-    # Average execution duration
-    avg_duration = db.query(func.avg(TestCase.execution_duration)).filter(
-        TestCase.execution_duration.isnot(None)
-    ).scalar()
-
     return TestCaseStats(
-        total_test_cases=total_test_cases,
+        total_test_cases=row.total,
         by_status=by_status,
         by_priority=by_priority,
-        total_automated=total_automated,
-        total_manual=total_manual,
+        total_automated=row.automated,
+        total_manual=row.total - row.automated,
         pass_rate=round(pass_rate, 2),
-        avg_execution_duration=round(avg_duration, 2) if avg_duration else None
+        avg_execution_duration=round(row.avg_duration, 2) if row.avg_duration else None
+    )
+
+
+@router.get("/stats", response_model=TestCaseStats)
+def get_test_case_statistics(
+    cached: bool = Query(False, description="Allow a result up to STATS_CACHE_TTL_SECONDS old (for dashboard polling)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get statistics about test cases"""
+    if not cached:
+        return _compute_test_case_stats(db)
+
+    key = table_versions("test_cases")
+    stats = _stats_cache.get(key)
+    if stats is None:
+        stats = _compute_test_case_stats(db)
+        _stats_cache.set(key, stats)
+    return stats
+
+
+@router.get("/flaky", response_model=List[FlakyTestResponse])
+def get_flaky_test_cases(
+    days: int = Query(30, ge=1, le=3650, description="Look back this many days"),
+    min_executions: int = Query(5, ge=2, description="Ignore test cases run fewer times"),
+    min_flip_rate: float = Query(0.3, gt=0.0, le=1.0, description="Minimum flips / (executions - 1)"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Test cases whose results flip between passed and failed, most unstable first"""
+    return find_flaky_tests(
+        db,
+        since=datetime.utcnow() - timedelta(days=days),
+        min_executions=min_executions,
+        min_flip_rate=min_flip_rate,
+        limit=limit
     )
 
 
 @router.get("/{test_case_id}", response_model=TestCaseWithRequirement)
-async def get_test_case(
+def get_test_case(
     test_case_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -262,7 +299,7 @@ async def get_test_case(
 
 
 @router.put("/{test_case_id}", response_model=TestCaseResponse)
-async def update_test_case(
+def update_test_case(
     test_case_id: int,
     test_case_data: TestCaseUpdate,
     db: Session = Depends(get_db),
@@ -300,7 +337,7 @@ async def update_test_case(
 
 
 @router.patch("/{test_case_id}/execute", response_model=TestCaseResponse)
-async def execute_test_case(
+def execute_test_case(
     test_case_id: int,
     execution_data: TestCaseExecutionUpdate,
     db: Session = Depends(get_db),
@@ -321,15 +358,89 @@ async def execute_test_case(
     test_case.execution_date = datetime.utcnow()
     test_case.execution_duration = execution_data.execution_duration
     test_case.executed_by = execution_data.executed_by or current_user.username
+    record_executions(db, [execution_row(test_case, test_case.execution_date)])
 
     db.commit()
     db.refresh(test_case)
 
+    if test_case.status == TestCaseStatus.FAILED and test_case.actual_results:
+        # Recorded failures feed similar-failure lookups in later analyses
+        get_similarity_index().add(
+            test_case.actual_results,
+            test_case_id=test_case.id,
+            test_case_name=test_case.test_case_id
+        )
+
     return _build_test_case_response(test_case)
 
 
+@router.get("/{test_case_id}/executions", response_model=List[TestExecutionResponse])
+def get_test_case_executions(
+    test_case_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Execution history of a test case, newest first
+
+    When older executions remain, the response carries an `X-Next-Cursor`
+    header; pass its value as `cursor` to fetch them.
+    """
+    if not db.query(TestCase.id).filter(TestCase.id == test_case_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Test case with ID {test_case_id} not found"
+        )
+
+    executions, next_cursor = get_test_case_history(db, test_case_id, limit, _parse_cursor(cursor))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_cursor)
+    return executions
+
+
+@router.post("/results", response_model=TestResultImportResponse)
+def import_test_results_file(
+    file: UploadFile = File(..., description="JUnit XML or JSONL results (gzip with a .gz name)"),
+    format: Optional[str] = Query(
+        None, pattern="^(junit|jsonl)$", description="Result format (default: from the file extension)"
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Record a CI run's execution results in bulk
+
+    Accepts a JUnit / xUnit XML report or JSON Lines with one
+    `{test_case_id, status, actual_results, execution_duration, executed_by}`
+    object per line. The file is parsed incrementally and all results are
+    applied in one transaction; results for unknown test case ids are
+    counted as failed. Executor defaults to the current user.
+    """
+    result_format = format or detect_format(file.filename)
+    if result_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot tell the result format from the file name; pass format=junit or format=jsonl"
+        )
+
+    fileobj = file.file
+    if (file.filename or "").lower().endswith(".gz"):
+        fileobj = gzip.GzipFile(fileobj=fileobj, mode="rb")
+    try:
+        return import_test_results(db, iter_results(fileobj, result_format), current_user.username)
+    except (ET.ParseError, ValueError, OSError, EOFError) as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid results file: {e}"
+        )
+
+
 @router.delete("/{test_case_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_test_case(
+def delete_test_case(
     test_case_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -1,15 +1,30 @@
 """
 API endpoints for intelligent test failure analysis and suggestions
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session, joinedload
 from app.database import get_db
 from app.models.test_case import TestCase
+from app.models.test_suggestion import SuggestionFeedback, TestCaseSuggestion
 from app.models.user import User
 from app.core.dependencies import get_current_user
-from app.services.reasoning_agent import ReasoningAgent
-from pydantic import BaseModel
-from typing import List, Optional
+from app.services import failure_analysis
+from app.services.batch_analysis import (
+    MAX_BATCH_SIZE,
+    iter_tar_logs,
+    load_snapshots,
+    stream_batch_analysis
+)
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+import gzip
+import json
+import tarfile
+from itertools import islice
 
 router = APIRouter(prefix="/test-cases", tags=["test-suggestions"])
 
@@ -20,14 +35,80 @@ class AnalyzeRequest(BaseModel):
     environment: Optional[str] = None
 
 
+class BatchAnalyzeItem(BaseModel):
+    """One failed test case and its execution log"""
+    test_case_id: int
+    execution_log: str
+
+
+class BatchAnalyzeRequest(BaseModel):
+    """Request to analyze many test failures at once"""
+    items: List[BatchAnalyzeItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
 class FeedbackRequest(BaseModel):
     """Feedback on suggestion helpfulness"""
     helpful: bool
     comment: Optional[str] = None
 
 
+def _analysis_response(
+    test_case_id: int,
+    test_case_name: str,
+    report: Dict,
+    timestamp: Optional[datetime] = None
+) -> Dict:
+    """Response body for one analysis, from SuggestionReport.to_dict()"""
+    timestamp = timestamp or datetime.utcnow()
+    return {
+        "test_case_id": test_case_id,
+        "test_case_name": test_case_name,
+        "failure_type": report["failure_type"],
+        "root_causes": report["root_causes"],
+        "suggestions": report["suggestions"],
+        "similar_failures": report["similar_failures"],
+        "confidence_score": report["confidence_score"],
+        "analysis_timestamp": timestamp.isoformat() + ("Z" if timestamp.tzinfo is None else "")
+    }
+
+
+def _ndjson_response(results) -> StreamingResponse:
+    """Stream result dicts as newline-delimited JSON"""
+    async def body():
+        async for result in results:
+            yield json.dumps(result, default=str) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+def _get_test_case(db: Session, test_case_id: int) -> TestCase:
+    """Test case with its requirement loaded, or 404"""
+    test_case = db.query(TestCase).options(
+        joinedload(TestCase.requirement)
+    ).filter(TestCase.id == test_case_id).first()
+
+    if not test_case:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Test case with id {test_case_id} not found"
+        )
+    return test_case
+
+
+def _stored_analysis_response(test_case: TestCase, analysis, cached: bool) -> Dict:
+    """Response body for a stored FailureAnalysis"""
+    response = _analysis_response(test_case.id, test_case.test_case_id, analysis.report, analysis.created_at)
+    response["analysis_id"] = analysis.id
+    response["cached"] = cached
+    # Stored suggestion ids, in report order, for the feedback endpoint
+    response["suggestion_ids"] = [
+        s.id for s in sorted(analysis.suggestions, key=lambda s: (s.priority, s.id))
+    ]
+    return response
+
+
 @router.post("/{test_case_id}/analyze", summary="Analyze failed test case")
-async def analyze_test_failure(
+def analyze_test_failure(
     test_case_id: int,
     request: AnalyzeRequest,
     db: Session = Depends(get_db),
@@ -43,55 +124,113 @@ async def analyze_test_failure(
     - Find similar historical failures
 
     No LLM required - pure deterministic analysis
+
+    Reports are stored and keyed by a fingerprint of the normalized log:
+    re-analyzing an identical failure returns the stored report
+    (`cached: true`) without running the reasoning engine again.
     """
-    # Get test case with requirement
-    test_case = db.query(TestCase).options(
-        joinedload(TestCase.requirement)
-    ).filter(TestCase.id == test_case_id).first()
+    test_case = _get_test_case(db, test_case_id)
+    analysis, cached = failure_analysis.get_or_create_analysis(
+        db, test_case, request.execution_log, current_user.id
+    )
+    return _stored_analysis_response(test_case, analysis, cached)
 
-    if not test_case:
+
+@router.post("/{test_case_id}/analyze/upload", summary="Analyze failed test case from a log file")
+def analyze_test_failure_upload(
+    test_case_id: int,
+    file: UploadFile = File(..., description="Execution log (plain text, or gzip with a .gz name)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Analyze a failed test case from an uploaded execution log
+
+    Same analysis and response as `/analyze`, for logs too large to send
+    as a JSON string. The file is scanned line by line and only the error
+    message, a bounded stack-trace window and keyword hits are kept, so
+    memory use does not depend on the log size.
+    """
+    test_case = _get_test_case(db, test_case_id)
+
+    fileobj = file.file
+    if (file.filename or "").endswith(".gz"):
+        fileobj = gzip.GzipFile(fileobj=fileobj, mode="rb")
+    try:
+        analysis, cached = failure_analysis.analyze_log_stream(db, test_case, fileobj, current_user.id)
+    except (OSError, EOFError) as e:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Test case with id {test_case_id} not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid log file: {e}"
         )
+    return _stored_analysis_response(test_case, analysis, cached)
 
-    # Run reasoning agent
-    agent = ReasoningAgent()
-    report = agent.analyze_failure(test_case, request.execution_log)
 
-    return {
-        "test_case_id": test_case_id,
-        "test_case_name": test_case.test_case_id,
-        "failure_type": report.failure_type,
-        "root_causes": [
-            {
-                "cause": rc.cause,
-                "likelihood": rc.likelihood,
-                "evidence": rc.evidence,
-                "affected_components": rc.affected_components,
-                "regulatory_impact": rc.regulatory_impact
-            }
-            for rc in report.root_causes
-        ],
-        "suggestions": [
-            {
-                "priority": s.priority,
-                "action": s.action,
-                "details": s.details,
-                "code_locations": s.code_locations,
-                "verification_steps": s.verification_steps,
-                "estimated_effort_hours": s.estimated_effort_hours
-            }
-            for s in report.suggestions
-        ],
-        "similar_failures": report.similar_failures,
-        "confidence_score": report.confidence_score,
-        "analysis_timestamp": "2025-10-21T12:00:00Z"
-    }
+@router.post("/batch-analyze", summary="Analyze many failed test cases")
+async def batch_analyze(
+    request: BatchAnalyzeRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Analyze a batch of failed test cases (e.g. after a nightly CI run)
+
+    All test cases are loaded in one query and analyzed in a process pool.
+    Reports are stored as with `/analyze`, so failures analyzed before
+    come back first (`cached: true`). Results stream back as NDJSON, one
+    line per test case, in completion order, each with its `analysis_id`
+    and `suggestion_ids`. Unknown test cases produce a line with an
+    `error` field.
+    """
+    pairs = [(item.test_case_id, item.execution_log) for item in request.items]
+    snapshots = await run_in_threadpool(load_snapshots, db, [key for key, _ in pairs])
+    return _ndjson_response(stream_batch_analysis(
+        db, pairs, snapshots, current_user.id, _stored_analysis_response
+    ))
+
+
+@router.post("/batch-analyze/archive", summary="Analyze a tarball of failure logs")
+async def batch_analyze_archive(
+    file: UploadFile = File(..., description="tar / tar.gz of logs named <id>.log"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Analyze a tarball of execution logs
+
+    Each file is one log, named after the test case: the numeric primary key
+    (`123.log`) or the test case ID (`TC-000942.log`). Results stream back as
+    NDJSON like `/batch-analyze`.
+    """
+    def read_archive():
+        try:
+            # One entry past the limit is enough to reject, without reading the rest
+            pairs = list(islice(iter_tar_logs(file.file), MAX_BATCH_SIZE + 1))
+        except tarfile.TarError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid log archive: {e}"
+            )
+        if not pairs:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Log archive contains no files"
+            )
+        if len(pairs) > MAX_BATCH_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Log archive exceeds {MAX_BATCH_SIZE} files"
+            )
+        return pairs, load_snapshots(db, [key for key, _ in pairs])
+
+    pairs, snapshots = await run_in_threadpool(read_archive)
+    return _ndjson_response(stream_batch_analysis(
+        db, pairs, snapshots, current_user.id, _stored_analysis_response
+    ))
 
 
 @router.get("/{test_case_id}/suggestions", summary="Get test suggestions")
-async def get_test_suggestions(
+def get_test_suggestions(
     test_case_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -99,7 +238,8 @@ async def get_test_suggestions(
     """
     Get existing suggestions for a test case
 
-    Returns previously analyzed suggestions from the database
+    Returns previously analyzed suggestions from the database, newest
+    analysis first, with feedback counts
     """
     # Verify test case exists
     test_case = db.query(TestCase).filter(TestCase.id == test_case_id).first()
@@ -109,16 +249,48 @@ async def get_test_suggestions(
             detail=f"Test case with id {test_case_id} not found"
         )
 
-    # TODO: Query test_case_suggestions table when implemented
+    feedback = db.query(
+        SuggestionFeedback.suggestion_id,
+        func.sum(case((SuggestionFeedback.helpful.is_(True), 1), else_=0)).label("helpful"),
+        func.count(SuggestionFeedback.id).label("total")
+    ).group_by(SuggestionFeedback.suggestion_id).subquery()
+
+    rows = db.query(TestCaseSuggestion, feedback.c.helpful, feedback.c.total).outerjoin(
+        feedback, feedback.c.suggestion_id == TestCaseSuggestion.id
+    ).filter(
+        TestCaseSuggestion.test_case_id == test_case_id
+    ).order_by(
+        TestCaseSuggestion.analysis_id.desc(), TestCaseSuggestion.priority, TestCaseSuggestion.id
+    ).all()
+
     return {
         "test_case_id": test_case_id,
-        "suggestions": [],
-        "message": "Suggestion history not yet implemented. Use /analyze endpoint for real-time analysis."
+        "suggestions": [
+            {
+                "id": suggestion.id,
+                "analysis_id": suggestion.analysis_id,
+                "suggestion_type": suggestion.suggestion_type,
+                "priority": suggestion.priority,
+                "action": suggestion.action,
+                "details": suggestion.details,
+                "code_locations": suggestion.code_locations or [],
+                "verification_steps": suggestion.verification_steps or [],
+                "estimated_effort_hours": suggestion.estimated_effort_hours,
+                "failure_type": suggestion.failure_type,
+                "confidence_score": suggestion.confidence_score,
+                "matched_rule_id": suggestion.matched_rule_id,
+                "status": suggestion.status,
+                "created_at": suggestion.created_at,
+                "helpful_count": int(helpful or 0),
+                "feedback_count": total or 0
+            }
+            for suggestion, helpful, total in rows
+        ]
     }
 
 
 @router.post("/suggestions/{suggestion_id}/feedback", summary="Submit suggestion feedback")
-async def submit_suggestion_feedback(
+def submit_suggestion_feedback(
     suggestion_id: int,
     feedback: FeedbackRequest,
     db: Session = Depends(get_db),
@@ -130,19 +302,34 @@ async def submit_suggestion_feedback(
     This helps the system learn over time by tracking which suggestions
     engineers find useful vs not useful.
     """
-    # TODO: Save feedback to suggestion_feedback table when implemented
+    suggestion = db.query(TestCaseSuggestion.id).filter(TestCaseSuggestion.id == suggestion_id).first()
+    if not suggestion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Suggestion with id {suggestion_id} not found"
+        )
+
+    record = SuggestionFeedback(
+        suggestion_id=suggestion_id,
+        user_id=current_user.id,
+        helpful=feedback.helpful,
+        comment=feedback.comment
+    )
+    db.add(record)
+    db.commit()
+
     return {
         "suggestion_id": suggestion_id,
+        "feedback_id": record.id,
         "feedback_recorded": True,
         "helpful": feedback.helpful,
         "comment": feedback.comment,
-        "user_id": current_user.id,
-        "message": "Feedback functionality will be implemented with database tables"
+        "user_id": current_user.id
     }
 
 
 @router.get("/analysis-stats", summary="Get analysis statistics")
-async def get_analysis_stats(
+def get_analysis_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -153,13 +340,6 @@ async def get_analysis_stats(
     - Total analyses performed
     - Most common failure types
     - Average confidence scores
-    - Most helpful suggestions
+    - Most helpful suggestions (by matched rule)
     """
-    # TODO: Implement when suggestion history is tracked
-    return {
-        "total_analyses": 0,
-        "analyses_this_week": 0,
-        "average_confidence": 0.0,
-        "most_common_failure_type": None,
-        "message": "Statistics will be available when analysis history is tracked"
-    }
+    return failure_analysis.get_analysis_stats(db)
@@ -3,6 +3,7 @@ Traceability Links API Routes
 CRUD operations for traceability links with matrix and gap analysis.
 """
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, or_, and_
 from typing import List, Optional, Dict, Any
@@ -15,9 +16,16 @@ from app.schemas.traceability import (
     TraceabilityLinkCreate, TraceabilityLinkUpdate, TraceabilityLinkResponse,
     TraceabilityLinkListResponse, TraceabilityLinkWithRequirements,
     TraceabilityLinkFilter, BulkTraceabilityCreate, BulkTraceabilityResponse,
-    TraceabilityMatrix, RequirementTraceNode, TraceabilityGap, TraceabilityReport
+    TraceabilityMatrix, RequirementTraceNode, TraceabilityGap, TraceabilityReport,
+    VerificationMatrix
 )
 from app.core.dependencies import get_current_user
+from app.services.exports import traceability_link_filters
+from app.services.tabular_export import EXPORT_FORMATS, iter_export
+from app.services.traceability_import import import_traceability_links
+from app.services.traceability_matrix import (
+    DEFAULT_MATRIX_DEPTH, MATRIX_COLUMNS, MAX_MATRIX_DEPTH, build_matrix, iter_matrix_rows
+)
 
 router = APIRouter(prefix="/traceability", tags=["traceability"])
 
@@ -50,7 +58,7 @@ def _build_trace_link_response(link: TraceabilityLink) -> TraceabilityLinkRespon
 # ============================================================================
 
 @router.post("/", response_model=TraceabilityLinkResponse, status_code=status.HTTP_201_CREATED)
-async def create_traceability_link(
+def create_traceability_link(
     link_data: TraceabilityLinkCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -105,52 +113,16 @@ async def create_traceability_link(
 
 
 @router.post("/bulk", response_model=BulkTraceabilityResponse)
-async def create_bulk_traceability_links(
+def create_bulk_traceability_links(
     bulk_data: BulkTraceabilityCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create multiple traceability links at once"""
-    created = 0
-    skipped = 0
-    failed = 0
-    errors = []
-
-    for link_data in bulk_data.links:
-        try:
-            # Check if link already exists
-            existing = db.query(TraceabilityLink).filter(
-                and_(
-                    TraceabilityLink.source_id == link_data.source_id,
-                    TraceabilityLink.target_id == link_data.target_id,
-                    TraceabilityLink.link_type == link_data.link_type
-                )
-            ).first()
-
-            if existing:
-                if bulk_data.skip_duplicates:
-                    skipped += 1
-                    continue
-                else:
-                    errors.append(f"Duplicate link: source={link_data.source_id}, target={link_data.target_id}")
-                    failed += 1
-                    continue
-
-            # Create link
-            new_link = TraceabilityLink(
-                **link_data.model_dump(),
-                created_by_id=current_user.id
-            )
-            db.add(new_link)
-            created += 1
-
-        except Exception as e:
-            errors.append(f"Error creating link (source={link_data.source_id}, target={link_data.target_id}): {str(e)}")
-            failed += 1
-
-    # Commit all successful links
     try:
-        db.commit()
+        counts = import_traceability_links(
+            db, bulk_data.links, bulk_data.skip_duplicates, current_user.id
+        )
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -158,16 +130,11 @@ async def create_bulk_traceability_links(
             detail=f"Failed to commit bulk links: {str(e)}"
         )
 
-    return BulkTraceabilityResponse(
-        created=created,
-        skipped=skipped,
-        failed=failed,
-        errors=errors
-    )
+    return BulkTraceabilityResponse(**counts)
 
 
 @router.get("/", response_model=TraceabilityLinkListResponse)
-async def list_traceability_links(
+def list_traceability_links(
     link_type: Optional[TraceLinkType] = Query(None, description="Filter by link type"),
     source_id: Optional[int] = Query(None, description="Filter by source requirement ID"),
     target_id: Optional[int] = Query(None, description="Filter by target requirement ID"),
@@ -186,20 +153,8 @@ async def list_traceability_links(
         joinedload(TraceabilityLink.target)
     )
 
-    # Apply filters
-    if link_type:
-        query = query.filter(TraceabilityLink.link_type == link_type)
-    if source_id:
-        query = query.filter(TraceabilityLink.source_id == source_id)
-    if target_id:
-        query = query.filter(TraceabilityLink.target_id == target_id)
-    if requirement_id:
-        query = query.filter(
-            or_(
-                TraceabilityLink.source_id == requirement_id,
-                TraceabilityLink.target_id == requirement_id
-            )
-        )
+    # Apply filters (shared with /export/traceability-links)
+    query = query.filter(*traceability_link_filters(link_type, source_id, target_id, requirement_id))
 
     # Get total count
     total = query.count()
@@ -226,15 +181,18 @@ async def list_traceability_links(
 
 
 @router.get("/matrix/{requirement_id}", response_model=TraceabilityMatrix)
-async def get_traceability_matrix(
+def get_traceability_matrix(
     requirement_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get full traceability matrix for a requirement"""
+    """Get the direct traceability neighbours and test cases of a requirement"""
+    # Links point from the derived requirement (source) to its parent (target),
+    # so parents are the targets of the requirement's child_traces and children
+    # the sources of its parent_traces
     requirement = db.query(Requirement).options(
-        joinedload(Requirement.parent_traces),
-        joinedload(Requirement.child_traces),
+        joinedload(Requirement.child_traces).joinedload(TraceabilityLink.target),
+        joinedload(Requirement.parent_traces).joinedload(TraceabilityLink.source),
         joinedload(Requirement.test_cases)
     ).filter(Requirement.id == requirement_id).first()
 
@@ -246,7 +204,7 @@ async def get_traceability_matrix(
 
     # Build parent requirements list
     parent_reqs = []
-    for link in requirement.parent_traces:
+    for link in requirement.child_traces:
         if link.target:
             parent_reqs.append(RequirementTraceNode(
                 id=link.target.id,
@@ -254,13 +212,13 @@ async def get_traceability_matrix(
                 title=link.target.title,
                 type=link.target.type.value,
                 status=link.target.status.value,
-                has_test_cases=len(link.target.test_cases) > 0,
-                test_case_count=len(link.target.test_cases)
+                has_test_cases=link.target.test_case_count > 0,
+                test_case_count=link.target.test_case_count
             ))
 
     # Build child requirements list
     child_reqs = []
-    for link in requirement.child_traces:
+    for link in requirement.parent_traces:
         if link.source:
             child_reqs.append(RequirementTraceNode(
                 id=link.source.id,
@@ -268,8 +226,8 @@ async def get_traceability_matrix(
                 title=link.source.title,
                 type=link.source.type.value,
                 status=link.source.status.value,
-                has_test_cases=len(link.source.test_cases) > 0,
-                test_case_count=len(link.source.test_cases)
+                has_test_cases=link.source.test_case_count > 0,
+                test_case_count=link.source.test_case_count
             ))
 
     # Build test cases list
@@ -306,12 +264,46 @@ async def get_traceability_matrix(
     )
 
 
+@router.get("/matrix/{requirement_id}/subtree", response_model=VerificationMatrix)
+def get_verification_matrix(
+    requirement_id: int,
+    max_depth: int = Query(DEFAULT_MATRIX_DEPTH, ge=0, le=MAX_MATRIX_DEPTH, description="Levels of derived requirements to include"),
+    format: str = Query("json", pattern="^(json|csv|xlsx)$", description="json, or csv / xlsx as a download"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Verification matrix for a requirement and every requirement derived from it.
+
+    Lists each requirement of the subtree (e.g. an AHLR down to its
+    technical specifications) with its test cases. csv and xlsx stream one
+    row per requirement / test case pair for certification packages.
+    """
+    root = db.query(Requirement).filter(Requirement.id == requirement_id).first()
+    if not root:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Requirement with ID {requirement_id} not found"
+        )
+
+    if format == "json":
+        return build_matrix(db, root, max_depth)
+
+    media_type, extension = EXPORT_FORMATS[format]
+    rows = iter_matrix_rows(db, root.id, max_depth)
+    return StreamingResponse(
+        iter_export(format, MATRIX_COLUMNS, rows, sheet_name=root.requirement_id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{root.requirement_id}-matrix.{extension}"'}
+    )
+
+
 # ============================================================================
 # Graph Visualization Endpoints (must come before /{link_id} to avoid conflicts)
 # ============================================================================
 
 @router.get("/graph")
-async def get_traceability_graph(
+def get_traceability_graph(
     type: Optional[RequirementType] = Query(None, description="Filter by requirement type"),
     status: Optional[RequirementStatus] = Query(None, description="Filter by status"),
     include_tests: bool = Query(False, description="Include test cases as nodes"),
@@ -390,7 +382,7 @@ async def get_traceability_graph(
             "status": req.status.value,
             "priority": req.priority.value,
             "category": req.category,
-            "test_count": len(req.test_cases),
+            "test_count": req.test_case_count,
             "node_type": "requirement"
         })
 
@@ -462,7 +454,7 @@ async def get_traceability_graph(
 
 
 @router.get("/orphaned")
-async def get_orphaned_requirements(
+def get_orphaned_requirements(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -470,17 +462,13 @@ async def get_orphaned_requirements(
     Get requirements with no parent or child traceability links and no test cases.
     These are completely isolated requirements.
     """
-    all_requirements = db.query(Requirement).options(
-        joinedload(Requirement.parent_traces),
-        joinedload(Requirement.child_traces),
-        joinedload(Requirement.test_cases)
-    ).all()
+    all_requirements = db.query(Requirement).all()
 
     orphaned = []
     for req in all_requirements:
-        has_parents = len(req.parent_traces) > 0
-        has_children = len(req.child_traces) > 0
-        has_tests = len(req.test_cases) > 0
+        has_parents = req.parent_link_count > 0
+        has_children = req.child_link_count > 0
+        has_tests = req.test_case_count > 0
 
         if not has_parents and not has_children and not has_tests:
             orphaned.append({
@@ -502,7 +490,7 @@ async def get_orphaned_requirements(
 
 
 @router.get("/gaps")
-async def get_traceability_gaps(
+def get_traceability_gaps(
     gap_type: Optional[str] = Query(None, description="Filter by gap type: orphan, missing_parent, missing_test"),
     severity: Optional[str] = Query(None, description="Filter by severity: critical, high, medium, low"),
     db: Session = Depends(get_db),
@@ -512,11 +500,7 @@ async def get_traceability_gaps(
     Get comprehensive traceability gap analysis.
     Returns requirements missing parents, children, or test coverage.
     """
-    all_requirements = db.query(Requirement).options(
-        joinedload(Requirement.parent_traces),
-        joinedload(Requirement.child_traces),
-        joinedload(Requirement.test_cases)
-    ).all()
+    all_requirements = db.query(Requirement).all()
 
     gaps = {
         "missing_parents": [],
@@ -526,9 +510,9 @@ async def get_traceability_gaps(
     }
 
     for req in all_requirements:
-        has_parents = len(req.parent_traces) > 0
-        has_children = len(req.child_traces) > 0
-        has_tests = len(req.test_cases) > 0
+        has_parents = req.parent_link_count > 0
+        has_children = req.child_link_count > 0
+        has_tests = req.test_case_count > 0
 
         req_data = {
             "id": req.id,
@@ -584,7 +568,7 @@ async def get_traceability_gaps(
 
 
 @router.get("/report", response_model=TraceabilityReport)
-async def get_traceability_report(
+def get_traceability_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -596,33 +580,29 @@ async def get_traceability_report(
 
     # Requirements with parents
     requirements_with_parents = db.query(Requirement).filter(
-        Requirement.parent_traces.any()
+        Requirement.parent_link_count > 0
     ).count()
 
     # Requirements with children
     requirements_with_children = db.query(Requirement).filter(
-        Requirement.child_traces.any()
+        Requirement.child_link_count > 0
     ).count()
 
     # Requirements with tests
     requirements_with_tests = db.query(Requirement).filter(
-        Requirement.test_cases.any()
+        Requirement.test_case_count > 0
     ).count()
 
     # Orphaned requirements (no parents, no children, no tests)
-    all_requirements = db.query(Requirement).options(
-        joinedload(Requirement.parent_traces),
-        joinedload(Requirement.child_traces),
-        joinedload(Requirement.test_cases)
-    ).all()
+    all_requirements = db.query(Requirement).all()
 
     orphaned_requirements = 0
     traceability_gaps = []
 
     for req in all_requirements:
-        has_parents = len(req.parent_traces) > 0
-        has_children = len(req.child_traces) > 0
-        has_tests = len(req.test_cases) > 0
+        has_parents = req.parent_link_count > 0
+        has_children = req.child_link_count > 0
+        has_tests = req.test_case_count > 0
 
         # Orphan check
         if not has_parents and not has_children and not has_tests:
@@ -696,7 +676,7 @@ async def get_traceability_report(
 
 
 @router.get("/conflicts")
-async def get_requirement_conflicts(
+def get_requirement_conflicts(
     priority: Optional[str] = None,
     requirement_type: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -848,7 +828,7 @@ async def get_requirement_conflicts(
 
 
 @router.get("/{link_id}", response_model=TraceabilityLinkWithRequirements)
-async def get_traceability_link(
+def get_traceability_link(
     link_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -891,9 +871,9 @@ async def get_traceability_link(
             created_by_id=link.source.created_by_id,
             created_at=link.source.created_at,
             updated_at=link.source.updated_at,
-            test_case_count=0,
-            parent_trace_count=0,
-            child_trace_count=0
+            test_case_count=link.source.test_case_count,
+            parent_trace_count=link.source.parent_link_count,
+            child_trace_count=link.source.child_link_count
         ),
         target_requirement=RequirementResponse(
             id=link.target.id,
@@ -914,15 +894,15 @@ async def get_traceability_link(
             created_by_id=link.target.created_by_id,
             created_at=link.target.created_at,
             updated_at=link.target.updated_at,
-            test_case_count=0,
-            parent_trace_count=0,
-            child_trace_count=0
+            test_case_count=link.target.test_case_count,
+            parent_trace_count=link.target.parent_link_count,
+            child_trace_count=link.target.child_link_count
         )
     )
 
 
 @router.put("/{link_id}", response_model=TraceabilityLinkResponse)
-async def update_traceability_link(
+def update_traceability_link(
     link_id: int,
     link_data: TraceabilityLinkUpdate,
     db: Session = Depends(get_db),
@@ -955,7 +935,7 @@ async def update_traceability_link(
 
 
 @router.delete("/{link_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_traceability_link(
+def delete_traceability_link(
     link_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -6,6 +6,7 @@ from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserListResponse
 from app.core.security import get_password_hash
 from app.core.dependencies import get_current_active_user
+from app.core.cache import invalidate_user
 
 router = APIRouter()
 
@@ -21,7 +22,7 @@ def require_admin(current_user: User = Depends(get_current_active_user)):
 
 
 @router.get("/", response_model=UserListResponse)
-async def list_users(
+def list_users(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     role: Optional[str] = Query(None, description="Filter by role"),
@@ -67,7 +68,7 @@ async def list_users(
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(
+def get_user(
     user_id: int,
     db: Session = Depends(get_db),
     admin_user: User = Depends(require_admin)
@@ -83,7 +84,7 @@ async def get_user(
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(
+def create_user(
     user: UserCreate,
     db: Session = Depends(get_db),
     admin_user: User = Depends(require_admin)
@@ -124,7 +125,7 @@ async def create_user(
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-async def update_user(
+def update_user(
     user_id: int,
     user_update: UserUpdate,
     db: Session = Depends(get_db),
@@ -169,18 +170,21 @@ async def update_user(
     if "password" in update_data:
         update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
 
+    previous_username = db_user.username
+
     # Update fields
     for field, value in update_data.items():
         setattr(db_user, field, value)
 
     db.commit()
+    invalidate_user(previous_username)
     db.refresh(db_user)
 
     return db_user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
     admin_user: User = Depends(require_admin)
@@ -204,7 +208,9 @@ async def delete_user(
             detail="User not found"
         )
 
+    username = db_user.username
     db.delete(db_user)
     db.commit()
+    invalidate_user(username)
 
     return None
@@ -11,6 +11,11 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "postgresql://calidus:calidus123@db:5432/calidus"
     test_database_url: str = "postgresql://calidus:calidus123@db:5432/calidus_test"
+    db_pool_size: int = 20
+    db_max_overflow: int = 20
+
+    # Worker threads for synchronous route handlers (each may hold one DB connection)
+    db_threadpool_size: int = 40
 
     # Redis
     redis_url: str = "redis://redis:6379/0"
@@ -21,11 +26,44 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 60
     refresh_token_expire_days: int = 7
 
+    # Authenticated user resolution
+    user_cache_ttl_seconds: int = 30
+    # Embed id/is_active/role in access tokens so requests can skip the user lookup
+    jwt_user_claims: bool = False
+
     # CORS
     cors_origins: list = ["http://localhost:3000", "http://localhost:3001", "http://localhost:3002"]
 
+    # Worker processes for batch failure analysis (0 = in-process threads)
+    analysis_workers: int = 4
+    # Memory-mapped similar-failure index ("" keeps it in memory only)
+    similarity_index_dir: str = "data/similarity_index"
+    # Learned pattern weights reload interval (0 = always 1.0)
+    pattern_weights_ttl_seconds: int = 300
+
+    # Background jobs: worker poll interval when the queue is empty
+    job_poll_interval_seconds: float = 1.0
+    # A running job without a heartbeat for this long is requeued (its worker died)
+    job_stale_seconds: int = 600
+    # Executions (including requeues) before a job is marked failed
+    job_max_attempts: int = 3
+
+    # Coverage snapshots taken by the job worker (0 = manual only)
+    coverage_snapshot_interval_minutes: int = 60
+    # Every Nth snapshot stores the full heatmap; the rest store changed cells only
+    coverage_snapshot_keyframe_interval: int = 48
+
+    # Test execution history kept before purging (0 = keep forever)
+    test_execution_retention_days: int = 730
+
+    # Maximum age of statistics served with ?cached=true
+    stats_cache_ttl_seconds: int = 30
+
     # AI / Anthropic
     anthropic_api_key: str = ""
+    anthropic_base_url: str = ""  # e.g. a local stub model server for testing
+    # Upper bound on how long a cached chat context may be reused
+    chat_context_ttl_seconds: int = 300
 
     class Config:
         env_file = ".env"
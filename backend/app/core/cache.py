@@ -0,0 +1,149 @@
+"""
+In-process caching helpers.
+
+Small, thread-safe TTL cache used for hot per-request lookups, plus per-table
+version counters for invalidating derived data when rows change. Route
+handlers run in a worker threadpool, so every operation takes a lock.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded mapping whose entries expire `ttl` seconds after being set.
+
+    Oldest entries are evicted first once `maxsize` is reached.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or `default` if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key` for `ttl` seconds"""
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+# Column snapshots of authenticated users, keyed by token subject (username)
+user_cache = TTLCache(ttl=settings.user_cache_ttl_seconds, maxsize=4096)
+
+# Subjects whose account changed; signed-claims tokens for them are re-checked
+# against the database until any token issued before the change has expired.
+stale_subjects = TTLCache(ttl=settings.access_token_expire_minutes * 60, maxsize=4096)
+
+
+def invalidate_user(username: Optional[str]) -> None:
+    """Forget cached state for a user after it is updated or deleted"""
+    if not username:
+        return
+    user_cache.invalidate(username)
+    stale_subjects.set(username, True)
+
+
+# ============================================================================
+# Table version counters
+# ============================================================================
+
+_table_versions: Dict[str, int] = {}
+_versions_lock = threading.Lock()
+
+
+def bump_tables(*table_names: str) -> None:
+    """Mark tables as changed; call after writes that bypass the ORM session"""
+    with _versions_lock:
+        for name in table_names:
+            _table_versions[name] = _table_versions.get(name, 0) + 1
+
+
+def table_versions(*table_names: str) -> Tuple[int, ...]:
+    """Current version of each table, usable as part of a cache key"""
+    with _versions_lock:
+        return tuple(_table_versions.get(name, 0) for name in table_names)
+
+
+def _changed_tables(session: Session) -> set:
+    return session.info.setdefault("changed_tables", set())
+
+
+def _mapped_tables(instances: Iterable[Any]) -> set:
+    tables = set()
+    for instance in instances:
+        table = getattr(instance, "__table__", None)
+        if table is not None:
+            tables.add(table.name)
+    return tables
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_tables(session, flush_context):
+    _changed_tables(session).update(
+        _mapped_tables(session.new) | _mapped_tables(session.dirty) | _mapped_tables(session.deleted)
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_tables(orm_execute_state):
+    # query.update()/delete() and ORM insert()/update()/delete() statements
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _changed_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session):
+    changed = session.info.pop("changed_tables", None)
+    if changed:
+        bump_tables(*changed)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_tables(session, previous_transaction):
+    session.info.pop("changed_tables", None)
@@ -1,18 +1,48 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.session import make_transient_to_detached
 from app.database import get_db
+from app.config import get_settings
+from app.core.cache import user_cache, stale_subjects
 from app.core.security import decode_access_token
 from app.models.user import User
 
+settings = get_settings()
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Columns kept in the user cache (everything UserResponse needs)
+_USER_SNAPSHOT_COLUMNS = ("id", "username", "email", "hashed_password", "is_active", "role",
+                          "created_at", "updated_at")
+
+
+def _attach_user(db: Session, fields: dict) -> User:
+    """
+    Attach a User built from known column values to the session without a query.
+
+    The instance behaves as if it had been loaded: relationships and any
+    column not in `fields` lazy-load on first access.
+    """
+    user = User(**fields)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
-    """Get the current authenticated user"""
+    """
+    Get the current authenticated user.
+
+    Declared sync so the user lookup runs in the worker threadpool rather
+    than blocking the event loop. Resolution order:
+
+    1. Signed claims (`jwt_user_claims`) - no query at all.
+    2. Short-TTL snapshot cache keyed by token subject.
+    3. Database lookup, which refreshes the cache.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -27,14 +57,27 @@ async def get_current_user(
     if username is None:
         raise credentials_exception
 
+    if settings.jwt_user_claims and "uid" in payload and username not in stale_subjects:
+        return _attach_user(db, {
+            "id": payload["uid"],
+            "username": username,
+            "is_active": payload.get("active", False),
+            "role": payload.get("role"),
+        })
+
+    snapshot = user_cache.get(username)
+    if snapshot is not None:
+        return _attach_user(db, snapshot)
+
     user = db.query(User).filter(User.username == username).first()
     if user is None:
         raise credentials_exception
 
+    user_cache.set(username, {column: getattr(user, column) for column in _USER_SNAPSHOT_COLUMNS})
     return user
 
 
-async def get_current_active_user(
+def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
     """Ensure the current user is active"""
@@ -38,3 +38,16 @@ def decode_access_token(token: str) -> Optional[dict]:
         return payload
     except JWTError:
         return None
+
+
+def user_token_claims(user) -> dict:
+    """
+    Build the JWT claims for a user.
+
+    With `jwt_user_claims` enabled the token also carries the fields needed
+    for authorization, so `get_current_user` can skip the database.
+    """
+    claims = {"sub": user.username}
+    if settings.jwt_user_claims:
+        claims.update({"uid": user.id, "active": bool(user.is_active), "role": user.role})
+    return claims
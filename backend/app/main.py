@@ -1,7 +1,9 @@
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
-from app.api import auth, requirements, test_cases, traceability, users, compliance, risk, test_suggestions, impact_analysis, coverage, chat
+from app.services.batch_analysis import shutdown_analysis_executor
+from app.api import auth, requirements, test_cases, traceability, users, compliance, risk, test_suggestions, impact_analysis, coverage, chat, jobs, exports, reqif
 
 settings = get_settings()
 
@@ -18,9 +20,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Content-Disposition"],
 )
 
 
+@app.on_event("startup")
+async def configure_threadpool():
+    """
+    Bound the worker pool that runs synchronous route handlers.
+
+    DB-bound handlers are plain `def` functions, so FastAPI executes them in
+    AnyIO's default thread limiter instead of on the event loop. Sizing it
+    against the SQLAlchemy pool keeps threads from queueing on connections.
+    """
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = settings.db_threadpool_size
+
+
+@app.on_event("shutdown")
+def stop_analysis_workers():
+    """Stop the batch analysis process pool"""
+    shutdown_analysis_executor()
+
+
 @app.get("/")
 async def root():
     return {
@@ -39,11 +61,15 @@ async def health_check():
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(requirements.router, prefix="/api")
-app.include_router(test_cases.router, prefix="/api")
+# Before test_cases so static paths (/test-cases/analysis-stats) are not taken as /{test_case_id}
 app.include_router(test_suggestions.router, prefix="/api")
+app.include_router(test_cases.router, prefix="/api")
 app.include_router(traceability.router, prefix="/api")
 app.include_router(compliance.router)
 app.include_router(risk.router)
 app.include_router(impact_analysis.router)
 app.include_router(coverage.router)
+app.include_router(jobs.router)
+app.include_router(exports.router)
+app.include_router(reqif.router)
 app.include_router(chat.router, prefix="/api", tags=["chat"])
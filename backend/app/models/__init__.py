@@ -15,11 +15,13 @@ from app.models.test_case import (
     TestCaseStatus,
     TestCasePriority
 )
+from app.models.test_execution import TestExecution
 from app.models.traceability import (
     TraceabilityLink,
     TraceLinkType
 )
 from app.models.test_suggestion import (
+    FailureAnalysis,
     TestCaseSuggestion,
     SuggestionFeedback,
     FailurePattern
@@ -31,6 +33,10 @@ from app.models.impact_analysis import (
     ChangeRequestStatus
 )
 from app.models.coverage import CoverageSnapshot
+from app.models.coverage_rollup import CoverageRollup, RollupResolution
+from app.models.job import Job, JobStatus
+# Registers the session events maintaining the requirement counter columns
+from app.models import counters  # noqa: F401
 
 __all__ = [
     "User",
@@ -42,8 +48,10 @@ __all__ = [
     "TestCase",
     "TestCaseStatus",
     "TestCasePriority",
+    "TestExecution",
     "TraceabilityLink",
     "TraceLinkType",
+    "FailureAnalysis",
     "TestCaseSuggestion",
     "SuggestionFeedback",
     "FailurePattern",
@@ -52,4 +60,8 @@ __all__ = [
     "RiskLevel",
     "ChangeRequestStatus",
     "CoverageSnapshot",
+    "CoverageRollup",
+    "RollupResolution",
+    "Job",
+    "JobStatus",
 ]
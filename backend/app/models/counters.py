@@ -0,0 +1,150 @@
+"""
+Requirement Counters
+Keeps the denormalized test case / trace link counts on requirements in step
+with ORM writes to test_cases and traceability_links.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import bindparam, event, update
+from sqlalchemy.orm import Session, attributes
+from sqlalchemy.orm.util import identity_key
+
+from app.models.requirement import Requirement
+from app.models.test_case import TestCase, TestCaseStatus
+from app.models.traceability import TraceabilityLink
+
+# Counter column for each counted test case status
+STATUS_COUNTERS = {
+    TestCaseStatus.PASSED: "passed_test_count",
+    TestCaseStatus.FAILED: "failed_test_count",
+    TestCaseStatus.PENDING: "pending_test_count",
+}
+
+COUNTER_COLUMNS = (
+    "test_case_count",
+    "passed_test_count",
+    "failed_test_count",
+    "pending_test_count",
+    "parent_link_count",
+    "child_link_count",
+)
+
+# Attributes each counted model contributes through
+_COUNTED_ATTRIBUTES = {
+    TestCase: ("requirement_id", "status"),
+    TraceabilityLink: ("source_id", "target_id"),
+}
+
+# {requirement id: {counter column: delta}}
+CounterDeltas = Dict[int, Dict[str, int]]
+
+
+def _contributions(model, values: Tuple) -> Iterable[Tuple[Optional[int], str]]:
+    if model is TestCase:
+        requirement_id, status = values
+        yield requirement_id, "test_case_count"
+        if status in STATUS_COUNTERS:
+            yield requirement_id, STATUS_COUNTERS[status]
+    else:
+        source_id, target_id = values
+        # parent_traces are the links targeting a requirement
+        yield target_id, "parent_link_count"
+        yield source_id, "child_link_count"
+
+
+def add_contribution(deltas: CounterDeltas, model, values: Tuple, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one row's contribution to the counters"""
+    for requirement_id, column in _contributions(model, values):
+        if requirement_id is not None:
+            deltas[requirement_id][column] += sign
+
+
+def apply_counter_deltas(session: Session, deltas: CounterDeltas) -> None:
+    """
+    Apply counter changes as one executemany UPDATE within the session's transaction.
+
+    For writes that bypass the unit of work (bulk UPDATEs); ORM flushes
+    apply theirs automatically. Loaded requirements have their counters
+    expired so they are re-read.
+    """
+    params = [
+        {"requirement_pk": requirement_id, **{f"delta_{c}": changes.get(c, 0) for c in COUNTER_COLUMNS}}
+        for requirement_id, changes in deltas.items()
+        if any(changes.values())
+    ]
+    if not params:
+        return
+
+    table = Requirement.__table__
+    session.execute(
+        update(table)
+        .where(table.c.id == bindparam("requirement_pk"))
+        .values({c: table.c[c] + bindparam(f"delta_{c}") for c in COUNTER_COLUMNS}),
+        params
+    )
+    for row in params:
+        requirement = session.identity_map.get(identity_key(Requirement, row["requirement_pk"]))
+        if requirement is not None:
+            session.expire(requirement, list(COUNTER_COLUMNS))
+
+
+def _values(obj, attrs: Tuple[str, ...], committed: bool, passive=attributes.PASSIVE_OFF) -> Tuple:
+    values = []
+    for attr in attrs:
+        history = attributes.get_history(obj, attr, passive=passive)
+        if committed:
+            current = history.deleted or history.unchanged
+        else:
+            current = history.added or history.unchanged
+        values.append(current[0] if current else None)
+    return tuple(values)
+
+
+def _counted(objects) -> Iterable:
+    return (obj for obj in objects if type(obj) in _COUNTED_ATTRIBUTES)
+
+
+# Old values are needed to move a row between counters, so setting a counted
+# attribute loads its previous value first
+for _model, _attrs in _COUNTED_ATTRIBUTES.items():
+    for _attr in _attrs:
+        event.listen(getattr(_model, _attr), "set", lambda *args: None, active_history=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _load_deleted_values(session, flush_context, instances):
+    # Deleted rows are gone by after_flush; load what they counted towards now
+    with session.no_autoflush:
+        for obj in _counted(session.deleted):
+            for attr in _COUNTED_ATTRIBUTES[type(obj)]:
+                getattr(obj, attr)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_counter_deltas(session, flush_context):
+    deltas: CounterDeltas = defaultdict(lambda: defaultdict(int))
+    for obj in _counted(session.new):
+        model = type(obj)
+        add_contribution(deltas, model, tuple(getattr(obj, a) for a in _COUNTED_ATTRIBUTES[model]), 1)
+    for obj in _counted(session.dirty):
+        model = type(obj)
+        old = _values(obj, _COUNTED_ATTRIBUTES[model], committed=True)
+        new = _values(obj, _COUNTED_ATTRIBUTES[model], committed=False)
+        if old != new:
+            add_contribution(deltas, model, old, -1)
+            add_contribution(deltas, model, new, 1)
+    for obj in _counted(session.deleted):
+        model = type(obj)
+        # Never load here: the rows no longer exist
+        old = _values(obj, _COUNTED_ATTRIBUTES[model], committed=True, passive=attributes.PASSIVE_NO_INITIALIZE)
+        add_contribution(deltas, model, old, -1)
+    if deltas:
+        session.info["counter_deltas"] = deltas
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _apply_counter_deltas(session, flush_context):
+    deltas = session.info.pop("counter_deltas", None)
+    if deltas:
+        apply_counter_deltas(session, deltas)
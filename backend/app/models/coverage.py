@@ -36,15 +36,20 @@ class CoverageSnapshot(Base):
     medium_coverage = Column(JSON)
     low_coverage = Column(JSON)
 
-    # Heatmap data (type × priority matrix)
+    # Heatmap data (type × priority matrix), stored in full on keyframes only
     heatmap_data = Column(JSON)  # {"AHLR": {"Critical": {...}, "High": {...}}, ...}
 
+    # Delta snapshots: cells changed since the parent snapshot, replayed onto the keyframe
+    base_snapshot_id = Column(Integer, ForeignKey("coverage_snapshots.id", ondelete="CASCADE"), index=True)
+    parent_snapshot_id = Column(Integer, ForeignKey("coverage_snapshots.id", ondelete="CASCADE"))
+    heatmap_delta = Column(JSON)  # {"AHLR": {"Critical": {...}}} - changed cells only
+
     # Gap analysis
     total_gaps = Column(Integer, nullable=False, default=0)
     critical_gaps = Column(Integer, nullable=False, default=0)
 
     # Metadata
-    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_by_id = Column(Integer, ForeignKey("users.id"))  # None for scheduled snapshots
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
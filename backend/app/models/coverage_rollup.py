@@ -0,0 +1,52 @@
+"""
+Coverage Rollup Model
+Daily, weekly and monthly aggregates of coverage snapshots for long-range trends.
+"""
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class RollupResolution(str, enum.Enum):
+    """Rollup period length"""
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
+
+class CoverageRollup(Base):
+    """
+    Coverage statistics over one period.
+    Maintained as snapshots are created; one row per resolution and period.
+    """
+    __tablename__ = "coverage_rollups"
+    __table_args__ = (
+        # Also the index behind range queries: WHERE resolution = ? AND period_start BETWEEN ...
+        UniqueConstraint('resolution', 'period_start', name='unique_coverage_rollup'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    resolution = Column(String(10), nullable=False)
+    period_start = Column(DateTime, nullable=False)  # UTC, naive
+
+    # Overall coverage: the mean is coverage_sum / snapshot_count
+    snapshot_count = Column(Integer, nullable=False, default=0)
+    coverage_min = Column(Float, nullable=False)
+    coverage_max = Column(Float, nullable=False)
+    coverage_sum = Column(Float, nullable=False, default=0.0)
+
+    # Counts from the latest snapshot in the period
+    last_snapshot_date = Column(DateTime, nullable=False)
+    total_requirements = Column(Integer, nullable=False, default=0)
+    covered_requirements = Column(Integer, nullable=False, default=0)
+    total_gaps = Column(Integer, nullable=False, default=0)
+    critical_gaps = Column(Integer, nullable=False, default=0)
+
+    # {"by_type": {"Aircraft_High_Level_Requirement": {"min": .., "max": .., "sum": ..}}, "by_priority": {...}}
+    breakdown = Column(JSON, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<CoverageRollup {self.resolution} {self.period_start}: {self.snapshot_count} snapshots>"
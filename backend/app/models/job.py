@@ -0,0 +1,66 @@
+"""
+Background Job Model
+Queue table for long-running work executed by the job worker process.
+"""
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Enum, JSON, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    """Job lifecycle status"""
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class Job(Base):
+    """
+    Background job.
+    Submitted by the API or the worker's scheduler, claimed and executed
+    by a worker (python -m app.worker).
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False, index=True)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED, index=True)
+
+    # Input and output
+    params = Column(JSON, nullable=False)
+    result = Column(JSON)
+    error = Column(Text)
+
+    # Progress reported by the running handler (0.0 - 1.0)
+    progress = Column(Float, default=0.0)
+    progress_message = Column(String(255))
+
+    # Execution bookkeeping
+    worker_id = Column(String(100))
+    attempts = Column(Integer, default=0, nullable=False)
+
+    # Metadata
+    created_by_id = Column(Integer, ForeignKey("users.id"), index=True)  # None for scheduled jobs
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+
+    # Relationships
+    created_by = relationship("User")
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, type={self.job_type}, status={self.status})>"
+
+
+# At most one queued or running scheduled job (no submitting user) per type,
+# so workers checking the schedule at the same time queue it once
+_scheduled_active = Job.created_by_id.is_(None) & Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING])
+Index(
+    "ix_jobs_scheduled_active", Job.job_type, unique=True,
+    postgresql_where=_scheduled_active,
+    sqlite_where=_scheduled_active,
+)
@@ -2,11 +2,15 @@
 Requirement Model
 Represents aerospace requirements with full traceability support.
 """
-from sqlalchemy import Column, Integer, String, Text, Enum, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Enum, DateTime, ForeignKey, Index, case, event, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.sql.elements import Grouping
 from app.database import Base
+from typing import Any, Mapping
 import enum
+import hashlib
+import json
 
 
 class RequirementType(str, enum.Enum):
@@ -62,7 +66,7 @@ class Requirement(Base):
     rationale = Column(Text)
     
     # Priority and status
-    priority = Column(Enum(RequirementPriority), default=RequirementPriority.MEDIUM)
+    priority = Column(Enum(RequirementPriority), default=RequirementPriority.MEDIUM, index=True)
     status = Column(Enum(RequirementStatus), default=RequirementStatus.DRAFT, index=True)
     
     # Regulatory source linkage
@@ -85,6 +89,20 @@ class Requirement(Base):
     
     # Issues tracking
     issues = Column(Text)  # JSON string for storing issue list
+
+    # Denormalized counts of test cases and trace links, maintained on flush
+    # (app.models.counters) and reconciled by the requirement_counter_reconcile job
+    test_case_count = Column(Integer, nullable=False, default=0, server_default="0")
+    passed_test_count = Column(Integer, nullable=False, default=0, server_default="0")
+    failed_test_count = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_test_count = Column(Integer, nullable=False, default=0, server_default="0")
+    parent_link_count = Column(Integer, nullable=False, default=0, server_default="0")
+    child_link_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # sha256 of the CONTENT_FIELDS, kept current on every ORM write (unset on
+    # rows not written since it was added); bulk upserts (sync, ReqIF
+    # import) skip rows whose hash is unchanged
+    content_hash = Column(String(64))
     
     # Relationships
     created_by = relationship("User", back_populates="requirements")
@@ -110,3 +128,67 @@ class Requirement(Base):
 
     def __repr__(self):
         return f"<Requirement {self.requirement_id}: {self.title}>"
+
+
+# Sort key for gap lists (Critical first, unset priority last). Written as
+# literals so queries repeat the indexed expression verbatim.
+priority_rank = case(
+    {
+        literal_column(f"'{priority.name}'"): literal_column(str(rank), Integer)
+        for rank, priority in enumerate(RequirementPriority)
+    },
+    value=Requirement.priority,
+    else_=literal_column(str(len(RequirementPriority)), Integer),
+)
+
+# Gap queries walk this in (priority_rank, id) order; only uncovered requirements are indexed.
+# PostgreSQL needs an expression index column in its own parentheses.
+Index(
+    "ix_requirements_gap_order", Grouping(priority_rank), Requirement.id,
+    postgresql_where=Requirement.test_case_count == 0,
+    sqlite_where=Requirement.test_case_count == 0,
+)
+
+# Covers the type / status / priority groupings of /requirements/stats
+Index("ix_requirements_type_status_priority", Requirement.type, Requirement.status, Requirement.priority, Requirement.id)
+
+
+# Columns covered by Requirement.content_hash
+CONTENT_FIELDS = (
+    "type",
+    "category",
+    "title",
+    "description",
+    "rationale",
+    "priority",
+    "status",
+    "verification_method",
+    "compliance_status",
+    "regulatory_document",
+    "regulatory_section",
+    "regulatory_title",
+    "regulatory_page",
+    "file_path",
+    "owner",
+    "version",
+)
+
+
+def _hashed_value(field: str, value: Any) -> Any:
+    if value is None:
+        # Unset columns hash as the value the INSERT will store
+        default = Requirement.__table__.c[field].default
+        value = default.arg if default is not None and default.is_scalar else None
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def requirement_content_hash(values: Mapping[str, Any]) -> str:
+    """Content hash of a requirement given as field -> value (missing fields count as unset)"""
+    canonical = [_hashed_value(field, values.get(field)) for field in CONTENT_FIELDS]
+    return hashlib.sha256(json.dumps(canonical, ensure_ascii=False, separators=(",", ":")).encode()).hexdigest()
+
+
+@event.listens_for(Requirement, "before_insert")
+@event.listens_for(Requirement, "before_update")
+def _set_content_hash(mapper, connection, target):
+    target.content_hash = requirement_content_hash({field: getattr(target, field) for field in CONTENT_FIELDS})
@@ -72,6 +72,7 @@ class TestCase(Base):
     requirement = relationship("Requirement", back_populates="test_cases")
     created_by = relationship("User", back_populates="test_cases")
     suggestions = relationship("TestCaseSuggestion", back_populates="test_case", cascade="all, delete-orphan")
+    analyses = relationship("FailureAnalysis", back_populates="test_case", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<TestCase {self.test_case_id}: {self.title}>"
@@ -0,0 +1,35 @@
+"""
+Test Execution Model
+Append-only history of test case executions.
+"""
+from sqlalchemy import Column, Integer, String, Text, Enum, DateTime, ForeignKey, Index
+from app.database import Base
+from app.models.test_case import TestCaseStatus
+
+
+class TestExecution(Base):
+    """
+    One recorded execution of a test case.
+    TestCase keeps the latest result; every result is also appended here.
+    On PostgreSQL the table is range-partitioned by month on executed_at
+    (see the migration), so retention drops whole partitions.
+    """
+    __tablename__ = "test_executions"
+    __table_args__ = (
+        Index("ix_test_executions_test_case_executed", "test_case_id", "executed_at"),
+        Index("ix_test_executions_requirement_executed", "requirement_id", "executed_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False)
+    # Copied from the test case so requirement history needs no join
+    requirement_id = Column(Integer, ForeignKey("requirements.id", ondelete="CASCADE"), nullable=False)
+
+    status = Column(Enum(TestCaseStatus), nullable=False)
+    actual_results = Column(Text)
+    execution_duration = Column(Integer)  # Duration in seconds
+    executed_by = Column(String(100))
+    executed_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<TestExecution {self.test_case_id} {self.status} at {self.executed_at}>"
@@ -1,18 +1,46 @@
 """
 Database models for test failure analysis and suggestions
 """
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, TIMESTAMP, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, TIMESTAMP, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 
+class FailureAnalysis(Base):
+    """Stored reasoning agent report, deduplicated by normalized log fingerprint"""
+    __tablename__ = "failure_analyses"
+    __table_args__ = (
+        # One report per test case, log content and knowledge base revision
+        UniqueConstraint('test_case_id', 'log_fingerprint', 'knowledge_version', name='unique_failure_analysis'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False, index=True)
+    log_fingerprint = Column(String(64), nullable=False)  # sha256 of the normalized log
+    knowledge_version = Column(String(16), nullable=False)
+
+    # Report
+    failure_type = Column(String(50), index=True)
+    confidence_score = Column(Float)
+    report = Column(JSON, nullable=False)  # SuggestionReport.to_dict()
+
+    created_by_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), index=True)
+
+    # Relationships
+    test_case = relationship("TestCase", back_populates="analyses")
+    suggestions = relationship("TestCaseSuggestion", back_populates="analysis")
+    created_by = relationship("User")
+
+
 class TestCaseSuggestion(Base):
     """Stores AI-generated suggestions for test case failures"""
     __tablename__ = "test_case_suggestions"
 
     id = Column(Integer, primary_key=True, index=True)
-    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False, index=True)
+    analysis_id = Column(Integer, ForeignKey("failure_analyses.id", ondelete="CASCADE"), index=True)
     suggestion_type = Column(String(50), nullable=False)  # 'root_cause', 'fix_suggestion', 'investigation'
 
     # Suggestion content
@@ -39,6 +67,7 @@ class TestCaseSuggestion(Base):
 
     # Relationships
     test_case = relationship("TestCase", back_populates="suggestions")
+    analysis = relationship("FailureAnalysis", back_populates="suggestions")
     resolved_by = relationship("User")
 
 
@@ -47,7 +76,7 @@ class SuggestionFeedback(Base):
     __tablename__ = "suggestion_feedback"
 
     id = Column(Integer, primary_key=True, index=True)
-    suggestion_id = Column(Integer, ForeignKey("test_case_suggestions.id", ondelete="CASCADE"), nullable=False)
+    suggestion_id = Column(Integer, ForeignKey("test_case_suggestions.id", ondelete="CASCADE"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Feedback
@@ -66,6 +95,7 @@ class FailurePattern(Base):
     __tablename__ = "failure_patterns"
 
     id = Column(Integer, primary_key=True, index=True)
+    rule_id = Column(String(50), unique=True, index=True)  # Knowledge base pattern rule_id
     pattern_name = Column(String(200), nullable=False)
     category = Column(String(100))
 
@@ -0,0 +1,90 @@
+"""
+Background Job Schemas
+Pydantic schemas for job submission, status and the parameters of each job type.
+"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from app.models.job import JobStatus
+from app.schemas.traceability import TraceabilityLinkCreate
+
+# Upper bounds for work submitted as one job (the inline endpoints allow far less)
+MAX_IMPORT_LINKS = 50000
+MAX_ANALYSIS_ITEMS = 10000
+
+
+# ============================================================================
+# Job type parameters
+# ============================================================================
+
+class CoverageSnapshotJobParams(BaseModel):
+    """coverage_snapshot / coverage_rollup_rebuild / requirement_counter_reconcile / pattern_confidence_learning: no parameters"""
+    pass
+
+
+class TestExecutionMaintenanceJobParams(BaseModel):
+    """test_execution_maintenance: history retention override"""
+    retention_days: Optional[int] = Field(
+        None, ge=0, description="Keep this many days of history (default: TEST_EXECUTION_RETENTION_DAYS)"
+    )
+
+
+class TraceabilityImportJobParams(BaseModel):
+    """traceability_import: links to create"""
+    links: List[TraceabilityLinkCreate] = Field(..., min_length=1, max_length=MAX_IMPORT_LINKS)
+    skip_duplicates: bool = Field(default=True, description="Skip duplicate links instead of failing")
+
+
+class FailureAnalysisJobItem(BaseModel):
+    """One failed test case and its execution log"""
+    test_case_id: int
+    execution_log: str
+
+
+class FailureAnalysisJobParams(BaseModel):
+    """failure_analysis: failed test cases to analyze"""
+    items: List[FailureAnalysisJobItem] = Field(..., min_length=1, max_length=MAX_ANALYSIS_ITEMS)
+
+
+# ============================================================================
+# Request / Response Schemas
+# ============================================================================
+
+class JobSubmitRequest(BaseModel):
+    """Request to queue a background job"""
+    job_type: str = Field(..., description="Job type, see GET /api/jobs/types")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Parameters for the job type")
+
+
+class JobResponse(BaseModel):
+    """Job status (the result is fetched separately)"""
+    id: int
+    job_type: str
+    status: JobStatus
+    progress: float = 0.0
+    progress_message: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_by_id: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class JobListResponse(BaseModel):
+    """Paginated list of jobs"""
+    jobs: List[JobResponse]
+    total: int
+    page: int
+    page_size: int
+
+
+class JobResultResponse(BaseModel):
+    """Result of a finished job"""
+    id: int
+    job_type: str
+    status: JobStatus
+    result: Optional[Dict[str, Any]] = None
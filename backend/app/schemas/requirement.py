@@ -138,3 +138,37 @@ class RequirementStats(BaseModel):
     total_with_tests: int = Field(default=0, description="Requirements with test cases")
     total_with_traces: int = Field(default=0, description="Requirements with traceability links")
     coverage_percentage: float = Field(default=0.0, description="Percentage of requirements with tests")
+
+
+# ============================================================================
+# Bulk Exchange Schemas
+# ============================================================================
+
+class UpsertCounts(BaseModel):
+    """Outcome of a bulk upsert keyed on the business identifier"""
+    inserted: int = Field(default=0, description="New rows")
+    updated: int = Field(default=0, description="Existing rows whose content changed")
+    unchanged: int = Field(default=0, description="Existing rows left untouched")
+
+
+class RequirementSyncItem(RequirementBase):
+    """One requirement of a sync; the stored requirement's content is replaced by these fields"""
+    rationale: Optional[str] = Field(None, description="Why the requirement exists")
+    regulatory_title: Optional[str] = Field(None, max_length=200, description="Title of the regulatory section")
+    compliance_status: Optional[str] = Field(None, max_length=20, description="Compliance status")
+    owner: Optional[str] = Field(None, max_length=100, description="Responsible owner")
+
+
+class RequirementSyncRequest(BaseModel):
+    """Full or partial set of requirements from an upstream system"""
+    requirements: List[RequirementSyncItem] = Field(..., description="Requirements keyed on requirement_id; later duplicates win")
+
+
+class ReqIFImportResponse(BaseModel):
+    """Outcome of a ReqIF import"""
+    requirements: UpsertCounts = Field(default_factory=UpsertCounts)
+    test_cases: UpsertCounts = Field(default_factory=UpsertCounts)
+    links_created: int = Field(default=0, description="Traceability links created")
+    links_unchanged: int = Field(default=0, description="Relations whose link already existed")
+    failed: int = Field(default=0, description="Spec objects and relations that could not be imported")
+    errors: List[str] = Field(default_factory=list, description="First error messages")
@@ -118,6 +118,53 @@ class TestCaseExecutionUpdate(BaseModel):
     execution_notes: Optional[str] = Field(None, description="Additional notes about execution")
 
 
+class TestResultRecord(BaseModel):
+    """One execution result in a bulk results import (a JSONL line or a JUnit testcase)"""
+    test_case_id: str = Field(..., min_length=1, description="Test case identifier (e.g., TC-001)")
+    status: TestCaseStatus = Field(..., description="Execution status")
+    actual_results: Optional[str] = Field(None, description="Actual test results")
+    execution_duration: Optional[int] = Field(None, ge=0, description="Duration in seconds")
+    executed_by: Optional[str] = Field(None, max_length=100, description="Username who executed the test")
+
+
+class TestResultImportResponse(BaseModel):
+    """Outcome of a bulk results import"""
+    updated: int = Field(..., description="Test cases updated")
+    failed: int = Field(..., description="Results whose test case was not found")
+    errors: List[str] = Field(default_factory=list, description="First error messages")
+
+
+# ============================================================================
+# Execution History Schemas
+# ============================================================================
+
+class TestExecutionResponse(BaseModel):
+    """One recorded execution from the history"""
+    id: int
+    test_case_id: int
+    requirement_id: int
+    status: TestCaseStatus
+    actual_results: Optional[str] = None
+    execution_duration: Optional[int] = None
+    executed_by: Optional[str] = None
+    executed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class FlakyTestResponse(BaseModel):
+    """A test case whose result keeps flipping between passed and failed"""
+    test_case_id: int
+    test_case_identifier: str
+    title: str
+    requirement_id: int
+    executions: int = Field(..., description="Passed / failed executions in the window")
+    failures: int
+    flips: int = Field(..., description="Consecutive executions with different results")
+    flip_rate: float = Field(..., description="flips / (executions - 1)")
+
+
 # ============================================================================
 # Query/Filter Schemas
 # ============================================================================
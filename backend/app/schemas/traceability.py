@@ -131,6 +131,40 @@ class TraceabilityMatrix(BaseModel):
     coverage_status: str = Field(default="unknown", description="none, partial, full")
 
 
+class MatrixTestCase(BaseModel):
+    """A test case column of the verification matrix"""
+    id: int
+    test_case_id: str
+    title: str
+    status: Optional[str] = None
+
+
+class MatrixRequirement(BaseModel):
+    """A requirement row of the verification matrix"""
+    id: int
+    requirement_id: str
+    title: str
+    type: str
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    depth: int = Field(..., description="Levels below the matrix root (0 for the root)")
+    test_cases: List[MatrixTestCase] = Field(default_factory=list)
+
+
+class VerificationMatrix(BaseModel):
+    """Requirements x test cases for a requirement and the requirements derived from it"""
+    requirement_id: int
+    requirement_identifier: str
+    title: str
+    max_depth: int
+    levels: int
+    total_requirements: int
+    total_test_cases: int
+    verified_requirements: int = Field(..., description="Requirements whose tests all passed")
+    untested_requirements: int
+    requirements: List[MatrixRequirement] = Field(default_factory=list)
+
+
 class TraceabilityGap(BaseModel):
     """Identifies gaps in traceability"""
     requirement_id: int
@@ -0,0 +1,45 @@
+"""
+Build Similarity Index
+Backfills the similar-failure index from failed test cases' recorded actual results.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from app.database import SessionLocal
+from app.models import TestCase, TestCaseStatus
+from app.services.similarity_index import get_similarity_index
+
+
+def build_similarity_index():
+    """Index every failed test case that has actual results (already indexed failures are skipped)"""
+    print("=" * 70)
+    print("CALIDUS Similarity Index Builder")
+    print("=" * 70)
+
+    index = get_similarity_index()
+    print(f"Index: {index.directory or 'in memory'} ({len(index):,} entries)")
+
+    db = SessionLocal()
+
+    try:
+        rows = db.query(TestCase.id, TestCase.test_case_id, TestCase.actual_results).filter(
+            TestCase.status == TestCaseStatus.FAILED,
+            TestCase.actual_results.isnot(None)
+        ).order_by(TestCase.id).yield_per(1000)
+
+        added = 0
+        for test_case_pk, test_case_id, actual_results in rows:
+            if index.add(actual_results, test_case_id=test_case_pk, test_case_name=test_case_id):
+                added += 1
+
+        print(f"✓ Added {added:,} failures ({len(index):,} entries total)")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    build_similarity_index()
@@ -0,0 +1,62 @@
+"""
+Import Test Results
+Records a CI run's execution results (JUnit XML or JSONL, optionally gzipped) on their test cases.
+
+Usage:
+    python app/scripts/import_test_results.py results.xml
+    python app/scripts/import_test_results.py results.jsonl.gz --executed-by ci-nightly
+"""
+import argparse
+import gzip
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from app.database import SessionLocal
+from app.services.test_results_import import RESULT_FORMATS, detect_format, import_test_results, iter_results
+
+
+def import_results_file(path: Path, result_format: str, executed_by: str):
+    """Stream one results file into the database"""
+    print("=" * 70)
+    print("CALIDUS Test Result Import")
+    print("=" * 70)
+
+    db = SessionLocal()
+    opener = gzip.open if path.suffix.lower() == ".gz" else open
+
+    try:
+        with opener(path, "rb") as fileobj:
+            result = import_test_results(
+                db,
+                iter_results(fileobj, result_format),
+                executed_by,
+                on_progress=lambda done: print(f"  ... {done} results applied")
+            )
+        print(f"✓ Updated {result['updated']} test cases")
+        if result["failed"]:
+            print(f"✗ {result['failed']} results for unknown test cases")
+            for error in result["errors"]:
+                print(f"  - {error}")
+
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import CI test execution results")
+    parser.add_argument("path", type=Path, help="JUnit XML or JSONL results file")
+    parser.add_argument("--format", choices=RESULT_FORMATS, help="result format (default: from the file extension)")
+    parser.add_argument("--executed-by", default="ci", help="executor for results that do not name one")
+    args = parser.parse_args()
+
+    result_format = args.format or detect_format(args.path.name)
+    if result_format is None:
+        parser.error("cannot tell the result format from the file name; pass --format")
+    import_results_file(args.path, result_format, args.executed_by)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Learn Pattern Confidence
+Rolls suggestion feedback into FailurePattern confidence scores now (the pattern_confidence_learning job does this daily).
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from app.database import SessionLocal
+from app.services import pattern_learning
+
+
+def learn_pattern_confidence():
+    """Aggregate feedback for every knowledge base pattern that produced suggestions"""
+    print("=" * 70)
+    print("CALIDUS Pattern Confidence Learning")
+    print("=" * 70)
+
+    db = SessionLocal()
+
+    try:
+        result = pattern_learning.learn_pattern_confidence(db)
+        print(f"✓ Updated {result['patterns_updated']} patterns, created {result['patterns_created']}")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    learn_pattern_confidence()
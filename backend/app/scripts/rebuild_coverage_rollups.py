@@ -0,0 +1,32 @@
+"""
+Rebuild Coverage Rollups
+Recomputes the daily / weekly / monthly coverage rollups from stored snapshots (after upgrading, or to repair them).
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from app.database import SessionLocal
+from app.services.coverage_rollups import rebuild_rollups
+
+
+def rebuild_coverage_rollups():
+    """Replace all rollup rows with aggregates of the snapshot history"""
+    print("=" * 70)
+    print("CALIDUS Coverage Rollup Rebuild")
+    print("=" * 70)
+
+    db = SessionLocal()
+
+    try:
+        result = rebuild_rollups(db)
+        print(f"✓ Built {result['rollups']} rollup rows from {result['snapshots']} snapshots")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_coverage_rollups()
@@ -0,0 +1,32 @@
+"""
+Reconcile Requirement Counters
+Recounts every requirement's test cases and trace links and repairs the stored counters (after bulk SQL changes or a restore).
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from app.database import SessionLocal
+from app.services.requirement_counters import reconcile_requirement_counters
+
+
+def reconcile_counters():
+    """Rewrite the counters of requirements whose stored counts have drifted"""
+    print("=" * 70)
+    print("CALIDUS Requirement Counter Reconciliation")
+    print("=" * 70)
+
+    db = SessionLocal()
+
+    try:
+        result = reconcile_requirement_counters(db)
+        print(f"✓ Checked {result['checked']} requirements, fixed {result['fixed']}")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    reconcile_counters()
@@ -0,0 +1,78 @@
+"""
+ReqIF Exchange
+Imports a ReqIF document from, or exports all requirements to, another requirements tool.
+
+Usage:
+    python app/scripts/reqif_exchange.py import oem_delivery.reqifz --user admin
+    python app/scripts/reqif_exchange.py export calidus.reqif
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from app.database import SessionLocal
+from app.models import User
+from app.services.reqif import import_reqif, iter_reqif
+
+
+def import_file(path: Path, username: str):
+    """Import one ReqIF document as the given user"""
+    print("=" * 70)
+    print("CALIDUS ReqIF Import")
+    print("=" * 70)
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
+            print(f"✗ Unknown user '{username}'")
+            return
+        with open(path, "rb") as fileobj:
+            result = import_reqif(db, fileobj, user.id)
+        for entity in ("requirements", "test_cases"):
+            counts = result[entity]
+            if counts:
+                print(
+                    f"✓ {entity}: {counts['inserted']} inserted, {counts['updated']} updated, "
+                    f"{counts['unchanged']} unchanged"
+                )
+        print(f"✓ {result['links_created']} traceability links created")
+        if result["failed"]:
+            print(f"✗ {result['failed']} objects or relations not imported")
+            for error in result["errors"]:
+                print(f"  - {error}")
+
+    finally:
+        db.close()
+
+
+def export_file(path: Path):
+    """Write every requirement, test case and link to a ReqIF document"""
+    db = SessionLocal()
+    try:
+        with open(path, "wb") as fileobj:
+            for chunk in iter_reqif(db):
+                fileobj.write(chunk)
+        print(f"✓ Exported to {path}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exchange requirements in ReqIF")
+    parser.add_argument("direction", choices=("import", "export"))
+    parser.add_argument("path", type=Path, help=".reqif document (or .reqifz archive to import)")
+    parser.add_argument("--user", default="admin", help="user recorded as creator of imported objects")
+    args = parser.parse_args()
+
+    if args.direction == "import":
+        import_file(args.path, args.user)
+    else:
+        export_file(args.path)
+
+
+if __name__ == "__main__":
+    main()
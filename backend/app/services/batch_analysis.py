@@ -0,0 +1,234 @@
+"""
+Batch Test Failure Analysis
+Runs the reasoning agent over many failed test cases in a process pool and stores the reports
+"""
+
+import asyncio
+import tarfile
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import get_settings
+from app.models.test_case import TestCase
+from app.services.failure_analysis import find_stored_analyses, get_or_create_analysis
+from app.services.reasoning_agent import get_reasoning_agent
+
+settings = get_settings()
+
+# Upper bound on logs accepted in one batch request
+MAX_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class RequirementSnapshot:
+    """Requirement fields the reasoning agent reads"""
+    type: Optional[str]
+    category: Optional[str]
+
+
+@dataclass(frozen=True)
+class TestCaseSnapshot:
+    """Picklable copy of the test case fields the reasoning agent reads"""
+    id: int
+    test_case_id: str
+    title: str
+    test_type: Optional[str]
+    priority: Optional[str]
+    actual_results: Optional[str]
+    requirement: Optional[RequirementSnapshot]
+
+    @classmethod
+    def from_model(cls, test_case: TestCase) -> "TestCaseSnapshot":
+        requirement = test_case.requirement
+        return cls(
+            id=test_case.id,
+            test_case_id=test_case.test_case_id,
+            title=test_case.title,
+            test_type=test_case.test_type,
+            priority=test_case.priority,
+            actual_results=test_case.actual_results,
+            requirement=RequirementSnapshot(
+                type=requirement.type,
+                category=requirement.category
+            ) if requirement else None
+        )
+
+
+def analyze_snapshot(snapshot: TestCaseSnapshot, execution_log: str) -> Dict:
+    """Worker entry point: analyze one failure with the process-wide agent"""
+    return get_reasoning_agent().analyze_failure(snapshot, execution_log).to_dict()
+
+
+def _init_worker() -> None:
+    """Worker process start: drop DB connections inherited from the parent's pool"""
+    from app.database import engine
+    engine.dispose(close=False)
+
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def get_analysis_executor() -> Executor:
+    """
+    Shared executor for batch analysis.
+
+    A process pool sized by ANALYSIS_WORKERS; 0 falls back to threads,
+    which keeps everything in-process (useful where fork is unavailable).
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                if settings.analysis_workers > 0:
+                    _executor = ProcessPoolExecutor(
+                        max_workers=settings.analysis_workers,
+                        initializer=_init_worker
+                    )
+                else:
+                    _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="analysis")
+    return _executor
+
+
+def shutdown_analysis_executor() -> None:
+    """Stop the shared executor (application shutdown)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def load_snapshots(db: Session, keys: List) -> Dict:
+    """
+    Load test cases with their requirements in one query.
+
+    `keys` may mix primary keys (int) and test case IDs (str, e.g. TC-000942);
+    the result maps each key that was found to its snapshot.
+    """
+    pks = {key for key in keys if isinstance(key, int)}
+    codes = {key for key in keys if isinstance(key, str)}
+    if not pks and not codes:
+        return {}
+
+    conditions = []
+    if pks:
+        conditions.append(TestCase.id.in_(pks))
+    if codes:
+        conditions.append(TestCase.test_case_id.in_(codes))
+    query = db.query(TestCase).options(joinedload(TestCase.requirement))
+    query = query.filter(conditions[0] if len(conditions) == 1 else conditions[0] | conditions[1])
+
+    snapshots = {}
+    for test_case in query.all():
+        snapshot = TestCaseSnapshot.from_model(test_case)
+        if test_case.id in pks:
+            snapshots[test_case.id] = snapshot
+        if test_case.test_case_id in codes:
+            snapshots[test_case.test_case_id] = snapshot
+    return snapshots
+
+
+def iter_tar_logs(fileobj: BinaryIO) -> Iterator[Tuple[object, str]]:
+    """
+    Yield (key, log) pairs from a (optionally compressed) tarball.
+
+    Each regular file is one log; its name without extension is the test case
+    primary key if numeric, otherwise the test case ID.
+    """
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            stem = PurePosixPath(member.name).name.split(".", 1)[0]
+            if not stem:
+                continue
+            key = int(stem) if stem.isdigit() else stem
+            content = archive.extractfile(member).read()
+            yield key, content.decode("utf-8", errors="replace")
+
+
+async def stream_batch_analysis(
+    db: Session,
+    pairs: List[Tuple[object, str]],
+    snapshots: Dict,
+    user_id: Optional[int],
+    format_result
+) -> AsyncIterator[Dict]:
+    """
+    Analyze all pairs in the executor, yielding results as each one finishes.
+
+    Reports are stored through get_or_create_analysis in this process as
+    they arrive, so batch failures are deduplicated, indexed for
+    similarity search and open to feedback like ones from /analyze;
+    failures already stored are yielded first without being analyzed.
+    Unknown test cases yield an error entry immediately. `format_result`
+    turns (snapshot, analysis, cached) into the response item; it runs on
+    a worker thread with the session, one call at a time.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_analysis_executor()
+
+    def store(snapshot: TestCaseSnapshot, execution_log: str, report: Dict) -> Dict:
+        analysis, cached = get_or_create_analysis(db, snapshot, execution_log, user_id, report=report)
+        return format_result(snapshot, analysis, cached)
+
+    async def run(snapshot: TestCaseSnapshot, execution_log: str):
+        try:
+            report = await loop.run_in_executor(executor, analyze_snapshot, snapshot, execution_log)
+            return snapshot, execution_log, report, None
+        except Exception as e:
+            return snapshot, execution_log, None, e
+
+    found, missing = [], []
+    for key, execution_log in pairs:
+        snapshot = snapshots.get(key)
+        if snapshot is None:
+            missing.append(key)
+        else:
+            found.append((snapshot, execution_log))
+
+    def load_stored():
+        stored = find_stored_analyses(db, [(snapshot.id, execution_log) for snapshot, execution_log in found])
+        return [
+            format_result(snapshot, analysis, True) if analysis is not None else None
+            for (snapshot, _), analysis in zip(found, stored)
+        ]
+
+    cached = await loop.run_in_executor(None, load_stored)
+    tasks = [
+        asyncio.ensure_future(run(snapshot, execution_log))
+        for (snapshot, execution_log), result in zip(found, cached) if result is None
+    ]
+
+    try:
+        for key in missing:
+            yield {"test_case_id": key, "error": f"Test case {key} not found"}
+        for result in cached:
+            if result is not None:
+                yield result
+        for finished in asyncio.as_completed(tasks):
+            snapshot, execution_log, report, error = await finished
+            if error is None:
+                try:
+                    result = await loop.run_in_executor(None, store, snapshot, execution_log, report)
+                except Exception as e:
+                    db.rollback()
+                    error = e
+                else:
+                    yield result
+                    continue
+            yield {
+                "test_case_id": snapshot.id,
+                "test_case_name": snapshot.test_case_id,
+                "error": f"Analysis failed: {error}"
+            }
+    finally:
+        # Client went away or iteration stopped early: drop queued work
+        for task in tasks:
+            task.cancel()
@@ -3,14 +3,48 @@ Test Coverage Analyzer Service
 Analyzes test coverage across requirements with heatmap generation and gap analysis.
 """
 
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional
+from datetime import datetime
+from sqlalchemy import BigInteger, case, cast, extract, func, or_
 from sqlalchemy.orm import Session
+from app.config import get_settings
 from app.models.requirement import Requirement, RequirementType, RequirementPriority
-from app.models.test_case import TestCase
 from app.models.coverage import CoverageSnapshot
+from app.models.coverage_rollup import RollupResolution
+from app.services.coverage_rollups import get_rollup_trends, record_snapshot
 import logging
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _coverage_cell(total: int, covered: int, test_case_count: int) -> Dict:
+    return {
+        "total": total,
+        "covered": covered,
+        "uncovered": total - covered,
+        "coverage_percentage": (covered / total * 100) if total > 0 else 0.0,
+        "test_case_count": test_case_count,
+    }
+
+
+def _sum_cells(cells: Iterable[Dict]) -> Dict:
+    """Combine heatmap cells into one coverage summary"""
+    total = covered = tests = 0
+    for cell in cells:
+        total += cell["total"]
+        covered += cell["covered"]
+        tests += cell["test_case_count"]
+    return _coverage_cell(total, covered, tests)
+
+
+def _parse_date(value) -> datetime:
+    """Aggregated timestamps come back as strings on SQLite"""
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _as_naive(value: datetime) -> datetime:
+    return value.replace(tzinfo=None) if value.tzinfo else value
 
 
 class CoverageAnalyzer:
@@ -38,7 +72,7 @@ class CoverageAnalyzer:
         total_reqs = len(requirements)
 
         # Get requirements with test cases
-        requirements_with_tests = {req.id for req in requirements if len(req.test_cases) > 0}
+        requirements_with_tests = {req.id for req in requirements if req.test_case_count > 0}
         covered_count = len(requirements_with_tests)
 
         # Calculate overall coverage
@@ -84,7 +118,7 @@ class CoverageAnalyzer:
 
         for req_type in RequirementType:
             type_reqs = [r for r in requirements if r.type == req_type]
-            covered = [r for r in type_reqs if len(r.test_cases) > 0]
+            covered = [r for r in type_reqs if r.test_case_count > 0]
 
             total = len(type_reqs)
             covered_count = len(covered)
@@ -94,7 +128,7 @@ class CoverageAnalyzer:
                 "covered": covered_count,
                 "uncovered": total - covered_count,
                 "coverage_percentage": (covered_count / total * 100) if total > 0 else 0.0,
-                "test_case_count": sum(len(r.test_cases) for r in type_reqs),
+                "test_case_count": sum(r.test_case_count for r in type_reqs),
             }
 
         return types
@@ -105,7 +139,7 @@ class CoverageAnalyzer:
 
         for priority in RequirementPriority:
             priority_reqs = [r for r in requirements if r.priority == priority]
-            covered = [r for r in priority_reqs if len(r.test_cases) > 0]
+            covered = [r for r in priority_reqs if r.test_case_count > 0]
 
             total = len(priority_reqs)
             covered_count = len(covered)
@@ -115,7 +149,7 @@ class CoverageAnalyzer:
                 "covered": covered_count,
                 "uncovered": total - covered_count,
                 "coverage_percentage": (covered_count / total * 100) if total > 0 else 0.0,
-                "test_case_count": sum(len(r.test_cases) for r in priority_reqs),
+                "test_case_count": sum(r.test_case_count for r in priority_reqs),
             }
 
         return priorities
@@ -147,7 +181,7 @@ class CoverageAnalyzer:
                 ]
 
                 total = len(filtered)
-                covered = len([r for r in filtered if len(r.test_cases) > 0])
+                covered = len([r for r in filtered if r.test_case_count > 0])
 
                 heatmap[req_type.value][priority.value] = {
                     "total": total,
@@ -164,7 +198,7 @@ class CoverageAnalyzer:
 
         Returns list sorted by priority (Critical first).
         """
-        uncovered = [r for r in requirements if len(r.test_cases) == 0]
+        uncovered = [r for r in requirements if r.test_case_count == 0]
 
         # Sort by priority (Critical > High > Medium > Low)
         priority_order = {
@@ -213,32 +247,183 @@ class CoverageAnalyzer:
 
         return trends
 
-    def create_snapshot(self, user_id: int) -> CoverageSnapshot:
-        """Create a coverage snapshot for trend analysis."""
-        analysis = self.analyze_coverage()
+    def get_coverage_trends(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        points: int = 200,
+        resolution: Optional[RollupResolution] = None,
+    ) -> List[Dict]:
+        """
+        Coverage trend over a date range, downsampled to about `points` points.
+
+        The range is cut into equal time buckets and each bucket is
+        aggregated in SQL (mean / min / max coverage, mean counts), so
+        the cost does not depend on how many snapshots fall into it.
+        Ranges with no more than `points` snapshots return them as is.
+        With a `resolution` the points are read from the daily, weekly
+        or monthly rollups instead, one per period.
+        """
+        if resolution is not None:
+            return get_rollup_trends(self.db, resolution, start, end)
+
+        date = CoverageSnapshot.snapshot_date
+        query = self.db.query(CoverageSnapshot)
+        if start is not None:
+            query = query.filter(date >= start)
+        if end is not None:
+            query = query.filter(date <= end)
+
+        count, first, last = query.with_entities(func.count(CoverageSnapshot.id), func.min(date), func.max(date)).one()
+        if count <= points:
+            return [
+                {
+                    "date": snapshot.snapshot_date.isoformat(),
+                    "coverage_percentage": snapshot.coverage_percentage,
+                    "min_coverage_percentage": snapshot.coverage_percentage,
+                    "max_coverage_percentage": snapshot.coverage_percentage,
+                    "total_requirements": snapshot.total_requirements,
+                    "covered_requirements": snapshot.covered_requirements,
+                    "total_gaps": snapshot.total_gaps,
+                    "critical_gaps": snapshot.critical_gaps,
+                    "snapshot_count": 1,
+                }
+                for snapshot in query.order_by(date).all()
+            ]
+
+        span = (_as_naive(_parse_date(last)) - _as_naive(_parse_date(first))).total_seconds()
+        width = max(int(span // points) + 1, 1)
+        bucket = (cast(extract("epoch", date), BigInteger) // width).label("bucket")
+        rows = (
+            query.with_entities(
+                bucket,
+                func.max(date),
+                func.avg(CoverageSnapshot.coverage_percentage),
+                func.min(CoverageSnapshot.coverage_percentage),
+                func.max(CoverageSnapshot.coverage_percentage),
+                func.avg(CoverageSnapshot.total_requirements),
+                func.avg(CoverageSnapshot.covered_requirements),
+                func.avg(CoverageSnapshot.total_gaps),
+                func.avg(CoverageSnapshot.critical_gaps),
+                func.count(CoverageSnapshot.id),
+            )
+            .group_by(bucket)
+            .order_by(bucket)
+            .all()
+        )
+
+        return [
+            {
+                "date": _parse_date(bucket_end).isoformat(),
+                "coverage_percentage": round(float(mean), 2),
+                "min_coverage_percentage": low,
+                "max_coverage_percentage": high,
+                "total_requirements": round(float(total)),
+                "covered_requirements": round(float(covered)),
+                "total_gaps": round(float(gaps)),
+                "critical_gaps": round(float(critical)),
+                "snapshot_count": snapshots,
+            }
+            for _, bucket_end, mean, low, high, total, covered, gaps, critical, snapshots in rows
+        ]
+
+    def coverage_counts(self) -> Dict:
+        """
+        Coverage heatmap (type × priority) from one grouped count query.
+
+        Reads only the requirements' test_case_count counters, so the
+        test_cases table is not touched. Cells carry total, covered,
+        uncovered, coverage_percentage and test_case_count.
+        """
+        rows = (
+            self.db.query(
+                Requirement.type,
+                Requirement.priority,
+                func.count(Requirement.id),
+                func.count(case((Requirement.test_case_count > 0, Requirement.id))),
+                func.coalesce(func.sum(Requirement.test_case_count), 0),
+            )
+            .group_by(Requirement.type, Requirement.priority)
+            .all()
+        )
+        counts = {(req_type, priority): (total, covered, tests) for req_type, priority, total, covered, tests in rows}
+
+        heatmap = {}
+        for req_type in RequirementType:
+            heatmap[req_type.value] = {}
+            for priority in RequirementPriority:
+                total, covered, tests = counts.get((req_type, priority), (0, 0, 0))
+                heatmap[req_type.value][priority.value] = _coverage_cell(total, covered, int(tests))
+        return heatmap
+
+    def create_snapshot(self, user_id: Optional[int] = None) -> CoverageSnapshot:
+        """
+        Create a coverage snapshot for trend analysis.
+
+        Counts come from coverage_counts(). The heatmap is stored in full
+        only on keyframes (every COVERAGE_SNAPSHOT_KEYFRAME_INTERVAL
+        snapshots); in between, only the cells that changed since the
+        previous snapshot are stored. Scheduled snapshots have no user.
+        """
+        heatmap = self.coverage_counts()
+        by_type = {t: _sum_cells(heatmap[t].values()) for t in heatmap}
+        by_priority = {
+            p.value: _sum_cells(heatmap[t][p.value] for t in heatmap)
+            for p in RequirementPriority
+        }
+        overall = _sum_cells(by_type.values())
 
         snapshot = CoverageSnapshot(
-            total_requirements=analysis["overall"]["total_requirements"],
-            covered_requirements=analysis["overall"]["covered_requirements"],
-            coverage_percentage=analysis["overall"]["coverage_percentage"],
-            ahlr_coverage=analysis["by_type"].get("Aircraft_High_Level", {}),
-            system_coverage=analysis["by_type"].get("System_Requirement", {}),
-            technical_coverage=analysis["by_type"].get("Technical_Specification", {}),
-            certification_coverage=analysis["by_type"].get("Certification_Requirement", {}),
-            critical_coverage=analysis["by_priority"].get("Critical", {}),
-            high_coverage=analysis["by_priority"].get("High", {}),
-            medium_coverage=analysis["by_priority"].get("Medium", {}),
-            low_coverage=analysis["by_priority"].get("Low", {}),
-            heatmap_data=analysis["heatmap"],
-            total_gaps=analysis["overall"]["uncovered_requirements"],
-            critical_gaps=len([
-                g for g in analysis["gaps"]
-                if g["priority"] == "Critical"
-            ]),
+            total_requirements=overall["total"],
+            covered_requirements=overall["covered"],
+            coverage_percentage=overall["coverage_percentage"],
+            ahlr_coverage=by_type[RequirementType.AHLR.value],
+            system_coverage=by_type[RequirementType.SYSTEM.value],
+            technical_coverage=by_type[RequirementType.TECHNICAL.value],
+            certification_coverage=by_type[RequirementType.CERTIFICATION.value],
+            critical_coverage=by_priority[RequirementPriority.CRITICAL.value],
+            high_coverage=by_priority[RequirementPriority.HIGH.value],
+            medium_coverage=by_priority[RequirementPriority.MEDIUM.value],
+            low_coverage=by_priority[RequirementPriority.LOW.value],
+            total_gaps=overall["uncovered"],
+            critical_gaps=by_priority[RequirementPriority.CRITICAL.value]["uncovered"],
             created_by_id=user_id,
         )
 
+        previous = (
+            self.db.query(CoverageSnapshot)
+            .order_by(CoverageSnapshot.snapshot_date.desc(), CoverageSnapshot.id.desc())
+            .first()
+        )
+        base_id = None
+        if previous is not None:
+            base_id = previous.base_snapshot_id or previous.id
+            chain_length = (
+                self.db.query(func.count(CoverageSnapshot.id))
+                .filter(CoverageSnapshot.base_snapshot_id == base_id)
+                .scalar()
+            )
+            if chain_length + 1 >= settings.coverage_snapshot_keyframe_interval:
+                base_id = None
+
+        if base_id is None:
+            snapshot.heatmap_data = heatmap
+        else:
+            previous_heatmap = self.get_snapshot_heatmap(previous)
+            snapshot.base_snapshot_id = base_id
+            snapshot.parent_snapshot_id = previous.id
+            snapshot.heatmap_delta = {
+                req_type: changed
+                for req_type, cells in heatmap.items()
+                if (changed := {
+                    priority: cell for priority, cell in cells.items()
+                    if previous_heatmap.get(req_type, {}).get(priority) != cell
+                })
+            }
+
         self.db.add(snapshot)
+        self.db.flush()
+        record_snapshot(self.db, snapshot)
         self.db.commit()
         self.db.refresh(snapshot)
 
@@ -246,6 +431,35 @@ class CoverageAnalyzer:
 
         return snapshot
 
+    def get_snapshot_heatmap(self, snapshot: CoverageSnapshot) -> Dict:
+        """Full heatmap of a snapshot, replaying deltas onto its keyframe"""
+        if snapshot.base_snapshot_id is None:
+            return snapshot.heatmap_data or {}
+
+        # The keyframe and its whole delta chain in one query
+        chain = {
+            row.id: row
+            for row in self.db.query(CoverageSnapshot).filter(
+                or_(
+                    CoverageSnapshot.id == snapshot.base_snapshot_id,
+                    CoverageSnapshot.base_snapshot_id == snapshot.base_snapshot_id,
+                )
+            )
+        }
+        deltas = []
+        current = chain.get(snapshot.id, snapshot)
+        while current is not None and current.base_snapshot_id is not None:
+            deltas.append(current.heatmap_delta or {})
+            current = chain.get(current.parent_snapshot_id)
+        if current is None:
+            raise ValueError(f"Coverage snapshot {snapshot.id} has a broken delta chain")
+
+        heatmap = {req_type: dict(cells) for req_type, cells in (current.heatmap_data or {}).items()}
+        for delta in reversed(deltas):
+            for req_type, cells in delta.items():
+                heatmap.setdefault(req_type, {}).update(cells)
+        return heatmap
+
     def suggest_test_cases(self, requirement_id: int) -> List[Dict]:
         """
         Generate test case suggestions for a requirement.
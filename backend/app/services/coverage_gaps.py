@@ -0,0 +1,89 @@
+"""
+Coverage Gap Queries
+Requirements without test cases, filtered, ordered and paginated in SQL
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.models.requirement import (
+    Requirement,
+    RequirementPriority,
+    RequirementStatus,
+    RequirementType,
+    priority_rank,
+)
+
+# (priority_rank, requirement id) of the last gap on a page
+GapCursor = Tuple[int, int]
+
+
+def encode_cursor(cursor: GapCursor) -> str:
+    return f"{cursor[0]}:{cursor[1]}"
+
+
+def decode_cursor(value: str) -> GapCursor:
+    """Parse a cursor returned with a previous page; raises ValueError when malformed"""
+    rank, _, requirement_id = value.partition(":")
+    return int(rank), int(requirement_id)
+
+
+def query_gaps(
+    db: Session,
+    type: Optional[RequirementType] = None,
+    priority: Optional[RequirementPriority] = None,
+    status: Optional[RequirementStatus] = None,
+    limit: int = 100,
+    after: Optional[GapCursor] = None,
+) -> Tuple[List[Dict], Optional[GapCursor]]:
+    """
+    One page of uncovered requirements, Critical first, then by id.
+
+    Returns the gaps and the cursor for the next page (None on the last
+    page). Pages are keyset-paginated on ix_requirements_gap_order, a
+    partial index holding only the uncovered requirements, so later pages
+    cost the same as the first.
+    """
+    rank = priority_rank.label("priority_rank")
+    query = db.query(
+        Requirement.id,
+        Requirement.requirement_id,
+        Requirement.title,
+        Requirement.type,
+        Requirement.priority,
+        Requirement.status,
+        Requirement.regulatory_document,
+        rank,
+    ).filter(
+        Requirement.test_case_count == 0
+    )
+
+    if type is not None:
+        query = query.filter(Requirement.type == type)
+    if priority is not None:
+        query = query.filter(Requirement.priority == priority)
+    if status is not None:
+        query = query.filter(Requirement.status == status)
+    if after is not None:
+        query = query.filter(tuple_(priority_rank, Requirement.id) > tuple_(*after))
+
+    # One extra row tells whether another page follows
+    rows = query.order_by(priority_rank, Requirement.id).limit(limit + 1).all()
+    next_cursor = (rows[limit - 1].priority_rank, rows[limit - 1].id) if len(rows) > limit else None
+
+    gaps = [
+        {
+            "requirement_id": row.id,
+            "requirement_identifier": row.requirement_id,
+            "title": row.title,
+            "type": row.type.value if row.type else None,
+            "priority": row.priority.value if row.priority else None,
+            "status": row.status.value if row.status else None,
+            "regulatory": bool(row.regulatory_document),
+            "regulatory_document": row.regulatory_document,
+        }
+        for row in rows[:limit]
+    ]
+    return gaps, next_cursor
@@ -0,0 +1,224 @@
+"""
+Coverage Trend Rollups
+Daily, weekly and monthly coverage aggregates, folded in per snapshot and read by date range
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, load_only
+
+from app.models.coverage import CoverageSnapshot
+from app.models.coverage_rollup import CoverageRollup, RollupResolution
+from app.models.requirement import RequirementPriority, RequirementType
+
+logger = logging.getLogger(__name__)
+
+# Snapshot JSON column holding each type's / priority's coverage summary
+BREAKDOWN_COLUMNS = {
+    "by_type": {
+        RequirementType.AHLR.value: "ahlr_coverage",
+        RequirementType.SYSTEM.value: "system_coverage",
+        RequirementType.TECHNICAL.value: "technical_coverage",
+        RequirementType.CERTIFICATION.value: "certification_coverage",
+    },
+    "by_priority": {
+        RequirementPriority.CRITICAL.value: "critical_coverage",
+        RequirementPriority.HIGH.value: "high_coverage",
+        RequirementPriority.MEDIUM.value: "medium_coverage",
+        RequirementPriority.LOW.value: "low_coverage",
+    },
+}
+
+# Snapshot columns read when rebuilding (leaves out the heatmap JSON)
+_SNAPSHOT_COLUMNS = [
+    CoverageSnapshot.snapshot_date,
+    CoverageSnapshot.coverage_percentage,
+    CoverageSnapshot.total_requirements,
+    CoverageSnapshot.covered_requirements,
+    CoverageSnapshot.total_gaps,
+    CoverageSnapshot.critical_gaps,
+] + [
+    getattr(CoverageSnapshot, column)
+    for columns in BREAKDOWN_COLUMNS.values()
+    for column in columns.values()
+]
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Rollup periods are naive UTC; snapshot dates may come back timezone-aware"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def period_start(resolution: RollupResolution, moment: datetime) -> datetime:
+    """Start of the day, ISO week (Monday) or month containing `moment`"""
+    day = datetime(moment.year, moment.month, moment.day)
+    if resolution == RollupResolution.DAILY:
+        return day
+    if resolution == RollupResolution.WEEKLY:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _fold(stats: Optional[Dict], value: float) -> Dict:
+    if not stats:
+        return {"min": value, "max": value, "sum": value, "count": 1}
+    return {
+        "min": min(stats["min"], value),
+        "max": max(stats["max"], value),
+        "sum": stats["sum"] + value,
+        "count": stats["count"] + 1,
+    }
+
+
+def _apply(rollup: CoverageRollup, snapshot: CoverageSnapshot, date: datetime) -> None:
+    """Fold one snapshot into a rollup row"""
+    coverage = snapshot.coverage_percentage
+    if rollup.snapshot_count:
+        rollup.coverage_min = min(rollup.coverage_min, coverage)
+        rollup.coverage_max = max(rollup.coverage_max, coverage)
+        rollup.coverage_sum += coverage
+    else:
+        rollup.coverage_min = rollup.coverage_max = rollup.coverage_sum = coverage
+    rollup.snapshot_count = (rollup.snapshot_count or 0) + 1
+
+    if rollup.last_snapshot_date is None or date >= rollup.last_snapshot_date:
+        rollup.last_snapshot_date = date
+        rollup.total_requirements = snapshot.total_requirements
+        rollup.covered_requirements = snapshot.covered_requirements
+        rollup.total_gaps = snapshot.total_gaps
+        rollup.critical_gaps = snapshot.critical_gaps
+
+    # Reassigned rather than mutated so the JSON column is flagged dirty
+    breakdown = {group: dict(stats) for group, stats in (rollup.breakdown or {}).items()}
+    for group, columns in BREAKDOWN_COLUMNS.items():
+        stats = breakdown.setdefault(group, {})
+        for key, column in columns.items():
+            value = (getattr(snapshot, column) or {}).get("coverage_percentage")
+            if value is not None:
+                stats[key] = _fold(stats.get(key), value)
+    rollup.breakdown = breakdown
+
+
+def _new_rollup(resolution: RollupResolution, start: datetime) -> CoverageRollup:
+    return CoverageRollup(
+        resolution=resolution.value,
+        period_start=start,
+        snapshot_count=0,
+        coverage_min=0.0,
+        coverage_max=0.0,
+        coverage_sum=0.0,
+        breakdown={},
+    )
+
+
+def record_snapshot(db: Session, snapshot: CoverageSnapshot) -> None:
+    """
+    Fold a new (flushed) snapshot into its daily, weekly and monthly rows.
+
+    Existing rows are locked for the update; a row created concurrently by
+    another snapshot is picked up after the insert conflict. The caller
+    commits.
+    """
+    date = to_utc_naive(snapshot.snapshot_date)
+    for resolution in RollupResolution:
+        start = period_start(resolution, date)
+        query = db.query(CoverageRollup).filter(
+            CoverageRollup.resolution == resolution.value,
+            CoverageRollup.period_start == start
+        ).with_for_update()
+
+        rollup = query.first()
+        if rollup is None:
+            rollup = _new_rollup(resolution, start)
+            _apply(rollup, snapshot, date)
+            try:
+                with db.begin_nested():
+                    db.add(rollup)
+                continue
+            except IntegrityError:
+                rollup = query.first()
+        _apply(rollup, snapshot, date)
+
+
+def rebuild_rollups(db: Session, batch_size: int = 1000) -> Dict:
+    """
+    Recompute every rollup row from the stored snapshots.
+
+    Snapshots are streamed in date order without their heatmap JSON;
+    use after the migration or to repair rollups.
+    """
+    db.query(CoverageRollup).delete(synchronize_session=False)
+
+    rollups: Dict[Tuple[RollupResolution, datetime], CoverageRollup] = {}
+    snapshot_count = 0
+    snapshots = (
+        db.query(CoverageSnapshot)
+        .options(load_only(*_SNAPSHOT_COLUMNS))
+        .order_by(CoverageSnapshot.snapshot_date)
+        .yield_per(batch_size)
+    )
+    for snapshot in snapshots:
+        date = to_utc_naive(snapshot.snapshot_date)
+        for resolution in RollupResolution:
+            key = (resolution, period_start(resolution, date))
+            if key not in rollups:
+                rollups[key] = _new_rollup(*key)
+            _apply(rollups[key], snapshot, date)
+        snapshot_count += 1
+
+    db.add_all(rollups.values())
+    db.commit()
+
+    logger.info(f"Coverage rollups rebuilt: {len(rollups)} rows from {snapshot_count} snapshots")
+    return {"snapshots": snapshot_count, "rollups": len(rollups)}
+
+
+def _summary(stats: Dict) -> Dict:
+    return {
+        "mean": round(stats["sum"] / stats["count"], 2),
+        "min": stats["min"],
+        "max": stats["max"],
+    }
+
+
+def get_rollup_trends(
+    db: Session,
+    resolution: RollupResolution,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[Dict]:
+    """
+    Coverage per period over a date range, from one query on the rollup index.
+
+    The period containing `start` is included. Each point carries the
+    mean / min / max overall coverage, the same per requirement type and
+    priority, and the counts of the period's latest snapshot.
+    """
+    query = db.query(CoverageRollup).filter(CoverageRollup.resolution == resolution.value)
+    if start is not None:
+        query = query.filter(CoverageRollup.period_start >= period_start(resolution, to_utc_naive(start)))
+    if end is not None:
+        query = query.filter(CoverageRollup.period_start <= to_utc_naive(end))
+
+    return [
+        {
+            "date": rollup.period_start.isoformat(),
+            "resolution": rollup.resolution,
+            "snapshot_count": rollup.snapshot_count,
+            "coverage_percentage": round(rollup.coverage_sum / rollup.snapshot_count, 2),
+            "min_coverage_percentage": rollup.coverage_min,
+            "max_coverage_percentage": rollup.coverage_max,
+            "total_requirements": rollup.total_requirements,
+            "covered_requirements": rollup.covered_requirements,
+            "total_gaps": rollup.total_gaps,
+            "critical_gaps": rollup.critical_gaps,
+            "by_type": {key: _summary(stats) for key, stats in rollup.breakdown.get("by_type", {}).items()},
+            "by_priority": {key: _summary(stats) for key, stats in rollup.breakdown.get("by_priority", {}).items()},
+        }
+        for rollup in query.order_by(CoverageRollup.period_start).all()
+    ]
@@ -0,0 +1,247 @@
+"""
+Data Exports
+Exportable columns and list filters for requirements, test cases and traceability links, and the streamed row queries behind /api/export
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.requirement import Requirement, RequirementPriority, RequirementStatus, RequirementType
+from app.models.test_case import TestCase, TestCasePriority, TestCaseStatus
+from app.models.traceability import TraceabilityLink, TraceLinkType
+
+# Rows fetched per round trip (a server-side cursor on PostgreSQL)
+EXPORT_FETCH_SIZE = 1000
+
+
+# ============================================================================
+# Filters (shared with the list endpoints)
+# ============================================================================
+
+def requirement_filters(
+    type: Optional[RequirementType] = None,
+    category: Optional[str] = None,
+    status: Optional[RequirementStatus] = None,
+    priority: Optional[RequirementPriority] = None,
+    search: Optional[str] = None,
+    regulatory_document: Optional[str] = None,
+) -> List:
+    """WHERE clauses of GET /requirements"""
+    clauses = []
+    if type:
+        clauses.append(Requirement.type == type)
+    if category:
+        clauses.append(Requirement.category == category)
+    if status:
+        clauses.append(Requirement.status == status)
+    if priority:
+        clauses.append(Requirement.priority == priority)
+    if regulatory_document:
+        clauses.append(Requirement.regulatory_document.ilike(f"%{regulatory_document}%"))
+    if search:
+        clauses.append(or_(
+            Requirement.title.ilike(f"%{search}%"),
+            Requirement.description.ilike(f"%{search}%"),
+            Requirement.requirement_id.ilike(f"%{search}%")
+        ))
+    return clauses
+
+
+def test_case_filters(
+    status: Optional[TestCaseStatus] = None,
+    priority: Optional[TestCasePriority] = None,
+    requirement_id: Optional[int] = None,
+    test_type: Optional[str] = None,
+    automated: Optional[bool] = None,
+    search: Optional[str] = None,
+) -> List:
+    """WHERE clauses of GET /test-cases"""
+    clauses = []
+    if status:
+        clauses.append(TestCase.status == status)
+    if priority:
+        clauses.append(TestCase.priority == priority)
+    if requirement_id:
+        clauses.append(TestCase.requirement_id == requirement_id)
+    if test_type:
+        clauses.append(TestCase.test_type.ilike(f"%{test_type}%"))
+    if automated is not None:
+        clauses.append(TestCase.automated == automated)
+    if search:
+        clauses.append(or_(
+            TestCase.title.ilike(f"%{search}%"),
+            TestCase.description.ilike(f"%{search}%"),
+            TestCase.test_case_id.ilike(f"%{search}%")
+        ))
+    return clauses
+
+
+def traceability_link_filters(
+    link_type: Optional[TraceLinkType] = None,
+    source_id: Optional[int] = None,
+    target_id: Optional[int] = None,
+    requirement_id: Optional[int] = None,
+) -> List:
+    """WHERE clauses of GET /traceability"""
+    clauses = []
+    if link_type:
+        clauses.append(TraceabilityLink.link_type == link_type)
+    if source_id:
+        clauses.append(TraceabilityLink.source_id == source_id)
+    if target_id:
+        clauses.append(TraceabilityLink.target_id == target_id)
+    if requirement_id:
+        clauses.append(or_(
+            TraceabilityLink.source_id == requirement_id,
+            TraceabilityLink.target_id == requirement_id
+        ))
+    return clauses
+
+
+# ============================================================================
+# Exportable columns
+# ============================================================================
+
+_source = aliased(Requirement, name="source_requirement")
+_target = aliased(Requirement, name="target_requirement")
+_tested = aliased(Requirement, name="tested_requirement")
+
+
+class ExportEntity:
+    """An exportable table: named columns (expression, kind), the defaults, and its FROM clause"""
+
+    def __init__(self, name: str, model, columns: Dict[str, Tuple], default_columns: Sequence[str], joins=()):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.default_columns = tuple(default_columns)
+        self.joins = joins
+
+    def resolve_columns(self, requested: Optional[str]) -> List[str]:
+        """Column names from a comma-separated list (defaults if empty); raises ValueError for unknown names"""
+        if not requested:
+            return list(self.default_columns)
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.columns]
+        if unknown or not names:
+            raise ValueError(
+                f"Unknown {self.name} columns: {', '.join(unknown) or requested}. "
+                f"Available: {', '.join(self.columns)}"
+            )
+        return names
+
+    def kinds(self, names: Sequence[str]) -> Dict[str, str]:
+        return {name: self.columns[name][1] for name in names}
+
+    def query(self, names: Sequence[str], clauses: Sequence):
+        statement = select(*(self.columns[name][0] for name in names)).select_from(self.model)
+        for target, on in self.joins:
+            statement = statement.outerjoin(target, on)
+        return statement.where(*clauses).order_by(self.model.id)
+
+
+REQUIREMENTS = ExportEntity(
+    "requirements",
+    Requirement,
+    {
+        "id": (Requirement.id, "int"),
+        "requirement_id": (Requirement.requirement_id, "str"),
+        "type": (Requirement.type, "str"),
+        "category": (Requirement.category, "str"),
+        "title": (Requirement.title, "str"),
+        "description": (Requirement.description, "str"),
+        "rationale": (Requirement.rationale, "str"),
+        "priority": (Requirement.priority, "str"),
+        "status": (Requirement.status, "str"),
+        "verification_method": (Requirement.verification_method, "str"),
+        "compliance_status": (Requirement.compliance_status, "str"),
+        "regulatory_document": (Requirement.regulatory_document, "str"),
+        "regulatory_section": (Requirement.regulatory_section, "str"),
+        "regulatory_page": (Requirement.regulatory_page, "int"),
+        "owner": (Requirement.owner, "str"),
+        "version": (Requirement.version, "str"),
+        "test_case_count": (Requirement.test_case_count, "int"),
+        "passed_test_count": (Requirement.passed_test_count, "int"),
+        "failed_test_count": (Requirement.failed_test_count, "int"),
+        "parent_trace_count": (Requirement.parent_link_count, "int"),
+        "child_trace_count": (Requirement.child_link_count, "int"),
+        "created_at": (Requirement.created_at, "datetime"),
+        "updated_at": (Requirement.updated_at, "datetime"),
+    },
+    (
+        "requirement_id", "type", "category", "title", "description", "priority", "status",
+        "verification_method", "regulatory_document", "regulatory_section", "test_case_count",
+        "created_at", "updated_at",
+    ),
+)
+
+TEST_CASES = ExportEntity(
+    "test_cases",
+    TestCase,
+    {
+        "id": (TestCase.id, "int"),
+        "test_case_id": (TestCase.test_case_id, "str"),
+        "title": (TestCase.title, "str"),
+        "description": (TestCase.description, "str"),
+        "preconditions": (TestCase.preconditions, "str"),
+        "test_steps": (TestCase.test_steps, "str"),
+        "expected_results": (TestCase.expected_results, "str"),
+        "actual_results": (TestCase.actual_results, "str"),
+        "status": (TestCase.status, "str"),
+        "priority": (TestCase.priority, "str"),
+        "execution_date": (TestCase.execution_date, "datetime"),
+        "execution_duration": (TestCase.execution_duration, "int"),
+        "executed_by": (TestCase.executed_by, "str"),
+        "test_type": (TestCase.test_type, "str"),
+        "test_environment": (TestCase.test_environment, "str"),
+        "automated": (TestCase.automated, "bool"),
+        "automation_script": (TestCase.automation_script, "str"),
+        "requirement_id": (_tested.requirement_id, "str"),
+        "created_at": (TestCase.created_at, "datetime"),
+        "updated_at": (TestCase.updated_at, "datetime"),
+    },
+    (
+        "test_case_id", "title", "requirement_id", "status", "priority", "test_type", "automated",
+        "execution_date", "execution_duration", "executed_by",
+    ),
+    joins=((_tested, _tested.id == TestCase.requirement_id),),
+)
+
+TRACEABILITY_LINKS = ExportEntity(
+    "traceability_links",
+    TraceabilityLink,
+    {
+        "id": (TraceabilityLink.id, "int"),
+        "source_requirement_id": (_source.requirement_id, "str"),
+        "source_title": (_source.title, "str"),
+        "target_requirement_id": (_target.requirement_id, "str"),
+        "target_title": (_target.title, "str"),
+        "link_type": (TraceabilityLink.link_type, "str"),
+        "description": (TraceabilityLink.description, "str"),
+        "rationale": (TraceabilityLink.rationale, "str"),
+        "created_at": (TraceabilityLink.created_at, "datetime"),
+    },
+    ("source_requirement_id", "target_requirement_id", "link_type", "description", "created_at"),
+    joins=(
+        (_source, _source.id == TraceabilityLink.source_id),
+        (_target, _target.id == TraceabilityLink.target_id),
+    ),
+)
+
+
+def iter_export_rows(db: Session, entity: ExportEntity, names: Sequence[str], clauses: Sequence) -> Iterator[Tuple]:
+    """
+    Rows of the selected columns in id order, EXPORT_FETCH_SIZE at a time.
+
+    Only the current batch is held in memory, so exports of any size run
+    in constant memory and the first rows can be sent immediately.
+    """
+    result = db.execute(entity.query(names, clauses).execution_options(yield_per=EXPORT_FETCH_SIZE))
+    for row in result:
+        yield tuple(row)
+
+
+def count_export_rows(db: Session, entity: ExportEntity, clauses: Sequence) -> int:
+    return db.query(entity.model).filter(*clauses).count()
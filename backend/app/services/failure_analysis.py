@@ -0,0 +1,285 @@
+"""
+Failure Analysis Persistence Service
+Stores reasoning agent reports, deduplicated by a fingerprint of the normalized log
+"""
+
+import hashlib
+import re
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.test_case import TestCase
+from app.models.test_suggestion import FailureAnalysis, SuggestionFeedback, TestCaseSuggestion
+from app.services.log_scanner import iter_log_blocks
+from app.services.reasoning_agent import ReasoningAgent, get_reasoning_agent
+from app.services.similarity_index import failure_text
+
+# Run-specific noise removed before fingerprinting, so reruns of the same failure match
+_VOLATILE_PATTERNS = [
+    # ISO-8601 / log timestamps, e.g. 2025-10-21T12:00:00.123Z or 2025-10-21 12:00:00,123
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    # Memory addresses and object ids
+    (re.compile(r"0x[0-9a-fA-F]+"), "<addr>"),
+    # UUIDs (run ids, request ids)
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<uuid>"),
+]
+_TRAILING_SPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+
+
+def normalize_log(execution_log: str) -> str:
+    """Strip run-specific noise (timestamps, addresses, ids, line endings)"""
+    normalized = execution_log.replace("\r\n", "\n")
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        normalized = pattern.sub(replacement, normalized)
+    return _TRAILING_SPACE.sub("", normalized).strip()
+
+
+def log_fingerprint(execution_log: str) -> str:
+    """Content hash identifying a failure log across reruns"""
+    return hashlib.sha256(normalize_log(execution_log).encode("utf-8")).hexdigest()
+
+
+class LogFingerprint:
+    """
+    Incremental log_fingerprint over a log streamed in blocks of whole lines.
+
+    Every normalization step is line-local except the final strip(), so
+    only trailing whitespace since the last non-blank character is held
+    back; the digest equals log_fingerprint of the whole log.
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._started = False
+        self._held = ""
+
+    def update(self, text: str) -> None:
+        """Add one or more complete lines (joined by newlines, no trailing newline)"""
+        text = text.replace("\r\n", "\n")
+        if text.endswith("\r"):
+            text = text[:-1]  # Its "\n" ended the block
+        for pattern, replacement in _VOLATILE_PATTERNS:
+            text = pattern.sub(replacement, text)
+        text = _TRAILING_SPACE.sub("", text)
+
+        segment = "\n" + text if self._started else text.lstrip()
+        content = segment.rstrip()
+        if not content:
+            if self._started:
+                self._held += segment
+            return
+        self._hash.update((self._held + content).encode("utf-8"))
+        self._held = segment[len(content):]
+        self._started = True
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def analysis_version(agent: ReasoningAgent) -> str:
+    """
+    Knowledge base version, combined with the learned pattern weights once
+    feedback has produced any, so re-learning the weights also invalidates
+    earlier reports. Fits FailureAnalysis.knowledge_version.
+    """
+    weights_version = agent.pattern_weights.current_version()
+    if not weights_version:
+        return agent.kb.version
+    return hashlib.sha256(f"{agent.kb.version}:{weights_version}".encode()).hexdigest()[:16]
+
+
+def _find_analysis(db: Session, test_case_id: int, fingerprint: str, knowledge_version: str):
+    return db.query(FailureAnalysis).filter(
+        FailureAnalysis.test_case_id == test_case_id,
+        FailureAnalysis.log_fingerprint == fingerprint,
+        FailureAnalysis.knowledge_version == knowledge_version
+    ).first()
+
+
+def find_stored_analyses(db: Session, items: List[Tuple[int, str]]) -> List[Optional[FailureAnalysis]]:
+    """
+    Stored analyses for many (test case id, execution log) pairs in one
+    query, aligned with `items`; None where get_or_create_analysis would miss.
+    """
+    if not items:
+        return []
+    knowledge_version = analysis_version(get_reasoning_agent())
+    keys = [(test_case_id, log_fingerprint(execution_log)) for test_case_id, execution_log in items]
+    stored = {
+        (analysis.test_case_id, analysis.log_fingerprint): analysis
+        for analysis in db.query(FailureAnalysis).filter(
+            FailureAnalysis.knowledge_version == knowledge_version,
+            FailureAnalysis.test_case_id.in_({test_case_id for test_case_id, _ in keys}),
+            FailureAnalysis.log_fingerprint.in_({fingerprint for _, fingerprint in keys})
+        )
+    }
+    return [stored.get(key) for key in keys]
+
+
+def get_or_create_analysis(
+    db: Session,
+    test_case: TestCase,
+    execution_log: str,
+    user_id: Optional[int] = None,
+    report: Optional[Dict] = None
+) -> Tuple[FailureAnalysis, bool]:
+    """
+    Return the stored analysis for this failure, running the agent only on a miss.
+
+    Reports are keyed by test case, log fingerprint and analysis_version,
+    so editing the rules or re-learning pattern weights invalidates
+    earlier reports; a hit returns the stored report unchanged, without
+    searching the similarity index again. Each new report's suggestions
+    are also stored as TestCaseSuggestion rows, and the failure is added
+    to the similarity index. A `report` already computed for this log
+    (batch analysis workers) is stored on a miss instead of running the
+    agent again. Returns (analysis, cached).
+    """
+    agent = get_reasoning_agent()
+    fingerprint = log_fingerprint(execution_log)
+
+    existing = _find_analysis(db, test_case.id, fingerprint, analysis_version(agent))
+    if existing:
+        return existing, True
+
+    if report is None:
+        report = agent.analyze_failure(test_case, execution_log).to_dict()
+    return _store_analysis(db, agent, test_case, fingerprint, report, execution_log, user_id)
+
+
+def analyze_log_stream(
+    db: Session,
+    test_case: TestCase,
+    fileobj: BinaryIO,
+    user_id: Optional[int] = None
+) -> Tuple[FailureAnalysis, bool]:
+    """
+    get_or_create_analysis for a log read from a binary stream.
+
+    The log is scanned and fingerprinted block by block in one pass, so
+    memory does not grow with its size; a stored report for the same
+    fingerprint is returned as with a log posted in the request body.
+    """
+    agent = get_reasoning_agent()
+    stream = agent.stream_scan()
+    fingerprint = LogFingerprint()
+    for block in iter_log_blocks(fileobj):
+        stream.feed(block)
+        fingerprint.update(block)
+
+    existing = _find_analysis(db, test_case.id, fingerprint.hexdigest(), analysis_version(agent))
+    if existing:
+        return existing, True
+
+    scan = stream.finish()
+    report = agent.analyze_scan(test_case, scan).to_dict()
+    return _store_analysis(db, agent, test_case, fingerprint.hexdigest(), report, scan.log, user_id)
+
+
+def _store_analysis(
+    db: Session,
+    agent: ReasoningAgent,
+    test_case: TestCase,
+    fingerprint: str,
+    report: Dict,
+    similarity_text: str,
+    user_id: Optional[int]
+) -> Tuple[FailureAnalysis, bool]:
+    knowledge_version = analysis_version(agent)
+    analysis = FailureAnalysis(
+        test_case_id=test_case.id,
+        log_fingerprint=fingerprint,
+        knowledge_version=knowledge_version,
+        failure_type=report["failure_type"],
+        confidence_score=report["confidence_score"],
+        report=report,
+        created_by_id=user_id
+    )
+    analysis.suggestions = [
+        TestCaseSuggestion(
+            test_case_id=test_case.id,
+            suggestion_type="fix_suggestion",
+            priority=suggestion["priority"],
+            action=suggestion["action"],
+            details=suggestion["details"],
+            code_locations=suggestion["code_locations"],
+            verification_steps=suggestion["verification_steps"],
+            estimated_effort_hours=suggestion["estimated_effort_hours"],
+            failure_type=report["failure_type"],
+            confidence_score=report["confidence_score"],
+            matched_rule_id=suggestion.get("rule_id")
+        )
+        for suggestion in report["suggestions"]
+    ]
+    db.add(analysis)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request stored the same failure first
+        db.rollback()
+        existing = _find_analysis(db, test_case.id, fingerprint, knowledge_version)
+        if existing is None:
+            raise
+        return existing, True
+
+    db.refresh(analysis)
+    agent.similarity_index.add(
+        failure_text(similarity_text, test_case.actual_results),
+        test_case_id=test_case.id,
+        test_case_name=test_case.test_case_id,
+        failure_type=analysis.failure_type,
+        analysis_id=analysis.id
+    )
+    return analysis, False
+
+
+def get_analysis_stats(db: Session, now: Optional[datetime] = None) -> Dict:
+    """Analysis metrics from aggregate queries over stored reports and feedback"""
+    now = now or datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+
+    total, this_week, average_confidence = db.query(
+        func.count(FailureAnalysis.id),
+        func.sum(case((FailureAnalysis.created_at >= week_ago, 1), else_=0)),
+        func.avg(FailureAnalysis.confidence_score)
+    ).one()
+
+    failure_types = db.query(
+        FailureAnalysis.failure_type,
+        func.count(FailureAnalysis.id).label("count")
+    ).group_by(FailureAnalysis.failure_type).order_by(func.count(FailureAnalysis.id).desc()).all()
+
+    helpful_count = func.sum(case((SuggestionFeedback.helpful.is_(True), 1), else_=0))
+    feedback_count = func.count(SuggestionFeedback.id)
+    rules = db.query(
+        TestCaseSuggestion.matched_rule_id,
+        helpful_count.label("helpful"),
+        feedback_count.label("feedback")
+    ).join(
+        SuggestionFeedback, SuggestionFeedback.suggestion_id == TestCaseSuggestion.id
+    ).filter(
+        TestCaseSuggestion.matched_rule_id.isnot(None)
+    ).group_by(TestCaseSuggestion.matched_rule_id).order_by(
+        helpful_count.desc(), feedback_count.desc()
+    ).limit(5).all()
+
+    return {
+        "total_analyses": total or 0,
+        "analyses_this_week": int(this_week or 0),
+        "average_confidence": round(float(average_confidence or 0.0), 3),
+        "most_common_failure_type": failure_types[0].failure_type if failure_types else None,
+        "failure_types": {row.failure_type: row.count for row in failure_types},
+        "most_helpful_rules": [
+            {
+                "rule_id": row.matched_rule_id,
+                "helpful": int(row.helpful or 0),
+                "feedback": row.feedback,
+                "helpful_rate": round(int(row.helpful or 0) / row.feedback, 3) if row.feedback else 0.0
+            }
+            for row in rules
+        ]
+    }
@@ -8,6 +8,7 @@ from sqlalchemy import or_
 from app.models.requirement import Requirement
 from app.models.traceability import TraceabilityLink
 from app.models.test_case import TestCase
+from app.models.impact_analysis import ImpactAnalysisReport, RiskLevel
 from datetime import datetime
 import logging
 
@@ -674,3 +675,32 @@ class ImpactAnalysisService:
             effort *= 1.25
 
         return round(effort, 1)
+
+    def save_report(self, result: ImpactAnalysisResult, analyzed_by_id: int) -> ImpactAnalysisReport:
+        """Persist an analysis result as an ImpactAnalysisReport"""
+        report = ImpactAnalysisReport(
+            requirement_id=result.requirement.id,
+            analyzed_by_id=analyzed_by_id,
+            risk_score=result.risk_score.score,
+            risk_level=RiskLevel[result.risk_score.level],
+            upstream_count=len(result.upstream),
+            downstream_count=len(result.downstream),
+            test_case_count=len(result.affected_test_cases),
+            regulatory_impact=len(result.regulatory_implications) > 0,
+            upstream_tree=[node.to_dict() for node in result.upstream],
+            downstream_tree=[node.to_dict() for node in result.downstream],
+            affected_requirements=[node.id for node in result.upstream + result.downstream],
+            affected_test_cases=result.affected_test_cases,
+            recommendations=result.recommendations,
+            regulatory_implications=result.regulatory_implications,
+            risk_factors=result.risk_score.factors,
+            estimated_effort_hours=result.estimated_effort_hours,
+            stats=result.stats
+        )
+
+        self.db.add(report)
+        self.db.commit()
+        self.db.refresh(report)
+
+        logger.info(f"Impact analysis report {report.id} created")
+        return report
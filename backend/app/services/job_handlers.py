@@ -0,0 +1,181 @@
+"""
+Background Job Handlers
+Long-running operations runnable through the job queue
+"""
+
+from typing import Dict
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import get_settings
+from app.models.test_case import TestCase
+from app.schemas.impact_analysis import AnalyzeImpactRequest
+from app.schemas.job import (
+    CoverageSnapshotJobParams,
+    FailureAnalysisJobParams,
+    TestExecutionMaintenanceJobParams,
+    TraceabilityImportJobParams
+)
+from app.services.coverage_analyzer import CoverageAnalyzer
+from app.services.coverage_rollups import rebuild_rollups
+from app.services.failure_analysis import get_or_create_analysis
+from app.services.requirement_counters import reconcile_requirement_counters
+from app.services.impact_analysis import ImpactAnalysisConfig, ImpactAnalysisService
+from app.services.jobs import JobContext, register_job, register_periodic_job
+from app.services.pattern_learning import learn_pattern_confidence
+from app.services.test_executions import ensure_partitions, purge_executions
+from app.services.traceability_import import import_traceability_links
+
+settings = get_settings()
+
+
+@register_job("impact_analysis", AnalyzeImpactRequest)
+def run_impact_analysis(db: Session, context: JobContext, params: AnalyzeImpactRequest) -> Dict:
+    """Impact analysis for a requirement; the full report is stored as an ImpactAnalysisReport"""
+    config = None
+    if params.config:
+        config = ImpactAnalysisConfig(
+            max_depth=params.config.max_depth,
+            include_test_cases=params.config.include_test_cases,
+            include_regulatory=params.config.include_regulatory,
+            weights=params.config.weights
+        )
+
+    context.progress(0.0, "Traversing traceability graph", force=True)
+    service = ImpactAnalysisService(db)
+    result = service.analyze_impact(params.requirement_id, config)
+
+    context.progress(0.9, "Saving report", force=True)
+    report = service.save_report(result, context.user_id)
+
+    return {
+        "report_id": report.id,
+        "requirement_id": params.requirement_id,
+        "risk_score": report.risk_score,
+        "risk_level": report.risk_level.value,
+        "upstream_count": report.upstream_count,
+        "downstream_count": report.downstream_count,
+        "test_case_count": report.test_case_count,
+        "estimated_effort_hours": report.estimated_effort_hours
+    }
+
+
+@register_job("coverage_snapshot", CoverageSnapshotJobParams)
+def run_coverage_snapshot(db: Session, context: JobContext, params: CoverageSnapshotJobParams) -> Dict:
+    """Coverage counts stored as a CoverageSnapshot (also queued every COVERAGE_SNAPSHOT_INTERVAL_MINUTES)"""
+    context.progress(0.0, "Counting coverage", force=True)
+    snapshot = CoverageAnalyzer(db).create_snapshot(context.user_id)
+
+    return {
+        "snapshot_id": snapshot.id,
+        "total_requirements": snapshot.total_requirements,
+        "covered_requirements": snapshot.covered_requirements,
+        "coverage_percentage": snapshot.coverage_percentage,
+        "total_gaps": snapshot.total_gaps,
+        "critical_gaps": snapshot.critical_gaps
+    }
+
+
+register_periodic_job("coverage_snapshot", lambda: settings.coverage_snapshot_interval_minutes * 60)
+
+
+@register_job("coverage_rollup_rebuild", CoverageSnapshotJobParams)
+def run_coverage_rollup_rebuild(db: Session, context: JobContext, params: CoverageSnapshotJobParams) -> Dict:
+    """Recompute the coverage trend rollups from all snapshots"""
+    context.progress(0.0, "Aggregating snapshots", force=True)
+    return rebuild_rollups(db)
+
+
+@register_job("test_execution_maintenance", TestExecutionMaintenanceJobParams)
+def run_test_execution_maintenance(
+    db: Session, context: JobContext, params: TestExecutionMaintenanceJobParams
+) -> Dict:
+    """Create upcoming history partitions and purge executions past retention (also queued daily)"""
+    context.progress(0.0, "Creating partitions", force=True)
+    partitions = ensure_partitions(db)
+
+    context.progress(0.5, "Purging old executions", force=True)
+    result = purge_executions(db, params.retention_days)
+    return {"partitions": partitions, **result}
+
+
+register_periodic_job("test_execution_maintenance", lambda: 24 * 3600)
+
+
+@register_job("requirement_counter_reconcile", CoverageSnapshotJobParams)
+def run_requirement_counter_reconcile(db: Session, context: JobContext, params: CoverageSnapshotJobParams) -> Dict:
+    """Recount every requirement's test cases and trace links, repairing drifted counters (also queued daily)"""
+    context.progress(0.0, "Recounting test cases and trace links", force=True)
+    return reconcile_requirement_counters(db)
+
+
+register_periodic_job("requirement_counter_reconcile", lambda: 24 * 3600)
+
+
+@register_job("pattern_confidence_learning", CoverageSnapshotJobParams)
+def run_pattern_confidence_learning(db: Session, context: JobContext, params: CoverageSnapshotJobParams) -> Dict:
+    """Roll suggestion feedback into pattern confidence and reload the learned weights (also queued daily)"""
+    context.progress(0.0, "Aggregating suggestion feedback", force=True)
+    return learn_pattern_confidence(db)
+
+
+register_periodic_job("pattern_confidence_learning", lambda: 24 * 3600)
+
+
+@register_job("traceability_import", TraceabilityImportJobParams)
+def run_traceability_import(db: Session, context: JobContext, params: TraceabilityImportJobParams) -> Dict:
+    """Bulk traceability link import (the /traceability/bulk endpoint without its size cap)"""
+    def on_progress(done: int, total: int):
+        context.progress(done / total, f"Checked {done} of {total} links")
+
+    return import_traceability_links(
+        db, params.links, params.skip_duplicates, context.user_id, on_progress=on_progress
+    )
+
+
+@register_job("failure_analysis", FailureAnalysisJobParams)
+def run_failure_analysis(db: Session, context: JobContext, params: FailureAnalysisJobParams) -> Dict:
+    """
+    Analyze many failed test cases.
+
+    Each report is stored like one from /test-cases/{id}/analyze, so
+    failures analyzed before are served from the store.
+    """
+    test_case_ids = {item.test_case_id for item in params.items}
+    test_cases = {
+        test_case.id: test_case
+        for test_case in db.query(TestCase).options(
+            joinedload(TestCase.requirement)
+        ).filter(TestCase.id.in_(test_case_ids))
+    }
+
+    results = []
+    analyzed = cached = failed = 0
+    total = len(params.items)
+    for done, item in enumerate(params.items, start=1):
+        test_case = test_cases.get(item.test_case_id)
+        if test_case is None:
+            results.append({"test_case_id": item.test_case_id, "error": f"Test case {item.test_case_id} not found"})
+            failed += 1
+        else:
+            analysis, was_cached = get_or_create_analysis(db, test_case, item.execution_log, context.user_id)
+            results.append({
+                "test_case_id": test_case.id,
+                "test_case_name": test_case.test_case_id,
+                "analysis_id": analysis.id,
+                "cached": was_cached,
+                "failure_type": analysis.failure_type,
+                "confidence_score": analysis.confidence_score
+            })
+            if was_cached:
+                cached += 1
+            else:
+                analyzed += 1
+        context.progress(done / total, f"Analyzed {done} of {total} failures")
+
+    return {
+        "analyzed": analyzed,
+        "cached": cached,
+        "failed": failed,
+        "results": results
+    }
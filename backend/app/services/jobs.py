@@ -0,0 +1,367 @@
+"""
+Background Job Queue
+Database-backed job queue: submission, claiming, execution and progress reporting
+"""
+
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Minimum seconds between progress writes from one job
+PROGRESS_INTERVAL = 0.5
+# Seconds between one worker's checks for due periodic jobs
+SCHEDULE_CHECK_SECONDS = 30.0
+TERMINAL_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+@dataclass(frozen=True)
+class JobType:
+    """A registered job type: its handler and the model its params must validate against"""
+    name: str
+    handler: Callable[[Session, "JobContext", BaseModel], Dict]
+    params_model: Type[BaseModel]
+
+
+_job_types: Dict[str, JobType] = {}
+_periodic_jobs: Dict[str, Callable[[], float]] = {}
+
+
+def register_job(name: str, params_model: Type[BaseModel]):
+    """
+    Decorator registering a job handler.
+
+    The handler is called as handler(db, context, params) in the worker,
+    with `params` validated against `params_model`, and returns the
+    JSON-serializable job result.
+    """
+    def decorator(handler):
+        _job_types[name] = JobType(name=name, handler=handler, params_model=params_model)
+        return handler
+    return decorator
+
+
+def register_periodic_job(name: str, interval_seconds: Callable[[], float]) -> None:
+    """
+    Have workers queue a registered job type on a schedule.
+
+    `interval_seconds` is read on every check (so it can follow a
+    setting); 0 or less disables the schedule. The job is queued with
+    its params model's defaults.
+    """
+    _periodic_jobs[name] = interval_seconds
+
+
+def get_job_types() -> Dict[str, JobType]:
+    """All registered job types"""
+    import app.services.job_handlers  # noqa: F401  (registers the built-in handlers)
+    return _job_types
+
+
+class JobContext:
+    """
+    Handed to a running handler for progress reporting.
+
+    Progress goes through its own short-lived session, so pollers see it
+    while the handler's transaction is still open; writes are throttled to
+    one per PROGRESS_INTERVAL seconds.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], job: Job, worker_id: str):
+        self.session_factory = session_factory
+        self.job_id = job.id
+        self.user_id = job.created_by_id
+        self.worker_id = worker_id
+        self._written_at: Optional[float] = None
+
+    def progress(self, fraction: float, message: Optional[str] = None, force: bool = False) -> None:
+        """Report progress (0.0 - 1.0) with an optional status line"""
+        now = time.monotonic()
+        if not force and self._written_at is not None and now - self._written_at < PROGRESS_INTERVAL:
+            return
+        self._written_at = now
+        values = {"progress": round(min(max(fraction, 0.0), 1.0), 4), "heartbeat_at": datetime.utcnow()}
+        if message is not None:
+            values["progress_message"] = message[:255]
+        _update_owned_job(self.session_factory, self.job_id, self.worker_id, values)
+
+
+def _update_owned_job(session_factory: Callable[[], Session], job_id: int, worker_id: str, values: Dict) -> bool:
+    """Update a running job only while this worker still owns it (it may have been requeued)"""
+    db = session_factory()
+    try:
+        updated = db.query(Job).filter(
+            Job.id == job_id,
+            Job.worker_id == worker_id,
+            Job.status == JobStatus.RUNNING
+        ).update(values, synchronize_session=False)
+        db.commit()
+        return updated > 0
+    finally:
+        db.close()
+
+
+def submit_job(db: Session, job_type: str, params: Dict, user_id: int) -> Job:
+    """
+    Validate and queue a job.
+
+    Raises ValueError for an unknown job type and pydantic's
+    ValidationError for invalid parameters.
+    """
+    registered = get_job_types().get(job_type)
+    if registered is None:
+        raise ValueError(f"Unknown job type: {job_type}")
+
+    validated = registered.params_model.model_validate(params)
+    job = Job(
+        job_type=job_type,
+        status=JobStatus.QUEUED,
+        params=validated.model_dump(mode="json"),
+        progress=0.0,
+        attempts=0,
+        created_by_id=user_id
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    logger.info(f"Job {job.id} ({job_type}) queued by user {user_id}")
+    return job
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[int]:
+    """
+    Atomically take the oldest queued job; returns its id or None.
+
+    SKIP LOCKED lets concurrent workers pass over a row another worker is
+    claiming (PostgreSQL); the conditional UPDATE is what guarantees a job
+    is claimed once on every backend.
+    """
+    for _ in range(5):
+        candidate = db.query(Job.id).filter(
+            Job.status == JobStatus.QUEUED
+        ).order_by(Job.id).limit(1).with_for_update(skip_locked=True).first()
+        if candidate is None:
+            db.commit()
+            return None
+
+        now = datetime.utcnow()
+        claimed = db.query(Job).filter(
+            Job.id == candidate.id,
+            Job.status == JobStatus.QUEUED
+        ).update({
+            "status": JobStatus.RUNNING,
+            "worker_id": worker_id,
+            "attempts": Job.attempts + 1,
+            "progress": 0.0,
+            "progress_message": None,
+            "started_at": now,
+            "heartbeat_at": now
+        }, synchronize_session=False)
+        db.commit()
+        if claimed:
+            return candidate.id
+    return None
+
+
+def schedule_due_jobs(db: Session) -> List[Job]:
+    """
+    Queue periodic jobs whose interval has passed since they were last queued.
+
+    A job type with a queued or running job is never queued again, so a
+    slow run does not pile up behind itself. Workers checking at the same
+    time may all find a job due; the ix_jobs_scheduled_active unique index
+    lets only the first insert through and the others skip it. Returns the
+    jobs queued.
+    """
+    job_types = get_job_types()
+    now = datetime.utcnow()
+    queued = []
+    for name, interval_seconds in _periodic_jobs.items():
+        seconds = interval_seconds()
+        if seconds <= 0:
+            continue
+        recent = db.query(Job.id).filter(
+            Job.job_type == name,
+            or_(
+                Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+                Job.created_at >= now - timedelta(seconds=seconds)
+            )
+        ).first()
+        if recent is not None:
+            continue
+        job = Job(
+            job_type=name,
+            status=JobStatus.QUEUED,
+            params=job_types[name].params_model().model_dump(mode="json"),
+            progress=0.0,
+            attempts=0
+        )
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker queued it first
+            db.rollback()
+            continue
+        queued.append(job)
+
+    if queued:
+        logger.info(f"Scheduled jobs queued: {', '.join(job.job_type for job in queued)}")
+    return queued
+
+
+def requeue_stale_jobs(
+    db: Session,
+    stale_seconds: Optional[int] = None,
+    max_attempts: Optional[int] = None
+) -> int:
+    """
+    Recover jobs whose worker stopped heartbeating.
+
+    They are queued again, or failed once they have used `max_attempts`
+    executions. Returns the number of jobs recovered.
+    """
+    stale_seconds = stale_seconds if stale_seconds is not None else settings.job_stale_seconds
+    max_attempts = max_attempts if max_attempts is not None else settings.job_max_attempts
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+    stale = [Job.status == JobStatus.RUNNING, Job.heartbeat_at < cutoff]
+
+    failed = db.query(Job).filter(*stale, Job.attempts >= max_attempts).update({
+        "status": JobStatus.FAILED,
+        "error": f"Worker stopped responding ({max_attempts} attempts)",
+        "finished_at": datetime.utcnow()
+    }, synchronize_session=False)
+    requeued = db.query(Job).filter(*stale, Job.attempts < max_attempts).update({
+        "status": JobStatus.QUEUED,
+        "worker_id": None
+    }, synchronize_session=False)
+    db.commit()
+
+    if failed or requeued:
+        logger.warning(f"Recovered stale jobs: {requeued} requeued, {failed} failed")
+    return failed + requeued
+
+
+def run_job(session_factory: Callable[[], Session], job_id: int, worker_id: str) -> JobStatus:
+    """
+    Execute a claimed job and record its outcome.
+
+    A heartbeat thread keeps the job from being taken for stale while a
+    handler runs without reporting progress.
+    """
+    db = session_factory()
+    stop = threading.Event()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        context = JobContext(session_factory, job, worker_id)
+
+        heartbeat_interval = max(settings.job_stale_seconds / 4, 1.0)
+
+        def heartbeat():
+            while not stop.wait(heartbeat_interval):
+                _update_owned_job(session_factory, job_id, worker_id, {"heartbeat_at": datetime.utcnow()})
+
+        threading.Thread(target=heartbeat, name=f"job-{job_id}-heartbeat", daemon=True).start()
+
+        started = time.monotonic()
+        try:
+            registered = get_job_types().get(job.job_type)
+            if registered is None:
+                raise ValueError(f"Unknown job type: {job.job_type}")
+            result = registered.handler(db, context, registered.params_model.model_validate(job.params))
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Job {job_id} ({job.job_type}) failed: {e}", exc_info=True)
+            status, values = JobStatus.FAILED, {"error": f"{type(e).__name__}: {e}"}
+        else:
+            status, values = JobStatus.SUCCEEDED, {"result": result, "progress": 1.0}
+            logger.info(f"Job {job_id} ({job.job_type}) succeeded in {time.monotonic() - started:.1f}s")
+
+        stop.set()
+        values.update({"status": status, "finished_at": datetime.utcnow()})
+        if not _update_owned_job(session_factory, job_id, worker_id, values):
+            logger.warning(f"Job {job_id} was requeued while running; its outcome was discarded")
+        return status
+    finally:
+        stop.set()
+        db.close()
+
+
+class Worker:
+    """
+    Job worker loop.
+
+    Each iteration recovers stale jobs, queues due periodic jobs (with
+    `schedule`), claims the oldest queued job and runs it; with an empty
+    queue it sleeps `poll_interval` seconds. Several workers (processes or
+    hosts) may share one database.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        worker_id: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        schedule: bool = True
+    ):
+        if session_factory is None:
+            from app.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval if poll_interval is not None else settings.job_poll_interval_seconds
+        self.schedule = schedule
+        self._scheduled_at: Optional[float] = None
+        self._stopping = threading.Event()
+
+    def run_once(self) -> bool:
+        """Run at most one job; returns False when the queue was empty"""
+        db = self.session_factory()
+        try:
+            requeue_stale_jobs(db)
+            now = time.monotonic()
+            if self.schedule and (self._scheduled_at is None or now - self._scheduled_at >= SCHEDULE_CHECK_SECONDS):
+                self._scheduled_at = now
+                schedule_due_jobs(db)
+            job_id = claim_next_job(db, self.worker_id)
+        finally:
+            db.close()
+
+        if job_id is None:
+            return False
+        run_job(self.session_factory, job_id, self.worker_id)
+        return True
+
+    def run(self, burst: bool = False) -> None:
+        """Process jobs until stopped (SIGINT / SIGTERM), or until the queue is empty with `burst`"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stop())
+            signal.signal(signal.SIGINT, lambda *_: self.stop())
+
+        logger.info(f"Job worker {self.worker_id} started")
+        while not self._stopping.is_set():
+            if not self.run_once():
+                if burst:
+                    break
+                self._stopping.wait(self.poll_interval)
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    def stop(self) -> None:
+        """Finish the current job, then exit the loop"""
+        self._stopping.set()
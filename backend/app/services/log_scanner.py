@@ -0,0 +1,383 @@
+"""
+Single-pass Log Scanner for Test Failure Analysis
+Finds every keyword, indicator and classifier term in one scan of the log
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, FrozenSet, Iterable, Iterator, List, Optional, Pattern, Set
+
+# Vocabulary reported as failure keywords (whole-word matches)
+KEYWORD_TERMS = (
+    "weight", "fuel", "passenger", "cargo", "balance",
+    "altitude", "airspeed", "velocity", "acceleration",
+    "temperature", "pressure", "density",
+    "exceeded", "invalid", "failed", "error", "timeout",
+    "sensor", "actuator", "control", "system",
+)
+
+# Substrings the failure classifier looks for in the log
+CLASSIFIER_TERMS = (
+    "timed out", "race condition", "deadlock", "cfr", "regulation", "compliance",
+)
+
+# Error message markers, in priority order, with the regex that extracts the message
+ERROR_MARKERS = (
+    ("error:", re.compile(r"Error:\s*(.+?)(?:\n|$)", re.IGNORECASE)),
+    ("failed:", re.compile(r"Failed:\s*(.+?)(?:\n|$)", re.IGNORECASE)),
+    ("assertionerror:", re.compile(r"AssertionError:\s*(.+?)(?:\n|$)", re.IGNORECASE)),
+    ("exception:", re.compile(r"Exception:\s*(.+?)(?:\n|$)", re.IGNORECASE)),
+)
+
+# Numeric values with units, e.g. "12500 lbs"; the left word boundary is checked in code.
+# Same language as (\d+\.\d+|\d+), but starting with a single character class lets
+# the regex engine skip non-candidate positions quickly.
+UNIT_PATTERN = r"[\d](?:\d*\.\d+|\d*)\s*(?:lbs|kg|ft|m|kts|mph)\b"
+
+STACK_TRACE_MARKERS = ("Traceback", "at ")
+MAX_STACK_LINES = 10
+MAX_ERROR_MESSAGE_FALLBACK = 200
+
+# Streaming limits: longer lines are cut, and only the head of the log is retained
+MAX_LINE_LENGTH = 64 * 1024
+EXCERPT_LENGTH = 64 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def build_trie_regex(terms: Iterable[str]) -> str:
+    """
+    Regex alternation for `terms` with shared prefixes factored into a trie.
+
+    Continuations are tried before shorter terms end, so a match at any
+    position is the longest term starting there.
+    """
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def render(node: Dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+
+    return render(trie)
+
+
+@dataclass
+class LogScan:
+    """Everything the reasoning steps need from one execution log"""
+    log: str
+    vocabulary: FrozenSet[str]
+    terms: FrozenSet[str]
+    keywords: List[str]
+    error_message: str
+    stack_trace: List[str]
+    # Sources of the pattern regexes that matched a line (streamed scans only)
+    regex_hits: Optional[FrozenSet[str]] = None
+    _lowered: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def lowered(self) -> str:
+        """Lower-cased log, only materialised for terms outside the scanned vocabulary"""
+        if self._lowered is None:
+            self._lowered = self.log.lower()
+        return self._lowered
+
+    def contains(self, term: str) -> bool:
+        """Case-insensitive substring check, answered from the scan when possible"""
+        term = term.lower()
+        if term in self.vocabulary:
+            return term in self.terms
+        return term in self.lowered
+
+
+class LogScanner:
+    """
+    Compiled multi-term matcher.
+
+    One trie regex covers keyword vocabulary, classifier terms, error
+    markers and any extra terms (root-cause indicators); numeric values with
+    units are a second branch of the same regex. The scan advances one
+    character past each match start so overlapping terms are still found,
+    and a prefix map reports every shorter term ending inside the longest
+    match at a position.
+    """
+
+    def __init__(self, extra_terms: Iterable[str] = ()):
+        self.keyword_terms = frozenset(KEYWORD_TERMS)
+        self.marker_terms = frozenset(marker for marker, _ in ERROR_MARKERS)
+        terms = {term.lower() for term in extra_terms if term}
+        terms |= set(CLASSIFIER_TERMS) | self.keyword_terms | self.marker_terms
+        self.vocabulary = frozenset(terms)
+
+        trie = build_trie_regex(self.vocabulary)
+        self._term_regex = re.compile(trie)
+        self._regex = re.compile(f"(?P<unit>{UNIT_PATTERN})|(?P<term>{trie})")
+
+        # For each term, every scanned term that is a prefix of it (itself included)
+        self._prefixes = {
+            term: [term[:i] for i in range(1, len(term) + 1) if term[:i] in self.vocabulary]
+            for term in self.vocabulary
+        }
+
+    def scan(self, log: str) -> LogScan:
+        """Lower-case the log once and collect every hit in a single pass"""
+        lowered = log.lower()
+        found = set()
+        keywords = set()
+        marker_positions: Dict[str, List[int]] = {marker: [] for marker in self.marker_terms}
+        self._match(lowered, found, keywords, marker_positions)
+
+        return LogScan(
+            log=log,
+            vocabulary=self.vocabulary,
+            terms=frozenset(found),
+            keywords=list(keywords),
+            error_message=self._error_message(log, lowered, marker_positions),
+            stack_trace=self._stack_trace(log),
+            _lowered=lowered,
+        )
+
+    def stream(self, regexes: Iterable[Pattern] = ()) -> "StreamingLogScan":
+        """Incremental scan fed line by line; `regexes` are evaluated per line"""
+        return StreamingLogScan(self, regexes)
+
+    def _match(
+        self,
+        lowered: str,
+        found: Set[str],
+        keywords: Set[str],
+        marker_positions: Dict[str, List[int]]
+    ) -> None:
+        """Collect terms, keywords and marker positions from lower-cased text"""
+        length = len(lowered)
+        unit_end = 0
+
+        pos = 0
+        while True:
+            match = self._regex.search(lowered, pos)
+            if match is None:
+                break
+            start = match.start()
+            matched_term = match.group("term")
+
+            if matched_term is None:
+                # Unit branch: mirror `\b...\b` finditer semantics (word boundary, no overlap)
+                if start >= unit_end and (start == 0 or not _is_word_char(lowered[start - 1])):
+                    keywords.add(match.group("unit"))
+                    unit_end = match.end()
+                term_match = self._term_regex.match(lowered, start)
+                matched_term = term_match.group(0) if term_match else None
+
+            if matched_term:
+                for term in self._prefixes[matched_term]:
+                    found.add(term)
+                    if term in self.keyword_terms:
+                        end = start + len(term)
+                        if (start == 0 or not _is_word_char(lowered[start - 1])) and \
+                                (end == length or not _is_word_char(lowered[end])):
+                            keywords.add(term)
+                    elif term in marker_positions:
+                        marker_positions[term].append(start)
+
+            pos = start + 1
+
+    @staticmethod
+    def _error_message(log: str, lowered: str, marker_positions: Dict[str, List[int]]) -> str:
+        """Primary error message, using marker positions found by the scan"""
+        aligned = len(lowered) == len(log)
+        for marker, regex in ERROR_MARKERS:
+            if not aligned:
+                # Lower-casing changed offsets (rare Unicode); search the original log
+                match = regex.search(log)
+                if match:
+                    return match.group(1).strip()
+                continue
+            for position in marker_positions[marker]:
+                match = regex.match(log, position)
+                if match:
+                    return match.group(1).strip()
+
+        # Fallback: first line of log
+        return log.partition("\n")[0][:MAX_ERROR_MESSAGE_FALLBACK]
+
+    @staticmethod
+    def _stack_trace(log: str) -> List[str]:
+        """Up to 10 stripped lines starting at the first stack-trace marker line"""
+        positions = [p for p in (log.find(marker) for marker in STACK_TRACE_MARKERS) if p >= 0]
+        if not positions:
+            return []
+
+        line_start = log.rfind("\n", 0, min(positions)) + 1
+        lines = []
+        while len(lines) < MAX_STACK_LINES:
+            line_end = log.find("\n", line_start)
+            if line_end < 0:
+                lines.append(log[line_start:].strip())
+                break
+            lines.append(log[line_start:line_end].strip())
+            line_start = line_end + 1
+        return lines
+
+
+class StreamingLogScan:
+    """
+    LogScan built from a log fed in blocks of whole lines, in constant memory.
+
+    Only the scan results are kept: terms and keyword hits, the first
+    message for each error marker, a stack-trace window of at most
+    MAX_STACK_LINES lines, matched regex sources and the first
+    EXCERPT_LENGTH characters of the log. The excerpt stands in for the log
+    where a step needs raw text (terms outside the scanned vocabulary,
+    similarity search). Terms and regexes never span lines, so each block
+    is scanned like a whole log; only error messages and the stack-trace
+    window carry over from one block to the next.
+    """
+
+    def __init__(self, scanner: LogScanner, regexes: Iterable[Pattern] = ()):
+        self.scanner = scanner
+        self._pending_regexes = {regex.pattern: regex for regex in regexes}
+        self.regex_hits: Set[str] = set()
+        self.terms: Set[str] = set()
+        self.keywords: Set[str] = set()
+        self.messages: Dict[str, str] = {}
+        self._awaiting: List[str] = []  # Markers whose message starts in a later block
+        self.first_line: Optional[str] = None
+        self.stack_trace: List[str] = []
+        self._excerpt: List[str] = []
+        self._excerpt_length = 0
+
+    def feed(self, text: str) -> None:
+        """Scan one or more complete lines (joined by newlines, no trailing newline)"""
+        if self.first_line is None:
+            self.first_line = text.partition("\n")[0]
+
+        if self._excerpt_length < EXCERPT_LENGTH:
+            piece = text[:EXCERPT_LENGTH - self._excerpt_length]
+            self._excerpt.append(piece)
+            self._excerpt_length += len(piece) + 1
+
+        lowered = text.lower()
+        marker_positions: Dict[str, List[int]] = {marker: [] for marker in self.scanner.marker_terms}
+        self.scanner._match(lowered, self.terms, self.keywords, marker_positions)
+        self._collect_messages(text, lowered, marker_positions)
+        self._collect_stack_trace(text)
+
+        if self._pending_regexes:
+            for source, regex in list(self._pending_regexes.items()):
+                if regex.search(text):
+                    self.regex_hits.add(source)
+                    del self._pending_regexes[source]
+
+    def _collect_messages(self, text: str, lowered: str, marker_positions: Dict[str, List[int]]) -> None:
+        if self._awaiting:
+            # `\s*` after a marker skips blank lines, so the message is the next non-blank line
+            leading = text.lstrip()
+            if leading:
+                message = leading.partition("\n")[0].strip()
+                for marker in self._awaiting:
+                    self.messages.setdefault(marker, message)
+                self._awaiting = []
+
+        aligned = len(lowered) == len(text)
+        for marker, regex in ERROR_MARKERS:
+            if marker in self.messages or not marker_positions[marker]:
+                continue
+            match = None
+            if aligned:
+                for position in marker_positions[marker]:
+                    match = regex.match(text, position)
+                    if match:
+                        break
+            else:
+                match = regex.search(text)
+            if match is not None and match.group(1).strip():
+                self.messages[marker] = match.group(1).strip()
+            elif marker not in self._awaiting:
+                # Nothing but whitespace after the marker in this block
+                self._awaiting.append(marker)
+
+    def _collect_stack_trace(self, text: str) -> None:
+        if len(self.stack_trace) >= MAX_STACK_LINES:
+            return
+        if self.stack_trace:
+            line_start = 0
+        else:
+            positions = [p for p in (text.find(marker) for marker in STACK_TRACE_MARKERS) if p >= 0]
+            if not positions:
+                return
+            line_start = text.rfind("\n", 0, min(positions)) + 1
+        while len(self.stack_trace) < MAX_STACK_LINES:
+            line_end = text.find("\n", line_start)
+            if line_end < 0:
+                self.stack_trace.append(text[line_start:].strip())
+                break
+            self.stack_trace.append(text[line_start:line_end].strip())
+            line_start = line_end + 1
+
+    def finish(self) -> LogScan:
+        """Scan results for everything fed so far"""
+        error_message = None
+        for marker, _ in ERROR_MARKERS:
+            if marker in self.messages:
+                error_message = self.messages[marker]
+                break
+        if error_message is None:
+            error_message = (self.first_line or "")[:MAX_ERROR_MESSAGE_FALLBACK]
+
+        return LogScan(
+            log="\n".join(self._excerpt),
+            vocabulary=self.scanner.vocabulary,
+            terms=frozenset(self.terms),
+            keywords=list(self.keywords),
+            error_message=error_message,
+            stack_trace=list(self.stack_trace),
+            regex_hits=frozenset(self.regex_hits),
+        )
+
+
+def iter_log_blocks(fileobj: BinaryIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Decoded blocks of complete lines from a binary log stream.
+
+    Each block is the text of one or more whole lines without the final
+    newline, so blocks joined with newlines reproduce the log. A line
+    longer than MAX_LINE_LENGTH is cut there and the rest of it skipped,
+    keeping memory bounded by the chunk size and the line limit.
+    """
+    limit = MAX_LINE_LENGTH * 4  # Bytes; UTF-8 uses at most 4 per character
+    buffer = b""
+    skipping = False
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        if skipping:
+            newline = chunk.find(b"\n")
+            if newline < 0:
+                continue
+            chunk = chunk[newline + 1:]
+            skipping = False
+        buffer += chunk
+        cut = buffer.rfind(b"\n")
+        if cut >= 0:
+            yield buffer[:cut].decode("utf-8", errors="replace")
+            buffer = buffer[cut + 1:]
+        if len(buffer) > limit:
+            yield buffer[:limit].decode("utf-8", errors="replace")[:MAX_LINE_LENGTH]
+            buffer = b""
+            skipping = True
+    if buffer:
+        yield buffer.decode("utf-8", errors="replace")
@@ -0,0 +1,189 @@
+"""
+Failure Pattern Confidence Learning
+Rolls suggestion feedback into per-pattern confidence and serves it as in-memory score weights
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.test_suggestion import FailurePattern, SuggestionFeedback, TestCaseSuggestion
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Beta prior: a pattern starts at 0.5 confidence, worth PRIOR_STRENGTH votes
+PRIOR_CONFIDENCE = 0.5
+PRIOR_STRENGTH = 4.0
+
+
+def smoothed_confidence(helpful: int, feedback: int) -> float:
+    """Share of helpful votes, pulled towards the prior while feedback is sparse"""
+    return (helpful + PRIOR_CONFIDENCE * PRIOR_STRENGTH) / (feedback + PRIOR_STRENGTH)
+
+
+def confidence_multiplier(confidence: Optional[float]) -> float:
+    """Score weight for a pattern: 0.5 (never helpful) .. 1.0 (prior) .. 1.5 (always helpful)"""
+    if confidence is None:
+        return 1.0
+    return 0.5 + min(max(confidence, 0.0), 1.0)
+
+
+def aggregate_pattern_feedback(db: Session, knowledge_patterns: Optional[Dict[str, Dict]] = None) -> Dict:
+    """
+    Recompute FailurePattern statistics from stored suggestions and feedback.
+
+    One grouped query counts, per matched rule, the analyses it matched
+    and the helpful / total feedback on its suggestions; FailurePattern
+    rows are upserted by rule_id. `knowledge_patterns` (rule_id -> raw
+    pattern) supplies names and categories for new rows.
+    """
+    knowledge_patterns = knowledge_patterns or {}
+    rows = db.query(
+        TestCaseSuggestion.matched_rule_id,
+        func.count(func.distinct(TestCaseSuggestion.analysis_id)).label("matched"),
+        func.sum(case((SuggestionFeedback.helpful.is_(True), 1), else_=0)).label("helpful"),
+        func.count(SuggestionFeedback.id).label("feedback")
+    ).outerjoin(
+        SuggestionFeedback, SuggestionFeedback.suggestion_id == TestCaseSuggestion.id
+    ).filter(
+        TestCaseSuggestion.matched_rule_id.isnot(None)
+    ).group_by(TestCaseSuggestion.matched_rule_id).all()
+
+    existing = {
+        pattern.rule_id: pattern
+        for pattern in db.query(FailurePattern).filter(FailurePattern.rule_id.isnot(None))
+    }
+
+    created = 0
+    for rule_id, matched, helpful, feedback in rows:
+        helpful = int(helpful or 0)
+        pattern = existing.get(rule_id)
+        if pattern is None:
+            raw = knowledge_patterns.get(rule_id, {})
+            pattern = FailurePattern(
+                rule_id=rule_id,
+                pattern_name=raw.get("name", rule_id),
+                category=raw.get("category")
+            )
+            db.add(pattern)
+            created += 1
+        pattern.times_matched = matched
+        pattern.times_helpful = helpful
+        pattern.confidence_score = round(smoothed_confidence(helpful, feedback), 4)
+
+    db.commit()
+    return {"patterns_updated": len(rows) - created, "patterns_created": created}
+
+
+def learn_pattern_confidence(db: Session) -> Dict:
+    """
+    Aggregate feedback for every knowledge base pattern, then reload this
+    process's weights; other processes pick the new confidence up within
+    PATTERN_WEIGHTS_TTL_SECONDS.
+    """
+    from app.services.reasoning_agent import get_knowledge_base
+
+    knowledge_patterns = {
+        pattern["rule_id"]: pattern
+        for pattern in get_knowledge_base().raw_patterns.get("patterns", [])
+        if pattern.get("rule_id")
+    }
+    result = aggregate_pattern_feedback(db, knowledge_patterns)
+    get_pattern_weights().invalidate()
+    return result
+
+
+class PatternWeights:
+    """
+    In-memory table of learned score multipliers, keyed by rule_id.
+
+    Loaded with one query and refreshed at most every `ttl_seconds`, so
+    scoring never waits on the database per request. A ttl of 0 disables
+    refreshing (every pattern weighs 1.0 unless loaded explicitly).
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None, ttl_seconds: float = 300):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.weights: Dict[str, float] = {}
+        self.version = ""  # Content hash of the weights; empty while every pattern weighs 1.0
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> None:
+        """Replace the table from FailurePattern confidence scores"""
+        rows = db.query(FailurePattern.rule_id, FailurePattern.confidence_score).filter(
+            FailurePattern.rule_id.isnot(None)
+        ).all()
+        weights = {rule_id: confidence_multiplier(confidence) for rule_id, confidence in rows}
+        self.version = hashlib.sha256(
+            json.dumps(sorted(weights.items())).encode()
+        ).hexdigest()[:16] if weights else ""
+        self.weights = weights
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Reload on next use (after the aggregation job ran in this process)"""
+        self._loaded_at = None
+
+    def _refresh(self) -> None:
+        if self.session_factory is None or self.ttl_seconds <= 0:
+            return
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.ttl_seconds:
+            return
+        # One thread refreshes; the others keep scoring with the current table
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            db = self.session_factory()
+            try:
+                self.load(db)
+            finally:
+                db.close()
+        except SQLAlchemyError as e:
+            logger.warning("Pattern weights refresh failed: %s", e)
+            self._loaded_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def current_version(self) -> str:
+        """Version of the weights scoring uses now (refreshed like multiplier)"""
+        self._refresh()
+        return self.version
+
+    def multiplier(self, rule_id: Optional[str]) -> float:
+        """Learned weight for a pattern (1.0 when it has no feedback yet)"""
+        self._refresh()
+        return self.weights.get(rule_id, 1.0)
+
+
+_pattern_weights: Optional[PatternWeights] = None
+_weights_lock = threading.Lock()
+
+
+def get_pattern_weights() -> PatternWeights:
+    """Process-wide weights table, refreshed every PATTERN_WEIGHTS_TTL_SECONDS"""
+    global _pattern_weights
+    if _pattern_weights is None:
+        with _weights_lock:
+            if _pattern_weights is None:
+                from app.database import SessionLocal
+                _pattern_weights = PatternWeights(SessionLocal, settings.pattern_weights_ttl_seconds)
+    return _pattern_weights
+
+
+def reset_pattern_weights() -> None:
+    """Drop the process-wide table so the next call rebuilds it (tests, config changes)"""
+    global _pattern_weights
+    with _weights_lock:
+        _pattern_weights = None
@@ -4,13 +4,22 @@ Rule-based system with pattern matching and domain knowledge
 No LLM required - pure deterministic reasoning
 """
 
+import hashlib
 import re
-from typing import List, Dict, Optional
+import threading
+import time
+from typing import List, Dict, Optional, Pattern, FrozenSet
 from dataclasses import dataclass, asdict
 from enum import Enum
 import json
 from pathlib import Path
 
+from app.services.log_scanner import LogScanner, LogScan, StreamingLogScan
+from app.services.pattern_learning import PatternWeights, get_pattern_weights
+from app.services.similarity_index import SimilarityIndex, failure_text, get_similarity_index
+
+KNOWLEDGE_DIR = Path(__file__).parent.parent / "knowledge"
+
 
 class FailureType(Enum):
     """Classification of test failure types"""
@@ -47,6 +56,7 @@ class Suggestion:
     code_locations: List[str]
     verification_steps: List[str]
     estimated_effort_hours: float
+    rule_id: Optional[str] = None  # Knowledge base pattern that produced it
 
     def to_dict(self):
         return asdict(self)
@@ -73,34 +83,214 @@ class SuggestionReport:
         }
 
 
-class ReasoningAgent:
-    """Rule-based intelligent agent for test failure analysis"""
+@dataclass
+class CompiledPattern:
+    """Failure pattern with regexes compiled and keywords lower-cased once"""
+    raw: Dict
+    regexes: List[Pattern]
+    keywords: FrozenSet[str]
+    requirement_types: List[str]
+    category: Optional[str]
+
+    @classmethod
+    def from_dict(cls, pattern: Dict) -> "CompiledPattern":
+        return cls(
+            raw=pattern,
+            regexes=[re.compile(regex, re.IGNORECASE) for regex in pattern.get("failure_patterns", [])],
+            keywords=frozenset(keyword.lower() for keyword in pattern.get("keywords", [])),
+            requirement_types=list(pattern.get("requirement_types", [])),
+            category=pattern.get("category"),
+        )
 
-    def __init__(self):
-        self.knowledge_base = self._load_knowledge_base()
-        self.aerospace_rules = self._load_aerospace_rules()
 
-    def _load_knowledge_base(self) -> Dict:
-        """Load pattern matching rules from JSON"""
-        kb_path = Path(__file__).parent.parent / "knowledge" / "failure_patterns.json"
-        if kb_path.exists():
-            with open(kb_path, 'r') as f:
-                return json.load(f)
-        return {"patterns": []}
+class KnowledgeBase:
+    """
+    Failure patterns and aerospace rules, loaded once per process.
 
-    def _load_aerospace_rules(self) -> Dict:
-        """Load aerospace-specific domain rules"""
-        rules_path = Path(__file__).parent.parent / "knowledge" / "aerospace_rules.json"
-        if rules_path.exists():
-            with open(rules_path, 'r') as f:
+    Holds compiled patterns plus inverted indexes used to pick candidate
+    patterns for a failure. The JSON files are reloaded when their mtime
+    changes (checked at most every `check_interval` seconds).
+    """
+
+    def __init__(
+        self,
+        patterns_path: Path = KNOWLEDGE_DIR / "failure_patterns.json",
+        rules_path: Path = KNOWLEDGE_DIR / "aerospace_rules.json",
+        check_interval: float = 2.0
+    ):
+        self.patterns_path = Path(patterns_path)
+        self.rules_path = Path(rules_path)
+        self.check_interval = check_interval
+
+        self.raw_patterns: Dict = {"patterns": []}
+        self.aerospace_rules: Dict = {"rules": []}
+        self.patterns: List[CompiledPattern] = []
+        self.keyword_index: Dict[str, List[int]] = {}
+        self.requirement_type_index: Dict[str, List[int]] = {}
+        self._index = ([], {}, {})
+        self.scanner = LogScanner()
+        self.version = ""  # Content hash; identifies the rules a stored report came from
+
+        self._lock = threading.Lock()
+        self._mtimes = None
+        self._checked_at = 0.0
+        self.refresh(force=True)
+
+    @staticmethod
+    def _mtime(path: Path) -> Optional[float]:
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return None
+
+    @staticmethod
+    def _load_json(path: Path, default: Dict) -> Dict:
+        if path.exists():
+            with open(path, 'r') as f:
                 return json.load(f)
-        return {"rules": []}
+        return default
+
+    def refresh(self, force: bool = False) -> None:
+        """Reload the JSON files if they changed on disk"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            mtimes = (self._mtime(self.patterns_path), self._mtime(self.rules_path))
+            if not force and mtimes == self._mtimes:
+                return
+
+            raw_patterns = self._load_json(self.patterns_path, {"patterns": []})
+            aerospace_rules = self._load_json(self.rules_path, {"rules": []})
+            patterns = [CompiledPattern.from_dict(p) for p in raw_patterns.get("patterns", [])]
+            keyword_index: Dict[str, List[int]] = {}
+            requirement_type_index: Dict[str, List[int]] = {}
+            for position, pattern in enumerate(patterns):
+                for keyword in pattern.keywords:
+                    keyword_index.setdefault(keyword, []).append(position)
+                for requirement_type in pattern.requirement_types:
+                    requirement_type_index.setdefault(requirement_type, []).append(position)
+
+            indicators = [
+                indicator
+                for pattern in patterns
+                for cause in pattern.raw.get("root_causes", [])
+                for indicator in cause.get("indicators", [])
+            ]
+            scanner = LogScanner(indicators)
+
+            # Swap in fully built state so concurrent readers never see a partial load
+            self.raw_patterns = raw_patterns
+            self.aerospace_rules = aerospace_rules
+            self.version = hashlib.sha256(
+                json.dumps([raw_patterns, aerospace_rules], sort_keys=True).encode()
+            ).hexdigest()[:16]
+            self.patterns = patterns
+            self.keyword_index = keyword_index
+            self.requirement_type_index = requirement_type_index
+            self._index = (patterns, keyword_index, requirement_type_index)
+            self.scanner = scanner
+            self._mtimes = mtimes
+
+    def candidates(self, keywords, requirement_type) -> List[CompiledPattern]:
+        """
+        Patterns that can clear the match threshold for this failure.
+
+        Without keyword overlap a pattern scores at most regex (0.4) plus
+        requirement type (0.2) plus category (0.1), and only the requirement
+        type term can push it past 0.5, so patterns are indexed by both.
+        """
+        patterns, keyword_index, requirement_type_index = self._index
+        positions = set()
+        for keyword in keywords:
+            positions.update(keyword_index.get(keyword, ()))
+        if requirement_type is not None:
+            positions.update(requirement_type_index.get(requirement_type, ()))
+        return [patterns[position] for position in sorted(positions)]
+
+
+_knowledge_base: Optional[KnowledgeBase] = None
+_reasoning_agent: Optional["ReasoningAgent"] = None
+_singleton_lock = threading.Lock()
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    """Process-wide knowledge base, refreshed when the JSON files change"""
+    global _knowledge_base
+    if _knowledge_base is None:
+        with _singleton_lock:
+            if _knowledge_base is None:
+                _knowledge_base = KnowledgeBase()
+    _knowledge_base.refresh()
+    return _knowledge_base
+
+
+def get_reasoning_agent() -> "ReasoningAgent":
+    """Process-wide ReasoningAgent; the agent itself holds no per-request state"""
+    global _reasoning_agent
+    if _reasoning_agent is None:
+        with _singleton_lock:
+            if _reasoning_agent is None:
+                _reasoning_agent = ReasoningAgent()
+    return _reasoning_agent
+
+
+class ReasoningAgent:
+    """Rule-based intelligent agent for test failure analysis"""
+
+    def __init__(
+        self,
+        kb: Optional[KnowledgeBase] = None,
+        similarity_index: Optional[SimilarityIndex] = None,
+        pattern_weights: Optional[PatternWeights] = None
+    ):
+        self._kb = kb
+        self._similarity_index = similarity_index
+        self._pattern_weights = pattern_weights
+
+    @property
+    def kb(self) -> KnowledgeBase:
+        """Compiled knowledge base (the shared one unless injected)"""
+        if self._kb is None:
+            return get_knowledge_base()
+        self._kb.refresh()
+        return self._kb
+
+    @property
+    def similarity_index(self) -> SimilarityIndex:
+        """Index of recorded failures (the shared one unless injected)"""
+        return self._similarity_index if self._similarity_index is not None else get_similarity_index()
+
+    @property
+    def pattern_weights(self) -> PatternWeights:
+        """Feedback-learned pattern weights (the shared table unless injected)"""
+        return self._pattern_weights if self._pattern_weights is not None else get_pattern_weights()
+
+    @property
+    def knowledge_base(self) -> Dict:
+        """Pattern matching rules as loaded from JSON"""
+        return self.kb.raw_patterns
+
+    @property
+    def aerospace_rules(self) -> Dict:
+        """Aerospace-specific domain rules as loaded from JSON"""
+        return self.kb.aerospace_rules
 
     def analyze_failure(self, test_case, execution_log: str) -> SuggestionReport:
         """Main entry point for failure analysis"""
+        return self.analyze_scan(test_case, self._scan(execution_log))
+
+    def stream_scan(self) -> StreamingLogScan:
+        """Incremental scan for logs too large to hold in memory; pass `finish()` to analyze_scan"""
+        kb = self.kb
+        return kb.scanner.stream(regex for pattern in kb.patterns for regex in pattern.regexes)
+
+    def analyze_scan(self, test_case, scan: LogScan) -> SuggestionReport:
+        """Analyze a failure from an already scanned log"""
 
         # Extract failure information
-        failure_info = self._extract_failure_info(test_case, execution_log)
+        failure_info = self._failure_info(test_case, scan)
 
         # Classify failure type
         failure_type = self._classify_failure(failure_info)
@@ -137,8 +327,25 @@ class ReasoningAgent:
             confidence_score=confidence
         )
 
+    def _scan(self, log: str) -> LogScan:
+        """Single pass over the log shared by all later reasoning steps"""
+        return self.kb.scanner.scan(log)
+
+    @staticmethod
+    def _log_contains(failure_info: Dict):
+        """Case-insensitive substring test, served by the log scan when present"""
+        scan = failure_info.get('scan')
+        if scan is not None:
+            return scan.contains
+        log = failure_info['execution_log'].lower()
+        return lambda term: term.lower() in log
+
     def _extract_failure_info(self, test_case, execution_log: str) -> Dict:
         """Extract structured information from failure"""
+        return self._failure_info(test_case, self._scan(execution_log))
+
+    def _failure_info(self, test_case, scan: LogScan) -> Dict:
+        """Structured failure information from a log scan"""
         return {
             "test_id": test_case.test_case_id,
             "test_title": test_case.title,
@@ -146,70 +353,32 @@ class ReasoningAgent:
             "priority": test_case.priority,
             "requirement_type": test_case.requirement.type if test_case.requirement else None,
             "requirement_category": test_case.requirement.category if test_case.requirement else None,
-            "execution_log": execution_log,
-            "error_message": self._extract_error_message(execution_log),
-            "stack_trace": self._extract_stack_trace(execution_log),
-            "keywords": self._extract_keywords(execution_log)
+            "execution_log": scan.log,
+            "error_message": scan.error_message,
+            "stack_trace": scan.stack_trace,
+            "keywords": scan.keywords,
+            "scan": scan
         }
 
     def _extract_error_message(self, log: str) -> str:
         """Extract primary error message"""
-        # Look for common error patterns
-        patterns = [
-            r"Error:\s*(.+?)(?:\n|$)",
-            r"Failed:\s*(.+?)(?:\n|$)",
-            r"AssertionError:\s*(.+?)(?:\n|$)",
-            r"Exception:\s*(.+?)(?:\n|$)"
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, log, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-
-        # Fallback: first line of log
-        return log.split('\n')[0][:200]
+        return self._scan(log).error_message
 
     def _extract_stack_trace(self, log: str) -> List[str]:
         """Extract stack trace lines"""
-        lines = log.split('\n')
-        stack_lines = []
-        in_stack = False
-
-        for line in lines:
-            if 'Traceback' in line or 'at ' in line:
-                in_stack = True
-            if in_stack:
-                stack_lines.append(line.strip())
-
-        return stack_lines[:10]  # Limit to 10 lines
+        return self._scan(log).stack_trace
 
     def _extract_keywords(self, log: str) -> List[str]:
         """Extract important keywords from log"""
-        keywords = set()
-        keyword_patterns = [
-            r'\b(weight|fuel|passenger|cargo|balance)\b',
-            r'\b(altitude|airspeed|velocity|acceleration)\b',
-            r'\b(temperature|pressure|density)\b',
-            r'\b(exceeded|invalid|failed|error|timeout)\b',
-            r'\b(sensor|actuator|control|system)\b',
-            r'\b(\d+\.\d+|\d+)\s*(lbs|kg|ft|m|kts|mph)\b'
-        ]
-
-        for pattern in keyword_patterns:
-            matches = re.finditer(pattern, log, re.IGNORECASE)
-            for match in matches:
-                keywords.add(match.group(0).lower())
-
-        return list(keywords)
+        return self._scan(log).keywords
 
     def _classify_failure(self, failure_info: Dict) -> FailureType:
         """Classify failure type based on patterns"""
-        log = failure_info['execution_log'].lower()
+        log_contains = self._log_contains(failure_info)
         error = failure_info['error_message'].lower()
 
         # Classification rules
-        if 'timeout' in error or 'timed out' in log:
+        if 'timeout' in error or log_contains('timed out'):
             return FailureType.TIMEOUT
 
         if 'assertionerror' in error or 'expected' in error:
@@ -218,7 +387,7 @@ class ReasoningAgent:
         if 'boundary' in error or 'exceeds' in error or 'limit' in error:
             return FailureType.BOUNDARY_VIOLATION
 
-        if 'race condition' in log or 'deadlock' in log:
+        if log_contains('race condition') or log_contains('deadlock'):
             return FailureType.CONCURRENCY_ERROR
 
         if 'connection' in error or 'network' in error or 'api' in error:
@@ -230,7 +399,7 @@ class ReasoningAgent:
         if 'configuration' in error or 'environment' in error:
             return FailureType.CONFIGURATION_ERROR
 
-        if 'cfr' in log or 'regulation' in log or 'compliance' in log:
+        if log_contains('cfr') or log_contains('regulation') or log_contains('compliance'):
             return FailureType.REGULATORY_VIOLATION
 
         # Default
@@ -238,22 +407,33 @@ class ReasoningAgent:
 
     def _match_patterns(self, failure_info: Dict, failure_type: FailureType) -> List[Dict]:
         """Match failure against known patterns"""
-        matched = []
-
-        for pattern in self.knowledge_base.get("patterns", []):
-            score = self._calculate_pattern_match_score(failure_info, pattern)
-            if score > 0.5:  # Threshold for match
-                matched.append({
-                    "pattern": pattern,
-                    "score": score
-                })
+        candidates = self.kb.candidates(failure_info['keywords'], failure_info['requirement_type'])
+
+        ranked = []
+        weights = self.pattern_weights
+        for pattern in candidates:
+            fit = self._pattern_fit(failure_info, pattern)
+            # The threshold applies to the fit itself; learned weights only reorder matches
+            if fit > 0.5:  # Threshold for match
+                ranked.append((fit * weights.multiplier(pattern.raw.get("rule_id")), pattern))
+
+        # Sort by weighted score
+        ranked.sort(key=lambda x: x[0], reverse=True)
+        return [
+            {"pattern": pattern.raw, "score": min(score, 1.0)}
+            for score, pattern in ranked[:3]  # Top 3 matches
+        ]
 
-        # Sort by score
-        matched.sort(key=lambda x: x['score'], reverse=True)
-        return matched[:3]  # Top 3 matches
+    def _calculate_pattern_match_score(self, failure_info: Dict, pattern) -> float:
+        """Match score of a pattern (raw dict or CompiledPattern), weighted by learned feedback"""
+        if not isinstance(pattern, CompiledPattern):
+            pattern = CompiledPattern.from_dict(pattern)
+        score = self._pattern_fit(failure_info, pattern) * self.pattern_weights.multiplier(pattern.raw.get("rule_id"))
+        return min(score, 1.0)
 
-    def _calculate_pattern_match_score(self, failure_info: Dict, pattern: Dict) -> float:
+    def _pattern_fit(self, failure_info: Dict, pattern: CompiledPattern) -> float:
         """Calculate how well a pattern matches the failure"""
+
         score = 0.0
         weights = {
             "regex": 0.4,
@@ -262,25 +442,29 @@ class ReasoningAgent:
             "category": 0.1
         }
 
-        # Check regex patterns
-        for regex in pattern.get("failure_patterns", []):
-            if re.search(regex, failure_info['execution_log'], re.IGNORECASE):
+        # Check regex patterns (streamed scans record which ones matched)
+        scan = failure_info.get('scan')
+        regex_hits = scan.regex_hits if scan is not None else None
+        for regex in pattern.regexes:
+            if regex_hits is not None:
+                matched = regex.pattern in regex_hits
+            else:
+                matched = regex.search(failure_info['execution_log'])
+            if matched:
                 score += weights["regex"]
                 break
 
         # Check keyword overlap
-        pattern_keywords = set(pattern.get("keywords", []))
-        failure_keywords = set(failure_info['keywords'])
-        keyword_overlap = len(pattern_keywords & failure_keywords)
-        if len(pattern_keywords) > 0:
-            score += weights["keywords"] * (keyword_overlap / len(pattern_keywords))
+        keyword_overlap = len(pattern.keywords.intersection(failure_info['keywords']))
+        if len(pattern.keywords) > 0:
+            score += weights["keywords"] * (keyword_overlap / len(pattern.keywords))
 
         # Check requirement type match
-        if failure_info['requirement_type'] in pattern.get("requirement_types", []):
+        if failure_info['requirement_type'] in pattern.requirement_types:
             score += weights["requirement_type"]
 
         # Check category match
-        if failure_info['requirement_category'] == pattern.get("category"):
+        if failure_info['requirement_category'] == pattern.category:
             score += weights["category"]
 
         return score
@@ -327,11 +511,11 @@ class ReasoningAgent:
             return 0.5  # Neutral if no indicators
 
         keywords = failure_info['keywords']
-        log = failure_info['execution_log'].lower()
+        log_contains = self._log_contains(failure_info)
 
         matches = 0
         for indicator in indicators:
-            if indicator.lower() in keywords or indicator.lower() in log:
+            if indicator.lower() in keywords or log_contains(indicator):
                 matches += 1
 
         return matches / len(indicators) if indicators else 0.0
@@ -345,8 +529,9 @@ class ReasoningAgent:
             evidence.append(f"Error message: {failure_info['error_message'][:100]}")
 
         # Matching indicators
+        log_contains = self._log_contains(failure_info)
         for indicator in cause_data.get("indicators", []):
-            if indicator.lower() in failure_info['execution_log'].lower():
+            if log_contains(indicator):
                 evidence.append(f"Log contains keyword: '{indicator}'")
 
         return evidence[:5]  # Top 5 pieces of evidence
@@ -387,7 +572,8 @@ class ReasoningAgent:
                     details=sug_data["details"],
                     code_locations=sug_data.get("code_locations", []),
                     verification_steps=sug_data.get("verification_steps", []),
-                    estimated_effort_hours=sug_data.get("estimated_effort_hours", 2.0)
+                    estimated_effort_hours=sug_data.get("estimated_effort_hours", 2.0),
+                    rule_id=pattern.get("rule_id")
                 ))
 
         # Add generic suggestions
@@ -436,10 +622,11 @@ class ReasoningAgent:
         return suggestions
 
     def _find_similar_failures(self, test_case, failure_info: Dict) -> List[Dict]:
-        """Find similar historical failures from database"""
-        # This would query the database for similar test failures
-        # For now, return empty list (to be implemented with DB integration)
-        return []
+        """Find similar historical failures of other test cases in the similarity index"""
+        return self.similarity_index.search(
+            failure_text(failure_info['execution_log'], getattr(test_case, 'actual_results', None)),
+            exclude_test_case_id=test_case.id
+        )
 
     def _calculate_confidence(
         self,
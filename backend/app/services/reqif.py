@@ -0,0 +1,703 @@
+"""
+ReqIF Exchange
+Streaming ReqIF 1.x import and export of requirements, test cases and the traceability links between them
+"""
+
+import logging
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.counters import add_contribution, apply_counter_deltas
+from app.models.requirement import (
+    Requirement, RequirementPriority, RequirementStatus, RequirementType, VerificationMethod
+)
+from app.models.test_case import TestCase, TestCasePriority, TestCaseStatus
+from app.models.traceability import TraceabilityLink, TraceLinkType
+from app.schemas.traceability import TraceabilityLinkCreate
+from app.services.requirement_sync import UPSERT_BATCH_SIZE, batches, upsert_requirements, upsert_statement, with_defaults
+from app.services.tabular_export import CHUNK_SIZE
+from app.services.traceability_import import LOOKUP_CHUNK_SIZE, import_traceability_links
+
+logger = logging.getLogger(__name__)
+
+REQIF_NAMESPACE = "http://www.omg.org/spec/ReqIF/20110401/reqif.xsd"
+XHTML_NAMESPACE = "http://www.w3.org/1999/xhtml"
+
+# Rows fetched per round trip while exporting
+EXPORT_FETCH_SIZE = 1000
+# Error messages returned to the caller (the failed count is always complete)
+MAX_REPORTED_ERRORS = 100
+
+REQUIREMENT = "requirement"
+TEST_CASE = "test_case"
+
+# (field, attribute LONG-NAME, datatype) of each spec object type. Datatypes
+# are STRING / XHTML / INTEGER / BOOLEAN or the enum of an ENUMERATION; the
+# ReqIF.* names are the standard ones other tools map to id, heading and text.
+REQUIREMENT_ATTRIBUTES = (
+    ("requirement_id", "ReqIF.ForeignID", "STRING"),
+    ("title", "ReqIF.Name", "STRING"),
+    ("description", "ReqIF.Text", "XHTML"),
+    ("type", "Type", RequirementType),
+    ("category", "Category", "STRING"),
+    ("rationale", "Rationale", "XHTML"),
+    ("priority", "Priority", RequirementPriority),
+    ("status", "Status", RequirementStatus),
+    ("verification_method", "Verification Method", VerificationMethod),
+    ("compliance_status", "Compliance Status", "STRING"),
+    ("regulatory_document", "Regulatory Document", "STRING"),
+    ("regulatory_section", "Regulatory Section", "STRING"),
+    ("regulatory_title", "Regulatory Title", "STRING"),
+    ("regulatory_page", "Regulatory Page", "INTEGER"),
+    ("file_path", "File Path", "STRING"),
+    ("owner", "Owner", "STRING"),
+    ("version", "Version", "STRING"),
+)
+
+TEST_CASE_ATTRIBUTES = (
+    ("test_case_id", "ReqIF.ForeignID", "STRING"),
+    ("title", "ReqIF.Name", "STRING"),
+    ("description", "ReqIF.Text", "XHTML"),
+    ("preconditions", "Preconditions", "XHTML"),
+    ("test_steps", "Test Steps", "XHTML"),
+    ("expected_results", "Expected Results", "XHTML"),
+    ("status", "Status", TestCaseStatus),
+    ("priority", "Priority", TestCasePriority),
+    ("test_type", "Test Type", "STRING"),
+    ("test_environment", "Test Environment", "STRING"),
+    ("automated", "Automated", "BOOLEAN"),
+    ("automation_script", "Automation Script", "STRING"),
+)
+
+OBJECT_TYPES = {
+    REQUIREMENT: ("SOT-REQUIREMENT", "Requirement", Requirement, REQUIREMENT_ATTRIBUTES),
+    TEST_CASE: ("SOT-TEST-CASE", "Test Case", TestCase, TEST_CASE_ATTRIBUTES),
+}
+
+TEST_CASE_FIELDS = tuple(field for field, _, _ in TEST_CASE_ATTRIBUTES if field != "test_case_id")
+
+_ATTRIBUTE_DEFINITIONS = {
+    f"ATTRIBUTE-DEFINITION-{kind}"
+    for kind in ("BOOLEAN", "DATE", "ENUMERATION", "INTEGER", "REAL", "STRING", "XHTML")
+}
+# Characters XML 1.0 does not allow, even escaped
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_XHTML_BLOCKS = {"p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote"}
+
+
+def _normalize(name: Optional[str]) -> str:
+    return re.sub(r"[\s_-]+", "_", (name or "").strip().lower())
+
+
+def _field_names(attributes) -> Dict[str, str]:
+    """Normalized attribute names recognised on import -> field (the exported LONG-NAMEs and the field names)"""
+    names = {}
+    for field, long_name, _ in attributes:
+        names[_normalize(field)] = field
+        names[_normalize(long_name)] = field
+    key = attributes[0][0]
+    names.update({"id": key, "identifier": key, "name": "title", "text": "description"})
+    return names
+
+
+_FIELD_NAMES = {kind: _field_names(attributes) for kind, (_, _, _, attributes) in OBJECT_TYPES.items()}
+
+
+# ============================================================================
+# Import
+# ============================================================================
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child(element: ET.Element, name: str) -> Optional[ET.Element]:
+    for child in element:
+        if _local_name(child.tag) == name:
+            return child
+    return None
+
+
+def _ref(element: ET.Element, container: str) -> Optional[str]:
+    """Text of the first reference inside a child container, e.g. TYPE/SPEC-OBJECT-TYPE-REF"""
+    child = _child(element, container)
+    if child is None or not len(child) or child[0].text is None:
+        return None
+    return child[0].text.strip()
+
+
+def _xhtml_text(element: ET.Element) -> str:
+    """Plain text of an XHTML fragment, with line breaks for <br/> and block elements"""
+    parts = []
+
+    def walk(node):
+        tag = _local_name(node.tag)
+        if tag == "br":
+            parts.append("\n")
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if tag in _XHTML_BLOCKS:
+            parts.append("\n")
+
+    for child in element:
+        walk(child)
+    return "".join(parts).strip()
+
+
+def _iter_elements(fileobj: BinaryIO, names: Set[str]) -> Iterator[ET.Element]:
+    """
+    Complete elements with the given local names, in document order.
+
+    Each is detached from its parent once the caller has seen it, so
+    memory does not grow with the document. Raises ET.ParseError on
+    invalid XML.
+    """
+    open_elements = []
+    for event, element in ET.iterparse(fileobj, events=("start", "end")):
+        if event == "start":
+            open_elements.append(element)
+            continue
+        open_elements.pop()
+        if _local_name(element.tag) in names:
+            yield element
+            if open_elements:
+                open_elements[-1].remove(element)
+
+
+def _enum_member(enum_class, text: str):
+    value = _normalize(text)
+    for member in enum_class:
+        if value in (_normalize(member.value), _normalize(member.name)):
+            return member
+    raise ValueError(f"'{text}' is not a valid {enum_class.__name__}")
+
+
+def _convert(model, attributes, values: Dict[str, str]) -> Dict[str, Any]:
+    """Typed column values from attribute text; raises ValueError for values the columns cannot hold"""
+    record = {}
+    for field, long_name, datatype in attributes:
+        text = values.get(field)
+        if text is None or text == "":
+            record[field] = None
+        elif datatype == "INTEGER":
+            record[field] = int(text)
+        elif datatype == "BOOLEAN":
+            record[field] = text.strip().lower() in ("true", "1")
+        elif datatype in ("STRING", "XHTML"):
+            length = getattr(model.__table__.c[field].type, "length", None)
+            if length and len(text) > length:
+                raise ValueError(f"{long_name} is longer than {length} characters")
+            record[field] = text
+        else:
+            record[field] = _enum_member(datatype, text)
+    return record
+
+
+class ReqIFReader:
+    """
+    Streams records out of a ReqIF document, collecting the definitions and
+    relations they refer to along the way.
+
+    Only identifiers are kept per object (to resolve relations), never the
+    objects themselves.
+    """
+
+    def __init__(self, default_type: RequirementType = RequirementType.SYSTEM):
+        self.default_type = default_type
+        self.enum_values: Dict[str, str] = {}
+        self.attribute_names: Dict[str, str] = {}
+        self.object_kinds: Dict[str, str] = {}
+        self.relation_types: Dict[str, str] = {}
+        # SPEC-OBJECT identifier -> (kind, requirement_id); test case keys are not needed
+        self.objects: Dict[str, Tuple[str, Optional[str]]] = {}
+        # (relation type LONG-NAME, source identifier, target identifier)
+        self.relations: List[Tuple[Optional[str], Optional[str], Optional[str]]] = []
+        self.failed = 0
+        self.errors: List[str] = []
+
+    def fail(self, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    @property
+    def has_test_cases(self) -> bool:
+        return any(kind == TEST_CASE for kind, _ in self.objects.values())
+
+    def _record(self, element: ET.Element, kind: str) -> Optional[Dict[str, Any]]:
+        identifier = element.get("IDENTIFIER")
+        _, _, model, attributes = OBJECT_TYPES[kind]
+        names = _FIELD_NAMES[kind]
+        values = {}
+        container = _child(element, "VALUES")
+        for value in container if container is not None else ():
+            field = names.get(_normalize(self.attribute_names.get(_ref(value, "DEFINITION"))))
+            if field is None:
+                continue
+            tag = _local_name(value.tag)
+            if tag == "ATTRIBUTE-VALUE-XHTML":
+                the_value = _child(value, "THE-VALUE")
+                values[field] = _xhtml_text(the_value) if the_value is not None else None
+            elif tag == "ATTRIBUTE-VALUE-ENUMERATION":
+                enum_ref = _ref(value, "VALUES")
+                values[field] = self.enum_values.get(enum_ref, enum_ref)
+            else:
+                values[field] = value.get("THE-VALUE")
+
+        key = attributes[0][0]
+        # Objects without a foreign id are keyed by their ReqIF identifier
+        values[key] = values.get(key) or identifier
+        try:
+            record = _convert(model, attributes, values)
+        except ValueError as e:
+            self.fail(f"SPEC-OBJECT {identifier}: {e}")
+            return None
+        if not record["title"]:
+            self.fail(f"SPEC-OBJECT {identifier}: no ReqIF.Name")
+            return None
+
+        if kind == REQUIREMENT:
+            record["description"] = record["description"] or record["title"]
+            record["type"] = record["type"] or self.default_type
+        else:
+            record["test_steps"] = record["test_steps"] or ""
+            record["expected_results"] = record["expected_results"] or ""
+        return record
+
+    def requirement_records(self, fileobj: BinaryIO) -> Iterator[Dict[str, Any]]:
+        """
+        First pass: requirement records, while reading the datatypes, spec
+        types and relations and noting which objects are test cases.
+        """
+        names = _ATTRIBUTE_DEFINITIONS | {
+            "ENUM-VALUE", "SPEC-OBJECT-TYPE", "SPEC-RELATION-TYPE", "SPEC-OBJECT", "SPEC-RELATION", "SPEC-HIERARCHY"
+        }
+        for element in _iter_elements(fileobj, names):
+            tag = _local_name(element.tag)
+            identifier = element.get("IDENTIFIER")
+            if tag == "ENUM-VALUE":
+                self.enum_values[identifier] = element.get("LONG-NAME") or identifier
+            elif tag in _ATTRIBUTE_DEFINITIONS:
+                self.attribute_names[identifier] = element.get("LONG-NAME") or identifier
+            elif tag == "SPEC-OBJECT-TYPE":
+                self.object_kinds[identifier] = TEST_CASE if "test" in _normalize(element.get("LONG-NAME")) else REQUIREMENT
+            elif tag == "SPEC-RELATION-TYPE":
+                self.relation_types[identifier] = element.get("LONG-NAME") or identifier
+            elif tag == "SPEC-OBJECT":
+                kind = self.object_kinds.get(_ref(element, "TYPE"), REQUIREMENT)
+                if kind == TEST_CASE:
+                    self.objects[identifier] = (TEST_CASE, None)
+                    continue
+                record = self._record(element, REQUIREMENT)
+                if record is not None:
+                    self.objects[identifier] = (REQUIREMENT, record["requirement_id"])
+                    yield record
+            elif tag == "SPEC-RELATION":
+                self.relations.append((
+                    self.relation_types.get(_ref(element, "TYPE")), _ref(element, "SOURCE"), _ref(element, "TARGET")
+                ))
+
+    def verified_requirements(self) -> Dict[str, str]:
+        """Test case SPEC-OBJECT identifier -> requirement_id it verifies, from relations in either direction"""
+        verified = {}
+        for _, source, target in self.relations:
+            source_kind, source_key = self.objects.get(source, (None, None))
+            target_kind, target_key = self.objects.get(target, (None, None))
+            if source_kind == TEST_CASE and target_kind == REQUIREMENT:
+                verified[source] = target_key
+            elif source_kind == REQUIREMENT and target_kind == TEST_CASE:
+                verified[target] = source_key
+        return verified
+
+    def test_case_records(self, fileobj: BinaryIO) -> Iterator[Dict[str, Any]]:
+        """Second pass: test case records, each with the requirement_id it verifies (or None) as `verifies`"""
+        verified = self.verified_requirements()
+        for element in _iter_elements(fileobj, {"SPEC-OBJECT", "SPEC-HIERARCHY"}):
+            identifier = element.get("IDENTIFIER")
+            if _local_name(element.tag) != "SPEC-OBJECT" or self.objects.get(identifier, (None,))[0] != TEST_CASE:
+                continue
+            record = self._record(element, TEST_CASE)
+            if record is not None:
+                record["verifies"] = verified.get(identifier)
+                yield record
+
+    def link_relations(self) -> Iterator[Tuple[str, str, str]]:
+        """(source requirement_id, target requirement_id, relation type) of relations between requirements"""
+        for relation_type, source, target in self.relations:
+            source_kind, source_key = self.objects.get(source, (None, None))
+            target_kind, target_key = self.objects.get(target, (None, None))
+            if TEST_CASE in (source_kind, target_kind):
+                continue
+            if source_kind is None or target_kind is None:
+                self.fail(f"SPEC-RELATION {source} -> {target}: unknown or invalid spec object")
+                continue
+            yield source_key, target_key, relation_type
+
+
+def _requirement_ids(db: Session, keys) -> Dict[str, int]:
+    keys = list(keys)
+    ids = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        ids.update(db.execute(
+            select(Requirement.requirement_id, Requirement.id).where(
+                Requirement.requirement_id.in_(keys[start:start + LOOKUP_CHUNK_SIZE])
+            )
+        ).all())
+    return ids
+
+
+def _upsert_test_cases(db: Session, reader: ReqIFReader, records, user_id: int) -> Dict[str, int]:
+    """
+    Upsert test cases by test_case_id, UPSERT_BATCH_SIZE per statement.
+
+    Existing rows are read per batch and compared field by field, so
+    unchanged test cases are not written. A test case keeps its current
+    requirement when the document does not say which one it verifies;
+    new ones without a known requirement fail. Counter changes are applied
+    with the batch, as the upsert bypasses the unit of work.
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    columns = [TestCase.id, TestCase.test_case_id, TestCase.requirement_id, *(TestCase.__table__.c[f] for f in TEST_CASE_FIELDS)]
+
+    for batch in batches(records, UPSERT_BATCH_SIZE):
+        batch = {record["test_case_id"]: record for record in batch}
+        requirement_ids = _requirement_ids(db, {r["verifies"] for r in batch.values() if r["verifies"]})
+        existing = {
+            row.test_case_id: row
+            for row in db.execute(select(*columns).where(TestCase.test_case_id.in_(batch)))
+        }
+        changed = []
+        deltas = defaultdict(lambda: defaultdict(int))
+        for test_case_id, record in batch.items():
+            current = existing.get(test_case_id)
+            requirement_id = requirement_ids.get(record["verifies"])
+            if requirement_id is None:
+                if current is None:
+                    reader.fail(f"Test case '{test_case_id}' does not verify a known requirement")
+                    continue
+                requirement_id = current.requirement_id
+
+            row = with_defaults(TestCase, record, TEST_CASE_FIELDS)
+            row.update(test_case_id=test_case_id, requirement_id=requirement_id)
+            if current is None:
+                counts["inserted"] += 1
+            elif all(getattr(current, field) == row[field] for field in TEST_CASE_FIELDS + ("requirement_id",)):
+                counts["unchanged"] += 1
+                continue
+            else:
+                counts["updated"] += 1
+                add_contribution(deltas, TestCase, (current.requirement_id, current.status), -1)
+            add_contribution(deltas, TestCase, (requirement_id, row["status"]), 1)
+            changed.append({**row, "created_by_id": user_id})
+
+        if changed:
+            db.execute(upsert_statement(db, TestCase, changed, "test_case_id", TEST_CASE_FIELDS + ("requirement_id",)))
+            apply_counter_deltas(db, deltas)
+    return counts
+
+
+def open_reqif(fileobj: BinaryIO) -> BinaryIO:
+    """The .reqif document itself: the file, or the first .reqif member of a .reqifz archive"""
+    if zipfile.is_zipfile(fileobj):
+        archive = zipfile.ZipFile(fileobj)
+        members = [name for name in archive.namelist() if name.lower().endswith(".reqif")]
+        if not members:
+            raise ValueError("The .reqifz archive contains no .reqif document")
+        return archive.open(members[0])
+    fileobj.seek(0)
+    return fileobj
+
+
+def import_reqif(
+    db: Session,
+    fileobj: BinaryIO,
+    user_id: int,
+    default_type: RequirementType = RequirementType.SYSTEM
+) -> Dict:
+    """
+    Import a ReqIF document (or .reqifz archive) in one transaction.
+
+    SPEC-OBJECTs become requirements, or test cases when their spec
+    object type is named like "Test Case"; attributes are matched by
+    LONG-NAME (ReqIF.ForeignID / ReqIF.Name / ReqIF.Text or the field
+    names). Requirements are upserted by requirement_id and test cases by
+    test_case_id, so re-importing a revised document only writes the
+    objects whose content changed. SPEC-RELATIONs between requirements
+    become traceability links (existing ones are left alone, none are
+    removed); a relation between a test case and a requirement sets the
+    requirement the test case verifies. Requirements without a Type
+    attribute get `default_type`.
+
+    The document is parsed incrementally, twice if it contains test cases
+    (their requirements must exist first), so the file must be seekable;
+    memory is bounded by one upsert batch plus the object identifiers.
+    Objects that cannot be imported are counted as failed. Raises
+    ET.ParseError / ValueError for invalid documents.
+    """
+    document = open_reqif(fileobj)
+    reader = ReqIFReader(default_type)
+
+    requirement_counts = upsert_requirements(db, reader.requirement_records(document), user_id)
+    test_case_counts = {}
+    if reader.has_test_cases:
+        document.seek(0)
+        test_case_counts = _upsert_test_cases(db, reader, reader.test_case_records(document), user_id)
+
+    relations = list(reader.link_relations())
+    requirement_ids = _requirement_ids(db, {key for source, target, _ in relations for key in (source, target)})
+    links = []
+    for source, target, relation_type in relations:
+        try:
+            links.append(TraceabilityLinkCreate(
+                source_id=requirement_ids[source],
+                target_id=requirement_ids[target],
+                link_type=_enum_member(TraceLinkType, relation_type or ""),
+            ))
+        except (KeyError, ValueError, ValidationError) as e:
+            reader.fail(f"Relation {source} -> {target}: {e}")
+    link_counts = import_traceability_links(db, links, skip_duplicates=True, user_id=user_id)
+    db.commit()
+
+    logger.info(
+        f"Imported ReqIF: requirements {requirement_counts}, test cases {test_case_counts}, "
+        f"{link_counts['created']} links created, {reader.failed} failed"
+    )
+    return {
+        "requirements": requirement_counts,
+        "test_cases": test_case_counts,
+        "links_created": link_counts["created"],
+        "links_unchanged": link_counts["skipped"],
+        "failed": reader.failed + link_counts["failed"],
+        "errors": (reader.errors + link_counts["errors"])[:MAX_REPORTED_ERRORS],
+    }
+
+
+# ============================================================================
+# Export
+# ============================================================================
+
+def _timestamp(value: Optional[datetime]) -> str:
+    value = value or datetime.now(timezone.utc)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def _text(value: Any) -> str:
+    """XML-safe text: characters XML 1.0 cannot carry are dropped"""
+    return _ILLEGAL_XML.sub("", str(value))
+
+
+def _datatype_kind(datatype) -> str:
+    return datatype if isinstance(datatype, str) else "ENUMERATION"
+
+
+def _datatype_id(datatype) -> str:
+    return f"DT-{datatype if isinstance(datatype, str) else datatype.__name__}"
+
+
+def _datatypes(now: str) -> str:
+    parts = [
+        f'<DATATYPE-DEFINITION-STRING IDENTIFIER="DT-STRING" LONG-NAME="String" LAST-CHANGE="{now}" MAX-LENGTH="1000"/>',
+        f'<DATATYPE-DEFINITION-XHTML IDENTIFIER="DT-XHTML" LONG-NAME="XHTML" LAST-CHANGE="{now}"/>',
+        f'<DATATYPE-DEFINITION-INTEGER IDENTIFIER="DT-INTEGER" LONG-NAME="Integer" LAST-CHANGE="{now}" '
+        f'MIN="-2147483648" MAX="2147483647"/>',
+        f'<DATATYPE-DEFINITION-BOOLEAN IDENTIFIER="DT-BOOLEAN" LONG-NAME="Boolean" LAST-CHANGE="{now}"/>',
+    ]
+    enums = {
+        datatype: None
+        for _, _, _, attributes in OBJECT_TYPES.values()
+        for _, _, datatype in attributes if not isinstance(datatype, str)
+    }
+    for enum_class in enums:
+        values = "".join(
+            f'<ENUM-VALUE IDENTIFIER="EV-{enum_class.__name__}-{member.name}" LONG-NAME={quoteattr(member.value)} '
+            f'LAST-CHANGE="{now}"><PROPERTIES><EMBEDDED-VALUE KEY="{key}" OTHER-CONTENT=""/></PROPERTIES></ENUM-VALUE>'
+            for key, member in enumerate(enum_class)
+        )
+        parts.append(
+            f'<DATATYPE-DEFINITION-ENUMERATION IDENTIFIER="{_datatype_id(enum_class)}" LONG-NAME="{enum_class.__name__}" '
+            f'LAST-CHANGE="{now}"><SPECIFIED-VALUES>{values}</SPECIFIED-VALUES></DATATYPE-DEFINITION-ENUMERATION>'
+        )
+    return "<DATATYPES>" + "".join(parts) + "</DATATYPES>"
+
+
+def _spec_types(now: str) -> str:
+    parts = []
+    for kind, (type_id, type_name, _, attributes) in OBJECT_TYPES.items():
+        definitions = []
+        for field, long_name, datatype in attributes:
+            definition = f"ATTRIBUTE-DEFINITION-{_datatype_kind(datatype)}"
+            multi_valued = ' MULTI-VALUED="false"' if _datatype_kind(datatype) == "ENUMERATION" else ""
+            datatype_ref = f"DATATYPE-DEFINITION-{_datatype_kind(datatype)}-REF"
+            definitions.append(
+                f'<{definition} IDENTIFIER="AD-{type_id}-{field}" LONG-NAME={quoteattr(long_name)} '
+                f'LAST-CHANGE="{now}"{multi_valued}><TYPE><{datatype_ref}>{_datatype_id(datatype)}</{datatype_ref}>'
+                f'</TYPE></{definition}>'
+            )
+        parts.append(
+            f'<SPEC-OBJECT-TYPE IDENTIFIER="{type_id}" LONG-NAME="{type_name}" LAST-CHANGE="{now}">'
+            f'<SPEC-ATTRIBUTES>{"".join(definitions)}</SPEC-ATTRIBUTES></SPEC-OBJECT-TYPE>'
+        )
+    for link_type in TraceLinkType:
+        parts.append(
+            f'<SPEC-RELATION-TYPE IDENTIFIER="SRT-{link_type.name}" LONG-NAME="{link_type.value}" LAST-CHANGE="{now}"/>'
+        )
+    parts.append(f'<SPECIFICATION-TYPE IDENTIFIER="ST-SPECIFICATION" LONG-NAME="Specification" LAST-CHANGE="{now}"/>')
+    return "<SPEC-TYPES>" + "".join(parts) + "</SPEC-TYPES>"
+
+
+def _attribute_value(type_id: str, field: str, datatype, value: Any) -> str:
+    kind = _datatype_kind(datatype)
+    definition = (
+        f'<DEFINITION><ATTRIBUTE-DEFINITION-{kind}-REF>AD-{type_id}-{field}</ATTRIBUTE-DEFINITION-{kind}-REF></DEFINITION>'
+    )
+    if kind == "XHTML":
+        text = "<xhtml:br/>".join(escape(_text(line)) for line in str(value).split("\n"))
+        return (
+            f"<ATTRIBUTE-VALUE-XHTML>{definition}<THE-VALUE><xhtml:div>{text}</xhtml:div></THE-VALUE>"
+            f"</ATTRIBUTE-VALUE-XHTML>"
+        )
+    if kind == "ENUMERATION":
+        return (
+            f"<ATTRIBUTE-VALUE-ENUMERATION>{definition}<VALUES><ENUM-VALUE-REF>"
+            f"EV-{datatype.__name__}-{value.name}</ENUM-VALUE-REF></VALUES></ATTRIBUTE-VALUE-ENUMERATION>"
+        )
+    if kind == "BOOLEAN":
+        value = "true" if value else "false"
+    return f"<ATTRIBUTE-VALUE-{kind} THE-VALUE={quoteattr(_text(value))}>{definition}</ATTRIBUTE-VALUE-{kind}>"
+
+
+def _spec_object(kind: str, identifier: str, row) -> str:
+    type_id, _, _, attributes = OBJECT_TYPES[kind]
+    values = "".join(
+        _attribute_value(type_id, field, datatype, getattr(row, field))
+        for field, _, datatype in attributes
+        if getattr(row, field) is not None
+    )
+    return (
+        f'<SPEC-OBJECT IDENTIFIER="{identifier}" LAST-CHANGE="{_timestamp(row.updated_at or row.created_at)}">'
+        f"<VALUES>{values}</VALUES><TYPE><SPEC-OBJECT-TYPE-REF>{type_id}</SPEC-OBJECT-TYPE-REF></TYPE></SPEC-OBJECT>"
+    )
+
+
+def _spec_relation(identifier: str, relation_type: TraceLinkType, source: str, target: str, changed) -> str:
+    return (
+        f'<SPEC-RELATION IDENTIFIER="{identifier}" LAST-CHANGE="{_timestamp(changed)}">'
+        f"<SOURCE><SPEC-OBJECT-REF>{source}</SPEC-OBJECT-REF></SOURCE>"
+        f"<TARGET><SPEC-OBJECT-REF>{target}</SPEC-OBJECT-REF></TARGET>"
+        f"<TYPE><SPEC-RELATION-TYPE-REF>SRT-{relation_type.name}</SPEC-RELATION-TYPE-REF></TYPE></SPEC-RELATION>"
+    )
+
+
+def _specification(identifier: str, name: str, prefix: str, ids: Iterator[int], now: str) -> Iterator[str]:
+    yield (
+        f'<SPECIFICATION IDENTIFIER="{identifier}" LONG-NAME="{name}" LAST-CHANGE="{now}">'
+        f"<TYPE><SPECIFICATION-TYPE-REF>ST-SPECIFICATION</SPECIFICATION-TYPE-REF></TYPE><CHILDREN>"
+    )
+    for row_id in ids:
+        yield (
+            f'<SPEC-HIERARCHY IDENTIFIER="H-{prefix}-{row_id}" LAST-CHANGE="{now}">'
+            f"<OBJECT><SPEC-OBJECT-REF>{prefix}-{row_id}</SPEC-OBJECT-REF></OBJECT></SPEC-HIERARCHY>"
+        )
+    yield "</CHILDREN></SPECIFICATION>"
+
+
+def _reqif_parts(db: Session, clauses: Sequence, title: str) -> Iterator[str]:
+    now = _timestamp(None)
+
+    def rows(statement):
+        return db.execute(statement.execution_options(yield_per=EXPORT_FETCH_SIZE))
+
+    requirement_columns = [Requirement.__table__.c[field] for field, _, _ in REQUIREMENT_ATTRIBUTES]
+    test_case_columns = [TestCase.__table__.c[field] for field, _, _ in TEST_CASE_ATTRIBUTES]
+    selected = select(Requirement.id).where(*clauses)
+    requirements = select(Requirement.id, *requirement_columns, Requirement.created_at, Requirement.updated_at)
+    test_cases = select(
+        TestCase.id, TestCase.requirement_id.label("requirement_pk"), *test_case_columns,
+        TestCase.created_at, TestCase.updated_at
+    )
+    links = select(
+        TraceabilityLink.id, TraceabilityLink.source_id, TraceabilityLink.target_id,
+        TraceabilityLink.link_type, TraceabilityLink.created_at
+    )
+    if clauses:
+        requirements = requirements.where(*clauses)
+        test_cases = test_cases.where(TestCase.requirement_id.in_(selected))
+        links = links.where(TraceabilityLink.source_id.in_(selected), TraceabilityLink.target_id.in_(selected))
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<REQ-IF xmlns="{REQIF_NAMESPACE}" xmlns:xhtml="{XHTML_NAMESPACE}">'
+    yield (
+        f'<THE-HEADER><REQ-IF-HEADER IDENTIFIER="HEADER"><CREATION-TIME>{now}</CREATION-TIME>'
+        f"<REQ-IF-TOOL-ID>CALIDUS</REQ-IF-TOOL-ID><REQ-IF-VERSION>1.0</REQ-IF-VERSION>"
+        f"<SOURCE-TOOL-ID>CALIDUS</SOURCE-TOOL-ID><TITLE>{escape(title)}</TITLE></REQ-IF-HEADER></THE-HEADER>"
+    )
+    yield "<CORE-CONTENT><REQ-IF-CONTENT>"
+    yield _datatypes(now)
+    yield _spec_types(now)
+
+    yield "<SPEC-OBJECTS>"
+    for row in rows(requirements.order_by(Requirement.id)):
+        yield _spec_object(REQUIREMENT, f"REQ-{row.id}", row)
+    for row in rows(test_cases.order_by(TestCase.id)):
+        yield _spec_object(TEST_CASE, f"TC-{row.id}", row)
+    yield "</SPEC-OBJECTS>"
+
+    yield "<SPEC-RELATIONS>"
+    for row in rows(links.order_by(TraceabilityLink.id)):
+        yield _spec_relation(f"LINK-{row.id}", row.link_type, f"REQ-{row.source_id}", f"REQ-{row.target_id}", row.created_at)
+    for row in rows(test_cases.order_by(TestCase.id)):
+        yield _spec_relation(
+            f"VER-{row.id}", TraceLinkType.VERIFIES, f"TC-{row.id}", f"REQ-{row.requirement_pk}",
+            row.updated_at or row.created_at
+        )
+    yield "</SPEC-RELATIONS>"
+
+    yield "<SPECIFICATIONS>"
+    yield from _specification(
+        "SPEC-REQUIREMENTS", "Requirements", "REQ", (row.id for row in rows(selected.order_by(Requirement.id))), now
+    )
+    yield from _specification(
+        "SPEC-TEST-CASES", "Test Cases", "TC", (row.id for row in rows(test_cases.order_by(TestCase.id))), now
+    )
+    yield "</SPECIFICATIONS>"
+    yield "</REQ-IF-CONTENT></CORE-CONTENT></REQ-IF>\n"
+
+
+def iter_reqif(db: Session, clauses: Sequence = (), title: str = "CALIDUS requirements") -> Iterator[bytes]:
+    """
+    A ReqIF 1.x document of the requirements matching `clauses`, their
+    test cases and the links among them, as UTF-8 chunks of about
+    CHUNK_SIZE.
+
+    Requirements are "Requirement" spec objects, test cases "Test Case"
+    spec objects with a "verifies" relation to their requirement, and links
+    relations typed by link type (source = child, target = parent). Rows
+    are fetched EXPORT_FETCH_SIZE at a time, so exports of any size stream
+    in constant memory; import_reqif reads the document back unchanged.
+    """
+    buffer = []
+    size = 0
+    for part in _reqif_parts(db, clauses, title):
+        data = part.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
@@ -0,0 +1,80 @@
+"""
+Requirement Counter Reconciliation
+Recomputes the denormalized test case / trace link counts on requirements and repairs any that drifted.
+"""
+
+import logging
+from typing import Dict
+
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.counters import COUNTER_COLUMNS, STATUS_COUNTERS
+from app.models.requirement import Requirement
+from app.models.test_case import TestCase
+from app.models.traceability import TraceabilityLink
+
+logger = logging.getLogger(__name__)
+
+
+def _actual_counts():
+    """(requirement id, one column per counter) computed from the child tables"""
+    tests = select(
+        TestCase.requirement_id.label("requirement_id"),
+        func.count().label("test_case_count"),
+        *(
+            func.count(case((TestCase.status == status, 1))).label(column)
+            for status, column in STATUS_COUNTERS.items()
+        )
+    ).group_by(TestCase.requirement_id).subquery()
+    parents = select(
+        TraceabilityLink.target_id.label("requirement_id"), func.count().label("parent_link_count")
+    ).group_by(TraceabilityLink.target_id).subquery()
+    children = select(
+        TraceabilityLink.source_id.label("requirement_id"), func.count().label("child_link_count")
+    ).group_by(TraceabilityLink.source_id).subquery()
+
+    sources = {column: tests for column in ("test_case_count", *STATUS_COUNTERS.values())}
+    sources.update(parent_link_count=parents, child_link_count=children)
+    return select(
+        Requirement.id,
+        *(func.coalesce(sources[column].c[column], 0).label(column) for column in COUNTER_COLUMNS),
+        *(getattr(Requirement, column).label(f"stored_{column}") for column in COUNTER_COLUMNS)
+    ).outerjoin(
+        tests, tests.c.requirement_id == Requirement.id
+    ).outerjoin(
+        parents, parents.c.requirement_id == Requirement.id
+    ).outerjoin(
+        children, children.c.requirement_id == Requirement.id
+    )
+
+
+def reconcile_requirement_counters(db: Session) -> Dict:
+    """
+    Compare every requirement's counters with its test cases and trace links.
+
+    One aggregate query finds the requirements whose stored counts differ;
+    those are rewritten with one executemany UPDATE. Counters are kept up
+    to date on every ORM write, so this only repairs drift from writes
+    made outside the application (manual SQL, restores).
+    """
+    checked = 0
+    fixes = []
+    for row in db.execute(_actual_counts()).mappings():
+        checked += 1
+        if any(row[column] != row[f"stored_{column}"] for column in COUNTER_COLUMNS):
+            fixes.append({"requirement_pk": row["id"], **{f"actual_{column}": row[column] for column in COUNTER_COLUMNS}})
+
+    if fixes:
+        table = Requirement.__table__
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("requirement_pk"))
+            .values({column: bindparam(f"actual_{column}") for column in COUNTER_COLUMNS}),
+            fixes
+        )
+    db.commit()
+
+    if fixes:
+        logger.warning(f"Reconciled counters of {len(fixes)} of {checked} requirements")
+    return {"checked": checked, "fixed": len(fixes)}
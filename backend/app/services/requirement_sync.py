@@ -0,0 +1,115 @@
+"""
+Requirement Sync Service
+Bulk INSERT ... ON CONFLICT upserts keyed on the business identifier, skipping rows whose content is unchanged
+"""
+
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.requirement import CONTENT_FIELDS, Requirement, requirement_content_hash
+
+# Rows per upsert statement (well within the bind parameter limits of both databases)
+UPSERT_BATCH_SIZE = 1000
+
+
+def batches(records: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(records)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def with_defaults(model, row: Mapping[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """The fields of a row, unset ones replaced by the column's scalar default as an ORM insert would"""
+    values = {}
+    for field in fields:
+        value = row.get(field)
+        if value is None:
+            default = model.__table__.c[field].default
+            if default is not None and default.is_scalar:
+                value = default.arg
+        values[field] = value
+    return values
+
+
+def upsert_statement(db: Session, model, rows: List[Dict], key: str, update_fields: Sequence[str], where=None):
+    """
+    One multi-row INSERT ... ON CONFLICT (key) DO UPDATE of the update fields.
+
+    `where` limits which conflicting rows are rewritten; it can refer to
+    the proposed row as `statement.excluded`, so it is a callable taking
+    the statement. Raises ValueError on databases without ON CONFLICT.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(model).values(rows)
+    elif dialect == "sqlite":
+        statement = sqlite.insert(model).values(rows)
+    else:
+        raise ValueError(f"Bulk upserts are not supported on {dialect}")
+
+    set_ = {field: statement.excluded[field] for field in update_fields}
+    set_["updated_at"] = func.now()
+    return statement.on_conflict_do_update(
+        index_elements=[key],
+        set_=set_,
+        where=where(statement) if where is not None else None,
+    )
+
+
+def upsert_requirements(
+    db: Session,
+    records: Iterable[Mapping[str, Any]],
+    user_id: int,
+    on_progress: Optional[Callable[[int], None]] = None
+) -> Dict[str, int]:
+    """
+    Insert or update requirements by requirement_id, without committing.
+
+    Each record holds requirement_id and the CONTENT_FIELDS; an update
+    replaces all of them (missing fields are stored unset or at their
+    default), a new row is created by `user_id`. Per UPSERT_BATCH_SIZE
+    records, one SELECT reads the stored content hashes and one
+    INSERT ... ON CONFLICT writes the new and changed rows; rows whose hash
+    matches are not sent at all, and the conflict clause only rewrites rows
+    whose hash still differs. Later duplicates of a requirement_id win.
+    Records are consumed lazily, so a generator keeps memory bounded by
+    one batch. Returns inserted / updated / unchanged counts.
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    for batch in batches(records, UPSERT_BATCH_SIZE):
+        rows = {}
+        for record in batch:
+            row = with_defaults(Requirement, record, CONTENT_FIELDS)
+            row["requirement_id"] = record["requirement_id"]
+            row["content_hash"] = requirement_content_hash(row)
+            row["created_by_id"] = user_id
+            rows[row["requirement_id"]] = row
+
+        stored = dict(db.execute(
+            select(Requirement.requirement_id, Requirement.content_hash).where(Requirement.requirement_id.in_(rows))
+        ).all())
+        changed = []
+        for requirement_id, row in rows.items():
+            if requirement_id not in stored:
+                counts["inserted"] += 1
+            elif stored[requirement_id] == row["content_hash"]:
+                counts["unchanged"] += 1
+                continue
+            else:
+                counts["updated"] += 1
+            changed.append(row)
+
+        if changed:
+            db.execute(upsert_statement(
+                db, Requirement, changed, "requirement_id", CONTENT_FIELDS + ("content_hash",),
+                where=lambda statement: Requirement.content_hash.is_distinct_from(statement.excluded.content_hash)
+            ))
+        if on_progress:
+            on_progress(sum(counts.values()))
+
+    return counts
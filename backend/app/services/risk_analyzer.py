@@ -159,10 +159,7 @@ class RiskAnalyzer:
         Returns:
             (score, details_text)
         """
-        # Count parent and child trace links
-        parent_count = len(requirement.parent_traces) if requirement.parent_traces else 0
-        child_count = len(requirement.child_traces) if requirement.child_traces else 0
-        total_links = parent_count + child_count
+        total_links = (requirement.parent_link_count or 0) + (requirement.child_link_count or 0)
 
         if total_links == 0:
             return (100.0, "Orphaned - no traceability links")
@@ -183,17 +180,14 @@ class RiskAnalyzer:
         Returns:
             (score, details_text)
         """
-        # Count test cases and their status
-        test_cases = requirement.test_cases if requirement.test_cases else []
-        total_tests = len(test_cases)
+        total_tests = requirement.test_case_count or 0
 
         if total_tests == 0:
             return (100.0, "No test cases - unverified requirement")
 
-        # Count passed tests
-        passed_tests = sum(1 for tc in test_cases if tc.status == "Passed")
-        failed_tests = sum(1 for tc in test_cases if tc.status == "Failed")
-        pending_tests = sum(1 for tc in test_cases if tc.status == "Pending")
+        passed_tests = requirement.passed_test_count or 0
+        failed_tests = requirement.failed_test_count or 0
+        pending_tests = requirement.pending_test_count or 0
 
         if failed_tests > 0:
             return (90.0, f"{failed_tests} failed test(s) - verification issues")
@@ -0,0 +1,300 @@
+"""
+Similar-Failure Retrieval Index
+Hashed n-gram vectors of failure logs with memory-mapped persistence and top-k cosine search
+"""
+
+import fcntl
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Vector width: unigrams plus bigrams of a log collide heavily in fewer buckets, which
+# lets boilerplate outrank the distinctive lines (see the recall test); 100k failures
+# x 2048 float32 = ~800 MB, memory-mapped and paged in by the mat-vec product per search
+DEFAULT_DIM = 2048
+# Rows allocated for the first append; capacity doubles when full
+INITIAL_CAPACITY = 256
+# Cosine below this is noise shared by every failure log ("error", "test", ...)
+MIN_SIMILARITY = 0.35
+DEFAULT_TOP_K = 5
+
+VECTORS_FILE = "vectors.f32"
+META_FILE = "meta.jsonl"
+MANIFEST_FILE = "manifest.json"
+
+# Words only: numbers, ids and hex values vary between runs of the same failure
+_TOKEN_PATTERN = re.compile(r"[a-z][a-z_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def vectorize(text: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """
+    L2-normalised hashed vector of word unigrams and bigrams.
+
+    Features are hashed with crc32 (stable across processes, unlike hash())
+    into `dim` buckets with a sign bit to cancel collisions on average;
+    counts are damped with 1 + log(tf).
+    """
+    tokens = tokenize(text)
+    features = Counter(tokens)
+    features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, count in features.items():
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + math.log(count))
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def _grow(buffer: np.ndarray, rows: int) -> np.ndarray:
+    """`buffer`, or a copy with double the capacity when it cannot hold `rows` rows"""
+    if rows <= len(buffer):
+        return buffer
+    grown = np.empty((max(rows, 2 * len(buffer), INITIAL_CAPACITY),) + buffer.shape[1:], dtype=buffer.dtype)
+    grown[:len(buffer)] = buffer
+    return grown
+
+
+def failure_text(execution_log: Optional[str], actual_results: Optional[str] = None) -> str:
+    """Text indexed for a failure: the execution log plus the recorded actual results"""
+    return "\n".join(part for part in (execution_log, actual_results) if part)
+
+
+def content_key(text: str) -> str:
+    """Identity of a failure's token stream, used to skip duplicate entries"""
+    return hashlib.sha1(" ".join(tokenize(text)).encode("utf-8")).hexdigest()
+
+
+class SimilarityIndex:
+    """
+    Append-only store of failure vectors with cosine top-k search.
+
+    With a directory the vectors live in a raw float32 file that is
+    memory-mapped for search (shared page cache across worker processes)
+    and one JSON line of metadata per row; appends write both files, and
+    other processes pick up new rows within `check_interval` seconds.
+    Without a directory the index is kept in memory, in a buffer that
+    doubles when full so appends write their row in place.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, dim: int = DEFAULT_DIM, check_interval: float = 2.0):
+        self.directory = Path(directory) if directory else None
+        self.dim = dim
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._meta_offset = 0
+        self._keys = set()
+        # Preallocated rows; the state holds views of the filled part
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        # (matrix, metadata, test case ids) swapped as one tuple so searches never see a partial
+        # append; metadata only grows, and searches read no further than their matrix
+        self._state: Tuple[np.ndarray, List[Dict], np.ndarray] = (self._vectors, [], self._ids)
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._load_manifest()
+            self._reload(force=True)
+
+    def __len__(self) -> int:
+        return len(self._state[2])
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _load_manifest(self) -> None:
+        manifest = self._path(MANIFEST_FILE)
+        if manifest.exists():
+            # Existing index keeps the width it was built with
+            self.dim = json.loads(manifest.read_text())["dim"]
+        else:
+            manifest.write_text(json.dumps({"dim": self.dim}))
+
+    def _map(self, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def _read_new_entries(self) -> None:
+        """Map rows appended since the last read (by this or another process); lock held"""
+        meta_path = self._path(META_FILE)
+        if not meta_path.exists() or meta_path.stat().st_size == self._meta_offset:
+            return
+
+        entries = []
+        with open(meta_path, "rb") as f:
+            f.seek(self._meta_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Partially written by a concurrent append
+                self._meta_offset += len(line)
+                entry = json.loads(line)
+                entries.append(entry)
+                self._keys.add((entry["test_case_id"], entry["key"]))
+
+        metadata = self._state[1]
+        rows = len(metadata) + len(entries)
+        self._ids = _grow(self._ids, rows)
+        self._ids[len(metadata):rows] = [entry["test_case_id"] for entry in entries]
+        metadata.extend(entries)
+        # Vectors are written before their metadata line, so the file holds at least `rows`
+        self._state = (self._map(rows), metadata, self._ids[:rows])
+
+    def _reload(self, force: bool = False) -> None:
+        """Pick up appends from other processes, at most every `check_interval` seconds"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            self._read_new_entries()
+
+    def add(
+        self,
+        text: str,
+        test_case_id: int,
+        test_case_name: Optional[str] = None,
+        failure_type: Optional[str] = None,
+        analysis_id: Optional[int] = None
+    ) -> bool:
+        """Record a failure; returns False if this test case already has the same failure"""
+        if not text or not text.strip():
+            return False
+
+        key = content_key(text)
+        vector = vectorize(text, self.dim)
+        entry = {
+            "test_case_id": test_case_id,
+            "test_case_name": test_case_name,
+            "failure_type": failure_type,
+            "analysis_id": analysis_id,
+            "key": key,
+            "recorded_at": datetime.utcnow().isoformat() + "Z"
+        }
+
+        with self._lock:
+            if self.directory is None:
+                if (test_case_id, key) in self._keys:
+                    return False
+                self._keys.add((test_case_id, key))
+                metadata = self._state[1]
+                rows = len(metadata)
+                # Rows past the current views are free, so these writes are invisible to searches
+                self._vectors = _grow(self._vectors, rows + 1)
+                self._vectors[rows] = vector
+                self._ids = _grow(self._ids, rows + 1)
+                self._ids[rows] = test_case_id
+                metadata.append(entry)
+                self._state = (self._vectors[:rows + 1], metadata, self._ids[:rows + 1])
+                return True
+
+            with open(self._path(META_FILE), "ab") as meta_file:
+                # Serialise writers across processes; catch up on their rows first
+                fcntl.flock(meta_file, fcntl.LOCK_EX)
+                try:
+                    self._read_new_entries()
+                    if (test_case_id, key) in self._keys:
+                        return False
+
+                    rows = len(self._state[1])
+                    vectors_path = self._path(VECTORS_FILE)
+                    with open(vectors_path, "r+b" if vectors_path.exists() else "wb") as f:
+                        # Write at the row offset (not append) so a vector orphaned by a crash is overwritten
+                        f.seek(rows * self.dim * 4)
+                        f.write(vector.tobytes())
+                        f.truncate()
+
+                    line = (json.dumps(entry) + "\n").encode("utf-8")
+                    meta_file.write(line)
+                    meta_file.flush()
+                    os.fsync(meta_file.fileno())
+                    self._read_new_entries()
+                finally:
+                    fcntl.flock(meta_file, fcntl.LOCK_UN)
+        return True
+
+    def search(
+        self,
+        text: str,
+        k: int = DEFAULT_TOP_K,
+        exclude_test_case_id: Optional[int] = None,
+        min_similarity: float = MIN_SIMILARITY
+    ) -> List[Dict]:
+        """Top-k recorded failures by cosine similarity to `text`"""
+        if self.directory is not None:
+            self._reload()
+        matrix, metadata, ids = self._state
+        if not len(matrix) or not text:
+            return []
+
+        scores = matrix @ vectorize(text, self.dim)
+        if exclude_test_case_id is not None:
+            scores[ids == exclude_test_case_id] = -1.0
+
+        # Over-fetch so repeat failures of one test case do not starve the result
+        fetch = min(len(scores), k * 4)
+        top = np.argpartition(-scores, fetch - 1)[:fetch]
+        results, seen = [], set()
+        for row in top[np.argsort(-scores[top])]:
+            score = float(scores[row])
+            if score < min_similarity or len(results) == k:
+                break
+            entry = metadata[row]
+            if entry["test_case_id"] in seen:
+                continue
+            seen.add(entry["test_case_id"])
+            results.append({
+                "test_case_id": entry["test_case_id"],
+                "test_case_name": entry["test_case_name"],
+                "failure_type": entry["failure_type"],
+                "analysis_id": entry["analysis_id"],
+                "recorded_at": entry["recorded_at"],
+                "similarity": round(score, 3)
+            })
+        return results
+
+
+_similarity_index: Optional[SimilarityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Process-wide index at SIMILARITY_INDEX_DIR (in memory when unset)"""
+    global _similarity_index
+    if _similarity_index is None:
+        with _index_lock:
+            if _similarity_index is None:
+                _similarity_index = SimilarityIndex(settings.similarity_index_dir or None)
+    return _similarity_index
+
+
+def reset_similarity_index() -> None:
+    """Drop the process-wide index so the next call reopens it (tests, config changes)"""
+    global _similarity_index
+    with _index_lock:
+        _similarity_index = None
@@ -0,0 +1,274 @@
+"""
+Tabular Export
+Streams rows as CSV, XLSX or Parquet, encoding a chunk at a time so memory use does not grow with the row count
+"""
+
+import csv
+import importlib.util
+import io
+import re
+import zipfile
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+# Bytes buffered before a chunk is sent
+CHUNK_SIZE = 64 * 1024
+
+# Excel's worksheet row limit (including the header row)
+XLSX_MAX_ROWS = 1_048_576
+
+# Rows per Parquet row group (and per chunk sent)
+PARQUET_ROW_GROUP_SIZE = 10000
+
+# format: (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Column kinds understood by the typed formats (Parquet); anything else is a string
+COLUMN_KINDS = ("int", "float", "bool", "datetime", "str")
+
+
+def parquet_available() -> bool:
+    """Parquet export needs the optional pyarrow package"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _cell_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+# ============================================================================
+# CSV
+# ============================================================================
+
+def iter_csv(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """UTF-8 CSV with a header row, in chunks of about CHUNK_SIZE bytes"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_cell_value(value) for value in row])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+# ============================================================================
+# XLSX
+# ============================================================================
+
+# Characters XML 1.0 does not allow, even escaped
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _workbook(sheet_name: str) -> str:
+    name = escape(sheet_name[:31], {'"': "&quot;"})
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def _xlsx_cell(value: Any) -> str:
+    value = _cell_value(value)
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_ILLEGAL_XML.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values: Iterable[Any]) -> str:
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file that hands written bytes back in chunks"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._size += len(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def pending(self) -> int:
+        return self._size
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks, self._size = [], 0
+        return data
+
+
+def iter_xlsx(columns: Sequence[str], rows: Iterable[Sequence[Any]], sheet_name: str = "Export") -> Iterator[bytes]:
+    """
+    A single-sheet XLSX workbook with a header row, in chunks.
+
+    Written as a streamed ZIP (data descriptors, no seeking back) with
+    inline strings, so no shared string table has to be held in memory.
+    Rows past Excel's XLSX_MAX_ROWS limit raise ValueError.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _workbook(sheet_name))
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+
+        with archive.open("xl/worksheets/sheet1.xml", mode="w") as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + _xlsx_row(columns)
+            ).encode("utf-8"))
+            for count, row in enumerate(rows, start=2):
+                if count > XLSX_MAX_ROWS:
+                    raise ValueError(f"XLSX exports are limited to {XLSX_MAX_ROWS - 1} rows")
+                sheet.write(_xlsx_row(row).encode("utf-8"))
+                if sink.pending() >= CHUNK_SIZE:
+                    yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+# ============================================================================
+# Parquet
+# ============================================================================
+
+def _arrow_type(pa, kind: str):
+    return {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "datetime": pa.timestamp("us"),
+    }.get(kind, pa.string())
+
+
+def _parquet_value(value: Any, kind: str) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, Enum):
+        value = value.value
+    if kind == "datetime":
+        # Naive UTC, as stored by SQLite
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    if kind == "str":
+        return str(value)
+    return value
+
+
+def iter_parquet(
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    types: Optional[Dict[str, str]] = None
+) -> Iterator[bytes]:
+    """
+    A Parquet file, one row group (and chunk) per PARQUET_ROW_GROUP_SIZE rows.
+
+    `types` maps column names to COLUMN_KINDS (default str). Requires
+    pyarrow (see parquet_available); raises ImportError without it.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    kinds = [(types or {}).get(name, "str") for name in columns]
+    schema = pa.schema([(name, _arrow_type(pa, kind)) for name, kind in zip(columns, kinds)])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    def row_group(batch):
+        values = zip(*batch)
+        return pa.Table.from_arrays(
+            [
+                pa.array([_parquet_value(v, kind) for v in column], type=field.type)
+                for column, kind, field in zip(values, kinds, schema)
+            ],
+            schema=schema
+        )
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= PARQUET_ROW_GROUP_SIZE:
+            writer.write_table(row_group(batch))
+            batch = []
+            yield sink.drain()
+    if batch:
+        writer.write_table(row_group(batch))
+    writer.close()
+    yield sink.drain()
+
+
+def iter_export(
+    export_format: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    sheet_name: str = "Export",
+    types: Optional[Dict[str, str]] = None
+) -> Iterator[bytes]:
+    """Rows encoded in one of EXPORT_FORMATS (`types` is used by Parquet, `sheet_name` by XLSX)"""
+    if export_format == "csv":
+        return iter_csv(columns, rows)
+    if export_format == "xlsx":
+        return iter_xlsx(columns, rows, sheet_name)
+    if export_format == "parquet":
+        return iter_parquet(columns, rows, types)
+    raise ValueError(f"Unknown export format: {export_format}")
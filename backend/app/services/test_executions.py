@@ -0,0 +1,247 @@
+"""
+Test Execution History
+Appending to, querying, purging and partitioning the test_executions table, and flaky test detection
+"""
+
+import base64
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, insert, select, text, tuple_
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.test_case import TestCase, TestCaseStatus
+from app.models.test_execution import TestExecution
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Monthly partitions created ahead of the current month (PostgreSQL)
+PARTITION_MONTHS_AHEAD = 2
+_PARTITION_NAME = re.compile(r"^test_executions_(\d{4})_(\d{2})$")
+
+# (executed_at, id) of the last execution on a page
+ExecutionCursor = Tuple[datetime, int]
+
+
+def execution_row(test_case: TestCase, executed_at: datetime) -> Dict:
+    """History row for a test case's current execution fields"""
+    return {
+        "test_case_id": test_case.id,
+        "requirement_id": test_case.requirement_id,
+        "status": test_case.status,
+        "actual_results": test_case.actual_results,
+        "execution_duration": test_case.execution_duration,
+        "executed_by": test_case.executed_by,
+        "executed_at": executed_at
+    }
+
+
+def record_executions(db: Session, rows: List[Dict]) -> None:
+    """Append history rows (see execution_row) as one multi-row INSERT; the caller commits"""
+    if rows:
+        db.execute(insert(TestExecution), rows)
+
+
+# ============================================================================
+# History queries
+# ============================================================================
+
+def encode_cursor(cursor: ExecutionCursor) -> str:
+    """URL-safe base64, as a timezone offset's "+" would otherwise arrive as a space in the query string"""
+    raw = f"{cursor[0].isoformat()}_{cursor[1]}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(value: str) -> ExecutionCursor:
+    """Parse a cursor returned with a previous page; raises ValueError when malformed"""
+    raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+    executed_at, _, execution_id = raw.rpartition("_")
+    return datetime.fromisoformat(executed_at), int(execution_id)
+
+
+def _history(db: Session, column, value: int, limit: int, before: Optional[ExecutionCursor]):
+    query = db.query(TestExecution).filter(column == value)
+    if before is not None:
+        query = query.filter(tuple_(TestExecution.executed_at, TestExecution.id) < tuple_(*before))
+
+    rows = query.order_by(TestExecution.executed_at.desc(), TestExecution.id.desc()).limit(limit + 1).all()
+    next_cursor = (rows[limit - 1].executed_at, rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def get_test_case_history(
+    db: Session,
+    test_case_id: int,
+    limit: int = 50,
+    before: Optional[ExecutionCursor] = None
+) -> Tuple[List[TestExecution], Optional[ExecutionCursor]]:
+    """A test case's executions, newest first, and the cursor for the next page"""
+    return _history(db, TestExecution.test_case_id, test_case_id, limit, before)
+
+
+def get_requirement_history(
+    db: Session,
+    requirement_id: int,
+    limit: int = 50,
+    before: Optional[ExecutionCursor] = None
+) -> Tuple[List[TestExecution], Optional[ExecutionCursor]]:
+    """Executions of all of a requirement's test cases, newest first, and the cursor for the next page"""
+    return _history(db, TestExecution.requirement_id, requirement_id, limit, before)
+
+
+def find_flaky_tests(
+    db: Session,
+    since: datetime,
+    min_executions: int = 5,
+    min_flip_rate: float = 0.3,
+    limit: int = 50
+) -> List[Dict]:
+    """
+    Test cases whose passed / failed results flip between consecutive runs.
+
+    Computed in one query: LAG() over each test case's executions since
+    `since` (blocked / pending runs are ignored) marks flips, which are
+    aggregated per test case. The flip rate is flips / (executions - 1);
+    1.0 means the result changed on every run. Highest rate first.
+    """
+    previous_status = func.lag(TestExecution.status).over(
+        partition_by=TestExecution.test_case_id,
+        order_by=(TestExecution.executed_at, TestExecution.id)
+    )
+    ordered = select(
+        TestExecution.test_case_id,
+        TestExecution.status,
+        previous_status.label("previous_status")
+    ).where(
+        TestExecution.executed_at >= since,
+        TestExecution.status.in_([TestCaseStatus.PASSED, TestCaseStatus.FAILED])
+    ).subquery()
+
+    flipped = case(
+        (and_(ordered.c.previous_status.isnot(None), ordered.c.previous_status != ordered.c.status), 1),
+        else_=0
+    )
+    executions = func.count()
+    flips = func.sum(flipped)
+    stats = select(
+        ordered.c.test_case_id,
+        executions.label("executions"),
+        flips.label("flips"),
+        func.sum(case((ordered.c.status == TestCaseStatus.FAILED, 1), else_=0)).label("failures")
+    ).group_by(
+        ordered.c.test_case_id
+    ).having(
+        executions >= max(min_executions, 2)
+    ).having(
+        flips >= min_flip_rate * (executions - 1)
+    ).subquery()
+
+    flip_rate = stats.c.flips * 1.0 / (stats.c.executions - 1)
+    rows = db.query(
+        stats, flip_rate.label("flip_rate"), TestCase.test_case_id.label("identifier"), TestCase.title,
+        TestCase.requirement_id
+    ).join(
+        TestCase, TestCase.id == stats.c.test_case_id
+    ).order_by(flip_rate.desc(), stats.c.test_case_id).limit(limit).all()
+
+    return [
+        {
+            "test_case_id": row.test_case_id,
+            "test_case_identifier": row.identifier,
+            "title": row.title,
+            "requirement_id": row.requirement_id,
+            "executions": row.executions,
+            "failures": row.failures,
+            "flips": row.flips,
+            "flip_rate": round(row.flip_rate, 4)
+        }
+        for row in rows
+    ]
+
+
+# ============================================================================
+# Partitions and retention
+# ============================================================================
+
+def _month_start(moment: datetime, months: int = 0) -> datetime:
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _is_partitioned(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def ensure_partitions(db: Session, now: Optional[datetime] = None, months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """
+    Create the monthly partitions for this month and `months_ahead` more.
+
+    Rows outside every monthly partition land in the default partition. A
+    month that already has rows there cannot get its own partition and is
+    skipped with a warning (its rows age out through purge_executions).
+    No-op except on PostgreSQL; returns the partition names in place.
+    """
+    if not _is_partitioned(db):
+        return []
+
+    now = now or datetime.utcnow()
+    names = []
+    for offset in range(months_ahead + 1):
+        start, end = _month_start(now, offset), _month_start(now, offset + 1)
+        name = f"test_executions_{start:%Y_%m}"
+        try:
+            with db.begin_nested():
+                db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF test_executions "
+                    f"FOR VALUES FROM ('{start:%Y-%m-%d} 00:00+00') TO ('{end:%Y-%m-%d} 00:00+00')"
+                ))
+        except DBAPIError as e:
+            logger.warning(f"Could not create partition {name}: {e.orig}")
+            continue
+        names.append(name)
+    db.commit()
+    return names
+
+
+def purge_executions(db: Session, retention_days: Optional[int] = None, now: Optional[datetime] = None) -> Dict:
+    """
+    Remove executions older than `retention_days` (default from settings; 0 keeps all).
+
+    On PostgreSQL monthly partitions that lie wholly before the cutoff are
+    dropped; the remaining old rows (in the partition straddling the cutoff
+    or the default partition) are deleted.
+    """
+    retention_days = retention_days if retention_days is not None else settings.test_execution_retention_days
+    if retention_days <= 0:
+        return {"partitions_dropped": 0, "rows_deleted": 0}
+
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    dropped = []
+    if _is_partitioned(db):
+        partitions = db.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'test_executions'"
+        )).scalars().all()
+        for name in sorted(partitions):
+            match = _PARTITION_NAME.match(name)
+            if match is None:
+                continue
+            start = datetime(int(match.group(1)), int(match.group(2)), 1)
+            if _month_start(start, 1) <= cutoff:
+                db.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+
+    deleted = db.query(TestExecution).filter(
+        TestExecution.executed_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    logger.info(f"Purged test executions before {cutoff:%Y-%m-%d}: {len(dropped)} partitions dropped, {deleted} rows deleted")
+    return {"partitions_dropped": len(dropped), "rows_deleted": deleted}
@@ -0,0 +1,216 @@
+"""
+Test Result Import Service
+Bulk execution results from CI (JUnit XML or JSONL), parsed incrementally and applied as batched UPDATEs
+"""
+
+import json
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from collections import defaultdict
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.counters import add_contribution, apply_counter_deltas
+from app.models.test_case import TestCase, TestCaseStatus
+from app.schemas.test_case import TestResultRecord
+from app.services.similarity_index import get_similarity_index
+from app.services.test_executions import record_executions
+
+logger = logging.getLogger(__name__)
+
+# Rows per executemany UPDATE
+UPDATE_BATCH_SIZE = 1000
+# Unknown test case messages returned to the caller (the count is always complete)
+MAX_REPORTED_ERRORS = 100
+
+RESULT_FORMATS = ("junit", "jsonl")
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """Result format from a file name (.xml / .jsonl / .ndjson, optionally .gz); None if unknown"""
+    name = (filename or "").lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith(".xml"):
+        return "junit"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return None
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _junit_record(testcase: ET.Element) -> TestResultRecord:
+    """
+    Map a <testcase> to a result.
+
+    The test case id is a <property name="test_case_id"> if present, else
+    the testcase name. <failure> / <error> mean failed, <skipped> blocked.
+    """
+    test_case_id = testcase.get("name", "")
+    status = TestCaseStatus.PASSED
+    actual_results = None
+    for child in testcase:
+        tag = _local_name(child.tag)
+        if tag == "properties":
+            for prop in child:
+                if prop.get("name") == "test_case_id" and prop.get("value"):
+                    test_case_id = prop.get("value")
+        elif tag in ("failure", "error"):
+            status = TestCaseStatus.FAILED
+            actual_results = "\n".join(
+                part for part in (child.get("message"), (child.text or "").strip()) if part
+            ) or tag
+        elif tag == "skipped" and status != TestCaseStatus.FAILED:
+            status = TestCaseStatus.BLOCKED
+            actual_results = child.get("message") or "skipped"
+        elif tag == "system-out" and actual_results is None and (child.text or "").strip():
+            actual_results = child.text.strip()
+
+    try:
+        duration = round(float(testcase.get("time")))
+    except (TypeError, ValueError):
+        duration = None
+
+    return TestResultRecord(
+        test_case_id=test_case_id.strip(),
+        status=status,
+        actual_results=actual_results,
+        execution_duration=duration
+    )
+
+
+def iter_junit_results(fileobj: BinaryIO) -> Iterator[TestResultRecord]:
+    """
+    Results from a JUnit / xUnit XML report, one <testcase> at a time.
+
+    Each testcase is detached from its parent once read, so memory use
+    does not grow with the report. Raises ET.ParseError on invalid XML.
+    """
+    open_elements = []
+    for event, element in ET.iterparse(fileobj, events=("start", "end")):
+        if event == "start":
+            open_elements.append(element)
+            continue
+        open_elements.pop()
+        if _local_name(element.tag) == "testcase":
+            yield _junit_record(element)
+            if open_elements:
+                open_elements[-1].remove(element)
+
+
+def iter_jsonl_results(fileobj: BinaryIO) -> Iterator[TestResultRecord]:
+    """
+    Results from JSON Lines, one TestResultRecord object per line.
+
+    Blank lines are skipped; raises ValueError naming the line for
+    invalid JSON or fields.
+    """
+    for line_number, line in enumerate(fileobj, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield TestResultRecord.model_validate(json.loads(line))
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: {e}") from e
+
+
+def iter_results(fileobj: BinaryIO, result_format: str) -> Iterator[TestResultRecord]:
+    if result_format == "junit":
+        return iter_junit_results(fileobj)
+    if result_format == "jsonl":
+        return iter_jsonl_results(fileobj)
+    raise ValueError(f"Unknown result format: {result_format}")
+
+
+def import_test_results(
+    db: Session,
+    results: Iterable[TestResultRecord],
+    executed_by: str,
+    on_progress: Optional[Callable[[int], None]] = None
+) -> Dict:
+    """
+    Record execution results on their test cases in one transaction.
+
+    Test case ids are resolved through a single preloaded id map, and
+    results are written UPDATE_BATCH_SIZE rows per executemany UPDATE,
+    each batch also appended to the execution history and its status
+    changes applied to the requirement counters.
+    `executed_by` applies to results that do not name an executor.
+    Results for unknown test cases are counted as failed. Failure text
+    is added to the similarity index after the commit, as for single
+    executions.
+
+    Derived caches keyed on table versions are invalidated once, by the
+    commit. Returns updated / failed counts and the first error messages.
+    """
+    test_case_ids = {}
+    # Current status by row id, followed through the import for the counters
+    statuses = {}
+    for row in db.query(TestCase.test_case_id, TestCase.id, TestCase.requirement_id, TestCase.status):
+        test_case_ids[row.test_case_id] = (row.id, row.requirement_id)
+        statuses[row.id] = row.status
+    executed_at = datetime.utcnow()
+
+    updated = 0
+    failed = 0
+    errors = []
+    failures = []
+    batch = []
+    history = []
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    def flush_batch():
+        nonlocal updated, batch, history, deltas
+        db.execute(update(TestCase), batch)
+        record_executions(db, history)
+        apply_counter_deltas(db, deltas)
+        updated += len(batch)
+        batch, history = [], []
+        deltas = defaultdict(lambda: defaultdict(int))
+        if on_progress:
+            on_progress(updated)
+
+    for record in results:
+        row_id, requirement_id = test_case_ids.get(record.test_case_id, (None, None))
+        if row_id is None:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"Test case '{record.test_case_id}' not found")
+            continue
+
+        fields = {
+            "status": record.status,
+            "actual_results": record.actual_results,
+            "execution_duration": record.execution_duration,
+            "executed_by": record.executed_by or executed_by
+        }
+        batch.append({"id": row_id, "execution_date": executed_at, **fields})
+        add_contribution(deltas, TestCase, (requirement_id, statuses[row_id]), -1)
+        add_contribution(deltas, TestCase, (requirement_id, record.status), 1)
+        statuses[row_id] = record.status
+        history.append({"test_case_id": row_id, "requirement_id": requirement_id, "executed_at": executed_at, **fields})
+        if record.status == TestCaseStatus.FAILED and record.actual_results:
+            failures.append((record.actual_results, row_id, record.test_case_id))
+        if len(batch) >= UPDATE_BATCH_SIZE:
+            flush_batch()
+
+    if batch:
+        flush_batch()
+    db.commit()
+
+    index = get_similarity_index()
+    for text, row_id, name in failures:
+        index.add(text, test_case_id=row_id, test_case_name=name)
+
+    logger.info(f"Imported test results: {updated} updated, {failed} unknown test cases")
+    return {
+        "updated": updated,
+        "failed": failed,
+        "errors": errors
+    }
@@ -0,0 +1,90 @@
+"""
+Traceability Link Import Service
+Bulk creation of traceability links, shared by the bulk endpoint and the import job
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.models.requirement import Requirement
+from app.models.traceability import TraceabilityLink
+from app.schemas.traceability import TraceabilityLinkCreate
+
+# Existing-link lookups per query (keeps IN lists within driver limits)
+LOOKUP_CHUNK_SIZE = 1000
+
+
+def import_traceability_links(
+    db: Session,
+    links: List[TraceabilityLinkCreate],
+    skip_duplicates: bool,
+    user_id: int,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> Dict:
+    """
+    Create links, skipping (or failing) duplicates, in one transaction.
+
+    Requirement ids and existing links are looked up in chunks instead of
+    per link; duplicates within the batch are caught as well. Links to
+    unknown requirements are reported as failed. `on_progress(done, total)`
+    is called after each chunk. Returns created / skipped / failed counts
+    and error messages.
+    """
+    created = 0
+    skipped = 0
+    failed = 0
+    errors = []
+    seen = set()
+    total = len(links)
+
+    for start in range(0, total, LOOKUP_CHUNK_SIZE):
+        chunk = links[start:start + LOOKUP_CHUNK_SIZE]
+        keys = [(link.source_id, link.target_id, link.link_type) for link in chunk]
+
+        requirement_ids = {link.source_id for link in chunk} | {link.target_id for link in chunk}
+        known = {
+            row.id for row in
+            db.query(Requirement.id).filter(Requirement.id.in_(requirement_ids))
+        }
+        seen.update(
+            tuple(row) for row in db.query(
+                TraceabilityLink.source_id, TraceabilityLink.target_id, TraceabilityLink.link_type
+            ).filter(
+                tuple_(
+                    TraceabilityLink.source_id, TraceabilityLink.target_id, TraceabilityLink.link_type
+                ).in_(keys)
+            )
+        )
+
+        for link_data, key in zip(chunk, keys):
+            missing = [rid for rid in (link_data.source_id, link_data.target_id) if rid not in known]
+            if missing:
+                errors.append(f"Requirement {missing[0]} not found (source={link_data.source_id}, target={link_data.target_id})")
+                failed += 1
+                continue
+
+            if key in seen:
+                if skip_duplicates:
+                    skipped += 1
+                else:
+                    errors.append(f"Duplicate link: source={link_data.source_id}, target={link_data.target_id}")
+                    failed += 1
+                continue
+
+            seen.add(key)
+            db.add(TraceabilityLink(**link_data.model_dump(), created_by_id=user_id))
+            created += 1
+
+        if on_progress:
+            on_progress(min(start + LOOKUP_CHUNK_SIZE, total), total)
+
+    db.commit()
+
+    return {
+        "created": created,
+        "skipped": skipped,
+        "failed": failed,
+        "errors": errors
+    }
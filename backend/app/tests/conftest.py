@@ -7,6 +7,9 @@ from app.database import Base, get_db
 from app.config import get_settings
 from app.core.security import get_password_hash
 from app.models.user import User
+from app.core.cache import user_cache, stale_subjects
+from app.services.pattern_learning import reset_pattern_weights
+from app.services.similarity_index import reset_similarity_index
 
 settings = get_settings()
 
@@ -19,6 +22,8 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database session for each test"""
+    user_cache.clear()
+    stale_subjects.clear()
     Base.metadata.create_all(bind=engine)
     session = TestingSessionLocal()
     try:
@@ -28,6 +33,24 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def similarity_index_dir(tmp_path, monkeypatch):
+    """Keep the similar-failure index per test, out of the source tree"""
+    monkeypatch.setattr(settings, "similarity_index_dir", str(tmp_path / "similarity_index"))
+    reset_similarity_index()
+    yield tmp_path / "similarity_index"
+    reset_similarity_index()
+
+
+@pytest.fixture(autouse=True)
+def neutral_pattern_weights(monkeypatch):
+    """Learned pattern weights come from the app database; keep them at 1.0 in tests"""
+    monkeypatch.setattr(settings, "pattern_weights_ttl_seconds", 0)
+    reset_pattern_weights()
+    yield
+    reset_pattern_weights()
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with overridden database dependency"""
@@ -1,5 +1,23 @@
 import pytest
 from fastapi import status
+from sqlalchemy import event
+
+from app.config import get_settings
+from app.tests.conftest import engine
+
+
+@pytest.fixture
+def user_queries():
+    """Record SQL statements that read from the users table"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
 
 
 def test_health_check(client):
@@ -125,3 +143,37 @@ def test_get_current_user_invalid_token(client):
         headers={"Authorization": "Bearer invalid_token"}
     )
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_current_user_is_cached(client, auth_headers, user_queries):
+    """Repeated requests with the same token reuse the cached user"""
+    for _ in range(3):
+        response = client.get("/api/auth/me", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["email"] == "test@example.com"
+    assert len(user_queries) <= 1
+
+
+def test_user_update_invalidates_cache(client, auth_headers, test_user, admin_user):
+    """Deactivating a user takes effect immediately despite the cache"""
+    assert client.get("/api/auth/me", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    login = client.post("/api/auth/login", json={"username": "admin", "password": "adminpass123"})
+    admin_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    response = client.put(f"/api/users/{test_user.id}", json={"is_active": False}, headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client.get("/api/auth/me", headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_signed_claims_skip_user_query(client, test_user, user_queries, monkeypatch):
+    """With signed claims enabled, authorization needs no user lookup"""
+    monkeypatch.setattr(get_settings(), "jwt_user_claims", True)
+    login = client.post("/api/auth/login", json={"username": "testuser", "password": "testpass123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    user_queries.clear()
+
+    response = client.post("/api/auth/refresh", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert user_queries == []
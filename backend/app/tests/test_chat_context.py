@@ -0,0 +1,161 @@
+"""
+Tests for the Ask Ahmed system context builder and data tools
+"""
+import pytest
+from sqlalchemy import event
+
+from app.api.chat import (
+    get_system_blocks, get_system_context, get_requirement_by_id, get_requirements_by_ids,
+    SYSTEM_PROMPT_PREFIX, _context_cache,
+)
+from app.models.requirement import Requirement, RequirementType, RequirementStatus, RequirementPriority
+from app.models.test_case import TestCase, TestCaseStatus
+from app.models.traceability import TraceabilityLink, TraceLinkType
+from app.tests.conftest import engine
+
+
+@pytest.fixture
+def statements():
+    """Record every SQL statement sent to the test database"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def seeded_db(db_session, test_user):
+    """A requirement with one failed and one passed test case"""
+    _context_cache.clear()
+    requirement = Requirement(
+        requirement_id="SYS-001",
+        type=RequirementType.SYSTEM,
+        category="Avionics",
+        title="Air data computation",
+        description="The system shall compute air data",
+        status=RequirementStatus.APPROVED,
+        priority=RequirementPriority.CRITICAL,
+        created_by_id=test_user.id,
+    )
+    db_session.add(requirement)
+    db_session.flush()
+    for test_id, test_status in (("TC-001", TestCaseStatus.FAILED), ("TC-002", TestCaseStatus.PASSED)):
+        db_session.add(TestCase(
+            test_case_id=test_id,
+            title=f"Verify air data {test_id}",
+            test_steps="1. Apply pitot pressure",
+            expected_results="Airspeed computed",
+            status=test_status,
+            test_type="integration",
+            automated=True,
+            requirement_id=requirement.id,
+            created_by_id=test_user.id,
+        ))
+    db_session.commit()
+    db_session.expire_all()
+    return db_session
+
+
+def test_context_reports_grouped_stats(seeded_db):
+    """Counts from the grouped aggregates land in the rendered context"""
+    context = get_system_context(seeded_db)
+    assert context.startswith(SYSTEM_PROMPT_PREFIX)
+    assert "**Total Requirements**: 1" in context
+    assert "- System Requirements: 1" in context
+    assert "- Critical: 1" in context
+    assert "**Passed**: 1 tests" in context
+    assert "**Automated Tests**: 2" in context
+    assert "- integration: 2" in context
+    assert "**TC-001**" in context and "Requirement: SYS-001" in context
+
+
+def test_context_build_uses_few_queries(seeded_db, statements):
+    """No per-value COUNTs and no lazy requirement loads"""
+    get_system_context(seeded_db)
+    assert len(statements) <= 6
+
+
+def test_context_is_cached_until_data_changes(seeded_db, statements):
+    """Repeated turns hit the cache; a commit to a source table invalidates it"""
+    first = get_system_context(seeded_db)
+    statements.clear()
+    assert get_system_context(seeded_db) == first
+    assert statements == []
+
+    test_case = seeded_db.query(TestCase).filter(TestCase.test_case_id == "TC-002").first()
+    test_case.status = TestCaseStatus.FAILED
+    seeded_db.commit()
+
+    updated = get_system_context(seeded_db)
+    assert updated != first
+    assert "**Failed**: 2 tests" in updated
+
+
+def test_system_blocks_mark_stable_prefix_cacheable(seeded_db):
+    """Only the static prefix carries cache_control"""
+    blocks = get_system_blocks(seeded_db)
+    assert blocks[0]["text"] == SYSTEM_PROMPT_PREFIX
+    assert blocks[0]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in blocks[1]
+
+
+def test_chat_stats_totals(client, auth_headers, seeded_db):
+    """Stats endpoint returns all three totals from one statement"""
+    response = client.get("/api/chat/stats", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_requirements"] == 1
+    assert data["total_test_cases"] == 2
+    assert data["total_traceability_links"] == 0
+
+
+@pytest.fixture
+def linked_db(seeded_db, test_user):
+    """SYS-001 with two parents (AHLR-*) and three children (TECH-*)"""
+    system_req = seeded_db.query(Requirement).filter(Requirement.requirement_id == "SYS-001").one()
+    for prefix, req_type, count in (("AHLR", RequirementType.AHLR, 2), ("TECH", RequirementType.TECHNICAL, 3)):
+        for n in range(count):
+            other = Requirement(
+                requirement_id=f"{prefix}-00{n}",
+                type=req_type,
+                title=f"{prefix} requirement {n}",
+                description="Linked requirement",
+                created_by_id=test_user.id,
+            )
+            seeded_db.add(other)
+            seeded_db.flush()
+            parent, child = (other, system_req) if prefix == "AHLR" else (system_req, other)
+            seeded_db.add(TraceabilityLink(
+                source_id=parent.id, target_id=child.id,
+                link_type=TraceLinkType.DERIVES_FROM, created_by_id=test_user.id,
+            ))
+    seeded_db.commit()
+    seeded_db.expire_all()
+    return seeded_db
+
+
+def test_requirement_lookup_is_batched(linked_db, statements):
+    """Links, linked IDs and tests come from a fixed number of queries"""
+    details = get_requirement_by_id(linked_db, "SYS-001")
+    assert len(statements) <= 3
+    assert details["test_case_count"] == 2
+    assert sorted(details["parent_requirements"]) == ["AHLR-000", "AHLR-001"]
+    assert sorted(details["child_requirements"]) == ["TECH-000", "TECH-001", "TECH-002"]
+
+
+def test_requirement_lookup_not_found(linked_db):
+    assert get_requirement_by_id(linked_db, "SYS-999") == {"error": "Requirement SYS-999 not found"}
+
+
+def test_multi_requirement_lookup(linked_db, statements):
+    """Many IDs resolve in one call, in request order, with errors for unknown IDs"""
+    results = get_requirements_by_ids(linked_db, ["TECH-001", "SYS-001", "NOPE-1", "AHLR-000"])
+    assert len(statements) <= 3
+    assert [r.get("requirement_id") for r in results] == ["TECH-001", "SYS-001", None, "AHLR-000"]
+    assert results[2] == {"error": "Requirement NOPE-1 not found"}
+    assert results[0]["parent_requirements"] == ["SYS-001"]
+    assert results[3]["child_requirements"] == ["SYS-001"]
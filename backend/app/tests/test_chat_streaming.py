@@ -0,0 +1,137 @@
+"""
+Tests for Ask Ahmed streaming against a local stub model server
+"""
+import json
+
+import anthropic
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from app.api import chat
+from app.config import get_settings
+from app.models.requirement import Requirement, RequirementType, RequirementStatus, RequirementPriority
+from app.models.test_case import TestCase, TestCaseStatus
+
+
+def _sse(event_type: str, data: dict) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+def _message_events(blocks: list, stop_reason: str):
+    """Anthropic Messages streaming events for the given content blocks"""
+    yield _sse("message_start", {"type": "message_start", "message": {
+        "id": "msg_stub", "type": "message", "role": "assistant", "model": "stub",
+        "content": [], "stop_reason": None, "stop_sequence": None,
+        "usage": {"input_tokens": 1, "output_tokens": 0},
+    }})
+    for index, block in enumerate(blocks):
+        if block["type"] == "text":
+            yield _sse("content_block_start", {"type": "content_block_start", "index": index,
+                                               "content_block": {"type": "text", "text": ""}})
+            for word in block["text"].split(" "):
+                yield _sse("content_block_delta", {"type": "content_block_delta", "index": index,
+                                                   "delta": {"type": "text_delta", "text": word + " "}})
+        else:
+            yield _sse("content_block_start", {"type": "content_block_start", "index": index,
+                                               "content_block": {"type": "tool_use", "id": block["id"],
+                                                                 "name": block["name"], "input": {}}})
+            yield _sse("content_block_delta", {"type": "content_block_delta", "index": index,
+                                               "delta": {"type": "input_json_delta",
+                                                         "partial_json": json.dumps(block["input"])}})
+        yield _sse("content_block_stop", {"type": "content_block_stop", "index": index})
+    yield _sse("message_delta", {"type": "message_delta",
+                                 "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                                 "usage": {"output_tokens": 5}})
+    yield _sse("message_stop", {"type": "message_stop"})
+
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    """Stub server: asks for two tools on the first turn, answers on the second"""
+    stub = FastAPI()
+    requests = []
+
+    @stub.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        requests.append(body)
+        if body["messages"][-1]["role"] == "user" and isinstance(body["messages"][-1]["content"], str):
+            blocks = [
+                {"type": "tool_use", "id": "tu_1", "name": "get_test_case_by_id", "input": {"test_case_id": "TC-001"}},
+                {"type": "tool_use", "id": "tu_2", "name": "search_requirements", "input": {"query": "air data"}},
+            ]
+            events = _message_events(blocks, "tool_use")
+        else:
+            events = _message_events([{"type": "text", "text": "TC-001 failed on SYS-001"}], "end_turn")
+        return StreamingResponse(events, media_type="text/event-stream")
+
+    def client_factory():
+        return anthropic.AsyncAnthropic(
+            api_key="test-key",
+            base_url="http://stub",
+            http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub"),
+        )
+
+    monkeypatch.setattr(get_settings(), "anthropic_api_key", "test-key")
+    monkeypatch.setattr(chat, "get_anthropic_client", client_factory)
+    return requests
+
+
+@pytest.fixture
+def seeded_db(db_session, test_user):
+    requirement = Requirement(
+        requirement_id="SYS-001",
+        type=RequirementType.SYSTEM,
+        title="Air data computation",
+        description="The system shall compute air data",
+        status=RequirementStatus.APPROVED,
+        priority=RequirementPriority.HIGH,
+        created_by_id=test_user.id,
+    )
+    db_session.add(requirement)
+    db_session.flush()
+    db_session.add(TestCase(
+        test_case_id="TC-001",
+        title="Verify air data",
+        test_steps="1. Apply pitot pressure",
+        expected_results="Airspeed computed",
+        status=TestCaseStatus.FAILED,
+        requirement_id=requirement.id,
+        created_by_id=test_user.id,
+    ))
+    db_session.commit()
+    return db_session
+
+
+async def _collect(generator) -> list:
+    events = []
+    async for chunk in generator:
+        assert chunk.startswith("data: ")
+        events.append(json.loads(chunk[len("data: "):]))
+    return events
+
+
+async def test_streams_tokens_and_runs_tools(stub_model, seeded_db):
+    """Text arrives as incremental deltas after both tool calls are answered"""
+    events = await _collect(chat.stream_chat_response(
+        [chat.ChatMessage(role="user", content="Why did TC-001 fail?")], "system", seeded_db
+    ))
+
+    assert [e["type"] for e in events if e["type"] == "error"] == []
+    content = [e["text"] for e in events if e["type"] == "content"]
+    assert len(content) > 1
+    assert "".join(content).strip() == "TC-001 failed on SYS-001"
+
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["first_token_ms"] is not None
+    assert done["total_ms"] >= done["first_token_ms"]
+
+    # Second request carries both tool results, answered from the database
+    assert len(stub_model) == 2
+    tool_results = stub_model[1]["messages"][-1]["content"]
+    assert [r["tool_use_id"] for r in tool_results] == ["tu_1", "tu_2"]
+    assert json.loads(tool_results[0]["content"])["requirement_id"] == "SYS-001"
+    assert json.loads(tool_results[1]["content"])[0]["requirement_id"] == "SYS-001"
@@ -0,0 +1,80 @@
+"""
+Concurrency Tests for DB-bound routes
+Ensures blocking route handlers run off the event loop, so throughput scales
+with the number of concurrent clients instead of serialising on one request.
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.main import app
+from app.database import get_db
+from app.models.requirement import Requirement, RequirementType, RequirementStatus, RequirementPriority
+from app.services.risk_analyzer import RiskAnalyzer
+from app.tests.conftest import TestingSessionLocal
+
+# Simulated per-request blocking work (seconds)
+BLOCKING_WORK_S = 0.1
+
+
+@pytest.fixture
+def threaded_app(db_session, test_user, auth_headers, monkeypatch):
+    """App wired with one session per request and a slow, blocking analyzer."""
+    requirement = Requirement(
+        requirement_id="AHLR-900",
+        type=RequirementType.AHLR,
+        category="Flight Control",
+        title="Concurrency probe",
+        description="Requirement used by the concurrency benchmark",
+        status=RequirementStatus.APPROVED,
+        priority=RequirementPriority.HIGH,
+        created_by_id=test_user.id,
+    )
+    db_session.add(requirement)
+    db_session.commit()
+
+    def override_get_db():
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    original = RiskAnalyzer.calculate_risk_score
+
+    def slow_calculate_risk_score(self, req):
+        time.sleep(BLOCKING_WORK_S)
+        return original(self, req)
+
+    monkeypatch.setattr(RiskAnalyzer, "calculate_risk_score", slow_calculate_risk_score)
+    app.dependency_overrides[get_db] = override_get_db
+    yield requirement.id
+    app.dependency_overrides.pop(get_db, None)
+
+
+async def _run_batch(client, headers, url, concurrency):
+    """Fire `concurrency` requests at once, return elapsed seconds."""
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *[client.get(url, headers=headers) for _ in range(concurrency)]
+    )
+    elapsed = time.perf_counter() - start
+    for response in responses:
+        assert response.status_code == 200, response.text
+    return elapsed
+
+
+async def test_blocking_handlers_scale_with_concurrency(threaded_app, auth_headers):
+    """Eight concurrent clients finish in well under eight times one request."""
+    url = f"/api/risk/requirements/by-id/{threaded_app}"
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        timings = {}
+        for concurrency in (1, 4, 8):
+            timings[concurrency] = await _run_batch(client, auth_headers, url, concurrency)
+            print(f"✓ {concurrency} concurrent clients: {timings[concurrency] * 1000:.2f}ms")
+
+    # Serialised execution would take ~8x the single-request time.
+    assert timings[8] < 8 * BLOCKING_WORK_S * 0.5
+    assert timings[8] < timings[1] * 4
@@ -2,6 +2,8 @@
 Tests for Coverage Analyzer Service and API
 """
 import pytest
+from sqlalchemy import event
+from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from app.models.requirement import Requirement, RequirementType, RequirementStatus, RequirementPriority
@@ -379,6 +381,92 @@ class TestCoverageAnalyzerService:
             assert "coverage_percentage" in trend
             assert "total_requirements" in trend
 
+    def test_snapshot_counts_match_analysis(self, analyzer: CoverageAnalyzer, coverage_test_user: User, test_requirements):
+        """Grouped counts agree with the full analysis."""
+        analysis = analyzer.analyze_coverage()
+        snapshot = analyzer.create_snapshot(coverage_test_user.id)
+
+        assert snapshot.ahlr_coverage == analysis["by_type"]["Aircraft_High_Level_Requirement"]
+        assert snapshot.critical_coverage == analysis["by_priority"]["Critical"]
+        for req_type, cells in analysis["heatmap"].items():
+            for priority, cell in cells.items():
+                assert {k: v for k, v in snapshot.heatmap_data[req_type][priority].items() if k != "test_case_count"} == cell
+
+    def test_snapshot_deltas(self, analyzer: CoverageAnalyzer, coverage_test_user: User, test_requirements, db_session: Session):
+        """Later snapshots store changed heatmap cells only and replay onto the keyframe."""
+        keyframe = analyzer.create_snapshot(coverage_test_user.id)
+        unchanged = analyzer.create_snapshot()
+
+        uncovered = test_requirements["uncovered"][0]  # AHLR High
+        db_session.add(TestCase(
+            requirement_id=uncovered.id, test_case_id="TC-100", title="New", test_steps="Step",
+            expected_results="Result", created_by_id=coverage_test_user.id,
+        ))
+        db_session.commit()
+        changed = analyzer.create_snapshot()
+
+        assert unchanged.base_snapshot_id == keyframe.id
+        assert unchanged.heatmap_data is None and unchanged.heatmap_delta == {}
+        assert unchanged.created_by_id is None
+        assert changed.parent_snapshot_id == unchanged.id
+        assert changed.heatmap_delta == {
+            "Aircraft_High_Level_Requirement": {"High": changed.heatmap_delta["Aircraft_High_Level_Requirement"]["High"]}
+        }
+
+        heatmap = analyzer.get_snapshot_heatmap(changed)
+        assert heatmap == analyzer.coverage_counts()
+        assert heatmap["Aircraft_High_Level_Requirement"]["High"]["covered"] == 1
+        assert analyzer.get_snapshot_heatmap(unchanged) == keyframe.heatmap_data
+
+    def test_snapshot_keyframe_interval(self, analyzer: CoverageAnalyzer, test_requirements, monkeypatch):
+        """Every Nth snapshot stores the full heatmap again."""
+        from app.services import coverage_analyzer
+        monkeypatch.setattr(coverage_analyzer.settings, "coverage_snapshot_keyframe_interval", 3)
+        snapshots = [analyzer.create_snapshot() for _ in range(5)]
+
+        assert [s.heatmap_data is not None for s in snapshots] == [True, False, False, True, False]
+        assert snapshots[4].base_snapshot_id == snapshots[3].id
+
+    def test_coverage_counts_reads_counters(self, analyzer: CoverageAnalyzer, db_session: Session, test_requirements):
+        """The snapshot heatmap comes from requirement counters, without scanning test cases."""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            heatmap = analyzer.coverage_counts()
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert len(statements) == 1 and "test_cases" not in statements[0]
+        assert heatmap["Technical_Specification"]["High"]["covered"] >= 1
+        assert sum(cell["total"] for cells in heatmap.values() for cell in cells.values()) == 8
+
+    def test_downsampled_trends(self, analyzer: CoverageAnalyzer, db_session: Session):
+        """Long histories come back as time buckets."""
+        start = datetime(2026, 1, 1)
+        db_session.add_all([
+            CoverageSnapshot(
+                snapshot_date=start + timedelta(hours=hour), total_requirements=100,
+                covered_requirements=hour, coverage_percentage=float(hour), total_gaps=100 - hour,
+            )
+            for hour in range(60)
+        ])
+        db_session.commit()
+
+        trends = analyzer.get_coverage_trends(points=10)
+        assert 2 <= len(trends) <= 11
+        assert sum(t["snapshot_count"] for t in trends) == 60
+        assert trends[0]["min_coverage_percentage"] == 0.0
+        assert trends[-1]["max_coverage_percentage"] == 59.0
+        assert [t["date"] for t in trends] == sorted(t["date"] for t in trends)
+
+        in_range = analyzer.get_coverage_trends(start=start + timedelta(hours=10), end=start + timedelta(hours=14))
+        assert [t["coverage_percentage"] for t in in_range] == [10.0, 11.0, 12.0, 13.0, 14.0]
+
     def test_suggest_unit_test(self, analyzer: CoverageAnalyzer, test_requirements):
         """Test suggesting unit test for requirement without any tests."""
         uncovered_req = test_requirements["uncovered"][0]  # AHLR-002
@@ -557,6 +645,47 @@ class TestCoverageAPI:
         for gap in data:
             assert gap["priority"] == "Low"
 
+    def test_get_gaps_pagination(self, client: TestClient, auth_headers: dict, test_requirements):
+        """Test keyset pagination through the gap list."""
+        everything = client.get("/api/coverage/gaps", headers=auth_headers).json()
+
+        first = client.get("/api/coverage/gaps?limit=3", headers=auth_headers)
+        assert len(first.json()) == 3
+        cursor = first.headers["X-Next-Cursor"]
+
+        second = client.get(f"/api/coverage/gaps?limit=3&cursor={cursor}", headers=auth_headers)
+        assert "X-Next-Cursor" not in second.headers
+        assert first.json() + second.json() == everything
+
+        response = client.get("/api/coverage/gaps?cursor=oops", headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_get_gaps_filters_beyond_first_page(
+        self, client: TestClient, auth_headers: dict, db_session: Session, coverage_test_user: User
+    ):
+        """Test filters apply before the limit, not to the top gaps only."""
+        for i in range(120):
+            db_session.add(Requirement(
+                requirement_id=f"CRIT-{i:03d}", title="Critical", description="Test",
+                type=RequirementType.SYSTEM, priority=RequirementPriority.CRITICAL,
+                status=RequirementStatus.APPROVED, created_by_id=coverage_test_user.id
+            ))
+        db_session.add(Requirement(
+            requirement_id="LOW-001", title="Low", description="Test",
+            type=RequirementType.SYSTEM, priority=RequirementPriority.LOW,
+            status=RequirementStatus.DRAFT, created_by_id=coverage_test_user.id
+        ))
+        db_session.commit()
+
+        low = client.get("/api/coverage/gaps?priority=Low", headers=auth_headers).json()
+        assert [g["requirement_identifier"] for g in low] == ["LOW-001"]
+
+        draft = client.get("/api/coverage/gaps?status=draft", headers=auth_headers).json()
+        assert [g["requirement_identifier"] for g in draft] == ["LOW-001"]
+
+        response = client.get("/api/coverage/gaps?priority=Urgent", headers=auth_headers)
+        assert response.status_code == 422
+
     def test_get_suggestions_success(self, client: TestClient, auth_headers: dict, test_requirements):
         """Test getting test suggestions for a requirement."""
         uncovered_req = test_requirements["uncovered"][0]
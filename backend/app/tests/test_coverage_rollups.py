@@ -0,0 +1,94 @@
+"""
+Tests for coverage trend rollups
+"""
+from datetime import datetime, timedelta
+
+from app.models.coverage import CoverageSnapshot
+from app.models.coverage_rollup import CoverageRollup, RollupResolution
+from app.services.coverage_analyzer import CoverageAnalyzer
+from app.services.coverage_rollups import get_rollup_trends, period_start, rebuild_rollups, record_snapshot
+
+START = datetime(2026, 3, 1)  # A Sunday
+
+
+def _snapshot(db_session, hours: int, coverage: float) -> CoverageSnapshot:
+    snapshot = CoverageSnapshot(
+        snapshot_date=START + timedelta(hours=hours), total_requirements=100,
+        covered_requirements=int(coverage), coverage_percentage=coverage, total_gaps=100 - int(coverage),
+        critical_coverage={"coverage_percentage": coverage / 2},
+    )
+    db_session.add(snapshot)
+    db_session.flush()
+    return snapshot
+
+
+def test_period_start():
+    moment = datetime(2026, 3, 18, 15, 30)  # Wednesday
+    assert period_start(RollupResolution.DAILY, moment) == datetime(2026, 3, 18)
+    assert period_start(RollupResolution.WEEKLY, moment) == datetime(2026, 3, 16)
+    assert period_start(RollupResolution.MONTHLY, moment) == datetime(2026, 3, 1)
+
+
+def test_snapshots_fold_into_rollups(db_session):
+    for hours, coverage in ((0, 40.0), (12, 60.0), (30, 80.0)):
+        record_snapshot(db_session, _snapshot(db_session, hours, coverage))
+    db_session.commit()
+
+    daily = get_rollup_trends(db_session, RollupResolution.DAILY)
+    assert [p["date"] for p in daily] == ["2026-03-01T00:00:00", "2026-03-02T00:00:00"]
+    first = daily[0]
+    assert first["snapshot_count"] == 2
+    assert (first["coverage_percentage"], first["min_coverage_percentage"], first["max_coverage_percentage"]) == (50.0, 40.0, 60.0)
+    assert first["covered_requirements"] == 60  # Latest snapshot of the day
+    assert first["by_priority"]["Critical"] == {"mean": 25.0, "min": 20.0, "max": 30.0}
+
+    weekly = get_rollup_trends(db_session, RollupResolution.WEEKLY)
+    assert [(p["date"], p["snapshot_count"]) for p in weekly] == [("2026-02-23T00:00:00", 2), ("2026-03-02T00:00:00", 1)]
+
+    monthly = get_rollup_trends(db_session, RollupResolution.MONTHLY)
+    assert [p["snapshot_count"] for p in monthly] == [3]
+    assert monthly[0]["coverage_percentage"] == 60.0
+
+
+def test_range_includes_period_containing_start(db_session):
+    for day in range(10):
+        record_snapshot(db_session, _snapshot(db_session, day * 24 + 6, float(day)))
+    db_session.commit()
+
+    points = get_rollup_trends(
+        db_session, RollupResolution.DAILY, start=START + timedelta(days=2, hours=12), end=START + timedelta(days=5)
+    )
+    assert [p["coverage_percentage"] for p in points] == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_rebuild_matches_incremental(db_session):
+    for hours in range(0, 24 * 40, 7):
+        record_snapshot(db_session, _snapshot(db_session, hours, float(hours % 100)))
+    db_session.commit()
+    incremental = {
+        resolution: get_rollup_trends(db_session, resolution) for resolution in RollupResolution
+    }
+
+    result = rebuild_rollups(db_session)
+    assert result["snapshots"] == len(range(0, 24 * 40, 7))
+    assert result["rollups"] == db_session.query(CoverageRollup).count()
+    for resolution in RollupResolution:
+        assert get_rollup_trends(db_session, resolution) == incremental[resolution]
+
+
+def test_trends_api_resolution(client, auth_headers, test_user, db_session):
+    analyzer = CoverageAnalyzer(db_session)
+    analyzer.create_snapshot(test_user.id)
+    analyzer.create_snapshot(test_user.id)
+
+    response = client.get("/api/coverage/trends?resolution=daily", headers=auth_headers)
+    assert response.status_code == 200
+    points = response.json()
+    assert len(points) == 1
+    assert points[0]["snapshot_count"] == 2
+    assert set(points[0]["by_type"]) == {"Aircraft_High_Level_Requirement", "System_Requirement",
+                                         "Technical_Specification", "Certification_Requirement"}
+
+    assert client.get("/api/coverage/trends?resolution=hourly", headers=auth_headers).status_code == 422
+    raw = client.get("/api/coverage/trends?resolution=raw", headers=auth_headers).json()
+    assert [p["snapshot_count"] for p in raw] == [1, 1]
@@ -0,0 +1,106 @@
+"""
+Tests for the streamed data exports
+"""
+import csv
+import io
+import zipfile
+
+import pytest
+
+from app.models.requirement import Requirement, RequirementPriority, RequirementStatus, RequirementType
+from app.models.test_case import TestCase, TestCaseStatus
+from app.models.traceability import TraceabilityLink, TraceLinkType
+from app.services import exports
+from app.services.tabular_export import parquet_available
+
+
+@pytest.fixture
+def data(db_session, test_user):
+    requirements = [
+        Requirement(
+            requirement_id=f"SYS-60{i}", title=f"Fuel, pump {i}", description="Test",
+            type=RequirementType.SYSTEM, priority=priority, status=RequirementStatus.APPROVED,
+            created_by_id=test_user.id
+        )
+        for i, priority in enumerate((RequirementPriority.HIGH, RequirementPriority.LOW, RequirementPriority.HIGH))
+    ]
+    db_session.add_all(requirements)
+    db_session.flush()
+    db_session.add_all([
+        TestCase(
+            test_case_id=f"TC-60{i}", title=f"Test {i}", test_steps="Run", expected_results="Pass",
+            status=status, automated=i == 0, requirement_id=requirements[i].id, created_by_id=test_user.id
+        )
+        for i, status in enumerate((TestCaseStatus.PASSED, TestCaseStatus.FAILED))
+    ])
+    db_session.add(TraceabilityLink(
+        source_id=requirements[1].id, target_id=requirements[0].id, link_type=TraceLinkType.REFINES,
+        created_by_id=test_user.id
+    ))
+    db_session.commit()
+    return requirements
+
+
+def _csv(response):
+    return list(csv.DictReader(io.StringIO(response.text)))
+
+
+def test_export_requirements_csv(client, auth_headers, data, monkeypatch):
+    # Several fetch batches per export
+    monkeypatch.setattr(exports, "EXPORT_FETCH_SIZE", 2)
+    response = client.get("/api/export/requirements", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="requirements.csv"' in response.headers["content-disposition"]
+    rows = _csv(response)
+    assert [(r["requirement_id"], r["title"], r["priority"], r["test_case_count"]) for r in rows] == [
+        ("SYS-600", "Fuel, pump 0", "High", "1"),
+        ("SYS-601", "Fuel, pump 1", "Low", "1"),
+        ("SYS-602", "Fuel, pump 2", "High", "0"),
+    ]
+
+    filtered = client.get(
+        "/api/export/requirements?priority=High&columns=requirement_id,status", headers=auth_headers
+    )
+    assert filtered.text.splitlines() == ["requirement_id,status", "SYS-600,approved", "SYS-602,approved"]
+
+
+def test_export_rejects_bad_requests(client, auth_headers, data):
+    response = client.get("/api/export/requirements?columns=requirement_id,hashed_password", headers=auth_headers)
+    assert response.status_code == 400
+    assert "hashed_password" in response.json()["detail"]
+
+    assert client.get("/api/export/requirements?format=pdf", headers=auth_headers).status_code == 422
+    assert client.get("/api/export/requirements?priority=Urgent", headers=auth_headers).status_code == 422
+
+
+def test_export_test_cases_xlsx(client, auth_headers, data):
+    response = client.get("/api/export/test-cases?format=xlsx&automated=true", headers=auth_headers)
+
+    assert response.status_code == 200
+    sheet = zipfile.ZipFile(io.BytesIO(response.content)).read("xl/worksheets/sheet1.xml").decode()
+    assert sheet.count("<row>") == 2
+    assert "TC-600" in sheet and "SYS-600" in sheet and "TC-601" not in sheet
+
+
+def test_export_traceability_links(client, auth_headers, data):
+    response = client.get(f"/api/export/traceability-links?requirement_id={data[0].id}", headers=auth_headers)
+
+    assert [(r["source_requirement_id"], r["target_requirement_id"], r["link_type"]) for r in _csv(response)] == [
+        ("SYS-601", "SYS-600", "refines")
+    ]
+
+
+@pytest.mark.skipif(parquet_available(), reason="pyarrow is installed")
+def test_export_parquet_requires_pyarrow(client, auth_headers, data):
+    response = client.get("/api/export/requirements?format=parquet", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_export_parquet(client, auth_headers, data):
+    pq = pytest.importorskip("pyarrow.parquet")
+    response = client.get("/api/export/test-cases?format=parquet&columns=test_case_id,automated", headers=auth_headers)
+
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.to_pydict() == {"test_case_id": ["TC-600", "TC-601"], "automated": [True, False]}
@@ -0,0 +1,172 @@
+"""
+Tests for the background job queue, worker and jobs API
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func
+from sqlalchemy.orm import sessionmaker
+
+from app.models.job import Job, JobStatus
+from app.models.requirement import Requirement, RequirementType
+from app.models.traceability import TraceabilityLink
+from app.services.jobs import Worker, claim_next_job, requeue_stale_jobs, schedule_due_jobs
+
+
+@pytest.fixture
+def worker(db_session):
+    """Worker bound to the test database"""
+    return Worker(sessionmaker(bind=db_session.get_bind()), worker_id="test-worker", schedule=False)
+
+
+@pytest.fixture
+def requirements(db_session, test_user):
+    reqs = [
+        Requirement(
+            requirement_id=f"SYS-00{n}", type=RequirementType.SYSTEM, title=f"Requirement {n}",
+            description="Fuel system", created_by_id=test_user.id,
+        )
+        for n in (1, 2, 3)
+    ]
+    db_session.add_all(reqs)
+    db_session.commit()
+    return reqs
+
+
+def _queue(db_session, user, attempts=0):
+    job = Job(job_type="coverage_snapshot", status=JobStatus.QUEUED, params={}, attempts=attempts, created_by_id=user.id)
+    db_session.add(job)
+    db_session.commit()
+    return job
+
+
+def test_import_job_lifecycle(client, auth_headers, db_session, worker, requirements):
+    """Submit, run in the worker, then read status, events and result"""
+    links = [
+        {"source_id": requirements[1].id, "target_id": requirements[0].id, "link_type": "derives_from"},
+        {"source_id": requirements[2].id, "target_id": requirements[1].id, "link_type": "derives_from"},
+        {"source_id": requirements[2].id, "target_id": requirements[1].id, "link_type": "derives_from"},
+        {"source_id": requirements[2].id, "target_id": 9999, "link_type": "derives_from"},
+    ]
+    response = client.post(
+        "/api/jobs/", json={"job_type": "traceability_import", "params": {"links": links}}, headers=auth_headers
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.json()["status"] == "QUEUED"
+    assert client.get(f"/api/jobs/{job_id}/result", headers=auth_headers).status_code == 409
+
+    assert worker.run_once()
+    assert not worker.run_once()
+    db_session.expire_all()  # The API shares this session; the worker used its own
+
+    job = client.get(f"/api/jobs/{job_id}", headers=auth_headers).json()
+    assert job["status"] == "SUCCEEDED"
+    assert job["progress"] == 1.0
+    assert job["attempts"] == 1
+
+    events = client.get(f"/api/jobs/{job_id}/events", headers=auth_headers)
+    assert events.headers["content-type"].startswith("text/event-stream")
+    assert "event: done" in events.text
+
+    result = client.get(f"/api/jobs/{job_id}/result", headers=auth_headers).json()["result"]
+    assert (result["created"], result["skipped"], result["failed"]) == (2, 1, 1)
+    assert db_session.query(TraceabilityLink).count() == 2
+
+    listed = client.get("/api/jobs/?status=SUCCEEDED", headers=auth_headers).json()
+    assert [j["id"] for j in listed["jobs"]] == [job_id]
+
+
+def test_coverage_snapshot_job(client, auth_headers, db_session, worker, requirements):
+    job_id = client.post("/api/jobs/", json={"job_type": "coverage_snapshot"}, headers=auth_headers).json()["id"]
+    worker.run_once()
+    db_session.expire_all()
+
+    result = client.get(f"/api/jobs/{job_id}/result", headers=auth_headers).json()["result"]
+    assert result["snapshot_id"]
+    assert result["total_requirements"] == 3
+
+
+def test_failed_job_reports_error(client, auth_headers, db_session, worker):
+    job_id = client.post(
+        "/api/jobs/", json={"job_type": "impact_analysis", "params": {"requirement_id": 9999}}, headers=auth_headers
+    ).json()["id"]
+    worker.run_once()
+    db_session.expire_all()
+
+    job = client.get(f"/api/jobs/{job_id}", headers=auth_headers).json()
+    assert job["status"] == "FAILED"
+    assert "9999" in job["error"]
+    response = client.get(f"/api/jobs/{job_id}/result", headers=auth_headers)
+    assert response.status_code == 409
+
+
+def test_submit_validation(client, auth_headers):
+    response = client.post("/api/jobs/", json={"job_type": "reticulate_splines"}, headers=auth_headers)
+    assert response.status_code == 400
+    response = client.post("/api/jobs/", json={"job_type": "impact_analysis", "params": {}}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_jobs_private_to_submitter(client, auth_headers, db_session, admin_user):
+    job = _queue(db_session, admin_user)
+    assert client.get(f"/api/jobs/{job.id}", headers=auth_headers).status_code == 404
+    assert client.get("/api/jobs/", headers=auth_headers).json()["total"] == 0
+
+
+def test_job_claimed_once(db_session, test_user):
+    job = _queue(db_session, test_user)
+    assert claim_next_job(db_session, "worker-a") == job.id
+    assert claim_next_job(db_session, "worker-b") is None
+
+
+def test_stale_jobs_requeued_then_failed(db_session, test_user):
+    old = datetime.utcnow() - timedelta(hours=1)
+    retry = _queue(db_session, test_user, attempts=1)
+    exhausted = _queue(db_session, test_user, attempts=3)
+    db_session.query(Job).update({"status": JobStatus.RUNNING, "heartbeat_at": old, "worker_id": "gone"})
+    db_session.commit()
+
+    assert requeue_stale_jobs(db_session, stale_seconds=60, max_attempts=3) == 2
+    db_session.expire_all()
+    assert retry.status == JobStatus.QUEUED and retry.worker_id is None
+    assert exhausted.status == JobStatus.FAILED
+
+
+def test_coverage_snapshots_scheduled(db_session, requirements):
+    scheduled = {job.job_type: job for job in schedule_due_jobs(db_session)}
+    assert set(scheduled) == {
+        "coverage_snapshot", "test_execution_maintenance", "requirement_counter_reconcile", "pattern_confidence_learning"
+    }
+    assert scheduled["coverage_snapshot"].created_by_id is None
+    # Not queued again while pending, nor within the interval once done
+    assert schedule_due_jobs(db_session) == []
+
+    worker = Worker(sessionmaker(bind=db_session.get_bind()), schedule=False)
+    while worker.run_once():
+        pass
+    db_session.expire_all()
+    assert all(job.status == JobStatus.SUCCEEDED for job in scheduled.values())
+    assert schedule_due_jobs(db_session) == []
+
+
+def test_concurrent_schedulers_queue_once(db_session, requirements):
+    other = sessionmaker(bind=db_session.get_bind())()
+    raced = []
+
+    def other_worker_schedules_first(session, flush_context, instances):
+        # Runs after this worker found the first job due, before it inserts it
+        if not raced:
+            raced.extend(schedule_due_jobs(other))
+
+    event.listen(db_session, "before_flush", other_worker_schedules_first)
+    try:
+        assert schedule_due_jobs(db_session) == []
+    finally:
+        event.remove(db_session, "before_flush", other_worker_schedules_first)
+        other.close()
+
+    assert raced
+
+    counts = db_session.query(Job.job_type, func.count(Job.id)).group_by(Job.job_type).all()
+    assert counts and all(count == 1 for _, count in counts)
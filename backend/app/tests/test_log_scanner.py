@@ -0,0 +1,124 @@
+"""
+Unit tests for the single-pass log scanner
+"""
+import re
+
+import pytest
+from app.services.log_scanner import LogScanner, build_trie_regex
+
+
+@pytest.fixture
+def scanner():
+    return LogScanner(["Density", "speed", "airspeed indicator", "out"])
+
+
+class TestTrieRegex:
+    """Test the trie-shaped alternation"""
+
+    def test_longest_term_wins(self):
+        regex = re.compile(build_trie_regex(["time", "timeout", "timed out"]))
+        assert regex.match("timeout!").group(0) == "timeout"
+        assert regex.match("timed out").group(0) == "timed out"
+        assert regex.match("timex").group(0) == "time"
+
+
+class TestLogScanner:
+    """Test term, keyword, unit and marker collection"""
+
+    def test_overlapping_terms_are_all_found(self, scanner):
+        scan = scanner.scan("AIRSPEED INDICATOR timed out")
+        assert {"airspeed indicator", "airspeed", "speed", "timed out", "out"} <= scan.terms
+
+    def test_keywords_require_word_boundaries(self, scanner):
+        scan = scanner.scan("fuel_pump sensor1 Fuel pressure")
+        assert sorted(scan.keywords) == ["fuel", "pressure"]
+        assert scan.contains("fuel")
+
+    def test_units_do_not_overlap(self, scanner):
+        scan = scanner.scan("measured 12.5 kg and ab12 kg at 250kts")
+        assert sorted(scan.keywords) == ["12.5 kg", "250kts"]
+
+    def test_error_marker_priority(self, scanner):
+        log = "step 1\nFailed: step 2\nAssertionError: expected 5 got 6\n"
+        assert scanner.scan(log).error_message == "expected 5 got 6"
+        assert scanner.scan("Failed: step 2\n").error_message == "step 2"
+        assert scanner.scan("first line\nsecond").error_message == "first line"
+
+    def test_stack_trace_window(self, scanner):
+        log = "start\nTraceback (most recent call last):\n" + "\n".join(f"  frame {i}" for i in range(20))
+        stack = scanner.scan(log).stack_trace
+        assert stack[0] == "Traceback (most recent call last):"
+        assert len(stack) == 10
+
+    def test_contains_outside_vocabulary(self, scanner):
+        scan = scanner.scan("Hydraulic PUMP cavitation")
+        assert scan.contains("pump")
+        assert not scan.contains("deadlock")
+
+
+def test_reasoning_agent_reuses_scan():
+    """Failure info carries the scan so later steps need no extra passes"""
+    from app.services.reasoning_agent import ReasoningAgent, FailureType
+
+    class Case:
+        test_case_id = "TC-1"
+        title = "Concurrency"
+        test_type = "system"
+        priority = "High"
+        requirement = None
+
+    agent = ReasoningAgent()
+    failure_info = agent._extract_failure_info(Case(), "Error: worker stuck\nDeadlock detected")
+    assert failure_info["scan"].contains("deadlock")
+    assert failure_info["error_message"] == "worker stuck"
+    assert agent._classify_failure(failure_info) == FailureType.CONCURRENCY_ERROR
+
+
+class TestStreamingLogScan:
+    """Test line-by-line scans against whole-log scans"""
+
+    LOGS = [
+        "start\nTraceback (most recent call last):\n" + "\n".join(f"  frame {i}" for i in range(20)),
+        "step 1\nFailed: step 2\nAssertionError: expected 12.5 kg got 13 kg\nfuel pressure timed out\n",
+        "Exception:\n\n   sensor deadlock in actuator control\nError: second",
+        "no markers here, just airspeed indicator drift\r\nat 250kts",
+    ]
+
+    @pytest.mark.parametrize("log", LOGS)
+    @pytest.mark.parametrize("lines_per_block", [1, 2, 100])
+    def test_matches_whole_log_scan(self, scanner, log, lines_per_block):
+        expected = scanner.scan(log)
+        stream = scanner.stream()
+        lines = log.split("\n")
+        for i in range(0, len(lines), lines_per_block):
+            stream.feed("\n".join(lines[i:i + lines_per_block]))
+        streamed = stream.finish()
+
+        assert streamed.terms == expected.terms
+        assert sorted(streamed.keywords) == sorted(expected.keywords)
+        assert streamed.error_message == expected.error_message
+        assert streamed.stack_trace == expected.stack_trace
+
+    def test_regex_hits_and_excerpt(self, scanner):
+        regexes = [re.compile(r"weight.*exceeds.*limit", re.IGNORECASE), re.compile(r"deadlock")]
+        stream = scanner.stream(regexes)
+        stream.feed("Weight 12850 lbs exceeds limit")
+        stream.feed("done")
+        scan = stream.finish()
+        assert scan.regex_hits == {"weight.*exceeds.*limit"}
+        assert scan.log == "Weight 12850 lbs exceeds limit\ndone"
+
+
+def test_iter_log_blocks(monkeypatch):
+    import io
+    from app.services import log_scanner
+
+    data = b"alpha\r\nbeta\ngamma\n\ndelta"
+    blocks = list(log_scanner.iter_log_blocks(io.BytesIO(data), chunk_size=4))
+    assert "\n".join(blocks) == data.decode()
+
+    # Over-long lines are cut and the rest of the line skipped
+    monkeypatch.setattr(log_scanner, "MAX_LINE_LENGTH", 8)
+    data = b"short\n" + b"x" * 100 + b"\nnext\nlast"
+    blocks = list(log_scanner.iter_log_blocks(io.BytesIO(data), chunk_size=7))
+    assert "\n".join(blocks).split("\n") == ["short", "x" * 8, "next", "last"]
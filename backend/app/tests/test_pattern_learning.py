@@ -0,0 +1,124 @@
+"""
+Tests for feedback-driven pattern confidence learning
+"""
+import pytest
+
+from app.models.requirement import Requirement, RequirementType
+from app.models.test_case import TestCase, TestCaseStatus
+from app.models.test_suggestion import FailureAnalysis, FailurePattern, SuggestionFeedback, TestCaseSuggestion
+from app.services import pattern_learning
+from app.services.pattern_learning import (
+    PatternWeights,
+    aggregate_pattern_feedback,
+    confidence_multiplier,
+    learn_pattern_confidence,
+    smoothed_confidence,
+)
+from app.services.reasoning_agent import ReasoningAgent
+from app.services.similarity_index import SimilarityIndex
+
+
+@pytest.fixture
+def rated_suggestions(db_session, test_user):
+    """WEIGHT_CALC_001 rated helpful three times, VALIDATION_ERROR_001 unhelpful twice"""
+    requirement = Requirement(
+        requirement_id="SYS-001", type=RequirementType.SYSTEM, title="Weight",
+        description="Weight limits", created_by_id=test_user.id,
+    )
+    db_session.add(requirement)
+    db_session.flush()
+    test_case = TestCase(
+        test_case_id="TC-000001", title="Weight", test_steps="Weigh", expected_results="OK",
+        status=TestCaseStatus.FAILED, requirement_id=requirement.id, created_by_id=test_user.id,
+    )
+    db_session.add(test_case)
+    db_session.flush()
+
+    for rule_id, votes in (("WEIGHT_CALC_001", [True, True, True]), ("VALIDATION_ERROR_001", [False, False])):
+        analysis = FailureAnalysis(
+            test_case_id=test_case.id, log_fingerprint=rule_id, knowledge_version="v1", report={}
+        )
+        suggestion = TestCaseSuggestion(
+            test_case_id=test_case.id, suggestion_type="fix_suggestion", priority=1,
+            action="Fix", matched_rule_id=rule_id, analysis=analysis,
+        )
+        db_session.add(suggestion)
+        db_session.flush()
+        for helpful in votes:
+            db_session.add(SuggestionFeedback(suggestion_id=suggestion.id, user_id=test_user.id, helpful=helpful))
+    db_session.commit()
+
+
+def test_smoothing_and_multiplier():
+    assert smoothed_confidence(0, 0) == 0.5
+    assert smoothed_confidence(3, 3) == pytest.approx(5 / 7)
+    assert confidence_multiplier(0.5) == 1.0
+    assert confidence_multiplier(None) == 1.0
+    assert confidence_multiplier(1.0) == 1.5
+
+
+def test_aggregate_pattern_feedback(db_session, rated_suggestions):
+    result = aggregate_pattern_feedback(db_session, {"WEIGHT_CALC_001": {"name": "Weight calculation"}})
+    assert result == {"patterns_updated": 0, "patterns_created": 2}
+
+    patterns = {p.rule_id: p for p in db_session.query(FailurePattern)}
+    weight = patterns["WEIGHT_CALC_001"]
+    assert weight.pattern_name == "Weight calculation"
+    assert (weight.times_matched, weight.times_helpful) == (1, 3)
+    assert weight.confidence_score == pytest.approx(5 / 7, abs=1e-4)
+    assert patterns["VALIDATION_ERROR_001"].confidence_score == pytest.approx(1 / 3, abs=1e-4)
+
+    # Re-running updates the same rows
+    assert aggregate_pattern_feedback(db_session) == {"patterns_updated": 2, "patterns_created": 0}
+
+
+def test_learned_weights_reorder_matches(db_session, rated_suggestions):
+    aggregate_pattern_feedback(db_session)
+    weights = PatternWeights()
+    weights.load(db_session)
+    assert weights.multiplier("WEIGHT_CALC_001") == pytest.approx(0.5 + 5 / 7, abs=1e-4)
+    assert weights.multiplier("UNKNOWN") == 1.0
+
+    neutral = ReasoningAgent(similarity_index=SimilarityIndex(), pattern_weights=PatternWeights())
+    learned = ReasoningAgent(similarity_index=SimilarityIndex(), pattern_weights=weights)
+    pattern = {"rule_id": "VALIDATION_ERROR_001", "failure_patterns": ["validation.*failed"], "keywords": ["invalid"]}
+    failure_info = {
+        "execution_log": "validation failed: invalid data",
+        "keywords": ["invalid"],
+        "requirement_type": None,
+        "requirement_category": "Data Integrity",
+    }
+    assert neutral._calculate_pattern_match_score(failure_info, pattern) == pytest.approx(0.7)
+    assert learned._calculate_pattern_match_score(failure_info, pattern) == pytest.approx(0.7 * (0.5 + 1 / 3), abs=1e-3)
+
+
+def test_weights_refresh_without_per_request_queries(db_session, rated_suggestions, monkeypatch):
+    loads = []
+
+    def session_factory():
+        loads.append(1)
+        return db_session
+
+    weights = PatternWeights(session_factory, ttl_seconds=300)
+    # The shared test session stays open until the fixture tears it down
+    monkeypatch.setattr(db_session, "close", lambda: None)
+    for _ in range(5):
+        weights.multiplier("WEIGHT_CALC_001")
+    assert len(loads) == 1
+
+    weights.invalidate()
+    weights.multiplier("WEIGHT_CALC_001")
+    assert len(loads) == 2
+
+
+def test_learning_job_reloads_weights(db_session, rated_suggestions, monkeypatch):
+    weights = PatternWeights(ttl_seconds=300)
+    weights.load(db_session)
+    monkeypatch.setattr(pattern_learning, "_pattern_weights", weights)
+
+    learn_pattern_confidence(db_session)
+
+    pattern = db_session.query(FailurePattern).filter_by(rule_id="WEIGHT_CALC_001").one()
+    assert pattern.confidence_score > 0.5
+    # Reloaded on next use instead of waiting out the ttl
+    assert weights._loaded_at is None
@@ -2,13 +2,18 @@
 Unit tests for the intelligent reasoning agent
 Tests pattern matching, root cause analysis, and suggestion generation
 """
+import json
+import os
 import pytest
 from app.services.reasoning_agent import (
     ReasoningAgent,
     FailureType,
     RootCause,
     Suggestion,
-    SuggestionReport
+    SuggestionReport,
+    KnowledgeBase,
+    get_reasoning_agent,
+    get_knowledge_base
 )
 
 
@@ -483,5 +488,48 @@ class TestDataClasses:
         assert 'suggestions' in result
 
 
+class TestKnowledgeBase:
+    """Test the shared, precompiled knowledge base"""
+
+    def test_singletons_are_shared(self):
+        """Agent and knowledge base are loaded once per process"""
+        assert get_reasoning_agent() is get_reasoning_agent()
+        assert get_knowledge_base() is get_knowledge_base()
+        assert get_reasoning_agent().kb is get_knowledge_base()
+
+    def test_candidates_match_full_scan(self, agent, weight_test_case, weight_failure_log):
+        """Pruning by inverted index keeps every pattern a full scan would match"""
+        failure_info = agent._extract_failure_info(weight_test_case, weight_failure_log)
+        full_scan = [
+            p for p in agent.kb.patterns
+            if agent._calculate_pattern_match_score(failure_info, p) > 0.5
+        ]
+        candidates = agent.kb.candidates(failure_info['keywords'], failure_info['requirement_type'])
+
+        assert full_scan
+        assert all(p in candidates for p in full_scan)
+        assert len(candidates) <= len(agent.kb.patterns)
+
+    def test_reload_on_mtime_change(self, tmp_path):
+        """Editing the patterns file is picked up without a restart"""
+        patterns_path = tmp_path / "failure_patterns.json"
+        patterns_path.write_text(json.dumps({"patterns": [{"name": "A", "keywords": ["Fuel"]}]}))
+        kb = KnowledgeBase(patterns_path, tmp_path / "missing_rules.json", check_interval=0)
+
+        assert kb.keyword_index == {"fuel": [0]}
+        assert kb.aerospace_rules == {"rules": []}
+
+        patterns_path.write_text(json.dumps({"patterns": [
+            {"name": "A", "keywords": ["fuel"]},
+            {"name": "B", "keywords": ["sensor", "fuel"]}
+        ]}))
+        stat = patterns_path.stat()
+        os.utime(patterns_path, (stat.st_atime, stat.st_mtime + 10))
+        kb.refresh()
+
+        assert [p.raw["name"] for p in kb.candidates(["sensor"], None)] == ["B"]
+        assert len(kb.candidates(["fuel"], None)) == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,189 @@
+"""
+Tests for ReqIF import and export
+"""
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from app.models.requirement import Requirement, RequirementPriority, RequirementStatus, RequirementType
+from app.models.test_case import TestCase, TestCaseStatus
+from app.models.traceability import TraceabilityLink, TraceLinkType
+from app.services import requirement_sync
+
+NS = {"r": "http://www.omg.org/spec/ReqIF/20110401/reqif.xsd"}
+
+OEM_DOCUMENT = """<?xml version="1.0" encoding="UTF-8"?>
+<REQ-IF xmlns="http://www.omg.org/spec/ReqIF/20110401/reqif.xsd" xmlns:xhtml="http://www.w3.org/1999/xhtml">
+  <CORE-CONTENT><REQ-IF-CONTENT>
+    <DATATYPES>
+      <DATATYPE-DEFINITION-STRING IDENTIFIER="_str" LAST-CHANGE="2026-01-01T00:00:00Z" MAX-LENGTH="255"/>
+      <DATATYPE-DEFINITION-ENUMERATION IDENTIFIER="_prio" LAST-CHANGE="2026-01-01T00:00:00Z">
+        <SPECIFIED-VALUES>
+          <ENUM-VALUE IDENTIFIER="_p1" LONG-NAME="critical" LAST-CHANGE="2026-01-01T00:00:00Z"/>
+        </SPECIFIED-VALUES>
+      </DATATYPE-DEFINITION-ENUMERATION>
+    </DATATYPES>
+    <SPEC-TYPES>
+      <SPEC-OBJECT-TYPE IDENTIFIER="_req" LONG-NAME="OEM Requirement" LAST-CHANGE="2026-01-01T00:00:00Z">
+        <SPEC-ATTRIBUTES>
+          <ATTRIBUTE-DEFINITION-STRING IDENTIFIER="_id" LONG-NAME="ReqIF.ForeignID" LAST-CHANGE="2026-01-01T00:00:00Z"/>
+          <ATTRIBUTE-DEFINITION-STRING IDENTIFIER="_name" LONG-NAME="ReqIF.Name" LAST-CHANGE="2026-01-01T00:00:00Z"/>
+          <ATTRIBUTE-DEFINITION-XHTML IDENTIFIER="_text" LONG-NAME="ReqIF.Text" LAST-CHANGE="2026-01-01T00:00:00Z"/>
+          <ATTRIBUTE-DEFINITION-ENUMERATION IDENTIFIER="_priority" LONG-NAME="Priority" LAST-CHANGE="2026-01-01T00:00:00Z"/>
+          <ATTRIBUTE-DEFINITION-STRING IDENTIFIER="_status" LONG-NAME="Status" LAST-CHANGE="2026-01-01T00:00:00Z"/>
+        </SPEC-ATTRIBUTES>
+      </SPEC-OBJECT-TYPE>
+      <SPEC-RELATION-TYPE IDENTIFIER="_derived" LONG-NAME="Derives From" LAST-CHANGE="2026-01-01T00:00:00Z"/>
+    </SPEC-TYPES>
+    <SPEC-OBJECTS>
+      <SPEC-OBJECT IDENTIFIER="_o1" LAST-CHANGE="2026-01-01T00:00:00Z">
+        <TYPE><SPEC-OBJECT-TYPE-REF>_req</SPEC-OBJECT-TYPE-REF></TYPE>
+        <VALUES>
+          <ATTRIBUTE-VALUE-STRING THE-VALUE="OEM-1"><DEFINITION><ATTRIBUTE-DEFINITION-STRING-REF>_id</ATTRIBUTE-DEFINITION-STRING-REF></DEFINITION></ATTRIBUTE-VALUE-STRING>
+          <ATTRIBUTE-VALUE-STRING THE-VALUE="Stall warning"><DEFINITION><ATTRIBUTE-DEFINITION-STRING-REF>_name</ATTRIBUTE-DEFINITION-STRING-REF></DEFINITION></ATTRIBUTE-VALUE-STRING>
+          <ATTRIBUTE-VALUE-XHTML><DEFINITION><ATTRIBUTE-DEFINITION-XHTML-REF>_text</ATTRIBUTE-DEFINITION-XHTML-REF></DEFINITION>
+            <THE-VALUE><xhtml:div><xhtml:p>The aircraft <xhtml:b>shall</xhtml:b> warn.</xhtml:p><xhtml:p>Aurally.</xhtml:p></xhtml:div></THE-VALUE>
+          </ATTRIBUTE-VALUE-XHTML>
+          <ATTRIBUTE-VALUE-ENUMERATION><DEFINITION><ATTRIBUTE-DEFINITION-ENUMERATION-REF>_priority</ATTRIBUTE-DEFINITION-ENUMERATION-REF></DEFINITION>
+            <VALUES><ENUM-VALUE-REF>_p1</ENUM-VALUE-REF></VALUES>
+          </ATTRIBUTE-VALUE-ENUMERATION>
+          <ATTRIBUTE-VALUE-STRING THE-VALUE="Under Review"><DEFINITION><ATTRIBUTE-DEFINITION-STRING-REF>_status</ATTRIBUTE-DEFINITION-STRING-REF></DEFINITION></ATTRIBUTE-VALUE-STRING>
+        </VALUES>
+      </SPEC-OBJECT>
+      <SPEC-OBJECT IDENTIFIER="_o2" LAST-CHANGE="2026-01-01T00:00:00Z">
+        <TYPE><SPEC-OBJECT-TYPE-REF>_req</SPEC-OBJECT-TYPE-REF></TYPE>
+        <VALUES>
+          <ATTRIBUTE-VALUE-STRING THE-VALUE="Stick shaker"><DEFINITION><ATTRIBUTE-DEFINITION-STRING-REF>_name</ATTRIBUTE-DEFINITION-STRING-REF></DEFINITION></ATTRIBUTE-VALUE-STRING>
+        </VALUES>
+      </SPEC-OBJECT>
+      <SPEC-OBJECT IDENTIFIER="_o3" LAST-CHANGE="2026-01-01T00:00:00Z">
+        <TYPE><SPEC-OBJECT-TYPE-REF>_req</SPEC-OBJECT-TYPE-REF></TYPE>
+        <VALUES>
+          <ATTRIBUTE-VALUE-STRING THE-VALUE="Broken"><DEFINITION><ATTRIBUTE-DEFINITION-STRING-REF>_name</ATTRIBUTE-DEFINITION-STRING-REF></DEFINITION></ATTRIBUTE-VALUE-STRING>
+          <ATTRIBUTE-VALUE-STRING THE-VALUE="Obsolete"><DEFINITION><ATTRIBUTE-DEFINITION-STRING-REF>_status</ATTRIBUTE-DEFINITION-STRING-REF></DEFINITION></ATTRIBUTE-VALUE-STRING>
+        </VALUES>
+      </SPEC-OBJECT>
+    </SPEC-OBJECTS>
+    <SPEC-RELATIONS>
+      <SPEC-RELATION IDENTIFIER="_r1" LAST-CHANGE="2026-01-01T00:00:00Z">
+        <TYPE><SPEC-RELATION-TYPE-REF>_derived</SPEC-RELATION-TYPE-REF></TYPE>
+        <SOURCE><SPEC-OBJECT-REF>_o2</SPEC-OBJECT-REF></SOURCE>
+        <TARGET><SPEC-OBJECT-REF>_o1</SPEC-OBJECT-REF></TARGET>
+      </SPEC-RELATION>
+    </SPEC-RELATIONS>
+  </REQ-IF-CONTENT></CORE-CONTENT>
+</REQ-IF>
+"""
+
+
+@pytest.fixture
+def exchange(db_session, test_user):
+    parent = Requirement(
+        requirement_id="AHLR-700", title="Stall protection", description="Line one\nLine <two> & more",
+        type=RequirementType.AHLR, priority=RequirementPriority.CRITICAL, status=RequirementStatus.APPROVED,
+        regulatory_page=12, created_by_id=test_user.id
+    )
+    child = Requirement(
+        requirement_id="SYS-701", title="Stall warning", description="Warn", type=RequirementType.SYSTEM,
+        created_by_id=test_user.id
+    )
+    db_session.add_all([parent, child])
+    db_session.flush()
+    db_session.add(TraceabilityLink(
+        source_id=child.id, target_id=parent.id, link_type=TraceLinkType.DERIVES_FROM, created_by_id=test_user.id
+    ))
+    db_session.add(TestCase(
+        test_case_id="TC-701", title="Warning test", test_steps="Slow down", expected_results="Horn",
+        status=TestCaseStatus.PASSED, automated=True, requirement_id=child.id, created_by_id=test_user.id
+    ))
+    db_session.commit()
+    return parent, child
+
+
+def _import(client, auth_headers, content: bytes, name="exchange.reqif"):
+    return client.post(
+        "/api/reqif/import", headers=auth_headers, files={"file": (name, content, "application/xml")}
+    )
+
+
+def test_export_reqif(client, auth_headers, exchange):
+    response = client.get("/api/reqif/export", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert 'filename="requirements.reqif"' in response.headers["content-disposition"]
+    document = ET.fromstring(response.content)
+    objects = document.findall(".//r:SPEC-OBJECTS/r:SPEC-OBJECT", NS)
+    assert [o.find("r:TYPE/r:SPEC-OBJECT-TYPE-REF", NS).text for o in objects] == [
+        "SOT-REQUIREMENT", "SOT-REQUIREMENT", "SOT-TEST-CASE"
+    ]
+    relations = document.findall(".//r:SPEC-RELATIONS/r:SPEC-RELATION", NS)
+    assert [r.find("r:TYPE/r:SPEC-RELATION-TYPE-REF", NS).text for r in relations] == [
+        "SRT-DERIVES_FROM", "SRT-VERIFIES"
+    ]
+
+    filtered = ET.fromstring(client.get("/api/reqif/export?type=Aircraft_High_Level_Requirement", headers=auth_headers).content)
+    assert len(filtered.findall(".//r:SPEC-OBJECT", NS)) == 1
+    assert filtered.findall(".//r:SPEC-RELATION", NS) == []
+
+
+def test_reimport_round_trip_is_unchanged(client, auth_headers, exchange, db_session):
+    exported = client.get("/api/reqif/export", headers=auth_headers).content
+
+    result = _import(client, auth_headers, exported).json()
+
+    assert result["requirements"] == {"inserted": 0, "updated": 0, "unchanged": 2}
+    assert result["test_cases"] == {"inserted": 0, "updated": 0, "unchanged": 1}
+    assert (result["links_created"], result["links_unchanged"], result["failed"]) == (0, 1, 0)
+
+
+def test_reimport_only_writes_changed_objects(client, auth_headers, exchange, db_session, monkeypatch):
+    # Several upsert batches per import
+    monkeypatch.setattr(requirement_sync, "UPSERT_BATCH_SIZE", 1)
+    parent, child = exchange
+    exported = client.get("/api/reqif/export", headers=auth_headers).content
+    db_session.delete(child)
+    parent.title = "Renamed locally"
+    db_session.commit()
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as reqifz:
+        reqifz.writestr("exchange.reqif", exported)
+    result = _import(client, auth_headers, archive.getvalue(), name="exchange.reqifz").json()
+
+    assert result["requirements"] == {"inserted": 1, "updated": 1, "unchanged": 0}
+    assert result["test_cases"]["inserted"] == 1
+    assert result["links_created"] == 1
+    db_session.expire_all()
+    restored = db_session.query(Requirement).filter_by(requirement_id="AHLR-700").one()
+    assert (restored.title, restored.description, restored.regulatory_page) == (
+        "Stall protection", "Line one\nLine <two> & more", 12
+    )
+    recreated = db_session.query(Requirement).filter_by(requirement_id="SYS-701").one()
+    assert (recreated.test_case_count, recreated.passed_test_count, recreated.child_link_count) == (1, 1, 1)
+    assert db_session.query(TestCase).filter_by(test_case_id="TC-701").one().automated is True
+
+
+def test_import_oem_document(client, auth_headers, db_session):
+    result = _import(client, auth_headers, OEM_DOCUMENT.encode()).json()
+
+    assert result["requirements"] == {"inserted": 2, "updated": 0, "unchanged": 0}
+    assert result["links_created"] == 1
+    assert result["failed"] == 1 and "Obsolete" in result["errors"][0]
+    warning = db_session.query(Requirement).filter_by(requirement_id="OEM-1").one()
+    assert warning.description == "The aircraft shall warn.\nAurally."
+    assert (warning.priority, warning.status, warning.type) == (
+        RequirementPriority.CRITICAL, RequirementStatus.UNDER_REVIEW, RequirementType.SYSTEM
+    )
+    # No foreign id: keyed by the ReqIF identifier
+    shaker = db_session.query(Requirement).filter_by(requirement_id="_o2").one()
+    assert shaker.child_traces[0].target_id == warning.id
+
+
+def test_import_rejects_invalid_documents(client, auth_headers):
+    assert _import(client, auth_headers, b"<REQ-IF><unclosed>").status_code == 400
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as reqifz:
+        reqifz.writestr("readme.txt", "no document")
+    assert _import(client, auth_headers, archive.getvalue(), name="x.reqifz").status_code == 400
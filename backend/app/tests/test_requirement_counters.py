@@ -0,0 +1,141 @@
+"""
+Tests for the denormalized requirement counters
+"""
+import pytest
+from sqlalchemy import update
+
+from app.models.counters import COUNTER_COLUMNS
+from app.models.requirement import Requirement, RequirementPriority, RequirementType
+from app.models.test_case import TestCase, TestCaseStatus
+from app.models.traceability import TraceabilityLink, TraceLinkType
+from app.services.requirement_counters import reconcile_requirement_counters
+from app.services.risk_analyzer import RiskAnalyzer
+
+
+@pytest.fixture
+def requirements(db_session, test_user):
+    requirements = [
+        Requirement(
+            requirement_id=f"SYS-40{i}", title=f"Requirement {i}", description="Test",
+            type=RequirementType.SYSTEM, priority=RequirementPriority.HIGH, created_by_id=test_user.id
+        )
+        for i in (1, 2)
+    ]
+    db_session.add_all(requirements)
+    db_session.commit()
+    return requirements
+
+
+def _counters(db_session, requirement):
+    db_session.refresh(requirement)
+    return {column: getattr(requirement, column) for column in COUNTER_COLUMNS}
+
+
+def _expected(**counts):
+    return {column: counts.get(column, 0) for column in COUNTER_COLUMNS}
+
+
+def _create_test_case(client, auth_headers, requirement, test_case_id):
+    response = client.post("/api/test-cases/", json={
+        "test_case_id": test_case_id, "title": "Test", "test_steps": "Run", "expected_results": "Pass",
+        "requirement_id": requirement.id
+    }, headers=auth_headers)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_test_case_writes_maintain_counters(client, auth_headers, db_session, requirements):
+    first, second = requirements
+    test_case_id = _create_test_case(client, auth_headers, first, "TC-401")
+    _create_test_case(client, auth_headers, first, "TC-402")
+    assert _counters(db_session, first) == _expected(test_case_count=2, pending_test_count=2)
+
+    response = client.patch(
+        f"/api/test-cases/{test_case_id}/execute", json={"status": "failed", "actual_results": "Timeout"},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert _counters(db_session, first) == _expected(test_case_count=2, pending_test_count=1, failed_test_count=1)
+
+    # Moving a test case to another requirement moves its counts with it
+    response = client.put(
+        f"/api/test-cases/{test_case_id}", json={"requirement_id": second.id, "status": "passed"}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert _counters(db_session, first) == _expected(test_case_count=1, pending_test_count=1)
+    assert _counters(db_session, second) == _expected(test_case_count=1, passed_test_count=1)
+
+    assert client.delete(f"/api/test-cases/{test_case_id}", headers=auth_headers).status_code == 204
+    assert _counters(db_session, second) == _expected()
+
+    listed = client.get("/api/requirements/?sort_by=id&sort_order=asc", headers=auth_headers).json()
+    assert [r["test_case_count"] for r in listed["requirements"]] == [1, 0]
+
+
+def test_link_writes_maintain_counters(client, auth_headers, db_session, test_user, requirements):
+    parent, child = requirements
+    link = TraceabilityLink(
+        source_id=child.id, target_id=parent.id, link_type=TraceLinkType.DERIVES_FROM, created_by_id=test_user.id
+    )
+    db_session.add(link)
+    db_session.commit()
+    assert _counters(db_session, parent) == _expected(parent_link_count=1)
+    assert _counters(db_session, child) == _expected(child_link_count=1)
+
+    detail = client.get(f"/api/requirements/{parent.id}", headers=auth_headers).json()
+    assert (detail["parent_trace_count"], len(detail["parent_traces"])) == (1, 1)
+
+    assert client.delete(f"/api/traceability/{link.id}", headers=auth_headers).status_code == 204
+    assert _counters(db_session, parent) == _expected()
+    assert _counters(db_session, child) == _expected()
+
+
+def test_deleting_requirement_updates_linked_counters(db_session, test_user, requirements):
+    parent, child = requirements
+    db_session.add(TraceabilityLink(
+        source_id=child.id, target_id=parent.id, link_type=TraceLinkType.DERIVES_FROM, created_by_id=test_user.id
+    ))
+    db_session.commit()
+
+    db_session.delete(child)
+    db_session.commit()
+    assert _counters(db_session, parent) == _expected()
+
+
+def test_bulk_import_updates_status_counters(client, auth_headers, db_session, requirements):
+    requirement = requirements[0]
+    for test_case_id in ("TC-401", "TC-402"):
+        _create_test_case(client, auth_headers, requirement, test_case_id)
+
+    body = (
+        b'{"test_case_id": "TC-401", "status": "failed"}\n'
+        b'{"test_case_id": "TC-402", "status": "passed"}\n'
+        b'{"test_case_id": "TC-401", "status": "passed"}\n'
+    )
+    response = client.post(
+        "/api/test-cases/results", files={"file": ("run.jsonl", body, "application/json")}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert _counters(db_session, requirement) == _expected(test_case_count=2, passed_test_count=2)
+
+    # Risk scoring reads the status counters
+    factors = {f.factor_name: f for f in RiskAnalyzer(db_session).calculate_risk_score(requirement).factors}
+    assert factors["Test Coverage"].details == "All 2 test(s) passing - fully verified"
+
+
+def test_reconcile_repairs_drift(db_session, test_user, requirements):
+    first, second = requirements
+    db_session.add(TestCase(
+        test_case_id="TC-401", title="Test", test_steps="Run", expected_results="Pass",
+        status=TestCaseStatus.PASSED, requirement_id=first.id, created_by_id=test_user.id
+    ))
+    db_session.commit()
+    assert reconcile_requirement_counters(db_session) == {"checked": 2, "fixed": 0}
+
+    # Writes outside the ORM leave the counters behind
+    db_session.execute(update(Requirement).values(test_case_count=5, child_link_count=1))
+    db_session.commit()
+
+    assert reconcile_requirement_counters(db_session) == {"checked": 2, "fixed": 2}
+    assert _counters(db_session, first) == _expected(test_case_count=1, passed_test_count=1)
+    assert _counters(db_session, second) == _expected()
@@ -0,0 +1,97 @@
+"""
+Tests for the idempotent requirement sync
+"""
+from sqlalchemy import event
+
+from app.models.requirement import Requirement, RequirementPriority, RequirementStatus, RequirementType
+from app.services import requirement_sync
+
+
+def _item(requirement_id, **fields):
+    return {
+        "requirement_id": requirement_id,
+        "type": "System_Requirement",
+        "title": f"Title {requirement_id}",
+        "description": "The system shall sync.",
+        **fields,
+    }
+
+
+def _sync(client, auth_headers, items):
+    return client.post("/api/requirements/sync", headers=auth_headers, json={"requirements": items})
+
+
+def test_sync_inserts_updates_and_skips_unchanged(client, auth_headers, db_session):
+    items = [_item(f"PLM-{i}") for i in range(3)]
+    response = _sync(client, auth_headers, items)
+    assert response.status_code == 200
+    assert response.json() == {"inserted": 3, "updated": 0, "unchanged": 0}
+
+    assert _sync(client, auth_headers, items).json() == {"inserted": 0, "updated": 0, "unchanged": 3}
+
+    items[1]["priority"] = "Critical"
+    items.append(_item("PLM-9", owner="avionics"))
+    assert _sync(client, auth_headers, items).json() == {"inserted": 1, "updated": 1, "unchanged": 2}
+
+    db_session.expire_all()
+    changed = db_session.query(Requirement).filter_by(requirement_id="PLM-1").one()
+    assert changed.priority == RequirementPriority.CRITICAL
+    assert changed.status == RequirementStatus.DRAFT and changed.version == "1.0"
+    assert changed.updated_at is not None
+    assert db_session.query(Requirement).filter_by(requirement_id="PLM-9").one().owner == "avionics"
+
+
+def test_sync_matches_requirements_written_through_the_api(client, auth_headers, db_session, test_user):
+    db_session.add(Requirement(
+        requirement_id="PLM-20", type=RequirementType.SYSTEM, title="Title PLM-20",
+        description="The system shall sync.", created_by_id=test_user.id
+    ))
+    db_session.commit()
+
+    assert _sync(client, auth_headers, [_item("PLM-20")]).json() == {"inserted": 0, "updated": 0, "unchanged": 1}
+
+    # Content set outside the sync is replaced by the upstream values
+    client.put(
+        f"/api/requirements/{db_session.query(Requirement).filter_by(requirement_id='PLM-20').one().id}",
+        headers=auth_headers, json={"title": "Edited locally"}
+    )
+    assert _sync(client, auth_headers, [_item("PLM-20")]).json() == {"inserted": 0, "updated": 1, "unchanged": 0}
+    db_session.expire_all()
+    assert db_session.query(Requirement).filter_by(requirement_id="PLM-20").one().title == "Title PLM-20"
+
+
+def test_sync_fills_in_missing_hashes(client, auth_headers, db_session):
+    _sync(client, auth_headers, [_item("PLM-40")])
+    # Rows written before the column existed have no hash
+    db_session.query(Requirement).filter_by(requirement_id="PLM-40").update({"content_hash": None})
+    db_session.commit()
+
+    assert _sync(client, auth_headers, [_item("PLM-40")]).json() == {"inserted": 0, "updated": 1, "unchanged": 0}
+    assert _sync(client, auth_headers, [_item("PLM-40")]).json() == {"inserted": 0, "updated": 0, "unchanged": 1}
+
+
+def test_sync_runs_two_statements_per_batch(client, auth_headers, db_session, monkeypatch):
+    monkeypatch.setattr(requirement_sync, "UPSERT_BATCH_SIZE", 50)
+    items = [_item(f"PLM-{i:03d}") for i in range(120)]
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "INSERT")) and "requirements" in statement:
+            statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = _sync(client, auth_headers, items)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert response.json() == {"inserted": 120, "updated": 0, "unchanged": 0}
+    # One hash lookup and one upsert per batch of 50
+    assert len(statements) == 6
+    assert sum("ON CONFLICT" in statement for statement in statements) == 3
+
+
+def test_sync_validates_items(client, auth_headers):
+    response = _sync(client, auth_headers, [_item("PLM-30", priority="Urgent")])
+    assert response.status_code == 422
@@ -0,0 +1,160 @@
+"""
+Unit tests for the similar-failure retrieval index
+"""
+import random
+
+import numpy as np
+import pytest
+from app.services.similarity_index import DEFAULT_DIM, INITIAL_CAPACITY, SimilarityIndex, VECTORS_FILE, vectorize
+
+def _word(n: int) -> str:
+    """A distinct letters-only token per number (tokenize drops digits)"""
+    return str(n).translate(str.maketrans("0123456789", "abcdefghij")) + "z"
+
+
+FUEL_LOG = "AssertionError: fuel density mismatch\nfuel density calculated at standard temperature"
+FUEL_LOG_RERUN = "AssertionError: fuel density mismatch at 15C\nfuel density calculated at standard temperature"
+TIMEOUT_LOG = "Error: database query timed out\nconnection pool exhausted"
+
+
+class TestVectorize:
+    """Test hashed n-gram vectors"""
+
+    def test_unit_length_and_stable(self):
+        vector = vectorize(FUEL_LOG)
+        assert vector.dtype == np.float32
+        assert np.linalg.norm(vector) == pytest.approx(1.0, rel=1e-5)
+        assert np.array_equal(vector, vectorize(FUEL_LOG))
+
+    def test_numbers_do_not_change_vector(self):
+        assert np.array_equal(vectorize("weight 12500 lbs exceeded"), vectorize("weight 12850 lbs exceeded"))
+
+    def test_empty_text(self):
+        assert not vectorize("1234 !!").any()
+
+
+class TestSimilarityIndex:
+    """Test appends, search and persistence"""
+
+    def test_search_ranks_similar_failures(self):
+        index = SimilarityIndex()
+        index.add(FUEL_LOG, test_case_id=1, test_case_name="TC-000001", failure_type="assertion_error")
+        index.add(TIMEOUT_LOG, test_case_id=2, test_case_name="TC-000002", failure_type="timeout")
+
+        results = index.search(FUEL_LOG_RERUN)
+        assert results[0]["test_case_name"] == "TC-000001"
+        assert results[0]["similarity"] > 0.8
+        assert all(r["test_case_id"] != 2 for r in results)
+
+    def test_excludes_current_test_case(self):
+        index = SimilarityIndex()
+        index.add(FUEL_LOG, test_case_id=1)
+        index.add(FUEL_LOG_RERUN, test_case_id=2)
+        assert [r["test_case_id"] for r in index.search(FUEL_LOG, exclude_test_case_id=1)] == [2]
+
+    def test_duplicate_failures_skipped(self):
+        index = SimilarityIndex()
+        assert index.add(FUEL_LOG, test_case_id=1)
+        assert not index.add(FUEL_LOG, test_case_id=1)
+        assert index.add(FUEL_LOG, test_case_id=3)
+        assert len(index) == 2
+
+    def test_appends_grow_buffer_geometrically(self):
+        index = SimilarityIndex(dim=8)
+        logs = [f"failure {_word(i)}" for i in range(INITIAL_CAPACITY * 4 + 1)]
+        capacities = set()
+        for i, log in enumerate(logs):
+            index.add(log, test_case_id=i)
+            capacities.add(len(index._vectors))
+
+        assert len(index) == len(logs)
+        assert sorted(capacities) == [INITIAL_CAPACITY * 2 ** n for n in range(4)]
+        # Rows written before each reallocation are carried over
+        assert np.array_equal(index._state[0][3], vectorize(logs[3], 8))
+        assert index.search(logs[3])[0]["test_case_id"] == 3
+
+    def test_default_width_keeps_distinctive_lines_apart(self):
+        """Recall trade-off: shared boilerplate swamps a short distinctive line in narrow vectors."""
+        rng = random.Random(7)
+
+        def word():
+            return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9)))
+
+        boilerplate, noise = [word() for _ in range(200)], [word() for _ in range(5000)]
+        signatures = [" ".join(word() for _ in range(8)) for _ in range(500)]
+
+        def log(family):
+            return "\n".join([
+                " ".join(rng.sample(boilerplate, 30)), signatures[family], " ".join(rng.sample(noise, 10))
+            ])
+
+        logs = [(family, log(family)) for family in range(500) for _ in range(2)]
+        queries = [(family, log(family)) for family in range(0, 500, 2)]
+
+        def recall(dim):
+            index = SimilarityIndex(dim=dim)
+            for i, (_, text) in enumerate(logs):
+                index.add(text, test_case_id=i)
+            hits = sum(
+                logs[index.search(text, k=1, min_similarity=-1)[0]["test_case_id"]][0] == family
+                for family, text in queries
+            )
+            return hits / len(queries)
+
+        assert recall(DEFAULT_DIM) >= 0.95
+        assert recall(256) < 0.6
+
+    def test_persistence_and_incremental_reload(self, tmp_path):
+        writer = SimilarityIndex(tmp_path)
+        writer.add(FUEL_LOG, test_case_id=1, test_case_name="TC-000001")
+
+        reader = SimilarityIndex(tmp_path, check_interval=0)
+        assert len(reader) == 1
+        writer.add(TIMEOUT_LOG, test_case_id=2, test_case_name="TC-000002")
+        # Another process's append becomes visible on the next search
+        assert reader.search(TIMEOUT_LOG)[0]["test_case_name"] == "TC-000002"
+        assert len(reader) == 2
+
+    def test_orphaned_vector_is_overwritten(self, tmp_path):
+        index = SimilarityIndex(tmp_path)
+        index.add(FUEL_LOG, test_case_id=1)
+        # Crash after the vector write but before its metadata line
+        with open(tmp_path / VECTORS_FILE, "ab") as f:
+            f.write(vectorize(TIMEOUT_LOG).tobytes())
+
+        reopened = SimilarityIndex(tmp_path)
+        reopened.add(FUEL_LOG_RERUN, test_case_id=2)
+        assert (tmp_path / VECTORS_FILE).stat().st_size == 2 * reopened.dim * 4
+        assert reopened.search(FUEL_LOG_RERUN)[0]["test_case_id"] == 2
+
+
+def test_reports_include_similar_failures(client, auth_headers, db_session, test_user):
+    """Analyzed failures are indexed and surface in later reports for other test cases"""
+    from app.models.requirement import Requirement, RequirementType
+    from app.models.test_case import TestCase, TestCaseStatus
+
+    requirement = Requirement(
+        requirement_id="SYS-001", type=RequirementType.SYSTEM, title="Fuel system",
+        description="Fuel quantity indication", created_by_id=test_user.id,
+    )
+    db_session.add(requirement)
+    db_session.flush()
+    tests = [
+        TestCase(
+            test_case_id=f"TC-00000{n}", title="Fuel density", test_steps="Measure",
+            expected_results="Match", status=TestCaseStatus.FAILED,
+            requirement_id=requirement.id, created_by_id=test_user.id,
+        )
+        for n in (1, 2)
+    ]
+    db_session.add_all(tests)
+    db_session.commit()
+
+    first = client.post(f"/api/test-cases/{tests[0].id}/analyze", json={"execution_log": FUEL_LOG}, headers=auth_headers)
+    assert first.json()["similar_failures"] == []
+
+    second = client.post(
+        f"/api/test-cases/{tests[1].id}/analyze", json={"execution_log": FUEL_LOG_RERUN}, headers=auth_headers
+    ).json()
+    assert [s["test_case_name"] for s in second["similar_failures"]] == ["TC-000001"]
+    assert second["similar_failures"][0]["analysis_id"] == first.json()["analysis_id"]
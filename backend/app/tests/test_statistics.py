@@ -0,0 +1,124 @@
+"""
+Tests for the statistics endpoints
+"""
+import pytest
+from sqlalchemy import event
+
+from app.models.requirement import Requirement, RequirementPriority, RequirementType
+from app.models.test_case import TestCase, TestCasePriority, TestCaseStatus
+from app.models.traceability import TraceabilityLink, TraceLinkType
+
+
+@pytest.fixture
+def requirement(db_session, test_user):
+    requirement = Requirement(
+        requirement_id="SYS-300", title="Avionics", description="Test",
+        type=RequirementType.SYSTEM, priority=RequirementPriority.CRITICAL, created_by_id=test_user.id
+    )
+    db_session.add(requirement)
+    db_session.commit()
+    return requirement
+
+
+@pytest.fixture
+def test_cases(db_session, test_user, requirement):
+    specs = [
+        (TestCaseStatus.PASSED, TestCasePriority.HIGH, True, 10),
+        (TestCaseStatus.PASSED, TestCasePriority.HIGH, True, 20),
+        (TestCaseStatus.FAILED, TestCasePriority.LOW, False, 30),
+        (TestCaseStatus.PENDING, TestCasePriority.LOW, False, None),
+    ]
+    cases = [
+        TestCase(
+            test_case_id=f"TC-30{i}", title=f"Test {i}", test_steps="Run", expected_results="Pass",
+            status=status, priority=priority, automated=automated, execution_duration=duration,
+            requirement_id=requirement.id, created_by_id=test_user.id
+        )
+        for i, (status, priority, automated, duration) in enumerate(specs)
+    ]
+    db_session.add_all(cases)
+    db_session.commit()
+    return cases
+
+
+@pytest.fixture
+def selects(db_session):
+    """Queries executed while the test runs (appended as they happen)"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.startswith(("SELECT", "WITH")):
+            statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_test_case_stats_single_query(client, auth_headers, test_cases, selects):
+    response = client.get("/api/test-cases/stats", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_test_cases": 4,
+        "by_status": {"passed": 2, "failed": 1, "pending": 1},
+        "by_priority": {"High": 2, "Low": 2},
+        "total_automated": 2,
+        "total_manual": 2,
+        "pass_rate": 66.67,
+        "avg_execution_duration": 20.0,
+    }
+    assert len([s for s in selects if "test_cases" in s]) == 1
+
+
+def test_test_case_stats_cached(client, auth_headers, db_session, test_cases, selects):
+    assert client.get("/api/test-cases/stats?cached=true", headers=auth_headers).json()["total_test_cases"] == 4
+    assert client.get("/api/test-cases/stats?cached=true", headers=auth_headers).json()["total_test_cases"] == 4
+    assert len([s for s in selects if "test_cases" in s]) == 1
+
+    # A committed write changes the table version, so the next read recomputes
+    db_session.delete(test_cases[0])
+    db_session.commit()
+    assert client.get("/api/test-cases/stats?cached=true", headers=auth_headers).json()["total_test_cases"] == 3
+
+
+def test_requirement_stats_single_query(client, auth_headers, db_session, test_user, requirement, test_cases, selects):
+    orphan = Requirement(
+        requirement_id="AHLR-300", title="Aircraft", description="Test",
+        type=RequirementType.AHLR, priority=RequirementPriority.LOW, created_by_id=test_user.id
+    )
+    untraced = Requirement(
+        requirement_id="TECH-300", title="Bus timing", description="Test",
+        type=RequirementType.TECHNICAL, priority=RequirementPriority.LOW, created_by_id=test_user.id
+    )
+    db_session.add_all([orphan, untraced])
+    db_session.flush()
+    db_session.add(TraceabilityLink(
+        source_id=orphan.id, target_id=requirement.id, link_type=TraceLinkType.DERIVES_FROM,
+        created_by_id=test_user.id
+    ))
+    db_session.commit()
+    selects.clear()
+
+    response = client.get("/api/requirements/stats", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_requirements": 3,
+        "by_type": {"Aircraft_High_Level_Requirement": 1, "System_Requirement": 1, "Technical_Specification": 1},
+        "by_status": {"draft": 3},
+        "by_priority": {"Critical": 1, "Low": 2},
+        "total_with_tests": 1,
+        "total_with_traces": 2,
+        "coverage_percentage": 33.33,
+    }
+    assert len([s for s in selects if "requirements" in s]) == 1
+
+    assert client.get("/api/requirements/stats?cached=true", headers=auth_headers).json() == response.json()
+
+
+def test_requirement_stats_empty(client, auth_headers):
+    response = client.get("/api/requirements/stats", headers=auth_headers)
+    assert response.json()["total_requirements"] == 0
+    assert response.json()["by_type"] == {}
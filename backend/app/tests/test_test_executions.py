@@ -0,0 +1,142 @@
+"""
+Tests for test execution history
+"""
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+import pytest
+
+from app.models.requirement import Requirement, RequirementPriority, RequirementType
+from app.models.test_case import TestCase, TestCaseStatus
+from app.models.test_execution import TestExecution
+from app.services.test_executions import (
+    decode_cursor,
+    encode_cursor,
+    find_flaky_tests,
+    purge_executions,
+    record_executions,
+)
+
+PASSED, FAILED = TestCaseStatus.PASSED, TestCaseStatus.FAILED
+
+
+@pytest.fixture
+def test_cases(db_session, test_user):
+    requirement = Requirement(
+        requirement_id="SYS-200", title="Hydraulics", description="Test",
+        type=RequirementType.SYSTEM, priority=RequirementPriority.HIGH, created_by_id=test_user.id
+    )
+    db_session.add(requirement)
+    db_session.flush()
+    cases = [
+        TestCase(
+            test_case_id=f"TC-10{i}", title=f"Test {i}", test_steps="Run", expected_results="Pass",
+            requirement_id=requirement.id, created_by_id=test_user.id
+        )
+        for i in (1, 2, 3)
+    ]
+    db_session.add_all(cases)
+    db_session.commit()
+    return cases
+
+
+def _record(db_session, test_case, statuses, start=None):
+    start = start or datetime.utcnow() - timedelta(days=1)
+    record_executions(db_session, [
+        {
+            "test_case_id": test_case.id,
+            "requirement_id": test_case.requirement_id,
+            "status": status,
+            "executed_at": start + timedelta(minutes=i)
+        }
+        for i, status in enumerate(statuses)
+    ])
+    db_session.commit()
+
+
+def test_execute_appends_history(client, auth_headers, test_cases):
+    test_case = test_cases[0]
+    for status, results in (("failed", "Pressure low"), ("passed", "Nominal"), ("passed", "Nominal again")):
+        response = client.patch(
+            f"/api/test-cases/{test_case.id}/execute",
+            json={"status": status, "actual_results": results},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+    first = client.get(f"/api/test-cases/{test_case.id}/executions?limit=2", headers=auth_headers)
+    assert first.status_code == 200
+    assert [e["actual_results"] for e in first.json()] == ["Nominal again", "Nominal"]
+    assert first.json()[0]["executed_by"] == "testuser"
+
+    cursor = first.headers["X-Next-Cursor"]
+    rest = client.get(f"/api/test-cases/{test_case.id}/executions?limit=2&cursor={cursor}", headers=auth_headers)
+    assert [(e["status"], e["actual_results"]) for e in rest.json()] == [("failed", "Pressure low")]
+    assert "X-Next-Cursor" not in rest.headers
+
+    assert client.get("/api/test-cases/9999/executions", headers=auth_headers).status_code == 404
+    assert client.get(
+        f"/api/test-cases/{test_case.id}/executions?cursor=nonsense", headers=auth_headers
+    ).status_code == 400
+
+
+def test_cursor_with_timezone_is_url_safe():
+    # PostgreSQL returns timestamptz values with a "+hh:mm" offset
+    cursor = (datetime(2024, 3, 1, 12, 30, 15, 250, tzinfo=timezone(timedelta(hours=2))), 42)
+
+    encoded = encode_cursor(cursor)
+
+    assert quote(encoded, safe="") == encoded
+    assert decode_cursor(encoded) == cursor
+    assert decode_cursor(encoded)[0].utcoffset() == timedelta(hours=2)
+    with pytest.raises(ValueError):
+        decode_cursor("nonsense")
+
+
+def test_bulk_import_appends_history(client, auth_headers, db_session, test_cases):
+    body = b'{"test_case_id": "TC-101", "status": "passed"}\n{"test_case_id": "TC-102", "status": "failed"}\n'
+    response = client.post(
+        "/api/test-cases/results",
+        files={"file": ("run.jsonl", body, "application/json")},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+
+    requirement_id = test_cases[0].requirement_id
+    history = client.get(f"/api/requirements/{requirement_id}/test-executions", headers=auth_headers).json()
+    assert sorted((e["test_case_id"], e["status"]) for e in history) == [
+        (test_cases[0].id, "passed"), (test_cases[1].id, "failed")
+    ]
+
+
+def test_flaky_detection(client, auth_headers, db_session, test_cases):
+    flaky, stable, broke_once = test_cases
+    _record(db_session, flaky, [PASSED, FAILED, PASSED, FAILED, TestCaseStatus.BLOCKED, PASSED, FAILED])
+    _record(db_session, stable, [PASSED] * 6)
+    _record(db_session, broke_once, [PASSED, PASSED, PASSED, FAILED, FAILED, FAILED])
+    # Outside the window
+    _record(db_session, stable, [FAILED, PASSED] * 3, start=datetime.utcnow() - timedelta(days=90))
+
+    results = find_flaky_tests(db_session, since=datetime.utcnow() - timedelta(days=30))
+    assert [(r["test_case_identifier"], r["executions"], r["flips"], r["failures"]) for r in results] == [
+        ("TC-101", 6, 5, 3)
+    ]
+    assert results[0]["flip_rate"] == 1.0
+
+    lenient = find_flaky_tests(db_session, since=datetime.utcnow() - timedelta(days=30), min_flip_rate=0.1)
+    assert [r["test_case_identifier"] for r in lenient] == ["TC-101", "TC-103"]
+
+    # The older alternating runs count once the window reaches them
+    response = client.get("/api/test-cases/flaky?days=120", headers=auth_headers)
+    assert response.status_code == 200
+    assert [(r["test_case_identifier"], r["flips"]) for r in response.json()] == [("TC-101", 5), ("TC-102", 5)]
+
+
+def test_purge_executions(db_session, test_cases):
+    now = datetime.utcnow()
+    _record(db_session, test_cases[0], [PASSED] * 3, start=now - timedelta(days=400))
+    _record(db_session, test_cases[0], [FAILED] * 2, start=now - timedelta(days=10))
+
+    assert purge_executions(db_session, retention_days=0) == {"partitions_dropped": 0, "rows_deleted": 0}
+    assert purge_executions(db_session, retention_days=365) == {"partitions_dropped": 0, "rows_deleted": 3}
+    assert db_session.query(TestExecution).count() == 2
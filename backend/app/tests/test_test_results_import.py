@@ -0,0 +1,139 @@
+"""
+Tests for bulk test result import
+"""
+import gzip
+import io
+import json
+
+import pytest
+
+from app.core.cache import table_versions
+from app.models.requirement import Requirement, RequirementPriority, RequirementType
+from app.models.test_case import TestCase, TestCaseStatus
+from app.services.similarity_index import get_similarity_index
+from app.services.test_results_import import detect_format, iter_junit_results
+
+JUNIT_REPORT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<testsuites>
+  <testsuite name="flight-controls" tests="4">
+    <testcase classname="fc.pitch" name="TC-001" time="1.6"/>
+    <testcase classname="fc.roll" name="test_roll_limits" time="0.2">
+      <properties><property name="test_case_id" value="TC-002"/></properties>
+      <failure message="Roll limit exceeded">AssertionError: 47 &gt; 45</failure>
+    </testcase>
+    <testcase classname="fc.yaw" name="TC-003"><skipped message="No rig available"/></testcase>
+    <testcase classname="fc.trim" name="TC-999" time="0.1"/>
+  </testsuite>
+</testsuites>
+"""
+
+
+@pytest.fixture
+def test_cases(db_session, test_user):
+    requirement = Requirement(
+        requirement_id="SYS-100", title="Flight controls", description="Test",
+        type=RequirementType.SYSTEM, priority=RequirementPriority.HIGH, created_by_id=test_user.id
+    )
+    db_session.add(requirement)
+    db_session.flush()
+    cases = [
+        TestCase(
+            test_case_id=f"TC-00{i}", title=f"Test {i}", test_steps="Run", expected_results="Pass",
+            requirement_id=requirement.id, created_by_id=test_user.id
+        )
+        for i in (1, 2, 3)
+    ]
+    db_session.add_all(cases)
+    db_session.commit()
+    return cases
+
+
+def _by_id(db_session):
+    db_session.expire_all()
+    return {tc.test_case_id: tc for tc in db_session.query(TestCase)}
+
+
+def test_detect_format():
+    assert detect_format("run.xml") == "junit"
+    assert detect_format("run.JSONL.gz") == "jsonl"
+    assert detect_format("run.ndjson") == "jsonl"
+    assert detect_format("run.txt") is None
+
+
+def test_junit_parsing():
+    records = list(iter_junit_results(io.BytesIO(JUNIT_REPORT)))
+
+    assert [(r.test_case_id, r.status) for r in records] == [
+        ("TC-001", TestCaseStatus.PASSED),
+        ("TC-002", TestCaseStatus.FAILED),
+        ("TC-003", TestCaseStatus.BLOCKED),
+        ("TC-999", TestCaseStatus.PASSED),
+    ]
+    assert records[0].execution_duration == 2
+    assert records[1].actual_results == "Roll limit exceeded\nAssertionError: 47 > 45"
+    assert records[2].actual_results == "No rig available"
+
+
+def test_import_junit(client, auth_headers, db_session, test_cases):
+    versions = table_versions("test_cases")
+
+    response = client.post(
+        "/api/test-cases/results",
+        files={"file": ("run.xml", JUNIT_REPORT, "application/xml")},
+        headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"updated": 3, "failed": 1, "errors": ["Test case 'TC-999' not found"]}
+    # One commit for the whole file
+    assert table_versions("test_cases") == (versions[0] + 1,)
+
+    cases = _by_id(db_session)
+    assert cases["TC-001"].status == TestCaseStatus.PASSED
+    assert cases["TC-001"].execution_duration == 2
+    assert cases["TC-001"].executed_by == "testuser"
+    assert cases["TC-001"].execution_date is not None
+    assert cases["TC-002"].status == TestCaseStatus.FAILED
+    assert cases["TC-003"].status == TestCaseStatus.BLOCKED
+    assert get_similarity_index().search("Roll limit exceeded AssertionError", k=1)[0]["test_case_name"] == "TC-002"
+
+
+def test_import_gzipped_jsonl(client, auth_headers, db_session, test_cases):
+    lines = [
+        {"test_case_id": "TC-001", "status": "failed", "actual_results": "Timeout", "executed_by": "ci-nightly"},
+        {"test_case_id": "TC-002", "status": "passed", "execution_duration": 4},
+    ]
+    body = gzip.compress("\n".join(json.dumps(line) for line in lines).encode() + b"\n\n")
+
+    response = client.post(
+        "/api/test-cases/results",
+        files={"file": ("run.jsonl.gz", body, "application/gzip")},
+        headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["updated"] == 2
+    cases = _by_id(db_session)
+    assert (cases["TC-001"].status, cases["TC-001"].executed_by) == (TestCaseStatus.FAILED, "ci-nightly")
+    assert (cases["TC-002"].status, cases["TC-002"].execution_duration) == (TestCaseStatus.PASSED, 4)
+
+
+def test_invalid_file_applies_nothing(client, auth_headers, db_session, test_cases):
+    body = b'{"test_case_id": "TC-001", "status": "passed"}\n{"test_case_id": "TC-002", "status": "exploded"}\n'
+
+    response = client.post(
+        "/api/test-cases/results",
+        files={"file": ("run.jsonl", body, "application/json")},
+        headers=auth_headers
+    )
+
+    assert response.status_code == 400
+    assert "Line 2" in response.json()["detail"]
+    assert _by_id(db_session)["TC-001"].status == TestCaseStatus.PENDING
+
+    response = client.post(
+        "/api/test-cases/results",
+        files={"file": ("run.txt", body, "text/plain")},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
@@ -0,0 +1,284 @@
+"""
+API tests for test failure analysis endpoints
+"""
+import io
+import json
+import tarfile
+
+import pytest
+from fastapi import status
+
+from app.models.requirement import Requirement, RequirementType, RequirementStatus, RequirementPriority
+from app.models.test_case import TestCase, TestCaseStatus
+from app.models.test_suggestion import FailurePattern
+from app.services.pattern_learning import get_pattern_weights
+
+WEIGHT_LOG = """Test execution failed
+AssertionError: Expected takeoff weight 12500 lbs, got 12850 lbs
+weight exceeds limit - fuel density calculated at standard temperature
+"""
+
+TIMEOUT_LOG = "Error: database query timed out after 30s\nconnection pool exhausted"
+
+
+@pytest.fixture
+def failed_tests(db_session, test_user):
+    """Two failed test cases on one requirement"""
+    requirement = Requirement(
+        requirement_id="CERT-001",
+        type=RequirementType.CERTIFICATION,
+        category="Weight and Balance",
+        title="Maximum takeoff weight",
+        description="MTOW shall not exceed 12,500 lbs",
+        status=RequirementStatus.APPROVED,
+        priority=RequirementPriority.CRITICAL,
+        created_by_id=test_user.id,
+    )
+    db_session.add(requirement)
+    db_session.flush()
+    tests = []
+    for n in (1, 2):
+        test_case = TestCase(
+            test_case_id=f"TC-00000{n}",
+            title=f"Weight check {n}",
+            test_steps="Compute weight",
+            expected_results="Within limit",
+            status=TestCaseStatus.FAILED,
+            requirement_id=requirement.id,
+            created_by_id=test_user.id,
+        )
+        db_session.add(test_case)
+        tests.append(test_case)
+    db_session.commit()
+    return tests
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_analyze_single_failure(client, auth_headers, failed_tests):
+    response = client.post(
+        f"/api/test-cases/{failed_tests[0].id}/analyze",
+        json={"execution_log": WEIGHT_LOG},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["test_case_name"] == "TC-000001"
+    assert data["failure_type"] == "assertion_error"
+    assert data["root_causes"] and data["suggestions"]
+
+
+def test_batch_analyze_streams_ndjson(client, auth_headers, failed_tests):
+    items = [
+        {"test_case_id": failed_tests[0].id, "execution_log": WEIGHT_LOG},
+        {"test_case_id": failed_tests[1].id, "execution_log": TIMEOUT_LOG},
+        {"test_case_id": 999999, "execution_log": "missing"},
+    ]
+    response = client.post("/api/test-cases/batch-analyze", json={"items": items}, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = _ndjson(response)
+    assert len(results) == 3
+
+    by_id = {r["test_case_id"]: r for r in results}
+    assert by_id[999999]["error"] == "Test case 999999 not found"
+    assert by_id[failed_tests[0].id]["failure_type"] == "assertion_error"
+    assert by_id[failed_tests[1].id]["failure_type"] == "timeout"
+    stored = by_id[failed_tests[0].id]
+    assert stored["cached"] is False and stored["analysis_id"] and stored["suggestion_ids"]
+
+    # Batch reports are stored like /analyze ones, in either direction
+    single = client.post(
+        f"/api/test-cases/{failed_tests[0].id}/analyze", json={"execution_log": WEIGHT_LOG}, headers=auth_headers
+    ).json()
+    assert single["cached"] is True and single["analysis_id"] == stored["analysis_id"]
+    rerun = _ndjson(client.post("/api/test-cases/batch-analyze", json={"items": items[:2]}, headers=auth_headers))
+    assert all(r["cached"] for r in rerun)
+    assert {r["analysis_id"] for r in rerun} == {r["analysis_id"] for r in results if "analysis_id" in r}
+
+
+def test_batch_analyze_rejects_empty_batch(client, auth_headers):
+    response = client.post("/api/test-cases/batch-analyze", json={"items": []}, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_batch_analyze_archive(client, auth_headers, failed_tests):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, log in ((f"logs/{failed_tests[0].id}.log", WEIGHT_LOG), ("logs/TC-000002.log", TIMEOUT_LOG)):
+            data = log.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+    response = client.post(
+        "/api/test-cases/batch-analyze/archive",
+        files={"file": ("logs.tar.gz", buffer.getvalue(), "application/gzip")},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    results = _ndjson(response)
+    assert sorted(r["test_case_name"] for r in results) == ["TC-000001", "TC-000002"]
+
+
+def test_batch_analyze_archive_invalid(client, auth_headers):
+    response = client.post(
+        "/api/test-cases/batch-analyze/archive",
+        files={"file": ("logs.tar.gz", b"not a tarball", "application/gzip")},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_batch_analyze_archive_too_large(client, auth_headers, monkeypatch):
+    monkeypatch.setattr("app.api.test_suggestions.MAX_BATCH_SIZE", 2)
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for i in range(5):
+            info = tarfile.TarInfo(f"logs/TC-00000{i}.log")
+            info.size = len(TIMEOUT_LOG)
+            archive.addfile(info, io.BytesIO(TIMEOUT_LOG.encode()))
+
+    response = client.post(
+        "/api/test-cases/batch-analyze/archive",
+        files={"file": ("logs.tar.gz", buffer.getvalue(), "application/gzip")},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "exceeds 2 files" in response.json()["detail"]
+
+
+def test_reanalysis_returns_stored_report(client, auth_headers, failed_tests):
+    url = f"/api/test-cases/{failed_tests[0].id}/analyze"
+    first = client.post(url, json={"execution_log": "2026-10-17 22:01:05,311 " + WEIGHT_LOG}, headers=auth_headers).json()
+    # Same failure on later runs: only line endings and timestamps differ
+    rerun_log = "2026-10-19T08:00:00Z " + WEIGHT_LOG.replace("\n", "\r\n")
+    rerun = client.post(url, json={"execution_log": "2026-10-18T07:30:12Z " + WEIGHT_LOG}, headers=auth_headers).json()
+    second = client.post(url, json={"execution_log": rerun_log}, headers=auth_headers).json()
+
+    assert first["cached"] is False
+    assert rerun["cached"] is True and second["cached"] is True
+    assert second["analysis_id"] == first["analysis_id"]
+    assert second["suggestions"] == first["suggestions"]
+    assert second["suggestion_ids"] == first["suggestion_ids"]
+
+    different = client.post(url, json={"execution_log": TIMEOUT_LOG}, headers=auth_headers).json()
+    assert different["cached"] is False
+    assert different["analysis_id"] != first["analysis_id"]
+
+
+def test_stored_report_follows_weights(client, auth_headers, db_session, failed_tests):
+    first_url, second_url = (f"/api/test-cases/{t.id}/analyze" for t in failed_tests)
+    first = client.post(first_url, json={"execution_log": WEIGHT_LOG}, headers=auth_headers).json()
+    client.post(second_url, json={"execution_log": WEIGHT_LOG}, headers=auth_headers)
+
+    # Served as stored, though a similar failure was indexed since
+    cached = client.post(first_url, json={"execution_log": WEIGHT_LOG}, headers=auth_headers).json()
+    assert cached["cached"] is True
+    assert cached["similar_failures"] == first["similar_failures"]
+
+    db_session.add(FailurePattern(rule_id="WEIGHT_CALC_001", pattern_name="Weight", confidence_score=0.9))
+    db_session.commit()
+    get_pattern_weights().load(db_session)
+
+    relearned = client.post(first_url, json={"execution_log": WEIGHT_LOG}, headers=auth_headers).json()
+    assert relearned["cached"] is False
+    assert relearned["analysis_id"] != first["analysis_id"]
+
+
+def test_suggestion_history_and_feedback(client, auth_headers, failed_tests):
+    analysis = client.post(
+        f"/api/test-cases/{failed_tests[0].id}/analyze",
+        json={"execution_log": WEIGHT_LOG},
+        headers=auth_headers,
+    ).json()
+    suggestion_id = analysis["suggestion_ids"][0]
+
+    response = client.post(
+        f"/api/test-cases/suggestions/{suggestion_id}/feedback",
+        json={"helpful": True, "comment": "Fixed the density constant"},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["feedback_id"]
+
+    history = client.get(f"/api/test-cases/{failed_tests[0].id}/suggestions", headers=auth_headers).json()
+    assert [s["id"] for s in history["suggestions"]] == analysis["suggestion_ids"]
+    stored = {s["id"]: s for s in history["suggestions"]}[suggestion_id]
+    assert stored["helpful_count"] == 1 and stored["feedback_count"] == 1
+
+
+def test_feedback_unknown_suggestion(client, auth_headers):
+    response = client.post(
+        "/api/test-cases/suggestions/999999/feedback",
+        json={"helpful": False},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_analysis_stats(client, auth_headers, failed_tests):
+    for test_case, log in ((failed_tests[0], WEIGHT_LOG), (failed_tests[1], TIMEOUT_LOG), (failed_tests[0], WEIGHT_LOG)):
+        client.post(f"/api/test-cases/{test_case.id}/analyze", json={"execution_log": log}, headers=auth_headers)
+
+    response = client.get("/api/test-cases/analysis-stats", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    stats = response.json()
+    assert stats["total_analyses"] == 2
+    assert stats["analyses_this_week"] == 2
+    assert stats["failure_types"] == {"assertion_error": 1, "timeout": 1}
+    assert 0 < stats["average_confidence"] <= 1
+
+
+@pytest.mark.parametrize("log", [
+    WEIGHT_LOG,
+    "\n\n  2026-10-19 08:00:00 start \r\nobject at 0x7f3a\r\n\t\r\nend\t\n \n",
+    "single line",
+    "",
+])
+def test_streamed_fingerprint_matches(log):
+    from app.services.failure_analysis import LogFingerprint, log_fingerprint
+
+    lines = log.split("\n")
+    for lines_per_block in (1, 3):
+        fingerprint = LogFingerprint()
+        for i in range(0, len(lines), lines_per_block):
+            fingerprint.update("\n".join(lines[i:i + lines_per_block]))
+        assert fingerprint.hexdigest() == log_fingerprint(log)
+
+
+def test_analyze_uploaded_log(client, auth_headers, failed_tests):
+    url = f"/api/test-cases/{failed_tests[0].id}/analyze"
+    uploaded = client.post(
+        url + "/upload",
+        files={"file": ("run.log", WEIGHT_LOG.replace("\n", "\r\n").encode(), "text/plain")},
+        headers=auth_headers,
+    )
+    assert uploaded.status_code == status.HTTP_200_OK
+    data = uploaded.json()
+    assert data["cached"] is False
+    assert data["failure_type"] == "assertion_error"
+    assert data["suggestions"]
+
+    # The same failure posted as JSON hits the stored report
+    posted = client.post(url, json={"execution_log": WEIGHT_LOG}, headers=auth_headers).json()
+    assert posted["cached"] is True
+    assert posted["analysis_id"] == data["analysis_id"]
+
+
+def test_analyze_uploaded_gzip_log(client, auth_headers, failed_tests):
+    import gzip
+
+    url = f"/api/test-cases/{failed_tests[1].id}/analyze/upload"
+    response = client.post(
+        url, files={"file": ("run.log.gz", gzip.compress(TIMEOUT_LOG.encode()), "application/gzip")},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["failure_type"] == "timeout"
+
+    invalid = client.post(url, files={"file": ("run.log.gz", b"not gzip", "application/gzip")}, headers=auth_headers)
+    assert invalid.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,116 @@
+"""
+Tests for the traceability and verification matrices
+"""
+import csv
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from app.models.requirement import Requirement, RequirementType
+from app.models.test_case import TestCase, TestCaseStatus
+from app.models.traceability import TraceabilityLink, TraceLinkType
+
+
+@pytest.fixture
+def tree(db_session, test_user):
+    """AHLR-500 <- SYS-501 <- TECH-503, AHLR-500 <- SYS-502 (untested), TECH-503 also <- AHLR-500; SYS-509 unrelated"""
+    specs = {
+        "AHLR-500": RequirementType.AHLR,
+        "SYS-501": RequirementType.SYSTEM,
+        "SYS-502": RequirementType.SYSTEM,
+        "TECH-503": RequirementType.TECHNICAL,
+        "SYS-509": RequirementType.SYSTEM,
+    }
+    requirements = {
+        identifier: Requirement(
+            requirement_id=identifier, title=identifier, description="Test", type=req_type, created_by_id=test_user.id
+        )
+        for identifier, req_type in specs.items()
+    }
+    db_session.add_all(requirements.values())
+    db_session.flush()
+
+    for child, parent in (("SYS-501", "AHLR-500"), ("SYS-502", "AHLR-500"), ("TECH-503", "SYS-501"), ("TECH-503", "AHLR-500")):
+        db_session.add(TraceabilityLink(
+            source_id=requirements[child].id, target_id=requirements[parent].id,
+            link_type=TraceLinkType.DERIVES_FROM, created_by_id=test_user.id
+        ))
+    for test_case_id, requirement, status in (
+        ("TC-501", "AHLR-500", TestCaseStatus.PASSED),
+        ("TC-502", "SYS-501", TestCaseStatus.PASSED),
+        ("TC-503", "TECH-503", TestCaseStatus.PASSED),
+        ("TC-504", "TECH-503", TestCaseStatus.FAILED),
+        ("TC-509", "SYS-509", TestCaseStatus.PASSED),
+    ):
+        db_session.add(TestCase(
+            test_case_id=test_case_id, title=test_case_id, test_steps="Run", expected_results="Pass",
+            status=status, requirement_id=requirements[requirement].id, created_by_id=test_user.id
+        ))
+    db_session.commit()
+    return requirements
+
+
+def test_direct_matrix_lists_neighbours(client, auth_headers, tree):
+    matrix = client.get(f"/api/traceability/matrix/{tree['SYS-501'].id}", headers=auth_headers).json()
+
+    assert [p["requirement_id"] for p in matrix["parent_requirements"]] == ["AHLR-500"]
+    assert [(c["requirement_id"], c["test_case_count"]) for c in matrix["child_requirements"]] == [("TECH-503", 2)]
+    assert matrix["total_tests"] == 1
+
+
+def test_subtree_matrix(client, auth_headers, tree):
+    response = client.get(f"/api/traceability/matrix/{tree['AHLR-500'].id}/subtree", headers=auth_headers)
+
+    assert response.status_code == 200
+    matrix = response.json()
+    # TECH-503 is reachable at depth 1 and 2 and listed once, at depth 1
+    assert [(r["requirement_id"], r["depth"]) for r in matrix["requirements"]] == [
+        ("AHLR-500", 0), ("SYS-501", 1), ("SYS-502", 1), ("TECH-503", 1)
+    ]
+    assert [tc["test_case_id"] for tc in matrix["requirements"][3]["test_cases"]] == ["TC-503", "TC-504"]
+    assert (matrix["total_requirements"], matrix["total_test_cases"]) == (4, 4)
+    assert (matrix["verified_requirements"], matrix["untested_requirements"]) == (2, 1)
+
+    shallow = client.get(
+        f"/api/traceability/matrix/{tree['SYS-501'].id}/subtree?max_depth=0", headers=auth_headers
+    ).json()
+    assert [r["requirement_id"] for r in shallow["requirements"]] == ["SYS-501"]
+
+    assert client.get("/api/traceability/matrix/9999/subtree", headers=auth_headers).status_code == 404
+
+
+def test_subtree_matrix_csv(client, auth_headers, tree):
+    response = client.get(
+        f"/api/traceability/matrix/{tree['AHLR-500'].id}/subtree?format=csv", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="AHLR-500-matrix.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(r["requirement_id"], r["test_case_id"], r["test_status"]) for r in rows] == [
+        ("AHLR-500", "TC-501", "passed"),
+        ("SYS-501", "TC-502", "passed"),
+        ("SYS-502", "", ""),
+        ("TECH-503", "TC-503", "passed"),
+        ("TECH-503", "TC-504", "failed"),
+    ]
+
+
+def test_subtree_matrix_xlsx(client, auth_headers, tree):
+    response = client.get(
+        f"/api/traceability/matrix/{tree['AHLR-500'].id}/subtree?format=xlsx", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    workbook = zipfile.ZipFile(io.BytesIO(response.content))
+    assert workbook.testzip() is None
+    namespace = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+    sheet = ET.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+    rows = sheet.findall("s:sheetData/s:row", namespace)
+    assert len(rows) == 6
+    header = [cell.findtext("s:is/s:t", namespaces=namespace) for cell in rows[0]]
+    assert header[:2] == ["depth", "requirement_id"]
+    assert rows[1][0].findtext("s:v", namespaces=namespace) == "0"
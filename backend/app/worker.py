@@ -0,0 +1,26 @@
+"""
+Background Job Worker
+Runs queued jobs from the jobs table.
+
+Usage:
+    python -m app.worker            # poll until stopped (SIGTERM / Ctrl-C)
+    python -m app.worker --burst    # exit once the queue is empty
+"""
+import argparse
+import logging
+
+from app.services.jobs import Worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CALIDUS background job worker")
+    parser.add_argument("--burst", action="store_true", help="exit once the queue is empty")
+    parser.add_argument("--worker-id", help="identifier recorded on claimed jobs (default host:pid)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    Worker(worker_id=args.worker_id).run(burst=args.burst)
+
+
+if __name__ == "__main__":
+    main()